@@ -1,15 +1,200 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, send_file
 import os
 import re
+import threading
 import time
+import zipfile
 
-from agents.configuration_agent import configure_generation, export_data
-from agents.schema_analysis_agent import analyze_schema_file
-from agents.data_generation_agent import generate_data
-from agents.validation_agent import validate_all_tables
+from agents.configuration_agent import configure_generation
+from agents.db_loader import request_database_options
+from agents.instrumentation import PipelineMetrics, profiled, registry
+from agents.job_queue import JobQueue
+from agents.profiling_agent import apply_profile, load_profile, profile_csv, save_profile
+from agents.result_cache import DEFAULT_MAX_BYTES, ResultCache, result_key
+from agents.schema_analysis_agent import analyze_schema_file_cached
+from agents.pipeline import run_parallel_pipeline, run_streaming_pipeline
+from agents.preload import preload_in_background
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
 
+# Expecting input format like:
+# "Generate 100 rows for ecommerce-data-metadata.json as json"
+REQUEST_PATTERN = r"generate\s+(\d+)\s+rows\s+for\s+(\S+)\s+as\s+(\w+)"
+SEED_PATTERN = r"\bseed\s+(\d+)"
+USAGE = "❗ Please use format: Generate <rows> rows for <schema>.json as <format>"
+JOB_OUTPUT_DIR = os.path.join("data", "outputs", "jobs")
+# Each chat request writes to a directory of its own, so concurrent requests never share files
+CHAT_OUTPUT_DIR = os.path.join("data", "outputs", "chat")
+VALIDATION_REPORT_FILE = "validation_report.ndjson.gz"
+SAMPLE_DIR = os.path.join("data", "samples")
+DEFAULT_PRIVACY_SETTINGS = {"GDPR": True}
+
+
+def parse_request(message: str) -> dict:
+    """
+    Extracts the generation parameters from a chat message, or returns None.
+    """
+    match = re.search(REQUEST_PATTERN, message.lower())
+    if not match:
+        return None
+    seed = re.search(SEED_PATTERN, message.lower())
+    return {
+        "rows": int(match.group(1)),
+        "schema_file": match.group(2),
+        "format": match.group(3),
+        "seed": int(seed.group(1)) if seed else None
+    }
+
+
+def request_dir_name() -> str:
+    """
+    Returns a fresh, time-ordered directory name for one request's output.
+    """
+    return f"{int(time.time())}-{os.urandom(4).hex()}"
+
+
+def request_export_options(options: dict, output_dir: str) -> dict:
+    """
+    Restricts the export options of a request to what a client may choose
+    (see `db_loader.request_database_options`): SQLite files inside the
+    request's output directory, or the database set by DATABASE_DSN.
+    """
+    return request_database_options(options, output_dir, {"dsn": os.environ.get("DATABASE_DSN")})
+
+
+def run_generation(params: dict, output_dir: str = 'data/outputs', progress=None, metrics=None) -> dict:
+    """
+    Runs configure → analyze → generate → validate → mask → export for one request.
+
+    Identical seeded requests (same schema content, rows, format, seed and
+    options) are served from the result cache by linking the earlier files
+    into place; requests without a seed always generate fresh data.
+    Stage timings are recorded into `metrics` when given. With
+    `params["validation_report"]` set, the detailed validation reports are
+    written next to the exported files; such requests skip the cache lookup.
+    DATABASE requests load into the database given by
+    `params["export_options"]` and are never cached, as they leave no files.
+    """
+    # Step 1: Configure
+    config = configure_generation(
+        data_volume=params["rows"],
+        export_format=params["format"],
+        custom_rules=params.get("custom_rules"),
+        privacy_settings=params.get("privacy_settings", DEFAULT_PRIVACY_SETTINGS),
+        workers=int(os.environ.get("GENERATION_WORKERS", "1")),
+        export_options=params.get("export_options")
+    )
+    cacheable = config["export_format"] != "DATABASE" and params.get("seed") is not None
+
+    # Step 2: Locate Schema
+    schema_path = os.path.join("data", "schemas", params["schema_file"])
+    if not os.path.exists(schema_path):
+        raise FileNotFoundError(f"Schema file not found: {params['schema_file']}")
+
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    report_path = os.path.join(output_dir, VALIDATION_REPORT_FILE) if params.get("validation_report") else None
+    with metrics.stage("cache"):
+        key = result_key(schema_path, config, params.get("seed"))
+        exported = result_cache().get(key, output_dir) if report_path is None and cacheable else None
+    if exported is not None:
+        print(f"\n♻️  Reusing cached result {key[:12]} for {params['schema_file']}")
+        if progress is not None:
+            rows = sum(info["rows"] for info in exported.values())
+            progress(generated=rows, validated=rows, exported=rows, cached=True)
+        return exported
+
+    # Step 3: Analyze Schema, shaped by the sample data profile stored next to it
+    with metrics.stage("parse"):
+        parsed_schema = apply_profile(analyze_schema_file_cached(schema_path), load_profile(schema_path))
+
+    # Step 4-6: Generate, validate and export chunk by chunk
+    if (config["workers"] or 1) > 1:
+        exported = run_parallel_pipeline(
+            parsed_schema, config, output_dir, params.get("seed"),
+            progress=progress, metrics=metrics, report_path=report_path
+        )
+    else:
+        exported = run_streaming_pipeline(
+            parsed_schema, config, output_dir, params.get("seed"),
+            progress=progress, metrics=metrics, report_path=report_path
+        )
+    if cacheable:
+        result_cache().put(key, config["export_format"], exported)
+    return exported
+
+
+def run_job(params: dict, progress) -> dict:
+    """
+    Job runner: generates into a directory of its own and returns a JSON summary.
+    """
+    output_dir = os.path.join(JOB_OUTPUT_DIR, params["job_dir"])
+    metrics = PipelineMetrics()
+    try:
+        exported = run_generation(params, output_dir, progress, metrics)
+    except Exception:
+        registry.observe(metrics, "error")
+        raise
+    registry.observe(metrics)
+    result = {
+        "output_dir": output_dir,
+        "timings": metrics.to_dict(),
+        "tables": {
+            table_name: {
+                "file_paths": info["file_paths"],
+                **({"target": info["files"][0]["target"]} if "target" in info["files"][0] else {}),
+                "rows": info["rows"],
+                "bytes": info["bytes"],
+                "valid": info["validation"]["success"] if "validation" in info else None
+            }
+            for table_name, info in exported.items()
+        },
+        "validation": validation_summaries(exported)
+    }
+    if params.get("validation_report"):
+        result["validation_report"] = os.path.join(output_dir, VALIDATION_REPORT_FILE)
+    return result
+
+
+def validation_summaries(exported: dict) -> dict:
+    """
+    Returns the per-table validation summaries of a pipeline result.
+    """
+    return {table_name: info["validation"] for table_name, info in exported.items() if "validation" in info}
+
+
+# The result cache and job queue own files under ./data, so they are only
+# created when first used rather than whenever this module is imported
+_services = {}
+_services_lock = threading.Lock()
+
+
+def result_cache() -> ResultCache:
+    """
+    Returns the process-wide result cache, created on first use.
+    """
+    with _services_lock:
+        if "result_cache" not in _services:
+            _services["result_cache"] = ResultCache(
+                max_bytes=int(os.environ.get("RESULT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+            )
+        return _services["result_cache"]
+
+
+def jobs() -> JobQueue:
+    """
+    Returns the process-wide job queue, created on first use. Its workers
+    start with the first submitted job, or with `jobs().start()`.
+    """
+    with _services_lock:
+        if "jobs" not in _services:
+            _services["jobs"] = JobQueue(
+                run_job,
+                db_path=os.environ.get("JOB_DB", os.path.join("data", "jobs.sqlite3")),
+                max_workers=int(os.environ.get("JOB_WORKERS", "2"))
+            )
+        return _services["jobs"]
+
+
 @app.route("/")
 def index():
     return render_template("index.html")
@@ -21,56 +206,185 @@ def chat():
     if not user_message:
         return jsonify({"response": "❌ Please enter a valid message."})
 
+    metrics = PipelineMetrics()
     try:
-        # Expecting input format like:
-        # "Generate 100 rows for ecommerce-data-metadata.json as json"
-        pattern = r"generate\s+(\d+)\s+rows\s+for\s+(\S+)\s+as\s+(\w+)"
-        match = re.search(pattern, user_message.lower())
-
-        if not match:
-            return jsonify({"response": "❗ Please use format: Generate <rows> rows for <schema>.json as <format>"})
-
-        row_count = int(match.group(1))
-        schema_file = match.group(2)
-        export_format = match.group(3)
-
-        # Step 1: Configure
-        config = configure_generation(
-            data_volume=row_count,
-            export_format=export_format,
-            custom_rules=None,
-            privacy_settings={"GDPR": True}
+        params = parse_request(user_message)
+        if params is None:
+            return jsonify({"response": USAGE})
+        params["validation_report"] = bool(request.json.get("validation_report"))
+        params["custom_rules"] = request.json.get("custom_rules")
+        params["privacy_settings"] = request.json.get("privacy_settings", DEFAULT_PRIVACY_SETTINGS)
+
+        output_dir = os.path.join(CHAT_OUTPUT_DIR, request_dir_name())
+        params["export_options"] = request_export_options(request.json.get("export_options"), output_dir)
+        with profiled(bool(request.json.get("profile"))) as profile:
+            exported = run_generation(params, output_dir, metrics=metrics)
+        timings = metrics.to_dict()
+        registry.observe(metrics)
+        output_files = ", ".join(f"`{path}`" for info in exported.values() for path in info["file_paths"])
+        total_bytes = sum(info["bytes"] for info in exported.values())
+        targets = {entry["target"] for info in exported.values() for entry in info["files"] if "target" in entry}
+        destination = (
+            f"🗄️ Data loaded into: {', '.join(f'`{target}`' for target in sorted(targets))}" if targets
+            else f"📁 Data exported to: {output_files} ({total_bytes:,} bytes)"
         )
 
-        # Step 2: Locate Schema
-        schema_path = os.path.join("data", "schemas", schema_file)
-        if not os.path.exists(schema_path):
-            return jsonify({"response": f"❌ Schema file not found: {schema_file}"})
+        response = {
+            "response": (
+                f"✅ Generated {params['rows']} rows from `{params['schema_file']}` as `{params['format']}` in {timings['wall_seconds']:.2f}s.\n"
+                f"{destination}"
+            ),
+            "timings": timings,
+            "validation": validation_summaries(exported)
+        }
+        if params["validation_report"]:
+            response["validation_report"] = os.path.join(output_dir, VALIDATION_REPORT_FILE)
+        if profile:
+            response["profile"] = profile
+        return jsonify(response)
 
-        # Step 3: Analyze Schema
-        parsed_schema = analyze_schema_file(schema_path)
+    except FileNotFoundError as e:
+        registry.observe(metrics, "error")
+        return jsonify({"response": f"❌ {str(e)}"})
+    except Exception as e:
+        registry.observe(metrics, "error")
+        return jsonify({"response": f"❌ Error: {str(e)}"})
 
-        # Step 4: Generate Data
-        start = time.time()
-        generated_data = generate_data(parsed_schema, config["data_volume"])
-        duration = time.time() - start
 
-        # Step 5: Validate
-        validate_all_tables(generated_data, parsed_schema)
+@app.route("/api/jobs", methods=["POST"])
+def submit_job():
+    body = request.json or {}
+    params = parse_request(body.get("message", "")) if "message" in body else {
+        key: body.get(key) for key in ("rows", "schema_file", "format", "seed")
+    }
+    if params is None or not all(params[key] for key in ("rows", "schema_file", "format")):
+        return jsonify({"error": USAGE}), 400
+    try:
+        params["rows"] = int(params["rows"])
+        params["seed"] = int(params["seed"]) if params["seed"] is not None else None
+        priority = int(body.get("priority", 0))
+    except (TypeError, ValueError):
+        return jsonify({"error": "'rows', 'seed' and 'priority' must be integers"}), 400
+    params["validation_report"] = bool(body.get("validation_report"))
+    params["custom_rules"] = body.get("custom_rules")
+    params["privacy_settings"] = body.get("privacy_settings", DEFAULT_PRIVACY_SETTINGS)
+    params["job_dir"] = request_dir_name()
 
-        # Step 6: Export
-        output_file = export_data(generated_data, config)
+    # Validate up front so bad requests fail here rather than in the queue
+    try:
+        params["export_options"] = request_export_options(
+            body.get("export_options"), os.path.join(JOB_OUTPUT_DIR, params["job_dir"])
+        )
+        configure_generation(
+            params["rows"], params["custom_rules"], params["privacy_settings"], export_format=params["format"],
+            export_options=params["export_options"]
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not os.path.exists(os.path.join("data", "schemas", params["schema_file"])):
+        return jsonify({"error": f"Schema file not found: {params['schema_file']}"}), 404
 
-        return jsonify({
-            "response": (
-                f"✅ Generated {row_count} rows from `{schema_file}` as `{export_format}` in {duration:.2f}s.\n"
-                f"📁 Data exported to: `{output_file}`"
-            )
-        })
+    job_id = jobs().submit(params, priority=priority)
+    return jsonify({"job_id": job_id, "status": "queued"}), 202
 
-    except Exception as e:
-        return jsonify({"response": f"❌ Error: {str(e)}"})
+
+@app.route("/api/jobs", methods=["GET"])
+def list_jobs():
+    try:
+        limit = int(request.args.get("limit", 100))
+    except ValueError:
+        return jsonify({"error": "'limit' must be an integer"}), 400
+    return jsonify({"jobs": jobs().list(request.args.get("status"), limit)})
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = jobs().get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(job)
+
+
+@app.route("/api/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    job = jobs().cancel(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(job)
+
+
+@app.route("/api/jobs/<job_id>/download", methods=["GET"])
+def download_job(job_id):
+    job = jobs().get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    if job["status"] != "succeeded":
+        return jsonify({"error": f"Job is {job['status']}", "status": job["status"]}), 409
+
+    paths = [path for info in job["result"]["tables"].values() for path in info["file_paths"]]
+    if not paths:
+        return jsonify({"error": "Job loaded its data into a database and has no files to download"}), 409
+    if len(paths) == 1:
+        return send_file(os.path.abspath(paths[0]), as_attachment=True)
+
+    archive = os.path.join(job["result"]["output_dir"], f"{job_id}.zip")
+    if not os.path.exists(archive):
+        temp_path = f"{archive}.tmp-{os.urandom(4).hex()}"
+        with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for path in paths:
+                zf.write(path, os.path.basename(path))
+        os.replace(temp_path, archive)
+    return send_file(os.path.abspath(archive), as_attachment=True)
+
+
+@app.route("/api/schemas/<schema_file>/profile", methods=["POST"])
+def profile_schema(schema_file):
+    # Later runs from this schema draw their values from the stored profile
+    body = request.json or {}
+    schema_path = os.path.join("data", "schemas", schema_file)
+    sample_path = os.path.join(SAMPLE_DIR, os.path.basename(body.get("sample_file") or ""))
+    if not os.path.exists(schema_path):
+        return jsonify({"error": f"Schema file not found: {schema_file}"}), 404
+    if not os.path.isfile(sample_path):
+        return jsonify({"error": f"Sample file not found in {SAMPLE_DIR}: {body.get('sample_file')}"}), 404
+
+    parsed_schema = analyze_schema_file_cached(schema_path)
+    table = body.get("table") or (next(iter(parsed_schema)) if len(parsed_schema) == 1 else None)
+    if table not in parsed_schema:
+        return jsonify({"error": f"Pick one of the schema's tables: {', '.join(parsed_schema)}"}), 400
+    try:
+        table_profiles = load_profile(schema_path) or {}
+        table_profiles[table] = profile_csv(sample_path)
+        apply_profile(parsed_schema, table_profiles)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    save_profile(schema_path, table_profiles)
+    profile = table_profiles[table]
+    distributions = ("categories", "frequencies", "probabilities", "quantiles")
+    return jsonify({
+        "table": table,
+        "rows": profile["rows"],
+        "columns": {
+            column: {key: value for key, value in summary.items() if key not in distributions}
+            for column, summary in profile["columns"].items()
+        }
+    })
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    gauges = {f"result_cache_{name}": value for name, value in result_cache().stats().items()}
+    return Response(registry.render(gauges), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/api/cache", methods=["GET"])
+def cache_stats():
+    return jsonify(result_cache().stats())
 
 
 if __name__ == "__main__":
-    app.run(debug=True, use_reloader=False)
+    # Warm the schema cache, value pools and workers in the background and serve requests on threads meanwhile
+    preload_in_background(os.path.join("data", "schemas"), workers=int(os.environ.get("GENERATION_WORKERS", "1")))
+    # Resume jobs that were queued or running when the server last stopped
+    jobs().start()
+    app.run(debug=True, use_reloader=False, threaded=True)
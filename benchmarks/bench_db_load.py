@@ -0,0 +1,125 @@
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add the directory above the agents package to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.configuration_agent import configure_generation
+from agents.data_generation_agent import columns_to_rows, generate_columns
+from agents.db_loader import DatabaseLoader, table_parents
+from agents.pipeline import run_database_pipeline
+
+BENCH_SCHEMA = {
+    "customers": {
+        "columns": {
+            "id": {"type": "int", "primary_key": True},
+            "name": {"type": "string"},
+            "score": {"type": "float"},
+        },
+        "primary_key": "id",
+        "foreign_keys": []
+    },
+    "products": {
+        "columns": {
+            "id": {"type": "int", "primary_key": True},
+            "title": {"type": "string"},
+            "price": {"type": "float"},
+        },
+        "primary_key": "id",
+        "foreign_keys": []
+    },
+    "orders": {
+        "columns": {
+            "id": {"type": "int", "primary_key": True},
+            "customer_id": {"type": "int"},
+            "product_id": {"type": "int"},
+            "quantity": {"type": "int"},
+            "paid": {"type": "bool"},
+            "status": {"type": "string", "values": ["new", "paid", "shipped", "returned"]},
+        },
+        "primary_key": "id",
+        "foreign_keys": [
+            {"column": "customer_id", "ref_table": "customers", "ref_column": "id"},
+            {"column": "product_id", "ref_table": "products", "ref_column": "id"},
+        ]
+    },
+}
+
+
+def row_by_row(path, data):
+    """
+    Baseline: one INSERT statement per row on a single connection, with one
+    commit per table.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        with DatabaseLoader({"database": path, "if_exists": "replace"}) as loader:
+            loader.prepare(BENCH_SCHEMA, list(BENCH_SCHEMA))
+    connection = sqlite3.connect(path)
+    for table_name, columns in data.items():
+        rows = columns_to_rows(columns)
+        names = list(rows[0])
+        statement = f"INSERT INTO {table_name} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+        for row in rows:
+            connection.execute(statement, [row[name] for name in names])
+        connection.commit()
+    connection.close()
+
+
+def load(output_dir, config):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_database_pipeline(BENCH_SCHEMA, config, output_dir, seed=42, validate=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk loading generated tables into SQLite.")
+    parser.add_argument("--rows", type=int, default=500_000, help="rows per table")
+    parser.add_argument("--baseline-rows", type=int, default=100_000, help="rows per table for the row-by-row baseline")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"\n⏱️  Loading {len(BENCH_SCHEMA)} tables x {args.rows:,} rows into SQLite "
+          f"(parents first: {', '.join(t for t in BENCH_SCHEMA if not table_parents(BENCH_SCHEMA)[t])}); "
+          f"pipeline timings include generation, SQLite runs one write transaction at a time")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = generate_columns(BENCH_SCHEMA, args.baseline_rows, args.seed)
+        path = os.path.join(tmp, "baseline.db")
+        start = time.perf_counter()
+        row_by_row(path, data)
+        elapsed = time.perf_counter() - start
+        total = args.baseline_rows * len(BENCH_SCHEMA)
+        print(f"  {'row-by-row INSERT (baseline)':<40} {elapsed:8.3f}s  {total / elapsed:12,.0f} rows/s")
+
+        for label, options in (
+            ("executemany, 1 writer", {"writers": 1}),
+            ("executemany, writer per table", {}),
+            ("executemany, batch 1,000", {"batch_size": 1_000}),
+            ("executemany, commit every 10,000", {"commit_rows": 10_000}),
+        ):
+            path = os.path.join(tmp, "generated.db")
+            config = configure_generation(
+                args.rows, export_format="DATABASE", privacy_settings={},
+                export_options=dict(options, database=path, if_exists="replace")
+            )
+            start = time.perf_counter()
+            exported = load(tmp, config)
+            elapsed = time.perf_counter() - start
+            connection = sqlite3.connect(path)
+            counts = [connection.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in exported]
+            orphans = connection.execute(
+                "SELECT COUNT(*) FROM orders o LEFT JOIN customers c ON c.id = o.customer_id WHERE c.id IS NULL"
+            ).fetchone()[0]
+            connection.close()
+            assert counts == [args.rows] * len(BENCH_SCHEMA) and not orphans, "database does not hold the generated rows"
+            per_table = ", ".join(f"{t} {info['files'][0]['rows_per_second']:,}" for t, info in exported.items())
+            print(f"  {label:<40} {elapsed:8.3f}s  {sum(counts) / elapsed:12,.0f} rows/s  ({per_table})")
+
+
+if __name__ == "__main__":
+    main()
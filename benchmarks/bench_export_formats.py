@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add the directory above the agents package to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.configuration_agent import TableWriter
+from agents.data_generation_agent import generate_column_chunks
+
+BENCH_SCHEMA = {
+    "orders": {
+        "columns": {
+            "id": {"type": "int", "primary_key": True},
+            "quantity": {"type": "int"},
+            "amount": {"type": "float"},
+            "paid": {"type": "bool"},
+            "status": {"type": "string", "values": ["new", "paid", "shipped", "returned"]},
+            "note": {"type": "string"},
+        },
+        "primary_key": "id",
+        "foreign_keys": [],
+    }
+}
+
+CASES = [
+    ("CSV", None),
+    ("CSV", "gzip"),
+    ("CSV", "zstd"),
+    ("NDJSON", None),
+    ("NDJSON", "zstd"),
+    ("JSON", None),
+    ("PARQUET", None),
+    ("PARQUET", "zstd"),
+    ("ARROW", None),
+    ("FEATHER", "zstd"),
+]
+
+
+def write_format(chunks, output_dir, export_format, compression):
+    options = {"compression": compression} if compression else {}
+    with TableWriter("orders", export_format, output_dir, options=options) as writer:
+        for columns in chunks:
+            writer.write_chunk(columns)
+    return writer.file_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bytes written and throughput per export format.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    chunks = [columns for _, _, columns in generate_column_chunks(BENCH_SCHEMA, args.rows, args.chunk_size, args.seed)]
+    print(f"\n⏱️  Writing {args.rows:,} rows in chunks of {args.chunk_size:,}")
+    print(f"  {'format':<18} {'time':>8}  {'rows/s':>12}  {'size':>9}")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for export_format, compression in CASES:
+            label = export_format + (f"+{compression}" if compression else "")
+            start = time.perf_counter()
+            try:
+                path = write_format(chunks, output_dir, export_format, compression)
+            except ImportError as e:
+                print(f"  {label:<18} skipped: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<18} {elapsed:7.3f}s  {args.rows / elapsed:12,.0f}  "
+                  f"{os.path.getsize(path) / 1e6:7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the directory above the agents package to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.data_generation_agent import generate_columns, generate_data, generate_data_reference
+
+
+BENCH_SCHEMA = {
+    "bench": {
+        "columns": {
+            "id": {"type": "int", "primary_key": True},
+            "quantity": {"type": "int"},
+            "price": {"type": "float"},
+            "active": {"type": "bool"},
+            "status": {"type": "string", "values": ["new", "paid", "shipped", "returned"]},
+            "label": {"type": "string"},
+        },
+        "primary_key": "id",
+        "foreign_keys": [],
+        "row_count": 10
+    }
+}
+
+
+def legacy_generate_data(parsed_schema, row_count):
+    """
+    Copy of the original per-row, per-column generator, kept as the baseline.
+    """
+    table_name, table_info = next(iter(parsed_schema.items()))
+    columns = table_info.get("columns", {})
+    data = []
+
+    for _ in range(row_count):
+        row = {}
+        for col, props in columns.items():
+            dtype = props.get("type", "string").lower()
+            if dtype == "int":
+                row[col] = random.randint(1, 1000)
+            elif dtype == "float":
+                row[col] = round(random.uniform(1, 1000), 2)
+            elif dtype == "bool":
+                row[col] = random.choice([True, False])
+            else:
+                row[col] = f"{col}_{random.randint(1000, 9999)}"
+        data.append(row)
+
+    return {table_name: data}
+
+
+def timed(label, func, rows):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed:8.3f}s  {rows / elapsed:14,.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark data generation throughput.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = args.rows
+    print(f"\n⏱️  Generating {rows:,} rows x {len(BENCH_SCHEMA['bench']['columns'])} columns")
+
+    small = min(rows, 5_000)
+    assert generate_data(BENCH_SCHEMA, small, args.seed) == generate_data_reference(BENCH_SCHEMA, small, args.seed), \
+        "vectorized output differs from the scalar reference path"
+    print(f"  ✅ vectorized == scalar reference for {small:,} rows (seed={args.seed})")
+
+    legacy = timed("legacy per-row loop", lambda: legacy_generate_data(BENCH_SCHEMA, rows), rows)
+    timed("scalar reference (seeded)", lambda: generate_data_reference(BENCH_SCHEMA, rows, args.seed), rows)
+    rows_path = timed("columnar + row materialization", lambda: generate_data(BENCH_SCHEMA, rows, args.seed), rows)
+    columns = timed("columnar (no materialization)", lambda: generate_columns(BENCH_SCHEMA, rows, args.seed), rows)
+
+    print(f"\n  Speedup vs legacy: {legacy / columns:.1f}x columnar, {legacy / rows_path:.1f}x with rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# Add the directory above the agents package to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.schema_analysis_agent import parse_sql_schema
+
+
+def build_ddl(table_count, seed=42):
+    """
+    Builds a warehouse-style DDL dump with FKs, composite keys and constraints.
+    """
+    rng = random.Random(seed)
+    statements = []
+    for t in range(table_count):
+        lines = [
+            "  id BIGINT NOT NULL",
+            f"  code VARCHAR({rng.randint(8, 64)}) NOT NULL UNIQUE",
+            f"  amount DECIMAL({rng.randint(8, 18)},2) DEFAULT 0.00 CHECK (amount >= 0)",
+            "  created_at TIMESTAMP WITH TIME ZONE",
+        ]
+        for c in range(rng.randint(4, 20)):
+            lines.append(f"  attr_{c} {rng.choice(['INT', 'VARCHAR(255)', 'DOUBLE PRECISION', 'BOOLEAN', 'TEXT'])}")
+        if t:
+            parent = rng.randrange(t)
+            lines.append(f"  table_{parent}_id BIGINT REFERENCES table_{parent}(id)")
+            lines.append(f"  CONSTRAINT fk_{t} FOREIGN KEY (table_{parent}_id) REFERENCES table_{parent} (id)")
+        lines.append("  PRIMARY KEY (id)" if t % 3 else "  CONSTRAINT pk PRIMARY KEY (id, code)")
+        statements.append(f"CREATE TABLE table_{t} ( -- table {t}\n" + ",\n".join(lines) + "\n);")
+        statements.append(f"CREATE INDEX idx_{t} ON table_{t} (code);")
+    return "\n\n".join(statements)
+
+
+def legacy_parse_sql_schema(sql_text):
+    """
+    Copy of the original sqlparse + regex parser, kept as the baseline.
+    """
+    import sqlparse
+
+    schema = {}
+    for stmt in sqlparse.parse(sql_text):
+        stmt = str(stmt).strip()
+        if not stmt.lower().startswith("create table"):
+            continue
+        table_match = re.search(r'create table\s+(\w+)\s*\(', stmt, re.IGNORECASE)
+        if not table_match:
+            continue
+        table_name = table_match.group(1)
+        schema[table_name] = {"columns": {}, "primary_key": None, "foreign_keys": [], "row_count": 10}
+        for col_name, col_type in re.findall(r'(\w+)\s+([\w()]+)[,\n]', stmt):
+            schema[table_name]["columns"][col_name] = {"type": col_type}
+        pk_match = re.search(r'primary key\s*\((.*?)\)', stmt, re.IGNORECASE)
+        if pk_match:
+            schema[table_name]["primary_key"] = pk_match.group(1).strip()
+        for fk_col, ref_table, ref_col in re.findall(
+            r'foreign key\s*\((.*?)\)\s*references\s+(\w+)\s*\((.*?)\)', stmt, re.IGNORECASE
+        ):
+            schema[table_name]["foreign_keys"].append(
+                {"column": fk_col.strip(), "ref_table": ref_table.strip(), "ref_column": ref_col.strip()}
+            )
+    return schema
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQL DDL parsing.")
+    parser.add_argument("--tables", type=int, default=5_000)
+    args = parser.parse_args()
+
+    ddl = build_ddl(args.tables)
+    print(f"\n⏱️  Parsing {args.tables:,} CREATE TABLE statements ({len(ddl) / 1e6:.1f} MB)")
+
+    start = time.perf_counter()
+    schema = parse_sql_schema(ddl)
+    fast = time.perf_counter() - start
+    columns = sum(len(table["columns"]) for table in schema.values())
+    print(f"  single-pass parser  {fast:8.3f}s  {len(schema):,} tables, {columns:,} columns")
+    assert len(schema) == args.tables, "parser missed tables"
+
+    try:
+        start = time.perf_counter()
+        legacy = legacy_parse_sql_schema(ddl)
+        slow = time.perf_counter() - start
+    except ImportError:
+        print("  sqlparse baseline   skipped: sqlparse is not installed")
+        return
+    legacy_columns = sum(len(table["columns"]) for table in legacy.values())
+    print(f"  sqlparse + regex    {slow:8.3f}s  {len(legacy):,} tables, {legacy_columns:,} columns")
+    print(f"\n  Speedup: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
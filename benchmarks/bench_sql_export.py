@@ -0,0 +1,101 @@
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add the directory above the agents package to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.configuration_agent import TableWriter
+from agents.data_generation_agent import generate_columns, columns_to_rows
+
+BENCH_SCHEMA = {
+    "orders": {
+        "columns": {
+            "id": {"type": "int", "primary_key": True},
+            "quantity": {"type": "int"},
+            "amount": {"type": "float"},
+            "paid": {"type": "bool"},
+            "status": {"type": "string", "values": ["new", "paid", "shipped", "returned"]},
+            "note": {"type": "string"},
+        },
+        "primary_key": "id",
+        "foreign_keys": [],
+    }
+}
+
+CREATE_TABLE = "CREATE TABLE orders (id INTEGER, quantity INTEGER, amount REAL, paid INTEGER, status TEXT, note TEXT);"
+
+
+def legacy_write_sql(path, table_name, rows):
+    """
+    Copy of the original one-INSERT-per-row SQL export, kept as the baseline.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            columns = ', '.join(row.keys())
+            values = ', '.join(f"'{v}'" if isinstance(v, str) else str(v) for v in row.values())
+            f.write(f"INSERT INTO {table_name} ({columns}) VALUES ({values});\n")
+
+
+def write_mode(output_dir, columns, mode):
+    with contextlib.redirect_stdout(io.StringIO()):
+        with TableWriter("orders", "SQL", os.path.join(output_dir, mode), options={"sql_mode": mode}) as writer:
+            writer.write_chunk(columns)
+    return writer.file_path
+
+
+def load_into_sqlite(path, create_table=True):
+    connection = sqlite3.connect(":memory:")
+    if create_table:
+        connection.execute(CREATE_TABLE)
+    with open(path, encoding='utf-8') as f:
+        connection.executescript(f.read())
+    count = connection.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+    connection.close()
+    return count
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQL export and SQLite load throughput.")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    columns = generate_columns(BENCH_SCHEMA, args.rows, args.seed)["orders"]
+    print(f"\n⏱️  Exporting {args.rows:,} rows as SQL and loading them into SQLite")
+    print(f"  {'mode':<22} {'write':>8}  {'load':>8}  {'size':>9}")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        rows = columns_to_rows(columns)
+        legacy_path = os.path.join(output_dir, "legacy.sql")
+        legacy_write, _ = timed(lambda: legacy_write_sql(legacy_path, "orders", rows))
+        legacy_load, count = timed(lambda: load_into_sqlite(legacy_path))
+        assert count == args.rows
+        print(f"  {'legacy row INSERTs':<22} {legacy_write:7.3f}s  {legacy_load:7.3f}s  "
+              f"{os.path.getsize(legacy_path) / 1e6:7.1f}MB")
+
+        for mode in ("insert", "sqlite", "copy"):
+            write, path = timed(lambda: write_mode(output_dir, columns, mode))
+            size = f"{os.path.getsize(path) / 1e6:7.1f}MB"
+            if mode == "copy":
+                print(f"  {mode:<22} {write:7.3f}s  {'n/a':>8}  {size}  (PostgreSQL only)")
+                continue
+            load, count = timed(lambda: load_into_sqlite(path, create_table=mode == "insert"))
+            assert count == args.rows
+            print(f"  {mode:<22} {write:7.3f}s  {load:7.3f}s  {size}  "
+                  f"{(legacy_write + legacy_load) / (write + load):.1f}x end to end")
+
+
+if __name__ == "__main__":
+    main()
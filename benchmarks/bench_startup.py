@@ -0,0 +1,114 @@
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# The directory above the agents package, so subprocesses can import it
+PACKAGE_PARENT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SCHEMA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'schemas'))
+sys.path.append(PACKAGE_PARENT)
+
+# Entry points: the Flask app, and the agent modules the Streamlit app imports
+ENTRY_POINTS = {
+    "app": ["agents.app"],
+    "streamlit agents": [
+        "agents.configuration_agent", "agents.custom_rules", "agents.profiling_agent",
+        "agents.schema_analysis_agent", "agents.data_generation_agent", "agents.preload",
+        "agents.privacy_agent", "agents.validation_agent", "agents.validation_report",
+    ],
+}
+# Optional dependencies that must only load on first use
+LAZY_MODULES = ("great_expectations", "faker", "pyarrow.parquet", "scipy")
+
+
+def import_times(modules, work_dir):
+    """
+    Imports `modules` in a fresh interpreter under `python -X importtime`.
+    Returns (total microseconds, {module: (self us, cumulative us)}).
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PACKAGE_PARENT, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=work_dir, env=env, capture_output=True, text=True
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    times, total = {}, 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):
+            total += int(cumulative_us)
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return total, times
+
+
+def by_package(times):
+    """
+    Sums self time per top-level package.
+    """
+    packages = {}
+    for name, (self_us, _) in times.items():
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    return sorted(packages.items(), key=lambda item: -item[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report cold-start import time against a budget.")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per entry point")
+    parser.add_argument("--budget-ms", type=float, default=750, help="fail when the median import exceeds this")
+    parser.add_argument("--top", type=int, default=8, help="slowest packages to list")
+    parser.add_argument("--preload", action="store_true", help="also time `preload` on the bundled schemas")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="datagen-startup-") as work_dir:
+        for label, modules in ENTRY_POINTS.items():
+            try:
+                runs = [import_times(modules, work_dir) for _ in range(args.repeat)]
+            except RuntimeError as e:
+                print(f"\n⏭️  {label}: skipped ({e})")
+                continue
+            median = statistics.median(total for total, _ in runs) / 1000
+            times = runs[-1][1]
+            status = "✅" if median <= args.budget_ms else "❌"
+            failed |= median > args.budget_ms
+            print(f"\n{status} {label}: {median:,.0f} ms median import over {args.repeat} runs (budget {args.budget_ms:,.0f} ms)")
+            for package, self_us in by_package(times)[:args.top]:
+                print(f"    {package:<28} {self_us / 1000:8.1f} ms")
+            eager = [module for module in LAZY_MODULES if module in times]
+            if eager:
+                failed = True
+                print(f"  ❌ imported at startup, should load on first use: {', '.join(eager)}")
+
+        if args.preload:
+            from agents import value_pools
+            from agents.preload import preload
+            from agents.schema_analysis_agent import schema_cache
+
+            # Value pools are cached under ./data/pools, so build them in the scratch directory
+            shutil.copytree(SCHEMA_DIR, os.path.join(work_dir, "data", "schemas"))
+            cwd = os.getcwd()
+            os.chdir(work_dir)
+            try:
+                print()
+                for label in ("cold, builds pools", "warm, from disk cache"):
+                    # Start from empty in-memory caches, as a new server process would
+                    schema_cache.clear()
+                    value_pools._pools.clear()
+                    timings = preload(os.path.join("data", "schemas"))
+                    print(f"  preload ({label}): {sum(timings.values()):.2f}s")
+            finally:
+                os.chdir(cwd)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import html
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+# Add the directory above the agents package to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.configuration_agent import TableWriter
+from agents.data_generation_agent import columns_to_rows, generate_column_chunks
+from agents.benchmarks.bench_export_formats import BENCH_SCHEMA
+
+
+def legacy_write_json(path, columns):
+    """
+    Copy of the original JSON export: whole table as rows, json.dump(indent=4).
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(columns_to_rows(columns), f, indent=4)
+
+
+def legacy_write_xml(path, columns):
+    """
+    Copy of the original XML export: one f.write per field.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("<data><table name='orders'>\n")
+        for row in columns_to_rows(columns):
+            f.write("  <row>\n")
+            for k, v in row.items():
+                f.write(f"    <{k}>{html.escape(str(v))}</{k}>\n")
+            f.write("  </row>\n")
+        f.write("</table></data>\n")
+
+
+def streaming_write(output_dir, chunks, export_format, options=None):
+    with TableWriter("orders", export_format, output_dir, options=options) as writer:
+        for columns in chunks:
+            writer.write_chunk(columns)
+    return writer.file_path
+
+
+def measure(func, trace_memory=False):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming JSON, NDJSON and XML writers.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--memory", action="store_true", help="also report peak memory (tracemalloc slows every case down)")
+    args = parser.parse_args()
+
+    chunks = [columns for _, _, columns in generate_column_chunks(BENCH_SCHEMA, args.rows, args.chunk_size, args.seed)]
+    whole = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+    print(f"\n⏱️  Writing {args.rows:,} rows in chunks of {args.chunk_size:,}")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        cases = [
+            ("JSON legacy json.dump", lambda: legacy_write_json(os.path.join(output_dir, "legacy.json"), whole)),
+            ("JSON streaming indent=4", lambda: streaming_write(output_dir, chunks, "JSON")),
+            ("JSON streaming compact", lambda: streaming_write(output_dir, chunks, "JSON", {"indent": None})),
+            ("NDJSON streaming", lambda: streaming_write(output_dir, chunks, "NDJSON")),
+            ("XML legacy per-field", lambda: legacy_write_xml(os.path.join(output_dir, "legacy.xml"), whole)),
+            ("XML streaming", lambda: streaming_write(output_dir, chunks, "XML")),
+        ]
+        timings = {}
+        for label, func in cases:
+            elapsed, peak = measure(func, args.memory)
+            timings[label] = elapsed
+            memory = f"  peak {peak / 1e6:7.1f}MB" if peak is not None else ""
+            print(f"  {label:<26} {elapsed:8.3f}s  {args.rows / elapsed:12,.0f} rows/s{memory}")
+
+    print(f"\n  JSON speedup: {timings['JSON legacy json.dump'] / timings['JSON streaming indent=4']:.1f}x, "
+          f"XML speedup: {timings['XML legacy per-field'] / timings['XML streaming']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+# Add the directory above the agents package to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.data_generation_agent import generate_columns
+from agents.validation_agent import prepare_backend, validate_all_tables
+
+
+BENCH_SCHEMA = {
+    "customers": {
+        "columns": {
+            "id": {"type": "int", "primary_key": True},
+            "name": {"type": "varchar(50)"},
+            "tier": {"type": "string", "values": ["bronze", "silver", "gold"]},
+        },
+        "primary_key": "id",
+        "foreign_keys": [],
+    },
+    "orders": {
+        "columns": {
+            "id": {"type": "int", "primary_key": True},
+            "customer_id": {"type": "int"},
+            "amount": {"type": "float"},
+            "paid": {"type": "bool"},
+        },
+        "primary_key": "id",
+        "foreign_keys": [{"column": "customer_id", "ref_table": "customers", "ref_column": "id"}],
+    },
+}
+
+
+def run_backend(backend, data):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = validate_all_tables(data, BENCH_SCHEMA, backend=backend)
+    elapsed = time.perf_counter() - start
+    passed = all(result["success"] for result in results.values())
+    return elapsed, passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the native and Great Expectations validation backends.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    data = generate_columns(BENCH_SCHEMA, {"customers": args.rows // 10, "orders": args.rows}, args.seed)
+    print(f"\n⏱️  Validating {args.rows:,} orders against {args.rows // 10:,} customers")
+
+    timings = {}
+    for backend in ("native", "ge"):
+        # A backend that cannot run fails the benchmark rather than skipping the comparison
+        prepare_backend(backend)
+        elapsed, passed = run_backend(backend, data)
+        timings[backend] = elapsed
+        print(f"  {backend:<8} {elapsed:8.3f}s  {args.rows / elapsed:14,.0f} rows/s  passed={passed}")
+        if not passed:
+            sys.exit(f"❌ {backend}: generated data failed validation")
+
+    print(f"\n  Native speedup: {timings['ge'] / timings['native']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add the directory above the agents package to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents import value_pools
+from agents.data_generation_agent import generate_columns, generate_data, generate_data_reference
+
+
+BENCH_SCHEMA = {
+    "people": {
+        "columns": {
+            "id": {"type": "int", "primary_key": True},
+            "name": {"type": "string"},
+            "email": {"type": "string", "unique": True},
+            "company": {"type": "string"},
+            "city": {"type": "string"},
+            "joined": {"type": "date"},
+        },
+        "primary_key": "id",
+        "foreign_keys": []
+    }
+}
+
+FAKER_COLUMNS = ("name", "email", "company", "city")
+
+
+def per_cell_faker(rows, seed):
+    """
+    The naive approach: one Faker provider call per generated cell.
+    """
+    from faker import Faker
+
+    fake = Faker(value_pools.DEFAULT_LOCALE)
+    fake.seed_instance(seed)
+    providers = [getattr(fake, value_pools.FAKER_PROVIDERS[column]) for column in FAKER_COLUMNS]
+    return [[provider() for provider in providers] for _ in range(rows)]
+
+
+def timed(label, func, rows=None):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    throughput = f"  {rows / elapsed:14,.0f} rows/s" if rows else ""
+    print(f"  {label:<36} {elapsed:8.3f}s{throughput}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-cell Faker calls against cached value pools.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--faker-rows", type=int, default=20_000,
+                        help="rows for the per-cell Faker baseline, extrapolated to --rows")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if value_pools.faker_version() is None:
+        sys.exit("❌ Faker is not installed; value pools only cover dates without it")
+
+    rows = args.rows
+    # Pools are cached under ./data/pools, so build them in a scratch directory
+    cwd, work_dir = os.getcwd(), tempfile.mkdtemp(prefix="datagen-pools-")
+    os.chdir(work_dir)
+    try:
+        print(f"\n⏱️  {rows:,} rows x {len(BENCH_SCHEMA['people']['columns'])} columns "
+              f"({', '.join(FAKER_COLUMNS)} from Faker)")
+
+        faker_seconds = timed("per-cell Faker calls", lambda: per_cell_faker(args.faker_rows, args.seed), args.faker_rows)
+        build = timed("pool build (cold, incl. disk write)", lambda: generate_columns(BENCH_SCHEMA, 1, args.seed))
+
+        value_pools._pools.clear()
+        timed("pool load (disk cache)", lambda: generate_columns(BENCH_SCHEMA, 1, args.seed))
+
+        small = min(rows, 5_000)
+        assert generate_data(BENCH_SCHEMA, small, args.seed) == generate_data_reference(BENCH_SCHEMA, small, args.seed), \
+            "vectorized output differs from the scalar reference path"
+        print(f"  ✅ vectorized == scalar reference for {small:,} rows (seed={args.seed})")
+
+        pooled = timed("pool sampling (warm)", lambda: generate_columns(BENCH_SCHEMA, rows, args.seed), rows)
+        faker_estimate = faker_seconds * rows / args.faker_rows
+        print(f"\n  Per-cell Faker for {rows:,} rows: ~{faker_estimate:,.1f}s (extrapolated)")
+        print(f"  Speedup: {faker_estimate / pooled:,.0f}x warm, {faker_estimate / (pooled + build):,.0f}x including the cold build")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+# Add the directory above the agents package to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.configuration_agent import SUPPORTED_FORMATS, configure_generation, export_data
+from agents.data_generation_agent import generate_columns, generate_data
+from agents.instrumentation import peak_rss_bytes
+from agents.schema_analysis_agent import analyze_schema_file
+from agents.validation_agent import validate_all_tables
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+COLUMN_TYPES = ('INT', 'DOUBLE PRECISION', 'BOOLEAN', 'VARCHAR(32)')
+
+# Cases as (width, depth, rows): each suite sweeps one dimension at a time
+# around a centre point, so every axis is covered without the full product.
+SUITES = {
+    "quick": (
+        [(10, 2, 10_000), (100, 2, 10_000)]
+        + [(20, 1, 10_000), (20, 4, 10_000)]
+        + [(10, 2, 1_000), (10, 2, 100_000)]
+    ),
+    "full": (
+        [(width, 1, 100_000) for width in (10, 50, 200, 500)]
+        + [(20, depth, 100_000) for depth in (1, 2, 4, 6)]
+        + [(10, 2, rows) for rows in (1_000, 100_000, 1_000_000, 10_000_000)]
+    ),
+}
+
+# Row dicts are only built up to this many rows per case; beyond it
+# generate_data measures dict construction more than generation.
+ROW_MATERIALIZE_LIMIT = 1_000_000
+
+# Stages faster than this in the baseline are too noisy to compare
+MIN_COMPARABLE_SECONDS = 0.05
+# Memory growth below this is allocator noise rather than a regression
+MIN_COMPARABLE_BYTES = 32 << 20
+
+
+def build_ddl(width, depth):
+    """
+    Builds a chain of `depth` tables of `width` columns each, every table
+    referencing the one before it.
+    """
+    statements = []
+    for level in range(depth):
+        lines = ["  id BIGINT NOT NULL"]
+        if level:
+            lines.append(f"  table_{level - 1}_id BIGINT REFERENCES table_{level - 1}(id)")
+        for c in range(width - len(lines)):
+            lines.append(f"  col_{c} {COLUMN_TYPES[c % len(COLUMN_TYPES)]}")
+        lines.append("  PRIMARY KEY (id)")
+        statements.append(f"CREATE TABLE table_{level} (\n" + ",\n".join(lines) + "\n);")
+    return "\n\n".join(statements)
+
+
+def current_rss_bytes():
+    """
+    Returns the current resident set size, or None where /proc is unavailable.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemorySampler:
+    """
+    Samples the resident set size on a background thread while the body
+    runs. Unlike tracemalloc this does not slow the measured code down, and
+    unlike the process high-water mark it is meaningful per stage.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start_bytes = None
+        self.peak_bytes = None
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+    def __enter__(self):
+        gc.collect()
+        self.start_bytes = current_rss_bytes()
+        if self.start_bytes is None:
+            # Fall back to the high-water mark, which only ever grows
+            self.start_bytes = self.peak_bytes = peak_rss_bytes()
+            return self
+        self.peak_bytes = self.start_bytes
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if hasattr(self, '_thread'):
+            self._stop.set()
+            self._thread.join()
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+        else:
+            self.peak_bytes = peak_rss_bytes()
+        return False
+
+
+def measure(func, units, unit="rows"):
+    """
+    Runs `func` once and returns (its result, the stage record).
+    """
+    with MemorySampler() as memory, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+    record = {
+        "seconds": round(seconds, 6),
+        "units": units,
+        "unit": unit,
+        "per_second": round(units / seconds, 1) if seconds > 0 else None,
+        "peak_rss_bytes": memory.peak_bytes,
+        "rss_delta_bytes": (memory.peak_bytes - memory.start_bytes) if memory.peak_bytes is not None else None
+    }
+    return result, record
+
+
+def run_case(width, depth, rows, formats, work_dir, seed):
+    """
+    Benchmarks parse, generate, validate and export for one synthetic schema.
+
+    Runs in a fresh process per case, so memory freed by earlier cases does
+    not hide the growth of later ones and repeated runs stay comparable.
+    """
+    schema_path = os.path.join(work_dir, f"w{width}_d{depth}.sql")
+    with open(schema_path, 'w') as f:
+        f.write(build_ddl(width, depth))
+
+    stages = {}
+    schema, stages["parse"] = measure(lambda: analyze_schema_file(schema_path), width * depth, "columns")
+    total_rows = rows * depth
+
+    data, stages["generate"] = measure(lambda: generate_columns(schema, rows, seed), total_rows)
+    if total_rows <= ROW_MATERIALIZE_LIMIT:
+        _, stages["generate_rows"] = measure(lambda: generate_data(schema, rows, seed), total_rows)
+
+    results, stages["validate"] = measure(lambda: validate_all_tables(data, schema), total_rows)
+    if not all(result["success"] for result in results.values()):
+        raise AssertionError(f"generated data failed validation for width={width} depth={depth} rows={rows}")
+
+    for export_format in formats:
+        output_dir = os.path.join(work_dir, export_format.lower())
+        config = configure_generation(rows, export_format=export_format)
+        manifest, stages[f"export_{export_format.lower()}"] = measure(
+            lambda: export_data(data, config, output_dir, schema=schema), total_rows
+        )
+        stages[f"export_{export_format.lower()}"]["bytes"] = sum(info["bytes"] for info in manifest["tables"].values())
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return stages
+
+
+def compare(results, baseline, tolerance, memory_tolerance):
+    """
+    Returns a message for every stage that got slower or hungrier than the
+    baseline allows; cases or stages missing from either side are skipped.
+    """
+    regressions = []
+    for case, stages in results["cases"].items():
+        for stage, record in stages.items():
+            before = baseline.get("cases", {}).get(case, {}).get(stage)
+            if before is None:
+                continue
+            if before["seconds"] >= MIN_COMPARABLE_SECONDS and record["per_second"] and before["per_second"]:
+                ratio = record["per_second"] / before["per_second"]
+                if ratio < 1 - tolerance:
+                    regressions.append(
+                        f"{case} {stage}: {record['per_second']:,.0f} {record['unit']}/s vs "
+                        f"{before['per_second']:,.0f} baseline ({(1 - ratio) * 100:.0f}% slower)"
+                    )
+            if record["rss_delta_bytes"] is not None and before.get("rss_delta_bytes") is not None:
+                allowed = max(before["rss_delta_bytes"] * (1 + memory_tolerance),
+                              before["rss_delta_bytes"] + MIN_COMPARABLE_BYTES)
+                if record["rss_delta_bytes"] > allowed:
+                    regressions.append(
+                        f"{case} {stage}: {record['rss_delta_bytes'] / 1e6:,.1f}MB vs "
+                        f"{before['rss_delta_bytes'] / 1e6:,.1f}MB baseline memory"
+                    )
+    return regressions
+
+
+def parse_cases(args):
+    if not (args.widths or args.depths or args.rows):
+        return SUITES[args.suite]
+    return [
+        (width, depth, rows)
+        for width in args.widths or [10]
+        for depth in args.depths or [2]
+        for rows in args.rows or [10_000]
+    ]
+
+
+def int_list(text):
+    return [int(value.replace('_', '')) for value in text.split(',') if value]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark schema analysis, generation, validation and export on synthetic schemas."
+    )
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--widths", type=int_list, help="comma-separated column counts; overrides the suite")
+    parser.add_argument("--depths", type=int_list, help="comma-separated foreign key chain lengths")
+    parser.add_argument("--rows", type=int_list, help="comma-separated rows per table")
+    parser.add_argument("--formats", default=",".join(SUPPORTED_FORMATS),
+                        help="comma-separated export formats (default: all)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the results JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="results JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--require-baseline", action="store_true",
+                        help="fail if there is no baseline to compare against (for CI)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed throughput drop (0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.5, help="allowed peak memory growth")
+    args = parser.parse_args()
+
+    formats = [f.strip().upper() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in SUPPORTED_FORMATS]
+    if unknown:
+        parser.error(f"unsupported formats: {', '.join(unknown)}")
+    if args.require_baseline and not args.save_baseline and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "cases": {}
+    }
+    work_dir = tempfile.mkdtemp(prefix="datagen-bench-")
+    try:
+        for width, depth, rows in parse_cases(args):
+            case = f"w{width}-d{depth}-r{rows}"
+            print(f"\n⏱️  {case}: {width} columns x {depth} tables x {rows:,} rows")
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                stages = executor.submit(run_case, width, depth, rows, formats, work_dir, args.seed).result()
+            results["cases"][case] = stages
+            for stage, record in stages.items():
+                memory = f"  +{record['rss_delta_bytes'] / 1e6:8.1f}MB" if record["rss_delta_bytes"] is not None else ""
+                print(f"  {stage:<16} {record['seconds']:9.3f}s  "
+                      f"{record['per_second'] or 0:14,.0f} {record['unit']}/s{memory}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"ℹ️  No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against {args.baseline}:")
+        for message in regressions:
+            print(f"  ❌ {message}")
+        sys.exit(1)
+    print(f"\n✅ No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
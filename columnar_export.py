@@ -0,0 +1,81 @@
+from .generated_table import GeneratedTable, import_pyarrow
+
+COLUMNAR_FORMATS = ('PARQUET', 'ARROW', 'FEATHER')
+DEFAULT_PARQUET_COMPRESSION = 'snappy'
+
+
+def to_arrow_table(table_data, schema=None):
+    """
+    Builds an Arrow table from a GeneratedTable or column arrays (zero-copy
+    for numeric numpy arrays) or from a list of row dicts, cast to `schema`
+    when given.
+    """
+    pa = import_pyarrow("Columnar export")
+    if isinstance(table_data, GeneratedTable):
+        table = table_data.to_arrow()
+    elif isinstance(table_data, dict):
+        table = pa.table({name: pa.array(values) for name, values in table_data.items()})
+    else:
+        table = pa.Table.from_pylist(table_data)
+    if schema is not None and not table.schema.equals(schema):
+        table = table.cast(schema)
+    return table
+
+
+class ColumnarChunkWriter:
+    """
+    Writes one table as Parquet or Arrow IPC (Feather v2), one row group or
+    record batch per chunk.
+
+    The Arrow schema is fixed by the first chunk; later chunks are cast to
+    it. `compression` is passed to pyarrow ('snappy', 'zstd', 'gzip', 'lz4'
+    or None) and `row_group_size` caps the rows per Parquet row group.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        export_format: str,
+        compression: str = None,
+        row_group_size: int = None
+    ):
+        self._pa = import_pyarrow(f"{export_format} export")
+        self.file_path = file_path
+        self.format = export_format
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.schema = None
+        self._writer = None
+        self._sink = None
+
+    def _open(self, schema) -> None:
+        self.schema = schema
+        if self.format == 'PARQUET':
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(
+                self.file_path, schema,
+                compression=self.compression or DEFAULT_PARQUET_COMPRESSION
+            )
+        else:
+            self._sink = self._pa.OSFile(self.file_path, 'wb')
+            options = self._pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._writer = self._pa.ipc.new_file(self._sink, schema, options=options)
+
+    def write(self, table_data) -> int:
+        table = to_arrow_table(table_data, self.schema)
+        if self._writer is None:
+            self._open(table.schema)
+        if self.format == 'PARQUET':
+            self._writer.write_table(table, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_table(table, max_chunksize=self.row_group_size)
+        return table.num_rows
+
+    def close(self) -> None:
+        if self._writer is None:
+            # Nothing was written: still leave a valid, empty file behind
+            self._open(self._pa.schema([]))
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
@@ -1,91 +1,410 @@
+import gzip
+import hashlib
+import io
 import json
 import os
-import pandas as pd
-import html
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any
 
+from .columnar_export import COLUMNAR_FORMATS, ColumnarChunkWriter
+from .custom_rules import parse_rules
+from .db_loader import load_tables, parse_database_options
+from .generated_table import GeneratedTable, table_length, to_dataframe
+from .instrumentation import PipelineMetrics, clock, since
+from .privacy_agent import parse_privacy
+from .sql_export import DEFAULT_BATCH_SIZE, DEFAULT_TRANSACTION_ROWS, SqlChunkWriter
+from .text_export import DEFAULT_JSON_INDENT, JsonChunkWriter, XmlChunkWriter
+
+try:
+    import zstandard
+except ImportError:  # zstd falls back to pyarrow's codec, if available
+    zstandard = None
+
+SUPPORTED_FORMATS = ['CSV', 'JSON', 'NDJSON', 'SQL', 'XML', 'PARQUET', 'ARROW', 'FEATHER', 'DATABASE']
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+WRITE_BUFFER_SIZE = 1 << 20
+MANIFEST_FILE = 'manifest.json'
+
 
 def configure_generation(
     data_volume: int,
     custom_rules: dict = None,
     privacy_settings: dict = None,
-    export_format: str = 'CSV'
+    export_format: str = 'CSV',
+    chunk_size: int = None,
+    workers: int = None,
+    export_options: dict = None
 ) -> dict:
     """
     Configures the data generation process based on user-defined requirements.
+
+    `chunk_size` bounds how many rows per table the streaming pipeline holds
+    in memory at once; `workers` > 1 generates chunks in a process pool.
+    `export_options` tunes the writers, e.g. for SQL: {'sql_mode': 'insert' |
+    'copy' | 'sqlite', 'batch_size': 1000, 'transaction_rows': 100000}.
+    JSON takes 'indent' (None writes one compact row per line).
+    'compression' is 'gzip' or 'zstd' for the text formats and any pyarrow
+    codec for PARQUET/ARROW/FEATHER, which also take 'row_group_size'.
+    DATABASE loads the tables straight into a database instead of files,
+    e.g. {'database': 'data/outputs/generated.db', 'batch_size': 10000,
+    'commit_rows': 100000, 'writers': 4, 'if_exists': 'replace'} for SQLite
+    or {'driver': 'psycopg2', 'dsn': '...'} for any DB-API driver (see
+    `db_loader.parse_database_options`).
+    `custom_rules` are checked here and compiled against the schema by
+    `custom_rules.apply_rules`, e.g. {'age_range': (18, 65),
+    'constraints': ['end_date > start_date']}. `privacy_settings` such as
+    {'GDPR': True} or {'columns': {'users.email': 'tokenize'}} are checked
+    by `privacy_agent.parse_privacy` and mask the data before export.
     """
-    supported_formats = ['CSV', 'JSON', 'SQL', 'XML']
     formatted_export_format = export_format.upper()
 
-    if formatted_export_format not in supported_formats:
-        raise ValueError(f"Unsupported export format: '{export_format}'. Supported formats are: {', '.join(supported_formats)}")
+    if formatted_export_format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported export format: '{export_format}'. Supported formats are: {', '.join(SUPPORTED_FORMATS)}")
+
+    compression = (export_options or {}).get('compression')
+    if compression and formatted_export_format not in COLUMNAR_FORMATS and compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unsupported compression: '{compression}'. Supported codecs are: {', '.join(COMPRESSION_SUFFIXES)}")
+
+    if formatted_export_format == 'DATABASE':
+        parse_database_options(export_options)
+    parse_rules(custom_rules)
+    parse_privacy(privacy_settings)
 
     config = {
         'data_volume': data_volume,
         'custom_rules': custom_rules if custom_rules else {},
         'privacy_settings': privacy_settings if privacy_settings else {},
-        'export_format': formatted_export_format
+        'export_format': formatted_export_format,
+        'chunk_size': chunk_size,
+        'workers': workers,
+        'export_options': export_options if export_options else {}
     }
 
     return config
 
 
+def open_text_output(file_path: str, compression: str = None):
+    """
+    Opens a buffered UTF-8 text stream, optionally gzip or zstd compressed.
+    """
+    if compression is None:
+        return open(file_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+    if compression == 'gzip':
+        raw = gzip.open(file_path, 'wb', compresslevel=6)
+    elif compression == 'zstd' and zstandard is not None:
+        raw = zstandard.open(file_path, 'wb', cctx=zstandard.ZstdCompressor(level=3))
+    elif compression == 'zstd':
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("zstd compression requires zstandard or pyarrow to be installed")
+        raw = pa.CompressedOutputStream(file_path, 'zstd')
+    else:
+        raise ValueError(f"Unsupported compression: '{compression}'. Supported codecs are: {', '.join(COMPRESSION_SUFFIXES)}")
+    return io.TextIOWrapper(io.BufferedWriter(raw, WRITE_BUFFER_SIZE), encoding='utf-8')
+
+
+def file_digest(file_path: str) -> tuple:
+    """
+    Returns (size in bytes, sha256 hex digest) of a file.
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(WRITE_BUFFER_SIZE), b''):
+            sha256.update(block)
+            size += len(block)
+    return size, sha256.hexdigest()
+
+
+def table_manifest(files: List[dict]) -> Dict[str, Any]:
+    """
+    Summarizes the manifest entries of one table's files.
+    """
+    return {
+        "file_paths": [entry["path"] for entry in files if entry["path"] is not None],
+        "rows": sum(entry["rows"] for entry in files),
+        "bytes": sum(entry["bytes"] for entry in files),
+        "files": files
+    }
+
+
+def write_manifest(
+    export_format: str,
+    output_dir: str,
+    tables: Dict[str, Dict[str, Any]],
+    seconds: float
+) -> Dict[str, Any]:
+    """
+    Builds the export manifest from per-table summaries and saves it
+    atomically as manifest.json next to the exported files.
+    """
+    manifest = {
+        "format": export_format,
+        "output_dir": output_dir,
+        "rows": sum(info["rows"] for info in tables.values()),
+        "bytes": sum(info["bytes"] for info in tables.values()),
+        "seconds": round(seconds, 6),
+        "tables": {
+            table_name: {key: info[key] for key in ("file_paths", "rows", "bytes", "files")}
+            for table_name, info in tables.items()
+        }
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    temp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(temp_path, path)
+    manifest["manifest_path"] = path
+    return manifest
+
+
+class TableWriter:
+    """
+    Appends chunks of one table to its export file, so a table never has to
+    be held in memory as a whole. With `part`, writes a numbered part file
+    instead. `options` are the config's `export_options`. Use as a context
+    manager.
+
+    Data goes to a temporary file that is renamed into place by `close()`,
+    so `file_path` only ever holds a complete export; `abort()` (or leaving
+    the context with an exception) discards it. After closing, `manifest`
+    describes the file: rows, bytes, sha256 and write time.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        export_format: str,
+        output_dir: str = 'data/outputs',
+        part: int = None,
+        options: dict = None
+    ):
+        self.table_name = table_name
+        self.format = export_format.upper()
+        if self.format not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported export format: '{export_format}'")
+        if self.format == 'DATABASE':
+            raise ValueError("DATABASE exports have no file; use db_loader.DatabaseLoader.writer")
+        options = options or {}
+        compression = options.get('compression')
+
+        os.makedirs(output_dir, exist_ok=True)
+        part_suffix = f".part-{part:05d}" if part is not None else ""
+        extension = self.format.lower()
+        if self.format not in COLUMNAR_FORMATS:
+            extension += COMPRESSION_SUFFIXES.get(compression, "")
+        self.file_path = os.path.join(
+            output_dir, f"{table_name}_generated{part_suffix}.{extension}"
+        )
+        self.part = part
+        self.rows_written = 0
+        self.manifest = None
+        self._temp_path = f"{self.file_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        self._started = time.perf_counter()
+        self._closed = False
+
+        if self.format in COLUMNAR_FORMATS:
+            self._file = None
+            self._writer = ColumnarChunkWriter(
+                self._temp_path, self.format, compression, options.get('row_group_size')
+            )
+            return
+
+        self._file = open_text_output(self._temp_path, compression)
+        if self.format == 'SQL':
+            self._writer = SqlChunkWriter(
+                self._file,
+                table_name,
+                mode=options.get('sql_mode', 'insert'),
+                batch_size=options.get('batch_size', DEFAULT_BATCH_SIZE),
+                transaction_rows=options.get('transaction_rows', DEFAULT_TRANSACTION_ROWS)
+            )
+        elif self.format == 'JSON':
+            self._writer = JsonChunkWriter(self._file, indent=options.get('indent', DEFAULT_JSON_INDENT))
+        elif self.format == 'NDJSON':
+            self._writer = JsonChunkWriter(self._file, lines=True)
+        elif self.format == 'XML':
+            self._writer = XmlChunkWriter(self._file, table_name)
+        else:
+            self._writer = None
+
+    def write_chunk(self, table_data) -> int:
+        """
+        Appends a chunk (rows or column arrays) and returns its row count.
+        """
+        if self.format == 'CSV':
+            df = to_dataframe(table_data)
+            df.to_csv(self._file, index=False, header=self.rows_written == 0)
+            count = len(df)
+
+        else:
+            count = self._writer.write(table_data)
+
+        self.rows_written += count
+        return count
+
+    def close(self) -> dict:
+        """
+        Finishes the file, renames it into place and returns its manifest entry.
+        """
+        if self._closed:
+            return self.manifest
+        self._closed = True
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+        size, digest = file_digest(self._temp_path)
+        os.replace(self._temp_path, self.file_path)
+        self.manifest = {
+            "table": self.table_name,
+            "part": self.part,
+            "path": self.file_path,
+            "format": self.format,
+            "rows": self.rows_written,
+            "bytes": size,
+            "sha256": digest,
+            "seconds": round(time.perf_counter() - self._started, 6)
+        }
+        return self.manifest
+
+    def abort(self) -> None:
+        """
+        Closes the writer and removes the unfinished temporary file.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._file is not None:
+                self._file.close()
+            elif self._writer is not None:
+                self._writer.close()
+        finally:
+            if os.path.exists(self._temp_path):
+                os.remove(self._temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _table_slice(table_data, start: int, stop: int):
+    if isinstance(table_data, GeneratedTable):
+        return table_data.slice(start, stop)
+    if isinstance(table_data, dict):
+        return {name: values[start:stop] for name, values in table_data.items()}
+    return table_data[start:stop]
+
+
+def _export_file(
+    table_name: str,
+    table_data,
+    export_format: str,
+    output_dir: str,
+    part: int,
+    options: dict,
+    metrics: PipelineMetrics = None
+) -> dict:
+    """
+    Worker task: writes one table or one part of a table and returns its manifest entry.
+    """
+    start = clock()
+    with TableWriter(table_name, export_format, output_dir, part=part, options=options) as writer:
+        writer.write_chunk(table_data)
+    if metrics is not None:
+        metrics.record('export', table_name, *since(start), writer.rows_written, writer.manifest["bytes"])
+    return writer.manifest
+
+
 def export_data(
-    data: Dict[str, List[Dict[str, Any]]],
+    data: Dict[str, Any],
     config: dict,
-    output_dir: str = 'data/outputs'
-) -> None:
+    output_dir: str = 'data/outputs',
+    metrics: PipelineMetrics = None,
+    schema: Dict[str, Any] = None
+) -> Dict[str, Any]:
     """
     Exports the generated data to the specified format.
+
+    Tables may be lists of row dicts or dicts of column arrays; rows are only
+    materialized for the row-oriented formats. Tables are written concurrently
+    on a thread pool of `config['workers']` threads, and tables longer than
+    `config['chunk_size']` rows are split into part files written in parallel.
+
+    Returns the manifest (also saved as manifest.json in `output_dir`): per
+    table its rows, bytes and files, each file with its sha256 and timing.
+    Per-table export timings are also recorded into `metrics` when given.
+
+    DATABASE loads the tables into the configured database instead, parents
+    before children when the parsed `schema` is given; the manifest then
+    records each table's rows and rows per second.
     """
     format = config['export_format']
+    if format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported export format: '{format}'. Supported formats are: {', '.join(SUPPORTED_FORMATS)}")
     os.makedirs(output_dir, exist_ok=True)
+    options = config.get('export_options')
+    part_rows = config.get('chunk_size')
+    started = time.perf_counter()
 
     print(f"\n📤 Exporting data in {format} format to '{output_dir}'")
 
-    for table_name, table_data in data.items():
-        df = pd.DataFrame(table_data)
-        file_path = os.path.join(output_dir, f"{table_name}_generated.{format.lower()}")
-
-        if format == 'CSV':
-            df.to_csv(file_path, index=False)
-            print(f"  ✅ CSV: {table_name} exported to {file_path}")
-
-        elif format == 'JSON':
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(table_data, f, indent=4)
-            print(f"  ✅ JSON: {table_name} exported to {file_path}")
-
-        elif format == 'SQL':
-            with open(file_path, 'w', encoding='utf-8') as f:
-                for row in table_data:
-                    columns = ', '.join(row.keys())
-                    values = ', '.join(
-                        f"'{str(v).replace('\'', '\'\'')}'" if isinstance(v, str) else str(v)
-                        for v in row.values()
-                    )
-                    f.write(f"INSERT INTO {table_name} ({columns}) VALUES ({values});\n")
-            print(f"  ✅ SQL: {table_name} export with INSERTs to {file_path}")
-
-        elif format == 'XML':
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(f"<data><table name='{table_name}'>\n")
-                for row in table_data:
-                    f.write(f"  <row>\n")
-                    for k, v in row.items():
-                        f.write(f"    <{k}>{html.escape(str(v))}</{k}>\n")
-                    f.write(f"  </row>\n")
-                f.write(f"</table></data>\n")
-            print(f"  ✅ XML: {table_name} exported to {file_path}")
+    if format == 'DATABASE':
+        loaded = load_tables(data, options, output_dir, schema, metrics)
+        tables = {table_name: table_manifest([entry]) for table_name, entry in loaded.items()}
+        for table_name, entry in loaded.items():
+            print(f"  ✅ {format}: {table_name} loaded into {entry['target']} "
+                  f"({entry['rows']} rows, {entry['rows_per_second'] or 0:,} rows/s)")
+        return write_manifest(format, output_dir, tables, time.perf_counter() - started)
 
+    with ThreadPoolExecutor(max_workers=config.get('workers')) as executor:
+        futures = {}
+        for table_name, table_data in data.items():
+            rows = table_length(table_data)
+            if part_rows and rows > part_rows:
+                tasks = [
+                    (part, _table_slice(table_data, start, start + part_rows))
+                    for part, start in enumerate(range(0, rows, part_rows))
+                ]
+            else:
+                tasks = [(None, table_data)]
+            futures[table_name] = [
+                executor.submit(_export_file, table_name, chunk, format, output_dir, part, options, metrics)
+                for part, chunk in tasks
+            ]
+
+        tables = {
+            table_name: table_manifest([future.result() for future in table_futures])
+            for table_name, table_futures in futures.items()
+        }
+
+    for table_name, info in tables.items():
+        if len(info["files"]) > 1:
+            print(f"  ✅ {format}: {table_name} exported to {len(info['files'])} part files "
+                  f"({info['rows']} rows, {info['bytes']} bytes)")
         else:
-            print(f"❌ Error: Unsupported export format '{format}' for {table_name}.")
+            print(f"  ✅ {format}: {table_name} exported to {info['file_paths'][0]}")
+
+    return write_manifest(format, output_dir, tables, time.perf_counter() - started)
 
 
 # ----------------------------
 # 🔍 Self-Test Block
 # ----------------------------
 if __name__ == '__main__':
+    # Self-test; run from the repository's parent directory so the relative
+    # imports resolve: python -m agents.configuration_agent
     output_test_dir = 'test_outputs'
     os.makedirs(output_test_dir, exist_ok=True)
 
@@ -0,0 +1,1054 @@
+import ast
+import copy
+import operator
+import re
+import string
+from functools import reduce
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_generation_agent import FLOAT_RANGE, INT_RANGE, column_kind, foreign_key_columns, primary_key_columns
+from .generated_table import DictionaryColumn, code_dtype
+from .value_pools import DATE_RANGE, DATE_TYPES, semantic_type
+
+# Unbounded regex repeats (*, +, {n,}) draw at most this many extra items
+REGEX_MAX_REPEAT = 8
+# Rules come from requests, so {n,m} bounds and the number of items a
+# pattern renders per row (nested repeats multiply) are capped
+REGEX_MAX_BOUND = 1000
+REGEX_MAX_ITEMS = 1000
+# Patterns render at most this many characters at once (rows x items), so
+# a long pattern over a large chunk is rendered in sub-batches of rows
+PATTERN_RENDER_CHARS = 1 << 22
+# Format template placeholders, as in Faker's bothify
+TEMPLATE_PLACEHOLDERS = {
+    '#': string.digits,
+    '?': string.ascii_uppercase,
+    '*': string.ascii_uppercase + string.digits,
+}
+SPEC_KEYS = ('range', 'values', 'regex', 'format')
+BOUNDED_KINDS = ('int', 'float') + DATE_TYPES
+FLOAT_STEP = 0.01
+
+_EPOCH = np.datetime64(0, 'ns')
+_UNITS = {'date': np.timedelta64(1, 'D'), 'datetime': np.timedelta64(1, 's')}
+_COMPARISONS = {
+    ast.Gt: ('>', operator.gt), ast.GtE: ('>=', operator.ge),
+    ast.Lt: ('<', operator.lt), ast.LtE: ('<=', operator.le),
+    ast.Eq: ('==', operator.eq), ast.NotEq: ('!=', operator.ne),
+}
+_FLIPPED = {'>': '<', '>=': '<=', '<': '>', '<=': '>=', '==': '==', '!=': '!='}
+_ARITHMETIC = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.Mod: operator.mod,
+}
+_ALLOWED_NODES = (
+    ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd, ast.BinOp,
+    ast.Compare, ast.In, ast.NotIn, ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple
+) + tuple(_COMPARISONS) + tuple(_ARITHMETIC)
+# Arithmetic that may take string operands, e.g. date_column - '2020-01-01'
+_STRING_ARITHMETIC = (ast.Add, ast.Sub)
+_WORD_CHARS = string.ascii_letters + string.digits + '_'
+_ESCAPES = {'d': string.digits, 'w': _WORD_CHARS, 's': ' '}
+
+
+# ----------------------------
+# Expressions
+# ----------------------------
+
+def _parse_dates(values) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[ns]')
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), errors='coerce', format='ISO8601')
+    return parsed.to_numpy(dtype='datetime64[ns]')
+
+
+def _map_values(values, func: Callable, missing) -> np.ndarray:
+    """
+    Applies a vectorized `func` to a column given as an array, a Series or a
+    `DictionaryColumn`. Dictionary-encoded and categorical columns apply it
+    once per distinct value; missing entries map to `missing`.
+    """
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        values = DictionaryColumn(values.cat.codes.to_numpy(), values.cat.categories.to_numpy(dtype=object))
+    if isinstance(values, DictionaryColumn):
+        return np.append(func(values.categories), missing)[values.codes]
+    return func(values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values))
+
+
+def _operand(values, is_date: bool) -> np.ndarray:
+    """
+    Returns a column as a NumPy array; date columns are parsed to datetime64.
+    """
+    if is_date:
+        return _map_values(values, _parse_dates, np.datetime64('NaT', 'ns'))
+    return _map_values(values, lambda array: array, None)
+
+
+def _check_arithmetic(node: ast.BinOp, source: str) -> None:
+    """
+    Rejects arithmetic whose size is not bounded by the columns: rules come
+    from requests, and "'a' * 100000 * 100000" would build a 10 GB string.
+    """
+    if not any(isinstance(child, ast.Name) for child in ast.walk(node)):
+        raise ValueError(f"Arithmetic in rule expression '{source}' must involve a column")
+    for operand in (node.left, node.right):
+        if isinstance(operand, (ast.List, ast.Tuple)):
+            raise ValueError(f"Lists in rule expression '{source}' cannot be used in arithmetic")
+        if (isinstance(operand, ast.Constant) and isinstance(operand.value, (str, bytes))
+                and not isinstance(node.op, _STRING_ARITHMETIC)):
+            raise ValueError(f"Strings in rule expression '{source}' can only be added or subtracted")
+
+
+def _holds_text(value) -> bool:
+    """
+    Tells whether an operand holds strings; nullable numeric columns are
+    object arrays of numbers and None, which do not count.
+    """
+    if isinstance(value, (str, bytes, list)):
+        return True
+    array = np.asarray(value)
+    if array.dtype.kind == 'O':
+        return pd.api.types.infer_dtype(array.ravel(), skipna=True) in ('string', 'bytes', 'mixed', 'mixed-integer')
+    return array.dtype.kind in 'SU'
+
+
+def _timestamp(value: str) -> np.datetime64:
+    try:
+        return np.datetime64(pd.Timestamp(value).to_datetime64(), 'ns')
+    except ValueError:
+        raise ValueError(f"Cannot compare a date with '{value}'") from None
+
+
+def _days(value) -> np.ndarray:
+    return (np.asarray(value, dtype=np.float64) * 86_400e9).astype(np.int64).astype('timedelta64[ns]')
+
+
+def _coerce(left, right, arithmetic: bool = False) -> tuple:
+    """
+    Aligns date operands: strings compared with dates are parsed, numbers
+    added to dates count days, and date differences compare as days.
+    """
+    left_kind, right_kind = np.asarray(left).dtype.kind, np.asarray(right).dtype.kind
+    if left_kind == 'M' and isinstance(right, str):
+        right = _timestamp(right)
+    elif right_kind == 'M' and isinstance(left, str):
+        left = _timestamp(left)
+    elif arithmetic and left_kind == 'M' and right_kind in 'iuf':
+        right = _days(right)
+    elif arithmetic and right_kind == 'M' and left_kind in 'iuf':
+        left = _days(left)
+    elif not arithmetic and left_kind == 'm' and right_kind in 'iuf':
+        left = left / np.timedelta64(1, 'D')
+    elif not arithmetic and right_kind == 'm' and left_kind in 'iuf':
+        right = right / np.timedelta64(1, 'D')
+    return left, right
+
+
+class Expression:
+    """
+    A row expression over a table's columns, such as "end_date > start_date"
+    or "status == 'returned' and amount > 100", parsed once and evaluated
+    on whole column arrays.
+
+    Supports comparisons (including `in [...]`), `and`/`or`/`not` and
+    + - * / %; arithmetic must involve a column, and * / % only take
+    numbers. Column names that are not identifiers go in backticks.
+    Date columns compare as dates, and a number added to a date counts days.
+    """
+
+    def __init__(self, source: str, dates=frozenset(), tree: ast.AST = None, names: Dict[str, str] = None):
+        self.source = source
+        if tree is None:
+            names = {}
+
+            def quote(match):
+                identifier = f"__column_{len(names)}"
+                names[identifier] = match.group(1)
+                return identifier
+
+            try:
+                tree = ast.parse(re.sub(r'`([^`]+)`', quote, source).strip(), mode='eval').body
+            except SyntaxError as e:
+                raise ValueError(f"Invalid rule expression '{source}': {e.msg}") from None
+            for node in ast.walk(tree):
+                if not isinstance(node, _ALLOWED_NODES):
+                    raise ValueError(f"Unsupported syntax in rule expression '{source}': {type(node).__name__}")
+                if isinstance(node, (ast.List, ast.Tuple)) and not all(isinstance(elt, ast.Constant) for elt in node.elts):
+                    raise ValueError(f"Lists in rule expression '{source}' may only hold constants")
+                if isinstance(node, ast.BinOp):
+                    _check_arithmetic(node, source)
+        self.tree = tree
+        self.names = names or {}
+        self.dates = frozenset(dates)
+        self.columns = {self.names.get(node.id, node.id) for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+    def bind(self, dates) -> "Expression":
+        """
+        Returns this expression for a table whose `dates` columns hold dates.
+        """
+        return Expression(self.source, dates, self.tree, self.names)
+
+    def part(self, node: ast.AST) -> "Expression":
+        """
+        Returns the sub-expression rooted at `node`.
+        """
+        source = ast.unparse(node)
+        for identifier, name in self.names.items():
+            source = source.replace(identifier, f"`{name}`")
+        return Expression(source, self.dates, node, self.names)
+
+    def evaluate(self, columns: Mapping[str, Any], row_count: int) -> np.ndarray:
+        """
+        Evaluates the expression for `row_count` rows; `columns` maps column
+        names to arrays, Series or `DictionaryColumn`s.
+        """
+        result = self._evaluate(self.tree, columns)
+        if np.ndim(result):
+            return result
+        return np.full(row_count, result, dtype=object if isinstance(result, str) else None)
+
+    def _evaluate(self, node: ast.AST, columns: Mapping[str, Any]):
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            name = self.names.get(node.id, node.id)
+            return _operand(columns[name], name in self.dates)
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return [elt.value for elt in node.elts]
+        if isinstance(node, ast.BoolOp):
+            values = [np.asarray(self._evaluate(value, columns), dtype=bool) for value in node.values]
+            return reduce(np.logical_and if isinstance(node.op, ast.And) else np.logical_or, values)
+        if isinstance(node, ast.UnaryOp):
+            value = self._evaluate(node.operand, columns)
+            if isinstance(node.op, ast.Not):
+                return ~np.asarray(value, dtype=bool)
+            return -value if isinstance(node.op, ast.USub) else value
+        if isinstance(node, ast.BinOp):
+            left, right = _coerce(self._evaluate(node.left, columns), self._evaluate(node.right, columns), True)
+            if not isinstance(node.op, _STRING_ARITHMETIC) and (_holds_text(left) or _holds_text(right)):
+                # 'abc' * quantity or '%0999999d' % price could allocate without bound
+                raise ValueError(f"Rule expression '{self.source}' can only multiply, divide or take the modulo of numbers")
+            return _ARITHMETIC[type(node.op)](left, right)
+
+        result, left = True, self._evaluate(node.left, columns)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = self._evaluate(comparator, columns)
+            if isinstance(op, (ast.In, ast.NotIn)):
+                found = pd.Series(np.atleast_1d(np.asarray(left, dtype=object))).isin(right).to_numpy()
+                outcome = found if isinstance(op, ast.In) else ~found
+            else:
+                outcome = _COMPARISONS[type(op)][1](*_coerce(left, right))
+            result = result & np.asarray(outcome, dtype=bool)
+            left = right
+        return result
+
+    def __repr__(self) -> str:
+        return f"Expression({self.source!r})"
+
+
+# ----------------------------
+# Patterns
+# ----------------------------
+
+class _RegexParser:
+    """
+    Parses the generatable subset of regular expressions: literals, `.`,
+    classes, \\d \\w \\s, groups, alternation and the ? * + {n,m} quantifiers.
+
+    `*`, `+` and `{n,}` repeat at most REGEX_MAX_REPEAT extra times; bounds
+    above REGEX_MAX_BOUND are rejected with a ValueError.
+    """
+
+    def __init__(self, regex: str):
+        self.regex = regex
+        self.text = regex[1:] if regex.startswith('^') else regex
+        if self.text.endswith('$') and not self.text.endswith('\\$'):
+            self.text = self.text[:-1]
+        self.pos = 0
+
+    def parse(self) -> tuple:
+        node = self._alternation()
+        if self.pos != len(self.text):
+            self._fail("unbalanced parenthesis")
+        return node
+
+    def _fail(self, reason: str):
+        raise ValueError(f"Cannot generate values for regex '{self.regex}': {reason}")
+
+    def _peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ''
+
+    def _next(self) -> str:
+        char = self._peek()
+        if not char:
+            self._fail("unexpected end of pattern")
+        self.pos += 1
+        return char
+
+    def _alternation(self) -> tuple:
+        branches = [self._sequence()]
+        while self._peek() == '|':
+            self.pos += 1
+            branches.append(self._sequence())
+        return branches[0] if len(branches) == 1 else ('alt', branches)
+
+    def _sequence(self) -> tuple:
+        items = []
+        while self._peek() and self._peek() not in '|)':
+            items.append(self._quantifier(self._atom()))
+        return ('seq', items)
+
+    def _atom(self) -> tuple:
+        char = self._next()
+        if char == '(':
+            if self.text.startswith('?:', self.pos):
+                self.pos += 2
+            elif self._peek() == '?':
+                self._fail("only (...) and (?:...) groups are supported")
+            node = self._alternation()
+            if self._next() != ')':
+                self._fail("unbalanced parenthesis")
+            return node
+        if char == '[':
+            return ('set', self._class())
+        if char == '.':
+            return ('set', string.ascii_letters + string.digits)
+        if char == '\\':
+            return self._escape(self._next())
+        if char in '*+?{':
+            self._fail(f"nothing to repeat at position {self.pos - 1}")
+        return ('lit', char)
+
+    def _escape(self, char: str) -> tuple:
+        if char in _ESCAPES:
+            return ('set', _ESCAPES[char])
+        if char.isalnum():
+            self._fail(f"unsupported escape \\{char}")
+        return ('lit', char)
+
+    def _class(self) -> str:
+        negated = self._peek() == '^'
+        if negated:
+            self.pos += 1
+        chars = []
+        while True:
+            char = self._next()
+            if char == ']' and chars:
+                break
+            if char == '\\':
+                escaped = self._next()
+                chars.extend(_ESCAPES.get(escaped, escaped))
+            elif self._peek() == '-' and self.text[self.pos + 1:self.pos + 2] not in ('', ']'):
+                self.pos += 1
+                last = self._next()
+                chars.extend(chr(code) for code in range(ord(char), ord(last) + 1))
+            else:
+                chars.append(char)
+        if negated:
+            chars = [char for char in string.ascii_letters + string.digits if char not in chars]
+        chars = ''.join(dict.fromkeys(chars))
+        if not chars:
+            self._fail("empty character class")
+        return chars
+
+    def _quantifier(self, atom: tuple) -> tuple:
+        char = self._peek()
+        if char == '?':
+            low, high = 0, 1
+        elif char == '*':
+            low, high = 0, REGEX_MAX_REPEAT
+        elif char == '+':
+            low, high = 1, 1 + REGEX_MAX_REPEAT
+        elif char == '{':
+            match = re.match(r'\{(\d+)(,(\d*))?\}', self.text[self.pos:])
+            if match is None:
+                return atom
+            low = int(match.group(1))
+            high = low if match.group(2) is None else (int(match.group(3)) if match.group(3) else low + REGEX_MAX_REPEAT)
+            if high < low:
+                self._fail(f"bad repeat {match.group(0)}")
+            if low > REGEX_MAX_BOUND or (match.group(3) and high > REGEX_MAX_BOUND):
+                self._fail(f"repeat {match.group(0)} exceeds the maximum of {REGEX_MAX_BOUND}")
+            self.pos += len(match.group(0)) - 1
+        else:
+            return atom
+        self.pos += 1
+        if self._peek() in ('?', '+'):
+            self.pos += 1
+        return ('rep', atom, low, high)
+
+
+def _render_items(node: tuple) -> int:
+    """
+    Counts the literals and classes `Pattern._render` draws per row.
+    """
+    kind = node[0]
+    if kind in ('lit', 'set'):
+        return 1
+    if kind in ('seq', 'alt'):
+        return sum(_render_items(child) for child in node[1])
+    return node[3] * _render_items(node[1])
+
+
+def splitmix64(state: np.ndarray, counter: int) -> np.ndarray:
+    """
+    SplitMix64: derives an independent 64-bit draw per row from one state.
+    """
+    z = state + np.uint64(((counter + 1) * 0x9E3779B97F4A7C15) % (1 << 64))
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class Pattern:
+    """
+    Generates strings matching a regex or a format template ('#' digit,
+    '?' upper-case letter, '*' either, '\\' escapes), one row at a time
+    from a single uniform draw, and checks values against it. Patterns
+    that draw more than REGEX_MAX_ITEMS characters per value are rejected.
+    """
+
+    def __init__(self, regex: str = None, template: str = None):
+        if template is not None:
+            items, escaped = [], False
+            for char in template:
+                if not escaped and char == '\\':
+                    escaped = True
+                    continue
+                placeholder = TEMPLATE_PLACEHOLDERS.get(char) if not escaped else None
+                items.append(('set', placeholder) if placeholder else ('lit', char))
+                escaped = False
+            self.tree = ('seq', items)
+            regex = ''.join(
+                f"[{re.escape(node[1])}]" if node[0] == 'set' else re.escape(node[1]) for node in items
+            )
+        else:
+            self.tree = _RegexParser(regex).parse()
+        self.items = _render_items(self.tree)
+        if self.items > REGEX_MAX_ITEMS:
+            raise ValueError(f"Cannot generate values for '{template or regex}': more than {REGEX_MAX_ITEMS} items per value")
+        try:
+            re.compile(regex)
+        except re.error as e:
+            raise ValueError(f"Invalid regex '{regex}': {e}") from None
+        self.regex = regex
+
+    def generate(self, u: np.ndarray) -> np.ndarray:
+        """
+        Renders one value per uniform, PATTERN_RENDER_CHARS characters at a
+        time; every row depends only on its own draw, so batching does not
+        change the values.
+        """
+        state = (np.asarray(u) * 2.0 ** 53).astype(np.uint64)
+        values = np.empty(len(state), dtype=object)
+        batch_rows = max(1, PATTERN_RENDER_CHARS // max(1, self.items))
+        for start in range(0, len(state), batch_rows):
+            counter = iter(range(1 << 62))
+            batch = state[start:start + batch_rows]
+            values[start:start + len(batch)] = self._render(self.tree, batch, counter)
+        return values
+
+    def _render(self, node: tuple, state: np.ndarray, counter) -> np.ndarray:
+        kind = node[0]
+        if kind == 'lit':
+            return np.full(len(state), node[1])
+        if kind == 'set':
+            chars = np.array(list(node[1]))
+            return chars[splitmix64(state, next(counter)) % np.uint64(len(chars))]
+        if kind == 'seq':
+            result = np.full(len(state), '')
+            for child in node[1]:
+                result = np.char.add(result, self._render(child, state, counter))
+            return result
+        if kind == 'alt':
+            choice = splitmix64(state, next(counter)) % np.uint64(len(node[1]))
+            branches = [self._render(branch, state, counter) for branch in node[1]]
+            result = branches[-1]
+            for index in range(len(branches) - 2, -1, -1):
+                result = np.where(choice == index, branches[index], result)
+            return result
+
+        _, child, low, high = node
+        count = low + splitmix64(state, next(counter)) % np.uint64(high - low + 1)
+        result = np.full(len(state), '')
+        for index in range(high):
+            part = self._render(child, state, counter)
+            if index >= low:
+                part = np.where(index < count, part, '')
+            result = np.char.add(result, part)
+        return result
+
+    def matches(self, values: np.ndarray) -> np.ndarray:
+        return pd.Series(values, dtype=object).astype(str).str.fullmatch(self.regex).to_numpy(dtype=bool)
+
+
+# ----------------------------
+# Column rules
+# ----------------------------
+
+def _to_units(values, kind: str) -> np.ndarray:
+    """
+    Returns values as floats: numbers as they are, dates as days and
+    datetimes as seconds since the epoch.
+    """
+    if kind in DATE_TYPES:
+        values = np.asarray(values)
+        if values.dtype.kind != 'M':
+            values = _parse_dates(values)
+        return (values.astype('datetime64[ns]') - _EPOCH) / _UNITS[kind]
+    return np.asarray(values, dtype=np.float64)
+
+
+def _from_units(values: np.ndarray, kind: str):
+    """
+    Inverse of `_to_units`; dates come back dictionary-encoded.
+    """
+    if kind == 'float':
+        return values
+    if kind == 'int':
+        return values.astype(np.int64)
+    if kind == 'datetime':
+        if not len(values):
+            return np.zeros(0, dtype=object)
+        stamps = values.astype(np.int64).astype('datetime64[s]')
+        return np.char.replace(np.datetime_as_string(stamps, unit='s'), 'T', ' ').astype(object)
+    days = values.astype(np.int64)
+    if not len(days):
+        return DictionaryColumn(np.zeros(0, dtype=np.int8), np.zeros(0, dtype=object))
+    first = days.min()
+    categories = np.arange(first, days.max() + 1).astype('datetime64[D]')
+    categories = np.datetime_as_string(categories, unit='D').astype(object)
+    return DictionaryColumn((days - first).astype(code_dtype(len(categories))), categories)
+
+
+def _default_interval(kind: str) -> Tuple[float, float]:
+    if kind == 'int':
+        return INT_RANGE
+    if kind == 'float':
+        return FLOAT_RANGE
+    first, last = _to_units(np.array(DATE_RANGE, dtype='datetime64[D]'), kind)
+    return first, last
+
+
+def _draw_interval(u: np.ndarray, low, high, kind: str) -> np.ndarray:
+    """
+    Maps uniform draws onto [low, high] (per row when arrays); rows whose
+    bounds conflict get `low`.
+    """
+    if kind == 'float':
+        values = np.rint((low + u * (high - low)) * 100) / 100
+        values = np.minimum(np.maximum(values, low), high)
+    else:
+        values = low + np.floor(u * (high - low + 1))
+    return np.where(high < low, low, values)
+
+
+def _lower_bound(value: np.ndarray, op: str, kind: str) -> np.ndarray:
+    if kind == 'float':
+        return value + FLOAT_STEP if op == '>' else value
+    return np.floor(value) + 1 if op == '>' else np.ceil(value)
+
+
+def _upper_bound(value: np.ndarray, op: str, kind: str) -> np.ndarray:
+    if kind == 'float':
+        return value - FLOAT_STEP if op == '<' else value
+    return np.ceil(value) - 1 if op == '<' else np.floor(value)
+
+
+def _units_of(series: pd.Series, kind: str) -> np.ndarray:
+    if kind in DATE_TYPES:
+        return _to_units(_operand(series, True), kind)
+    return pd.to_numeric(pd.Series(_operand(series, False)), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _select(mask: np.ndarray, values, otherwise):
+    """
+    Takes `values` where `mask` is set and `otherwise` elsewhere, keeping
+    dictionary columns encoded.
+    """
+    if isinstance(values, DictionaryColumn) and isinstance(otherwise, DictionaryColumn):
+        lookup, categories = pd.factorize(np.concatenate([otherwise.categories, values.categories]))
+        lookup = np.append(lookup, -1)
+        shifted = np.where(values.codes < 0, -1, values.codes.astype(np.int64) + len(otherwise.categories))
+        codes = np.where(mask, lookup[shifted], lookup[otherwise.codes])
+        return DictionaryColumn(codes.astype(code_dtype(len(categories))), np.asarray(categories, dtype=object))
+    return np.where(mask, np.asarray(values), np.asarray(otherwise))
+
+
+class _Spec:
+    """
+    One generator of a column rule: a range, a (weighted) value list or a pattern.
+    """
+
+    def __init__(self, spec: dict, where: str):
+        unknown = set(spec) - set(SPEC_KEYS) - {'weights'}
+        if unknown:
+            raise ValueError(f"{where}: unknown keys {', '.join(sorted(map(str, unknown)))}")
+        generators = [key for key in SPEC_KEYS if key in spec]
+        if len(generators) > 1:
+            raise ValueError(f"{where}: set only one of {', '.join(generators)}")
+        self.raw_range = self.range = self.values = self.cdf = self.pattern = None
+
+        if 'range' in spec:
+            if not isinstance(spec['range'], (list, tuple)) or len(spec['range']) != 2:
+                raise ValueError(f"{where}: range must be a (low, high) pair")
+            self.raw_range = tuple(spec['range'])
+        if 'values' in spec:
+            if not isinstance(spec['values'], (list, tuple)) or not spec['values']:
+                raise ValueError(f"{where}: values must be a non-empty list")
+            self.values = list(spec['values'])
+        if 'weights' in spec:
+            weights = np.asarray(spec['weights'], dtype=np.float64)
+            if self.values is None or weights.shape != (len(self.values),):
+                raise ValueError(f"{where}: weights need a values list of the same length")
+            if (weights < 0).any() or not weights.sum() > 0:
+                raise ValueError(f"{where}: weights must be non-negative and not all zero")
+            self.cdf = np.cumsum(weights) / weights.sum()
+        if 'regex' in spec:
+            self.pattern = Pattern(regex=str(spec['regex']))
+        if 'format' in spec:
+            self.pattern = Pattern(template=str(spec['format']))
+
+    @property
+    def empty(self) -> bool:
+        return self.raw_range is None and self.values is None and self.pattern is None
+
+    @property
+    def ranged(self) -> bool:
+        return self.values is None and self.pattern is None
+
+    def bind(self, kind: str, where: str) -> "_Spec":
+        """
+        Returns a copy for a column of `kind`, with the range in its units.
+        """
+        bound = copy.copy(self)
+        if self.raw_range is not None:
+            if kind not in BOUNDED_KINDS:
+                raise ValueError(f"{where}: ranges need a numeric or date column, not {kind}")
+            try:
+                low, high = _to_units(np.array(self.raw_range, dtype=object), kind)
+            except (TypeError, ValueError):
+                low = high = np.nan
+            if np.isnan(low) or np.isnan(high):
+                raise ValueError(f"{where}: range {self.raw_range} does not fit a {kind} column")
+            if kind != 'float':
+                low, high = np.ceil(low), np.floor(high)
+            if not low <= high:
+                raise ValueError(f"{where}: range {self.raw_range} is empty")
+            bound.range = (low, high)
+        if self.pattern is not None and kind != 'string':
+            raise ValueError(f"{where}: patterns need a string column, not {kind}")
+        return bound
+
+    def interval(self, kind: str) -> Tuple[float, float]:
+        return self.range if self.range is not None else _default_interval(kind)
+
+    def draw(self, u: np.ndarray, kind: str):
+        if self.values is not None:
+            if self.cdf is None:
+                index = (u * len(self.values)).astype(np.intp)
+            else:
+                index = np.minimum(np.searchsorted(self.cdf, u, side='right'), len(self.values) - 1)
+            return DictionaryColumn.encode(self.values, index)
+        if self.pattern is not None:
+            return self.pattern.generate(u)
+        low, high = self.interval(kind)
+        return _from_units(_draw_interval(u, low, high, kind), kind)
+
+    def expectation(self) -> Tuple[str, dict]:
+        if self.values is not None:
+            return "expect_column_values_to_be_in_set", {"value_set": self.values}
+        if self.pattern is not None:
+            return "expect_column_values_to_match_regex", {"regex": self.pattern.regex}
+        return "expect_column_values_to_be_between", {"min_value": self.raw_range[0], "max_value": self.raw_range[1]}
+
+    def check(self, series: pd.Series, kind: str) -> np.ndarray:
+        """
+        Returns which values satisfy the spec.
+        """
+        if self.values is not None:
+            return series.isin(self.values).to_numpy()
+        if self.pattern is not None:
+            return _map_values(series, self.pattern.matches, False).astype(bool)
+        units = _units_of(series, kind)
+        return (units >= self.range[0]) & (units <= self.range[1])
+
+
+class ColumnRule:
+    """
+    The compiled rules of one column: a base generator, conditional cases
+    (`when`), bounds from cross-column constraints and expression checks.
+
+    `generate` turns the column's uniform draws into values in one pass,
+    without rejection sampling: cases pick their generator per row, and
+    bounds narrow each row's interval before it is sampled. `violations`
+    checks data against the same rules for validation.
+    """
+
+    def __init__(self, column: str, kind: str, base: _Spec, cases: List[Tuple[Expression, _Spec]] = None):
+        self.column = column
+        self.kind = kind
+        self.base = base
+        self.cases = cases or []
+        self.bounds = []
+        self.checks = []
+
+    @property
+    def depends_on(self) -> set:
+        """
+        Columns that must be generated before this one.
+        """
+        columns = set()
+        for condition, _ in self.cases:
+            columns |= condition.columns
+        for _, value in self.bounds:
+            columns |= value.columns
+        return columns
+
+    @property
+    def generates(self) -> bool:
+        return not self.base.empty or bool(self.cases) or bool(self.bounds)
+
+    @property
+    def supersedes_values(self) -> bool:
+        """
+        Whether these rules replace the schema's value list check.
+        """
+        return not self.base.empty or bool(self.cases)
+
+    @property
+    def ranged(self) -> bool:
+        return self.base.ranged and all(spec.ranged for _, spec in self.cases)
+
+    def _case_masks(self, columns: Mapping[str, Any], row_count: int) -> Tuple[List[np.ndarray], np.ndarray]:
+        """
+        Returns each case's rows (the first matching case wins) and the rest.
+        """
+        taken = np.zeros(row_count, dtype=bool)
+        masks = []
+        for condition, _ in self.cases:
+            mask = np.asarray(condition.evaluate(columns, row_count), dtype=bool) & ~taken
+            taken |= mask
+            masks.append(mask)
+        return masks, ~taken
+
+    def generate(self, u: np.ndarray, context: Mapping[str, Any], default: Callable[[np.ndarray], Any]):
+        """
+        Generates the column from its uniform draws `u`; `context` holds the
+        columns it depends on and `default` is the schema's own generator.
+        """
+        masks, _ = self._case_masks(context, len(u))
+        if self.bounds:
+            return self._generate_bounded(u, context, masks)
+
+        values = default(u) if self.base.empty else self.base.draw(u, self.kind)
+        for mask, (_, spec) in zip(masks, self.cases):
+            values = _select(mask, spec.draw(u, self.kind), values)
+        return values
+
+    def _generate_bounded(self, u: np.ndarray, context: Mapping[str, Any], masks: List[np.ndarray]):
+        row_count = len(u)
+        low, high = (np.full(row_count, bound, dtype=np.float64) for bound in self.base.interval(self.kind))
+        for mask, (_, spec) in zip(masks, self.cases):
+            case_low, case_high = spec.interval(self.kind)
+            low, high = np.where(mask, case_low, low), np.where(mask, case_high, high)
+
+        above, below = np.full(row_count, np.nan), np.full(row_count, np.nan)
+        equal, excluded = None, []
+        for op, expression in self.bounds:
+            value = _to_units(expression.evaluate(context, row_count), self.kind)
+            if op in ('>', '>='):
+                above = np.fmax(above, _lower_bound(value, op, self.kind))
+            elif op in ('<', '<='):
+                below = np.fmin(below, _upper_bound(value, op, self.kind))
+            elif op == '==':
+                value = value if self.kind == 'float' else np.round(value)
+                equal = value if equal is None else np.where(np.isnan(value), equal, value)
+            else:
+                excluded.append(value)
+
+        # Constraints win over ranges: rows where both cannot hold ignore the range
+        bounded_low, bounded_high = np.fmax(low, above), np.fmin(high, below)
+        conflict = bounded_high < bounded_low
+        low = np.where(conflict, np.where(np.isnan(above), low, above), bounded_low)
+        high = np.where(conflict, np.where(np.isnan(below), high, below), bounded_high)
+        values = _draw_interval(u, low, high, self.kind)
+        step = FLOAT_STEP if self.kind == 'float' else 1
+        for value in excluded:
+            values = np.where(values == value, np.where(values + step <= high, values + step, values - step), values)
+        if equal is not None:
+            values = np.where(np.isnan(equal), values, equal)
+        return _from_units(values, self.kind)
+
+    def expectations(self) -> List[Tuple[str, dict]]:
+        """
+        Returns (expectation type, kwargs) for every check, in `violations` order.
+        """
+        expectations = []
+        if not self.base.empty:
+            expectations.append(self.base.expectation())
+        for condition, spec in self.cases:
+            expectation_type, kwargs = spec.expectation()
+            expectations.append((expectation_type, dict(kwargs, condition=condition.source)))
+        for expression in self.checks:
+            expectations.append(("expect_column_values_to_satisfy_expression", {"expression": expression.source}))
+        return expectations
+
+    def violations(self, df: pd.DataFrame) -> List[np.ndarray]:
+        """
+        Returns a mask of the rows that break each check. Missing values are
+        left to the not-null check, and cases only check their own rows.
+        """
+        series = df[self.column]
+        present = series.notna().to_numpy()
+        masks, rest = self._case_masks(df, len(df))
+        violations = []
+        if not self.base.empty:
+            violations.append(present & rest & ~self.base.check(series, self.kind))
+        for mask, (_, spec) in zip(masks, self.cases):
+            violations.append(present & mask & ~spec.check(series, self.kind))
+        for expression in self.checks:
+            complete = reduce(np.logical_and, [df[column].notna().to_numpy() for column in expression.columns])
+            violations.append(complete & ~np.asarray(expression.evaluate(df, len(df)), dtype=bool))
+        return violations
+
+    def __repr__(self) -> str:
+        return f"ColumnRule({self.column!r}, {len(self.expectations())} checks)"
+
+
+# ----------------------------
+# Compilation
+# ----------------------------
+
+def _parse_column_rule(key: str, rule) -> Dict[str, Any]:
+    where = f"Custom rule '{key}'"
+    if isinstance(rule, (list, tuple)):
+        rule = {"range": rule}
+    if not isinstance(rule, dict):
+        raise ValueError(f"{where} must be a (low, high) range or a dict")
+    cases = []
+    for number, case in enumerate(rule.get("when") or []):
+        if not isinstance(case, dict) or "if" not in case:
+            raise ValueError(f"{where}: every 'when' case needs an 'if' expression")
+        spec = {name: value for name, value in case.items() if name != "if"}
+        case_where = f"{where}, case {number + 1}"
+        parsed = _Spec(spec, case_where)
+        if parsed.empty:
+            raise ValueError(f"{case_where} sets no {', '.join(SPEC_KEYS)}")
+        cases.append((Expression(str(case["if"])), parsed))
+    spec = {name: value for name, value in rule.items() if name != "when"}
+    return {"base": _Spec(spec, where), "cases": cases}
+
+
+def parse_rules(custom_rules: dict) -> Tuple[Dict[str, dict], List[Tuple[str, Expression]]]:
+    """
+    Checks and parses `custom_rules` without a schema, raising ValueError on
+    malformed rules. Returns the column rules by key and the list of
+    (table or None, Expression) constraints; see `apply_rules`.
+    """
+    if not custom_rules:
+        return {}, []
+    if not isinstance(custom_rules, dict):
+        raise ValueError("custom_rules must be a dict")
+
+    column_rules, constraints = {}, []
+    for key, rule in custom_rules.items():
+        if key != "constraints":
+            column_rules[key] = _parse_column_rule(key, rule)
+            continue
+        by_table = rule if isinstance(rule, dict) else {None: rule}
+        for table_name, expressions in by_table.items():
+            for source in [expressions] if isinstance(expressions, str) else expressions:
+                constraints.append((table_name, Expression(str(source))))
+    return column_rules, constraints
+
+
+def rule_kind(column: str, properties: dict) -> str:
+    """
+    Returns the value kind rules see for a column: a generator kind or,
+    for date columns, 'date'/'datetime'.
+    """
+    semantic = semantic_type(column, properties)
+    return semantic if semantic in DATE_TYPES else column_kind(properties.get("type"))
+
+
+def _resolve(schema: Dict[str, Any], key: str) -> List[Tuple[str, str]]:
+    if '.' in key:
+        table_name, column = key.split('.', 1)
+        if column in schema.get(table_name, {}).get("columns", {}):
+            return [(table_name, column)]
+    return [(table_name, key) for table_name, info in schema.items() if key in info.get("columns", {})]
+
+
+def _depends(rules: Dict[str, ColumnRule], column: str, target: str) -> bool:
+    """
+    Whether `column` depends on `target`, directly or through other rules.
+    """
+    pending, seen = [column], set()
+    while pending:
+        current = pending.pop()
+        if current == target:
+            return True
+        if current in seen or current not in rules:
+            continue
+        seen.add(current)
+        pending.extend(rules[current].depends_on)
+    return False
+
+
+def _add_constraint(schema: Dict[str, Any], table_name: str, rules: Dict[str, ColumnRule], expression: Expression) -> None:
+    """
+    Turns each `column <op> expression` conjunct into a bound on that
+    column's generator where possible, and adds the whole expression as a
+    check. Conjuncts that cannot be solved for a column are only checked.
+    """
+    table_info = schema[table_name]
+    columns = table_info["columns"]
+    keys = set(foreign_key_columns(table_info)) | set(primary_key_columns(table_info))
+    conjuncts = expression.tree.values if isinstance(expression.tree, ast.BoolOp) \
+        and isinstance(expression.tree.op, ast.And) else [expression.tree]
+
+    def candidate(node: ast.AST, other: ast.AST):
+        if not isinstance(node, ast.Name):
+            return None
+        column = expression.names.get(node.id, node.id)
+        properties = columns[column]
+        if properties.get("primary_key") or column in keys or rule_kind(column, properties) not in BOUNDED_KINDS:
+            return None
+        rule = rules.get(column)
+        if (rule is not None and not rule.ranged) or ((rule is None or rule.base.empty) and properties.get("values")):
+            return None
+        value = expression.part(other)
+        if any(_depends(rules, dependency, column) for dependency in value.columns):
+            return None
+        return column, value
+
+    solved = []
+    for conjunct in conjuncts:
+        if not isinstance(conjunct, ast.Compare) or len(conjunct.ops) != 1 or type(conjunct.ops[0]) not in _COMPARISONS:
+            continue
+        op = _COMPARISONS[type(conjunct.ops[0])][0]
+        left, right = conjunct.left, conjunct.comparators[0]
+        for node, other, node_op in ((left, right, op), (right, left, _FLIPPED[op])):
+            target = candidate(node, other)
+            if target is not None:
+                column, value = target
+                if column not in rules:
+                    kind = rule_kind(column, columns[column])
+                    rules[column] = ColumnRule(column, kind, _Spec({}, "").bind(kind, ""))
+                rules[column].bounds.append((node_op, value))
+                solved.append(column)
+                break
+
+    owner = solved[0] if solved else next(column for column in columns if column in expression.columns)
+    if owner not in rules:
+        rules[owner] = ColumnRule(owner, rule_kind(owner, columns[owner]), _Spec({}, ""))
+    rules[owner].checks.append(expression)
+
+
+def column_order(table_info: Dict[str, Any]) -> List[str]:
+    """
+    Orders a table's columns so every column comes after the columns its
+    rules read, keeping schema order otherwise. Raises ValueError on cycles.
+    """
+    columns = table_info.get("columns", {})
+    order, done = [], set()
+
+    def visit(column: str, path: List[str]) -> None:
+        if column in done:
+            return
+        if column in path:
+            cycle = path[path.index(column):] + [column]
+            raise ValueError(f"Custom rules form a cycle: {' -> '.join(cycle)}")
+        rule = columns[column].get("rule")
+        for dependency in [name for name in columns if rule is not None and name in rule.depends_on]:
+            visit(dependency, path + [column])
+        done.add(column)
+        order.append(column)
+
+    for column in columns:
+        visit(column, [])
+    return order
+
+
+def apply_rules(parsed_schema: Dict[str, Any], custom_rules: dict) -> Dict[str, Any]:
+    """
+    Compiles `custom_rules` into a copy of the parsed schema.
+
+    Keys name a column as 'table.column' or 'column' (every table that has
+    it); a '<column>_range' key or a (low, high) value is a range. Rules are
+    dicts with one of 'range', 'values' (plus optional 'weights'), 'regex'
+    or 'format', and optional 'when' cases, e.g.
+    {'if': "status == 'returned'", 'range': (0, 0)}; the first matching case
+    replaces the base rule for its rows. 'constraints' lists expressions
+    (or {table: [expressions]}) such as 'end_date > start_date', which are
+    solved for one column while generating where possible and always checked.
+
+    Every ruled column gets a `ColumnRule` under its 'rule' property, and
+    tables with rules get a 'column_order' in which to generate columns.
+    The generator and `build_expectations` read both. The input schema is
+    not modified; without rules it is returned as is.
+    """
+    column_rules, constraints = parse_rules(custom_rules)
+    if not column_rules and not constraints:
+        return parsed_schema
+
+    schema = {
+        table_name: dict(info, columns={column: dict(properties) for column, properties in info.get("columns", {}).items()})
+        for table_name, info in parsed_schema.items()
+    }
+    rules = {table_name: {} for table_name in schema}
+    dates = {
+        table_name: {column for column, properties in info["columns"].items() if rule_kind(column, properties) in DATE_TYPES}
+        for table_name, info in schema.items()
+    }
+
+    for key, rule in column_rules.items():
+        targets = _resolve(schema, key)
+        if not targets and key.endswith('_range'):
+            targets = _resolve(schema, key[:-len('_range')])
+        if not targets:
+            raise ValueError(f"Custom rule '{key}' matches no column in the schema")
+        for table_name, column in targets:
+            table_info = schema[table_name]
+            properties = table_info["columns"][column]
+            where = f"Custom rule '{key}' on {table_name}.{column}"
+            if column in primary_key_columns(table_info) or column in foreign_key_columns(table_info):
+                raise ValueError(f"{where}: key columns take their values from keys")
+            kind = rule_kind(column, properties)
+            base = rule["base"].bind(kind, where)
+            if base.empty and rule["cases"] and properties.get("values"):
+                base = _Spec({"values": properties["values"]}, where)
+            cases = []
+            for condition, spec in rule["cases"]:
+                missing = condition.columns - set(table_info["columns"])
+                if missing:
+                    raise ValueError(f"{where}: condition '{condition.source}' uses unknown columns {', '.join(sorted(missing))}")
+                cases.append((condition.bind(dates[table_name]), spec.bind(kind, where)))
+            rules[table_name][column] = ColumnRule(column, kind, base, cases)
+
+    for table_filter, expression in constraints:
+        if table_filter is not None and table_filter not in schema:
+            raise ValueError(f"Constraint '{expression.source}' names unknown table '{table_filter}'")
+        tables = [table_filter] if table_filter is not None else [
+            table_name for table_name, info in schema.items() if expression.columns <= set(info["columns"])
+        ]
+        if not expression.columns or not tables:
+            raise ValueError(f"Constraint '{expression.source}' matches no table in the schema")
+        for table_name in tables:
+            missing = expression.columns - set(schema[table_name]["columns"])
+            if missing:
+                raise ValueError(f"Constraint '{expression.source}' uses unknown columns {', '.join(sorted(missing))} of '{table_name}'")
+            _add_constraint(schema, table_name, rules[table_name], expression.bind(dates[table_name]))
+
+    for table_name, table_rules in rules.items():
+        if not table_rules:
+            continue
+        for column, rule in table_rules.items():
+            schema[table_name]["columns"][column]["rule"] = rule
+        schema[table_name]["column_order"] = column_order(schema[table_name])
+    return schema
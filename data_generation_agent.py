@@ -1,76 +1,741 @@
-import os
-import random
-from faker import Faker
-
-fake = Faker()
-
-def generate_data(parsed_schema, config):
-    generated_ids = {}
-    generated_data = {}
-
-    def generate_table_data(table_name, schema):
-        table_rows = []
-        primary_key_column = None
-
-        for _ in range(schema["row_count"]):
-            row = {}
-            for column, properties in schema["columns"].items():
-                if properties.get("primary_key"):
-                    value = len(table_rows) + 1
-                    primary_key_column = column
-                elif "foreign_key" in properties:
-                    ref_table = properties["foreign_key"]["table"]
-                    ref_column = properties["foreign_key"]["column"]
-                    value = random.choice(generated_ids[ref_table])
-                else:
-                    if properties["type"] == "string":
-                        value = fake.name() if "name" in column else fake.email()
-                    elif properties["type"] == "int":
-                        value = random.randint(100, 1000)
-                    else:
-                        value = None
-                row[column] = value
+import math
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from .generated_table import DictionaryColumn, GeneratedTable, code_dtype
+from .value_pools import column_pool, disambiguate
+
+# Bump whenever the same seed would produce different values
+GENERATOR_VERSION = 4
+
+INT_RANGE = (1, 1000)
+FLOAT_RANGE = (1, 1000)
+STRING_SUFFIX_RANGE = (1000, 9999)
+# Composite key spaces are kept below this size so permuting them fits in int64
+MAX_KEY_SPACE = 2 ** 62
+
+
+def column_kind(dtype) -> str:
+    """
+    Maps a schema type (SQL, JSON or schema.org style) to a generator kind.
+    """
+    dtype = str(dtype or "string").lower().split(":")[-1]
+    if dtype.startswith(("int", "bigint", "smallint", "tinyint", "serial")):
+        return "int"
+    if dtype.startswith(("float", "double", "decimal", "numeric", "real")):
+        return "float"
+    if dtype.startswith("bool"):
+        return "bool"
+    return "string"
+
+
+def resolve_seed(seed=None) -> int:
+    """
+    Returns a concrete seed so every column stream of one run shares it.
+    """
+    if seed is None:
+        return int(np.random.SeedSequence().entropy % (2 ** 63))
+    return int(seed)
+
+
+def column_stream(seed: int, table_name: str, column: str, start: int = 0) -> np.random.Generator:
+    """
+    Returns the random stream of one column, positioned at row `start`.
+
+    Every value is drawn from exactly one uniform double, so row `i` of a
+    column always comes from draw `i` of its stream, however it is batched.
+    """
+    sequence = np.random.SeedSequence(
+        seed, spawn_key=(zlib.crc32(table_name.encode()), zlib.crc32(column.encode()))
+    )
+    bit_generator = np.random.PCG64(sequence)
+    if start:
+        bit_generator.advance(start)
+    return np.random.Generator(bit_generator)
+
+
+@lru_cache(maxsize=256)
+def _string_categories(column: str) -> np.ndarray:
+    """
+    Every value a free-text column can take, in suffix order.
+    """
+    low, high = STRING_SUFFIX_RANGE
+    categories = np.array([f"{column}_{suffix}" for suffix in range(low, high + 1)], dtype=object)
+    categories.flags.writeable = False
+    return categories
+
+
+def _values_from_uniforms(column: str, properties: dict, u: np.ndarray, seed: int, profiled: bool = True):
+    """
+    Turns a batch of uniform draws in [0, 1) into column values. String
+    columns come back dictionary-encoded, over a value pool when the column
+    has a semantic type (see `value_pools`). Columns with a sample data
+    profile (see `profiling_agent.apply_profile`) are drawn from it.
+    """
+    if properties.get("values"):
+        values = properties["values"]
+        return DictionaryColumn.encode(values, (u * len(values)).astype(np.intp))
+
+    profile = properties.get("profile")
+    if profiled and profile is not None:
+        return profile.sample(u, lambda u: _values_from_uniforms(column, properties, u, seed, profiled=False))
+
+    pool = column_pool(column, properties, seed)
+    if pool is not None:
+        return DictionaryColumn((u * len(pool)).astype(code_dtype(len(pool))), pool)
+
+    kind = column_kind(properties.get("type"))
+    if kind == "int":
+        low, high = INT_RANGE
+        return low + (u * (high - low + 1)).astype(np.int64)
+    if kind == "float":
+        low, high = FLOAT_RANGE
+        return np.rint((low + u * (high - low)) * 100) / 100
+    if kind == "bool":
+        return u < 0.5
+
+    low, high = STRING_SUFFIX_RANGE
+    codes = (u * (high - low + 1)).astype(np.int16)
+    return DictionaryColumn(codes, _string_categories(column))
+
+
+def _value_from_uniform(column: str, properties: dict, u: float, seed: int):
+    """
+    Scalar counterpart of `_values_from_uniforms`, used by the reference path.
+    """
+    if properties.get("values"):
+        values = properties["values"]
+        return values[int(u * len(values))]
+
+    if properties.get("profile") is not None:
+        return np.asarray(_values_from_uniforms(column, properties, np.array([u]), seed)).tolist()[0]
+
+    pool = column_pool(column, properties, seed)
+    if pool is not None:
+        return pool[int(u * len(pool))]
 
-            table_rows.append(row)
+    kind = column_kind(properties.get("type"))
+    if kind == "int":
+        low, high = INT_RANGE
+        return low + int(u * (high - low + 1))
+    if kind == "float":
+        low, high = FLOAT_RANGE
+        return round((low + u * (high - low)) * 100) / 100
+    if kind == "bool":
+        return u < 0.5
 
-        # Store primary keys
-        if primary_key_column:
-            generated_ids[table_name] = [row[primary_key_column] for row in table_rows]
+    low, high = STRING_SUFFIX_RANGE
+    return f"{column}_{low + int(u * (high - low + 1))}"
 
-        generated_data[table_name] = table_rows
 
-    # Step 1: Generate parent tables
-    for table, schema in parsed_schema.items():
-        has_fk = any("foreign_key" in col for col in schema["columns"].values())
-        if not has_fk:
-            generate_table_data(table, schema)
+@lru_cache(maxsize=8)
+def _zipf_cdf(parent_count: int, exponent: float) -> np.ndarray:
+    """
+    Cumulative Zipf weights over parent ranks 1..parent_count.
+    """
+    cdf = np.cumsum(np.arange(1, parent_count + 1, dtype=np.float64) ** -exponent)
+    return cdf / cdf[-1]
 
-    # Step 2: Generate child tables
-    for table, schema in parsed_schema.items():
-        has_fk = any("foreign_key" in col for col in schema["columns"].values())
-        if has_fk:
-            generate_table_data(table, schema)
 
-    return generated_data
+def _parent_index(u: np.ndarray, parent_count: int, reference: dict) -> np.ndarray:
+    """
+    Maps uniform draws to parent positions using the reference's distribution.
+    """
+    distribution = reference.get("distribution", "uniform")
+    if distribution == "uniform":
+        return (u * parent_count).astype(np.intp)
+    if distribution == "zipf":
+        cdf = _zipf_cdf(parent_count, float(reference.get("zipf_exponent", 1.1)))
+        return np.minimum(np.searchsorted(cdf, u, side="right"), parent_count - 1)
+    raise ValueError(f"Unsupported foreign key distribution: '{distribution}'")
 
 
-def generate_data(parsed_schema, row_count):
-    table_name, table_info = next(iter(parsed_schema.items()))
+def _affine_permutation(
+    table_name: str,
+    column: str,
+    seed: int,
+    slots: int,
+    start: int,
+    row_count: int
+) -> np.ndarray:
+    """
+    Maps row positions [start, start + row_count) through a seeded affine
+    permutation of range(slots); within each run of `slots` consecutive
+    positions every slot is used exactly once. Any shard can compute its
+    rows independently.
+    """
+    draws = column_stream(seed, table_name, column).integers(0, 2 ** 62, size=2)
+    bound = max(2, min(slots, (2 ** 63 - 1) // slots))
+    multiplier = 1 + int(draws[0]) % (bound - 1)
+    while math.gcd(multiplier, slots) != 1:
+        multiplier += 1
+    offset = int(draws[1]) % slots
+
+    positions = np.arange(start, start + row_count, dtype=np.int64)
+    return (positions * multiplier + offset) % slots
+
+
+def _unique_pool_values(
+    table_name: str,
+    column: str,
+    pool: np.ndarray,
+    seed: int,
+    start: int,
+    row_count: int
+):
+    """
+    Draws pool values without repeats: a seeded permutation of the pool,
+    made distinct with `disambiguate` for rows beyond the pool's size.
+    """
+    index = _affine_permutation(table_name, column, seed, len(pool), start, row_count)
+    if start + row_count <= len(pool):
+        return DictionaryColumn(index.astype(code_dtype(len(pool))), pool)
+    rounds = np.arange(start, start + row_count, dtype=np.int64) // len(pool)
+    return disambiguate(pool, index, rounds)
+
+
+def _capped_parent_index(
+    table_name: str,
+    column: str,
+    reference: dict,
+    parent_count: int,
+    start: int,
+    row_count: int,
+    seed: int
+) -> np.ndarray:
+    """
+    Assigns rows to parents so no parent gets more than `max_per_parent` children.
+
+    Row positions are mapped through a seeded affine permutation of the
+    parent_count * max_per_parent child slots, so each slot is used at most
+    once and any shard can compute its rows independently.
+    """
+    cap = int(reference["max_per_parent"])
+    return _affine_permutation(table_name, column, seed, parent_count * cap, start, row_count) // cap
+
+
+def _take_keys(keys, index: np.ndarray) -> np.ndarray:
+    """
+    Looks up parent keys by position in a `range` or a key column.
+    """
+    if isinstance(keys, range):
+        return keys.start + index.astype(np.int64) * keys.step
+    if isinstance(keys, DictionaryColumn):
+        return keys[index]
+    return np.asarray(keys)[index]
+
+
+def _key_radix(column: str, properties: dict, reference: dict = None) -> int:
+    """
+    Number of distinct values a composite key column can take.
+    """
+    if reference is not None:
+        return len(reference["keys"])
+    if properties.get("values"):
+        return len(properties["values"])
+    kind = column_kind(properties.get("type"))
+    if kind == "int":
+        return INT_RANGE[1] - INT_RANGE[0] + 1
+    if kind == "float":
+        return int(round((FLOAT_RANGE[1] - FLOAT_RANGE[0]) * 100)) + 1
+    if kind == "bool":
+        return 2
+    return STRING_SUFFIX_RANGE[1] - STRING_SUFFIX_RANGE[0] + 1
+
+
+def _key_values(column: str, properties: dict, reference: dict, digits: np.ndarray):
+    """
+    Maps the digits of a composite key column to its values.
+    """
+    if reference is not None:
+        return _take_keys(reference["keys"], digits)
+    if properties.get("values"):
+        return DictionaryColumn.encode(properties["values"], digits.astype(np.intp))
+    kind = column_kind(properties.get("type"))
+    if kind == "int":
+        return INT_RANGE[0] + digits
+    if kind == "float":
+        return np.rint(FLOAT_RANGE[0] * 100 + digits) / 100
+    if kind == "bool":
+        return digits == 1
+    return DictionaryColumn(digits.astype(np.int16), _string_categories(column))
+
+
+def composite_key_radices(table_info: Dict[str, Any], references: Dict[str, dict] = None) -> List[Tuple[str, int]]:
+    """
+    Returns the (column, radix) digits that make a composite primary key
+    unique, in key order, or [] for other tables. Digits stop before the
+    key space would exceed MAX_KEY_SPACE; later key columns are generated
+    as usual.
+    """
+    keys = primary_key_columns(table_info)
     columns = table_info.get("columns", {})
-    data = []
-
-    for _ in range(row_count):
-        row = {}
-        for col, props in columns.items():
-            dtype = props.get("type", "string").lower()
-            if dtype == "int":
-                row[col] = random.randint(1, 1000)
-            elif dtype == "float":
-                row[col] = round(random.uniform(1, 1000), 2)
-            elif dtype == "bool":
-                row[col] = random.choice([True, False])
+    if len(keys) < 2 or not all(key in columns for key in keys):
+        return []
+    references = references or {}
+    radices, space = [], 1
+    for column in keys:
+        radix = _key_radix(column, columns[column], references.get(column))
+        if space * radix > MAX_KEY_SPACE:
+            break
+        radices.append((column, radix))
+        space *= radix
+    return radices
+
+
+def composite_key_columns(
+    table_name: str,
+    table_info: Dict[str, Any],
+    start: int,
+    row_count: int,
+    seed: int,
+    references: Dict[str, dict] = None
+) -> Dict[str, Any]:
+    """
+    Generates rows [start, start + row_count) of a composite primary key's
+    columns so that no two rows share a key tuple.
+
+    Row positions go through a seeded affine permutation of the key space,
+    and each position is split into one digit per key column (a mixed-radix
+    number): foreign key columns index their parent keys, columns with a
+    value list index the list, and other columns their usual value range.
+    `plan_generation` checks that the table's rows fit the key space. Other
+    tables get {}.
+    """
+    radices = composite_key_radices(table_info, references)
+    if not radices:
+        return {}
+    references = references or {}
+    space = math.prod(radix for _, radix in radices)
+    if not row_count:
+        position = np.zeros(0, dtype=np.int64)
+    else:
+        position = _affine_permutation(table_name, radices[0][0], seed, space, start, row_count)
+    columns = {}
+    for column, radix in radices:
+        position, digits = np.divmod(position, radix)
+        columns[column] = _key_values(column, table_info["columns"][column], references.get(column), digits)
+    return columns
+
+
+def generate_column(
+    table_name: str,
+    column: str,
+    properties: dict,
+    row_count: int,
+    seed: int,
+    start: int = 0,
+    reference: dict = None,
+    context: Dict[str, Any] = None,
+    u: np.ndarray = None
+):
+    """
+    Generates rows [start, start + row_count) of one column in a single batch,
+    as a NumPy array or, for strings, a `DictionaryColumn`.
+
+    `reference` is the column's foreign key spec from `plan_generation`; its
+    values are then drawn in bulk from the parent key space. A column with
+    custom rules (see `custom_rules.apply_rules`) is drawn by its rule, which
+    reads the columns it depends on from `context`. Uniforms `u` already
+    drawn from the column's stream (and correlated by the table's copula)
+    stand in for a fresh draw.
+    """
+    if properties.get("primary_key"):
+        return np.arange(start + 1, start + row_count + 1, dtype=np.int64)
+
+    if reference is not None:
+        parent_count = len(reference["keys"])
+        if reference.get("max_per_parent"):
+            index = _capped_parent_index(table_name, column, reference, parent_count, start, row_count, seed)
+        else:
+            u = column_stream(seed, table_name, column, start).random(row_count)
+            index = _parent_index(u, parent_count, reference)
+        return _take_keys(reference["keys"], index)
+
+    rule = properties.get("rule")
+    if rule is not None and rule.generates:
+        u = column_stream(seed, table_name, column, start).random(row_count)
+        return rule.generate(u, context or {}, lambda u: _values_from_uniforms(column, properties, u, seed))
+
+    if properties.get("unique"):
+        pool = column_pool(column, properties, seed)
+        if pool is not None:
+            return _unique_pool_values(table_name, column, pool, seed, start, row_count)
+
+    if u is None:
+        u = column_stream(seed, table_name, column, start).random(row_count)
+    return _values_from_uniforms(column, properties, u, seed)
+
+
+def foreign_key_columns(table_info: Dict[str, Any]) -> Dict[str, dict]:
+    """
+    Collects {column: foreign key spec} from the table's `foreign_keys` list
+    and from the `foreign_key` property of its columns.
+    """
+    columns = table_info.get("columns", {})
+    references = {}
+    for fk in table_info.get("foreign_keys", []):
+        if fk["column"] in columns:
+            references[fk["column"]] = {"table": fk["ref_table"], "column": fk["ref_column"]}
+    for column, properties in columns.items():
+        if properties.get("foreign_key"):
+            references[column] = dict(references.get(column, {}), **properties["foreign_key"])
+    return references
+
+
+def primary_key_columns(table_info: Dict[str, Any]) -> List[str]:
+    """
+    Returns the table's primary key columns: its `primary_key` (a column
+    name or, for a composite key, a list of them), or else the columns
+    flagged `primary_key`.
+    """
+    primary_key = table_info.get("primary_key")
+    if isinstance(primary_key, (list, tuple)):
+        return list(primary_key)
+    if primary_key:
+        return [primary_key]
+    return [column for column, properties in table_info.get("columns", {}).items() if properties.get("primary_key")]
+
+
+def _find_cycle(parents: Dict[str, set], pending: Dict[str, int]) -> List[str]:
+    """
+    Walks unresolved parent links until a table repeats and returns that loop.
+    """
+    table = next(name for name, count in pending.items() if count)
+    path, seen = [], {}
+    while table not in seen:
+        seen[table] = len(path)
+        path.append(table)
+        table = next(parent for parent in sorted(parents[table]) if pending[parent])
+    return path[seen[table]:] + [table]
+
+
+def order_tables(parsed_schema: Dict[str, Any]) -> List[str]:
+    """
+    Orders tables so every table comes after the tables its foreign keys reference.
+
+    Self-references are allowed. A reference to a missing table or any other
+    cycle raises a ValueError naming the tables involved.
+    """
+    parents = {}
+    children = {table_name: [] for table_name in parsed_schema}
+    for table_name, table_info in parsed_schema.items():
+        parents[table_name] = set()
+        for column, reference in foreign_key_columns(table_info).items():
+            ref_table = reference["table"]
+            if ref_table not in parsed_schema:
+                raise ValueError(f"Foreign key {table_name}.{column} references unknown table '{ref_table}'")
+            if ref_table != table_name and ref_table not in parents[table_name]:
+                parents[table_name].add(ref_table)
+                children[ref_table].append(table_name)
+
+    pending = {table_name: len(deps) for table_name, deps in parents.items()}
+    ready = deque(table_name for table_name in parsed_schema if not pending[table_name])
+    order = []
+    while ready:
+        table_name = ready.popleft()
+        order.append(table_name)
+        for child in children[table_name]:
+            pending[child] -= 1
+            if not pending[child]:
+                ready.append(child)
+
+    if len(order) < len(parsed_schema):
+        cycle = _find_cycle(parents, pending)
+        raise ValueError(f"Foreign key cycle detected: {' -> '.join(cycle)}")
+    return order
+
+
+def table_row_counts(parsed_schema: Dict[str, Any], row_count=None) -> Dict[str, int]:
+    """
+    Resolves the row count of every table from one shared count, a per-table
+    dict, or (for None and missing tables) the schema's own `row_count`.
+    """
+    counts = {}
+    for table_name, table_info in parsed_schema.items():
+        if isinstance(row_count, dict):
+            counts[table_name] = int(row_count.get(table_name, table_info.get("row_count", 10)))
+        elif row_count is None:
+            counts[table_name] = int(table_info.get("row_count", 10))
+        else:
+            counts[table_name] = int(row_count)
+    return counts
+
+
+def plan_generation(
+    parsed_schema: Dict[str, Any],
+    row_count=None,
+    seed: int = None
+) -> Dict[str, Any]:
+    """
+    Resolves the seed, table order, row counts and foreign key references of one run.
+
+    Every foreign key column gets its spec plus the parent key space: a
+    `range` when it references a generated primary key, otherwise one
+    compact array of the referenced column. Parent rows are never kept.
+    """
+    seed = resolve_seed(seed)
+    order = order_tables(parsed_schema)
+    row_counts = table_row_counts(parsed_schema, row_count)
+    references = {}
+
+    for table_name in order:
+        # Build or load every value pool here, once, rather than in each worker
+        for column, properties in parsed_schema[table_name].get("columns", {}).items():
+            column_pool(column, properties, seed)
+        table_references = {}
+        for column, reference in foreign_key_columns(parsed_schema[table_name]).items():
+            ref_table, ref_column = reference["table"], reference["column"]
+            ref_properties = parsed_schema[ref_table].get("columns", {}).get(ref_column)
+            if ref_properties is None:
+                raise ValueError(f"Foreign key {table_name}.{column} references unknown column '{ref_table}.{ref_column}'")
+
+            parent_count = row_counts[ref_table]
+            if ref_properties.get("primary_key"):
+                keys = range(1, parent_count + 1)
+            elif (
+                ref_properties.get("rule") is not None
+                or ref_column in (parsed_schema[ref_table].get("copula") or ())
+                or len(primary_key_columns(parsed_schema[ref_table])) > 1
+            ):
+                # Ruled columns may read other columns of their table, copula and key columns are drawn together
+                keys = generate_shard(
+                    ref_table, parsed_schema[ref_table], 0, parent_count, seed, references.get(ref_table)
+                ).column(ref_column)
             else:
-                row[col] = f"{col}_{random.randint(1000, 9999)}"
-        data.append(row)
-    
-    return {table_name: data}
+                keys = generate_column(
+                    ref_table, ref_column, ref_properties, parent_count, seed,
+                    reference=references.get(ref_table, {}).get(ref_column)
+                )
+
+            if row_counts[table_name] and not parent_count:
+                raise ValueError(f"Cannot fill {table_name}.{column}: table '{ref_table}' has no rows")
+            cap = reference.get("max_per_parent")
+            if cap and row_counts[table_name] > parent_count * int(cap):
+                raise ValueError(
+                    f"{table_name} needs {row_counts[table_name]} rows but {ref_table} only allows "
+                    f"{parent_count} x {cap} children"
+                )
+            table_references[column] = dict(reference, keys=keys)
+        references[table_name] = table_references
+
+        radices = composite_key_radices(parsed_schema[table_name], table_references)
+        space = math.prod(radix for _, radix in radices)
+        if radices and row_counts[table_name] > space:
+            key = ", ".join(primary_key_columns(parsed_schema[table_name]))
+            raise ValueError(
+                f"{table_name} needs {row_counts[table_name]} rows but its primary key ({key}) "
+                f"only has {space} distinct values"
+            )
+
+    return {"seed": seed, "order": order, "row_counts": row_counts, "references": references}
+
+
+def shard_ranges(row_count: int, shard_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits `row_count` rows into contiguous (start, size) shards.
+    """
+    return [(start, min(shard_size, row_count - start)) for start in range(0, row_count, shard_size)]
+
+
+def generate_shard(
+    table_name: str,
+    table_info: Dict[str, Any],
+    start: int,
+    size: int,
+    seed: int,
+    references: Dict[str, dict] = None
+) -> GeneratedTable:
+    """
+    Generates rows [start, start + size) of one table.
+
+    Shards derive their state from (seed, table, column) and jump ahead to
+    `start`, so the result does not depend on how rows are split into shards
+    or on how many workers run them, and primary keys stay contiguous.
+    Columns are generated in the table's `column_order`, if it has one, so
+    ruled columns see the columns they depend on. The uniforms of a table's
+    profiled columns are correlated by its copula, if it has one. The
+    columns of a composite primary key are drawn together, so key tuples
+    never repeat (see `composite_key_columns`).
+    """
+    references = references or {}
+    columns = table_info.get("columns", {})
+    copula = table_info.get("copula")
+    uniforms = {}
+    if copula is not None:
+        uniforms = copula.correlate(
+            {column: column_stream(seed, table_name, column, start).random(size) for column in copula.columns}
+        )
+    generated = composite_key_columns(table_name, table_info, start, size, seed, references)
+    for column in table_info.get("column_order") or columns:
+        if column in generated:
+            continue
+        generated[column] = generate_column(
+            table_name, column, columns[column], size, seed, start, references.get(column), generated,
+            uniforms.get(column)
+        )
+    return GeneratedTable({column: generated[column] for column in columns}, size)
+
+
+def generate_columns(
+    parsed_schema: Dict[str, Any],
+    row_count=None,
+    seed: int = None
+) -> Dict[str, GeneratedTable]:
+    """
+    Generates every table, parents first, as typed column arrays.
+    """
+    plan = plan_generation(parsed_schema, row_count, seed)
+    return {
+        table_name: generate_shard(
+            table_name, parsed_schema[table_name], 0, plan["row_counts"][table_name],
+            plan["seed"], plan["references"][table_name]
+        )
+        for table_name in plan["order"]
+    }
+
+
+def generate_column_chunks(
+    parsed_schema: Dict[str, Any],
+    row_count=None,
+    chunk_size: int = 100_000,
+    seed: int = None,
+    plan: Dict[str, Any] = None
+) -> Iterator[Tuple[str, int, GeneratedTable]]:
+    """
+    Yields (table_name, start_row, columns) chunks of at most `chunk_size` rows, parents first.
+
+    Chunks are cut from the same column streams as `generate_columns`, so the
+    concatenated chunks equal the single-batch output for the same seed.
+    A `plan` from `plan_generation` is used as is instead of planning again.
+    """
+    if plan is None:
+        plan = plan_generation(parsed_schema, row_count, seed)
+    for table_name in plan["order"]:
+        for start, size in shard_ranges(plan["row_counts"][table_name], chunk_size):
+            yield table_name, start, generate_shard(
+                table_name, parsed_schema[table_name], start, size,
+                plan["seed"], plan["references"][table_name]
+            )
+
+
+def generate_columns_parallel(
+    parsed_schema: Dict[str, Any],
+    row_count=None,
+    seed: int = None,
+    workers: int = None,
+    shard_size: int = 250_000
+) -> Dict[str, GeneratedTable]:
+    """
+    Generates every table like `generate_columns`, running shards in a process pool.
+    """
+    plan = plan_generation(parsed_schema, row_count, seed)
+    tasks = [
+        (table_name, parsed_schema[table_name], start, size, plan["seed"], plan["references"][table_name])
+        for table_name in plan["order"]
+        for start, size in shard_ranges(plan["row_counts"][table_name], shard_size)
+    ]
+
+    shards = {table_name: [] for table_name in plan["order"]}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(generate_shard, *task) for task in tasks]
+        for task, future in zip(tasks, futures):
+            shards[task[0]].append(future.result())
+
+    generated = {}
+    for table_name, table_shards in shards.items():
+        if not table_shards:
+            generated[table_name] = generate_shard(
+                table_name, parsed_schema[table_name], 0, 0, plan["seed"], plan["references"][table_name]
+            )
+            continue
+        generated[table_name] = GeneratedTable.concat(table_shards)
+        table_shards.clear()
+    return generated
+
+
+def iter_rows(columns: Dict[str, np.ndarray]) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yields one dict of plain Python values per row.
+    """
+    if isinstance(columns, GeneratedTable):
+        yield from columns.iter_rows()
+        return
+    names = list(columns)
+    values = [np.asarray(array).tolist() for array in columns.values()]
+    for row in zip(*values):
+        yield dict(zip(names, row))
+
+
+def columns_to_rows(columns) -> List[Dict[str, Any]]:
+    """
+    Materializes a column dict into the list-of-dicts row format.
+    """
+    return list(iter_rows(columns))
+
+
+def generate_data(parsed_schema, row_count=None, seed=None):
+    """
+    Generates every table, parents first, in the list-of-dicts format.
+    """
+    columns_by_table = generate_columns(parsed_schema, row_count, seed)
+    return {table_name: columns_to_rows(columns) for table_name, columns in columns_by_table.items()}
+
+
+def generate_data_reference(parsed_schema, row_count=None, seed=None):
+    """
+    Row-at-a-time reference implementation of `generate_data`.
+
+    It consumes the same per-column streams one value at a time and must
+    produce identical output for the same seed.
+    """
+    plan = plan_generation(parsed_schema, row_count, seed)
+    seed = plan["seed"]
+    generated = {}
+    for table_name in plan["order"]:
+        columns = parsed_schema[table_name].get("columns", {})
+        order = parsed_schema[table_name].get("column_order") or list(columns)
+        references = plan["references"][table_name]
+        copula = parsed_schema[table_name].get("copula")
+        streams = {col: column_stream(seed, table_name, col) for col in columns}
+        data = []
+        for index in range(plan["row_counts"][table_name]):
+            row = {
+                col: np.asarray(values).tolist()[0]
+                for col, values in composite_key_columns(
+                    table_name, parsed_schema[table_name], index, 1, seed, references
+                ).items()
+            }
+            uniforms = {}
+            if copula is not None:
+                uniforms = copula.correlate({col: np.array([streams[col].random()]) for col in copula.columns})
+            for col in order:
+                props, reference = columns[col], references.get(col)
+                rule = props.get("rule")
+                if col in row:
+                    continue
+                if props.get("primary_key"):
+                    row[col] = index + 1
+                elif reference is None and rule is not None and rule.generates:
+                    context = {name: np.asarray([value]) for name, value in row.items()}
+                    value = generate_column(table_name, col, props, 1, seed, index, context=context)
+                    row[col] = np.asarray(value).tolist()[0]
+                elif (reference is not None and reference.get("max_per_parent")) or (
+                    reference is None and props.get("unique") and column_pool(col, props, seed) is not None
+                ):
+                    row[col] = np.asarray(generate_column(table_name, col, props, 1, seed, index, reference)).tolist()[0]
+                elif reference is not None:
+                    parent = _parent_index(np.array([streams[col].random()]), len(reference["keys"]), reference)
+                    row[col] = np.asarray(_take_keys(reference["keys"], parent)).tolist()[0]
+                elif col in uniforms:
+                    row[col] = _value_from_uniform(col, props, uniforms[col][0], seed)
+                else:
+                    row[col] = _value_from_uniform(col, props, streams[col].random(), seed)
+            data.append({col: row[col] for col in columns})
+        generated[table_name] = data
+    return generated
@@ -0,0 +1,519 @@
+import functools
+import importlib
+import io
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from .data_generation_agent import column_kind, foreign_key_columns
+from .generated_table import DictionaryColumn, table_length
+from .instrumentation import PipelineMetrics
+from .sql_export import copy_text_values, table_columns
+
+DEFAULT_DATABASE_FILE = 'generated.db'
+DEFAULT_DB_BATCH_SIZE = 10_000
+DEFAULT_COMMIT_ROWS = 100_000
+IF_EXISTS = ('append', 'replace')
+BULK_MODES = ('auto', 'copy', 'executemany')
+SQL_TYPES = {"int": "BIGINT", "float": "DOUBLE PRECISION", "bool": "BOOLEAN", "string": "TEXT"}
+SQLITE_TYPES = {"int": "INTEGER", "float": "REAL", "bool": "INTEGER", "string": "TEXT"}
+# DB-API paramstyle -> placeholder for the n-th parameter
+PLACEHOLDERS = {
+    'qmark': lambda n: '?',
+    'format': lambda n: '%s',
+    'pyformat': lambda n: '%s',
+    'numeric': lambda n: f':{n + 1}',
+    'named': lambda n: f':{n + 1}',
+}
+MYSQL_DRIVERS = ('pymysql', 'MySQLdb', 'mysql.connector')
+# Drivers a request may choose (see `request_database_options`)
+REQUEST_DRIVERS = ('sqlite3', 'psycopg2')
+# Connection settings only the server configuration may set
+SERVER_ONLY_OPTIONS = ('dsn', 'connect_args')
+
+
+def parse_database_options(options: dict) -> Dict[str, Any]:
+    """
+    Checks the DATABASE export options and fills in their defaults.
+
+    'database' is a SQLite file (the default driver); otherwise 'driver'
+    names any DB-API module, connected with 'dsn' or 'connect_args'.
+    'batch_size' rows go into one executemany (or COPY) call, a commit
+    follows every 'commit_rows' rows and 'writers' tables load at once.
+    'if_exists' is 'append' or 'replace'; 'create_tables' creates missing
+    tables from the schema. 'bulk' picks PostgreSQL COPY ('copy'),
+    'executemany' or whichever the driver supports best ('auto').
+    These options are trusted; options from a request must first pass
+    `request_database_options`.
+    """
+    options = dict(options or {})
+    parsed = {
+        'driver': options.get('driver') or 'sqlite3',
+        'database': options.get('database'),
+        'dsn': options.get('dsn'),
+        'connect_args': options.get('connect_args') or {},
+        'if_exists': options.get('if_exists', 'append'),
+        'create_tables': bool(options.get('create_tables', True)),
+        'bulk': options.get('bulk', 'auto'),
+    }
+    for name, default in (('batch_size', DEFAULT_DB_BATCH_SIZE), ('commit_rows', DEFAULT_COMMIT_ROWS), ('writers', None)):
+        value = options.get(name, default)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 1):
+            raise ValueError(f"Database option '{name}' must be a positive integer, got {value!r}")
+        parsed[name] = value
+    if parsed['if_exists'] not in IF_EXISTS:
+        raise ValueError(f"Unsupported if_exists: '{parsed['if_exists']}'. Supported values are: {', '.join(IF_EXISTS)}")
+    if parsed['bulk'] not in BULK_MODES:
+        raise ValueError(f"Unsupported bulk mode: '{parsed['bulk']}'. Supported modes are: {', '.join(BULK_MODES)}")
+    if parsed['bulk'] == 'copy' and parsed['driver'] == 'sqlite3':
+        raise ValueError("bulk='copy' needs a PostgreSQL driver such as psycopg2; SQLite loads with executemany")
+    if not isinstance(parsed['connect_args'], dict):
+        raise ValueError("Database option 'connect_args' must be a dict of keyword arguments")
+    if parsed['driver'] != 'sqlite3' and parsed['database'] and not (parsed['dsn'] or parsed['connect_args']):
+        raise ValueError("'database' names a SQLite file; connect other drivers with 'dsn' or 'connect_args'")
+    return parsed
+
+
+def request_database_options(options: dict, output_dir: str, server_options: dict = None) -> Dict[str, Any]:
+    """
+    Restricts DATABASE export options taken from a request.
+
+    The driver must be one of REQUEST_DRIVERS and the request may not set
+    'dsn' or 'connect_args'. A SQLite 'database' is a file resolved inside
+    `output_dir`; other drivers connect with the 'dsn' and 'connect_args'
+    of `server_options`, the server's own configuration, and fail when it
+    has none. The remaining options are returned unchanged.
+    """
+    options = dict(options or {})
+    driver = options.get('driver') or 'sqlite3'
+    if driver not in REQUEST_DRIVERS:
+        raise ValueError(f"Unsupported database driver: '{driver}'. Supported drivers are: {', '.join(REQUEST_DRIVERS)}")
+    for name in SERVER_ONLY_OPTIONS:
+        if name in options:
+            raise ValueError(f"Database option '{name}' can only be set in the server configuration")
+
+    if driver == 'sqlite3':
+        if options.get('database'):
+            options['database'] = _path_inside(output_dir, options['database'])
+        return options
+
+    if options.get('database'):
+        raise ValueError("'database' names a SQLite file; other databases are set in the server configuration")
+    server_options = server_options or {}
+    if not (server_options.get('dsn') or server_options.get('connect_args')):
+        raise ValueError(f"No database is configured on the server for driver '{driver}'")
+    options.update({name: server_options.get(name) for name in SERVER_ONLY_OPTIONS})
+    return options
+
+
+def _path_inside(directory: str, path) -> str:
+    """
+    Returns `path` relative to `directory` joined onto it, or raises
+    ValueError if it resolves (following symlinks) outside the directory.
+    """
+    if not isinstance(path, str):
+        raise ValueError(f"Database option 'database' must be a file name, got {path!r}")
+    root = os.path.realpath(directory)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if resolved == root or os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"SQLite database '{path}' must be a file inside the output directory")
+    return os.path.join(directory, os.path.relpath(resolved, root))
+
+
+class ConnectionPool:
+    """
+    Hands out at most `size` DB-API connections, opened on first use and
+    reused after `release`. Safe to share between threads.
+    """
+
+    def __init__(self, connect: Callable[[], Any], size: int):
+        self._connect = connect
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            connection = self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def release(self, connection) -> None:
+        self._idle.put(connection)
+        self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+
+
+def db_values(values) -> list:
+    """
+    Converts a column to Python values a DB-API driver accepts, with None
+    for missing values (including NaN).
+    """
+    if isinstance(values, DictionaryColumn):
+        return values.to_numpy().tolist()
+    array = np.asarray(values)
+    if array.dtype.kind == 'f' and np.isnan(array).any():
+        array = np.where(np.isnan(array), None, array.astype(object))
+    elif array.dtype.kind == 'O':
+        return [None if isinstance(value, float) and value != value else value for value in array.tolist()]
+    return array.tolist()
+
+
+def _column_info(table_data) -> Dict[str, Any]:
+    """
+    Schema-style table info derived from the column types of generated data.
+    """
+    columns = {}
+    for name, values in table_columns(table_data).items():
+        kind = "O" if isinstance(values, DictionaryColumn) else np.asarray(values).dtype.kind
+        columns[name] = {"type": {"i": "int", "u": "int", "f": "float", "b": "bool"}.get(kind, "string")}
+    return {"columns": columns, "foreign_keys": []}
+
+
+def _with_text_columns(table_info: Dict[str, Any], table_data) -> Dict[str, Any]:
+    """
+    Types the columns that hold text although the schema declares another
+    type, such as numbers generalized into labels by privacy masking, as
+    strings.
+    """
+    columns = dict(table_info.get("columns", {}))
+    for name, values in table_columns(table_data).items():
+        if name not in columns or column_kind(columns[name].get("type")) == "string":
+            continue
+        categories = values.categories if isinstance(values, DictionaryColumn) else np.asarray(values)
+        if categories.dtype.kind in "OSU" and any(isinstance(value, str) for value in categories.tolist()):
+            columns[name] = dict(columns[name], type="string")
+    return dict(table_info, columns=columns)
+
+
+class DatabaseLoader:
+    """
+    Loads generated tables into one DB-API database (see
+    `parse_database_options`) over a pool of connections, one per table
+    writer. Use as a context manager, or `close()` it.
+    """
+
+    def __init__(self, options: dict = None, output_dir: str = 'data/outputs'):
+        self.options = parse_database_options(options)
+        self.module = importlib.import_module(self.options['driver'])
+        self.sqlite = self.options['driver'] == 'sqlite3'
+        if self.sqlite:
+            path = self.options['database'] or os.path.join(output_dir, DEFAULT_DATABASE_FILE)
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.target = f"sqlite:///{path}"
+            connect = functools.partial(_connect_sqlite, path)
+        else:
+            dsn, connect_args = self.options['dsn'], self.options['connect_args']
+            self.target = f"{self.options['driver']}:{connect_args.get('database') or connect_args.get('dbname') or 'dsn'}"
+            connect = (
+                functools.partial(self.module.connect, dsn, **connect_args) if dsn
+                else functools.partial(self.module.connect, **connect_args)
+            )
+        self.placeholder = PLACEHOLDERS.get(getattr(self.module, 'paramstyle', 'qmark'), PLACEHOLDERS['qmark'])
+        self.quote_character = '`' if self.options['driver'] in MYSQL_DRIVERS else '"'
+        self.writers = self.options['writers']
+        self.pool = ConnectionPool(connect, self.writers or 32)
+
+    def quote(self, name: str) -> str:
+        q = self.quote_character
+        return q + str(name).replace(q, q + q) + q
+
+    def create_table_sql(self, table_name: str, table_info: Dict[str, Any], schema: Dict[str, Any]) -> str:
+        """
+        CREATE TABLE IF NOT EXISTS with column types, the primary key and
+        foreign keys to other tables' primary keys. A list-valued table
+        `primary_key` becomes a table-level PRIMARY KEY (a, b) constraint.
+        """
+        types = SQLITE_TYPES if self.sqlite else SQL_TYPES
+        primary_key = table_info.get("primary_key")
+        if isinstance(primary_key, (list, tuple)):
+            composite_key = list(primary_key) if len(primary_key) > 1 else []
+            primary_key = primary_key[0] if len(primary_key) == 1 else None
+        else:
+            composite_key = []
+        definitions = []
+        for column, properties in table_info.get("columns", {}).items():
+            definition = f"{self.quote(column)} {types[column_kind(properties.get('type'))]}"
+            if not composite_key and (properties.get("primary_key") or primary_key == column):
+                definition += " PRIMARY KEY"
+            definitions.append(definition)
+        if composite_key:
+            definitions.append(f"PRIMARY KEY ({', '.join(self.quote(column) for column in composite_key)})")
+        for column, reference in foreign_key_columns(table_info).items():
+            ref_info = schema.get(reference["table"], {})
+            ref_properties = ref_info.get("columns", {}).get(reference["column"], {})
+            if ref_properties.get("primary_key") or ref_info.get("primary_key") == reference["column"]:
+                definitions.append(
+                    f"FOREIGN KEY ({self.quote(column)}) REFERENCES "
+                    f"{self.quote(reference['table'])} ({self.quote(reference['column'])})"
+                )
+        return f"CREATE TABLE IF NOT EXISTS {self.quote(table_name)} ({', '.join(definitions)})"
+
+    def prepare(self, schema: Dict[str, Any], order: List[str]) -> None:
+        """
+        Drops (with if_exists='replace', children first) and creates the
+        tables of `schema`, parents first.
+        """
+        connection = self.pool.acquire()
+        try:
+            cursor = connection.cursor()
+            if self.options['if_exists'] == 'replace':
+                for table_name in reversed(order):
+                    cursor.execute(f"DROP TABLE IF EXISTS {self.quote(table_name)}")
+            if self.options['create_tables']:
+                for table_name in order:
+                    cursor.execute(self.create_table_sql(table_name, schema[table_name], schema))
+            connection.commit()
+        finally:
+            self.pool.release(connection)
+
+    def insert_sql(self, table_name: str, columns: List[str]) -> str:
+        placeholders = ', '.join(self.placeholder(n) for n in range(len(columns)))
+        names = ', '.join(self.quote(column) for column in columns)
+        return f"INSERT INTO {self.quote(table_name)} ({names}) VALUES ({placeholders})"
+
+    def writer(self, table_name: str) -> "DatabaseTableWriter":
+        return DatabaseTableWriter(self, table_name)
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _connect_sqlite(path: str):
+    connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+    # Writers of different tables wait for each other's commits instead of failing
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class DatabaseTableWriter:
+    """
+    Appends chunks of one table to its database table on a pooled
+    connection, in `batch_size` executemany (or COPY) calls with a commit
+    every `commit_rows` rows. Mirrors `TableWriter`: `close()` commits and
+    returns the manifest entry, with the load's rows per second; `abort()`
+    rolls back what was not committed yet.
+    """
+
+    def __init__(self, loader: DatabaseLoader, table_name: str):
+        self.loader = loader
+        self.table_name = table_name
+        self.rows_written = 0
+        self.manifest = None
+        self._connection = loader.pool.acquire()
+        self._cursor = self._connection.cursor()
+        bulk = loader.options['bulk']
+        self._copy = bulk != 'executemany' and hasattr(self._cursor, 'copy_expert')
+        if bulk == 'copy' and not self._copy:
+            loader.pool.release(self._connection)
+            raise ValueError(f"Driver '{loader.options['driver']}' has no COPY support (copy_expert)")
+        self._statement = None
+        self._rows_in_transaction = 0
+        self._started = time.perf_counter()
+        self._closed = False
+
+    def write_chunk(self, table_data) -> int:
+        """
+        Inserts a chunk (rows or column arrays) and returns its row count.
+        """
+        columns = table_columns(table_data)
+        if not columns:
+            return 0
+        names = list(columns)
+        count = table_length(columns)
+        batch_size = self.loader.options['batch_size']
+
+        if self._copy:
+            rendered = [copy_text_values(values) for values in columns.values()]
+            lines = ["\t".join(row) for row in zip(*rendered)]
+            statement = f"COPY {self.loader.quote(self.table_name)} ({', '.join(self.loader.quote(n) for n in names)}) FROM STDIN"
+            for start in range(0, count, batch_size):
+                batch = lines[start:start + batch_size]
+                self._cursor.copy_expert(statement, io.StringIO("\n".join(batch) + "\n"))
+                self._inserted(len(batch))
+            return count
+
+        if self._statement is None:
+            self._statement = self.loader.insert_sql(self.table_name, names)
+        values = [db_values(values) for values in columns.values()]
+        for start in range(0, count, batch_size):
+            rows = list(zip(*(column[start:start + batch_size] for column in values)))
+            self._cursor.executemany(self._statement, rows)
+            self._inserted(len(rows))
+        return count
+
+    def _inserted(self, rows: int) -> None:
+        self.rows_written += rows
+        self._rows_in_transaction += rows
+        if self._rows_in_transaction >= self.loader.options['commit_rows']:
+            self._connection.commit()
+            self._rows_in_transaction = 0
+
+    def close(self) -> dict:
+        """
+        Commits the rest of the table and returns its manifest entry.
+        """
+        if self._closed:
+            return self.manifest
+        self._closed = True
+        try:
+            self._connection.commit()
+        finally:
+            self.loader.pool.release(self._connection)
+        seconds = time.perf_counter() - self._started
+        self.manifest = {
+            "table": self.table_name,
+            "part": None,
+            "path": None,
+            "target": self.loader.target,
+            "format": "DATABASE",
+            "rows": self.rows_written,
+            "bytes": 0,
+            "seconds": round(seconds, 6),
+            "rows_per_second": round(self.rows_written / seconds) if seconds else None
+        }
+        return self.manifest
+
+    def abort(self) -> None:
+        """
+        Rolls back the rows written since the last commit.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._connection.rollback()
+        finally:
+            self.loader.pool.release(self._connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def table_parents(schema: Dict[str, Any]) -> Dict[str, set]:
+    """
+    The tables each table references through foreign keys, itself excluded.
+    """
+    return {
+        table_name: {reference["table"] for reference in foreign_key_columns(info).values()} - {table_name}
+        for table_name, info in schema.items()
+    }
+
+
+def load_in_dependency_order(
+    order: List[str],
+    parents: Dict[str, set],
+    load: Callable[[str, threading.Event], Any],
+    writers: int = None
+) -> Dict[str, Any]:
+    """
+    Runs `load(table_name, stop)` for every table on `writers` threads
+    (default: one per table), each table only once its parents have loaded.
+    `order` must list parents first. When a load fails, `stop` is set so
+    the others can give up at their next chunk, and the first error is
+    raised once every thread has finished.
+    """
+    stop = threading.Event()
+    futures = {}
+
+    def run(table_name):
+        try:
+            for parent in parents.get(table_name, ()):
+                futures[parent].result()
+            if stop.is_set():
+                raise CancelledError()
+            return load(table_name, stop)
+        except BaseException:
+            stop.set()
+            raise
+
+    with ThreadPoolExecutor(max_workers=writers or max(1, len(order))) as executor:
+        for table_name in order:
+            futures[table_name] = executor.submit(run, table_name)
+    errors = [future.exception() for future in futures.values() if future.exception() is not None]
+    for error in errors:
+        if not isinstance(error, CancelledError):
+            raise error
+    if errors:
+        raise errors[0]
+    return {table_name: future.result() for table_name, future in futures.items()}
+
+
+def load_tables(
+    data: Dict[str, Any],
+    options: dict = None,
+    output_dir: str = 'data/outputs',
+    schema: Dict[str, Any] = None,
+    metrics: PipelineMetrics = None
+) -> Dict[str, dict]:
+    """
+    Loads already generated tables into the database and returns each
+    table's manifest entry.
+
+    With `schema`, tables load in parallel, each after the tables its
+    foreign keys reference; without it, one after another in the order of
+    `data`, with tables created from the data's column types.
+    """
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    order = list(data)
+    if schema is not None:
+        parents = {table_name: parents & set(data) for table_name, parents in table_parents(schema).items()}
+        tables = {table_name: _with_text_columns(schema[table_name], data[table_name]) for table_name in order}
+    else:
+        parents = {table_name: set(order[i - 1:i]) for i, table_name in enumerate(order)}
+        tables = {table_name: _column_info(table_data) for table_name, table_data in data.items()}
+
+    def load(table_name, stop):
+        with loader.writer(table_name) as writer:
+            step = loader.options['commit_rows']
+            rows = table_length(data[table_name])
+            for start in range(0, rows, step):
+                if stop.is_set():
+                    raise CancelledError()
+                with metrics.stage('export', table_name, rows=min(step, rows - start)):
+                    writer.write_chunk(_chunk(data[table_name], start, start + step))
+        return writer.manifest
+
+    with DatabaseLoader(options, output_dir) as loader:
+        loader.prepare(tables, order)
+        return load_in_dependency_order(order, parents, load, loader.writers)
+
+
+def _chunk(table_data, start: int, stop: int):
+    columns = table_columns(table_data)
+    return {name: values[start:stop] for name, values in columns.items()}
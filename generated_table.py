@@ -0,0 +1,228 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+ROW_BATCH_SIZE = 10_000
+
+
+def import_pyarrow(feature: str):
+    """
+    Imports pyarrow on first use: it is only needed for Arrow conversion and
+    the columnar formats, and would otherwise slow down every startup.
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(f"{feature} requires pyarrow to be installed")
+    return pyarrow
+
+
+def code_dtype(category_count: int) -> np.dtype:
+    """
+    Returns the smallest signed integer type pandas uses for this many categories.
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if category_count < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class DictionaryColumn:
+    """
+    A column stored as small integer codes into an array of distinct values.
+
+    Code -1 stands for a missing value (None). Slicing returns another
+    DictionaryColumn over the same categories; `np.asarray` decodes it.
+    """
+
+    __slots__ = ('codes', 'categories')
+
+    def __init__(self, codes: np.ndarray, categories: np.ndarray):
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def encode(cls, values: Sequence[Any], index: np.ndarray) -> "DictionaryColumn":
+        """
+        Builds the column whose row i is `values[index[i]]`. Repeated entries
+        of `values` share one category.
+        """
+        lookup, categories = pd.factorize(np.asarray(list(values), dtype=object), use_na_sentinel=True)
+        codes = lookup.astype(code_dtype(len(categories)))[index]
+        return cls(codes, np.asarray(categories, dtype=object))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, key) -> "DictionaryColumn":
+        return DictionaryColumn(self.codes[key], self.categories)
+
+    def to_numpy(self) -> np.ndarray:
+        # Appending None makes code -1 decode to a missing value
+        return np.append(self.categories, None)[self.codes]
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        array = self.to_numpy()
+        return array if dtype is None else array.astype(dtype)
+
+    def to_pandas(self) -> pd.Categorical:
+        return pd.Categorical.from_codes(self.codes, categories=self.categories, validate=False)
+
+    def to_arrow(self, dictionary: bool = False):
+        pa = import_pyarrow("DictionaryColumn.to_arrow")
+        array = pa.DictionaryArray.from_arrays(pa.array(self.codes, mask=self.codes < 0), pa.array(self.categories))
+        return array if dictionary else array.dictionary_decode()
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes
+
+    def __repr__(self) -> str:
+        return f"DictionaryColumn({len(self.codes)} rows, {len(self.categories)} categories)"
+
+
+def _same_categories(columns: List[DictionaryColumn]) -> bool:
+    first = columns[0].categories
+    return all(
+        column.categories is first or np.array_equal(column.categories, first)
+        for column in columns[1:]
+    )
+
+
+def _concat_columns(parts: list):
+    if all(isinstance(part, DictionaryColumn) for part in parts) and _same_categories(parts):
+        return DictionaryColumn(np.concatenate([part.codes for part in parts]), parts[0].categories)
+    return np.concatenate([np.asarray(part) for part in parts])
+
+
+class GeneratedTable(Mapping):
+    """
+    One generated table as typed column arrays.
+
+    Numbers and booleans are NumPy arrays; low-cardinality strings are
+    `DictionaryColumn`s. Reading a column by name (`table[name]`) returns a
+    decoded NumPy array, so the table can stand in for a dict of column
+    arrays. `to_pandas` and `to_arrow` hand the columns over without
+    copying the codes, and `iter_rows` yields row dicts lazily for callers
+    that still want them.
+    """
+
+    def __init__(self, columns: Dict[str, Any], num_rows: int = None):
+        self.columns = columns
+        if num_rows is None:
+            num_rows = len(next(iter(columns.values()))) if columns else 0
+        self.num_rows = num_rows
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return np.asarray(self.columns[name])
+
+    def __contains__(self, name) -> bool:
+        return name in self.columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def column(self, name: str):
+        """
+        Returns a column as stored: a NumPy array or a `DictionaryColumn`.
+        """
+        return self.columns[name]
+
+    def slice(self, start: int, stop: int) -> "GeneratedTable":
+        stop = min(stop, self.num_rows)
+        return GeneratedTable(
+            {name: values[start:stop] for name, values in self.columns.items()}, max(0, stop - start)
+        )
+
+    def iter_rows(self, batch_size: int = ROW_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yields one dict of plain Python values per row, decoding
+        `batch_size` rows at a time.
+        """
+        names = list(self.columns)
+        for start in range(0, self.num_rows, batch_size):
+            batch = self.slice(start, start + batch_size)
+            values = [np.asarray(batch.columns[name]).tolist() for name in names]
+            for row in zip(*values):
+                yield dict(zip(names, row))
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        return list(self.iter_rows())
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Returns a DataFrame over the same buffers; dictionary columns become
+        pandas Categoricals.
+        """
+        return pd.DataFrame(
+            {
+                name: values.to_pandas() if isinstance(values, DictionaryColumn) else values
+                for name, values in self.columns.items()
+            },
+            copy=False
+        )
+
+    def to_arrow(self, dictionary: bool = False):
+        """
+        Returns an Arrow table; numeric columns are zero-copy. Dictionary
+        columns are decoded to plain strings unless `dictionary` is set.
+        """
+        pa = import_pyarrow("GeneratedTable.to_arrow")
+        return pa.table({
+            name: values.to_arrow(dictionary) if isinstance(values, DictionaryColumn) else pa.array(values)
+            for name, values in self.columns.items()
+        })
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes for values in self.columns.values())
+
+    @classmethod
+    def concat(cls, tables: List["GeneratedTable"]) -> "GeneratedTable":
+        """
+        Appends tables with the same columns; dictionary columns stay
+        encoded when their categories match.
+        """
+        return cls(
+            {name: _concat_columns([table.columns[name] for table in tables]) for name in tables[0].columns},
+            sum(table.num_rows for table in tables)
+        )
+
+    def __repr__(self) -> str:
+        return f"GeneratedTable({self.num_rows} rows, columns={list(self.columns)})"
+
+
+def render_dictionary(column: DictionaryColumn, render, missing: str) -> List[str]:
+    """
+    Renders a dictionary column by rendering each category once with
+    `render` (a whole-column renderer) and expanding the codes; missing
+    values become `missing`.
+    """
+    rendered = np.array(render(column.categories) + [missing], dtype=object)
+    return rendered[column.codes].tolist()
+
+
+def table_length(table_data) -> int:
+    """
+    Returns the row count of a table given as a GeneratedTable, a dict of
+    column arrays or a list of row dicts.
+    """
+    if isinstance(table_data, GeneratedTable):
+        return table_data.num_rows
+    if isinstance(table_data, dict):
+        return len(next(iter(table_data.values()), []))
+    return len(table_data)
+
+
+def to_dataframe(table_data) -> pd.DataFrame:
+    """
+    Returns a table as a DataFrame, without copying a GeneratedTable's columns.
+    """
+    if isinstance(table_data, GeneratedTable):
+        return table_data.to_pandas()
+    return pd.DataFrame(table_data)
@@ -0,0 +1,244 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+STAGES = ('parse', 'generate', 'validate', 'mask', 'export')
+PROFILE_TOP_N = 25
+
+
+def clock() -> Tuple[float, float]:
+    """
+    Returns (wall, CPU) time stamps; CPU time is that of the calling thread.
+    """
+    return time.perf_counter(), time.thread_time()
+
+
+def since(start: Tuple[float, float]) -> Tuple[float, float]:
+    """
+    Returns the (wall, CPU) seconds elapsed since a `clock()` stamp.
+    """
+    wall, cpu = clock()
+    return wall - start[0], cpu - start[1]
+
+
+def peak_rss_bytes() -> int:
+    """
+    Returns the peak resident set size of this process so far, or None.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _empty_counters() -> Dict[str, float]:
+    return {"wall_seconds": 0.0, "cpu_seconds": 0.0, "rows": 0, "bytes": 0}
+
+
+def _finish(counters: Dict[str, float]) -> Dict[str, Any]:
+    result = {key: round(value, 6) if isinstance(value, float) else value for key, value in counters.items()}
+    wall = counters["wall_seconds"]
+    result["rows_per_second"] = round(counters["rows"] / wall, 1) if wall > 0 else None
+    return result
+
+
+class PipelineMetrics:
+    """
+    Collects wall time, CPU time, rows and bytes per stage and per table
+    for one request. Safe to record into from several threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._started = clock()
+
+    def record(
+        self,
+        stage: str,
+        table: str = None,
+        wall: float = 0.0,
+        cpu: float = 0.0,
+        rows: int = 0,
+        bytes: int = 0
+    ) -> None:
+        with self._lock:
+            tables = self._stages.setdefault(stage, {})
+            counters = tables.setdefault(table, _empty_counters())
+            counters["wall_seconds"] += wall
+            counters["cpu_seconds"] += cpu
+            counters["rows"] += rows
+            counters["bytes"] += bytes
+
+    @contextmanager
+    def stage(self, stage: str, table: str = None, rows: int = 0, bytes: int = 0) -> Iterator[None]:
+        """
+        Times the body and records it under `stage` and `table`.
+        """
+        start = clock()
+        try:
+            yield
+        finally:
+            wall, cpu = since(start)
+            self.record(stage, table, wall, cpu, rows, bytes)
+
+    def merge(self, timings: Dict[str, Dict[str, Dict[str, float]]]) -> None:
+        """
+        Adds counters collected elsewhere, e.g. by a worker process, in the
+        raw {stage: {table: counters}} form returned by `raw()`.
+        """
+        for stage, tables in timings.items():
+            for table, counters in tables.items():
+                self.record(
+                    stage, table, counters["wall_seconds"], counters["cpu_seconds"],
+                    counters["rows"], counters["bytes"]
+                )
+
+    def raw(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        with self._lock:
+            return {stage: {table: dict(counters) for table, counters in tables.items()}
+                    for stage, tables in self._stages.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the JSON timing breakdown: totals per stage with a per-table
+        split, the request's wall time and the process's peak RSS. The peak
+        RSS covers the process's whole lifetime, earlier requests included,
+        so it is only reported for the request as a whole.
+        """
+        stages = {}
+        for stage, tables in self.raw().items():
+            total = _empty_counters()
+            for counters in tables.values():
+                for key in total:
+                    total[key] += counters[key]
+            stages[stage] = _finish(total)
+            stages[stage]["tables"] = {
+                table: _finish(counters) for table, counters in tables.items() if table is not None
+            }
+        return {
+            "wall_seconds": round(since(self._started)[0], 6),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": stages
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide totals across requests, rendered in the Prometheus text format.
+    """
+
+    def __init__(self, prefix: str = 'datagen'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._stages = {}
+
+    def observe(self, metrics: PipelineMetrics, outcome: str = 'success') -> None:
+        with self._lock:
+            self._requests[outcome] = self._requests.get(outcome, 0) + 1
+            for stage, tables in metrics.raw().items():
+                total = self._stages.setdefault(stage, _empty_counters())
+                for counters in tables.values():
+                    for key in total:
+                        total[key] += counters[key]
+
+    def render(self, gauges: Dict[str, float] = None) -> str:
+        """
+        Returns all metrics as Prometheus exposition text. `gauges` adds
+        extra unlabeled gauges, e.g. cache statistics.
+        """
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_requests_total Generation requests by outcome.",
+            f"# TYPE {p}_requests_total counter",
+        ]
+        with self._lock:
+            for outcome, count in sorted(self._requests.items()):
+                lines.append(f'{p}_requests_total{{outcome="{outcome}"}} {count}')
+            series = [
+                ("stage_wall_seconds_total", "wall_seconds", "Wall-clock seconds spent per pipeline stage."),
+                ("stage_cpu_seconds_total", "cpu_seconds", "CPU seconds spent per pipeline stage."),
+                ("stage_rows_total", "rows", "Rows processed per pipeline stage."),
+                ("stage_bytes_total", "bytes", "Bytes written per pipeline stage."),
+            ]
+            for name, key, help_text in series:
+                lines.append(f"# HELP {p}_{name} {help_text}")
+                lines.append(f"# TYPE {p}_{name} counter")
+                for stage, counters in sorted(self._stages.items()):
+                    lines.append(f'{p}_{name}{{stage="{stage}"}} {counters[key]}')
+
+        peak = peak_rss_bytes()
+        if peak is not None:
+            lines += [
+                f"# HELP {p}_peak_rss_bytes Peak resident set size of the server process.",
+                f"# TYPE {p}_peak_rss_bytes gauge",
+                f"{p}_peak_rss_bytes {peak}",
+            ]
+        for name, value in (gauges or {}).items():
+            lines += [f"# TYPE {p}_{name} gauge", f"{p}_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+# tracemalloc is process-wide, so profiled bodies run one at a time
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def profiled(enabled: bool = True, top_n: int = PROFILE_TOP_N) -> Iterator[Dict[str, Any]]:
+    """
+    Runs the body under cProfile and tracemalloc when `enabled`, filling the
+    yielded dict with the top functions by cumulative time, the traced
+    memory peak and the top allocation sites. Only the calling thread is
+    profiled, and tracemalloc slows the body down noticeably.
+
+    tracemalloc traces the whole process, so concurrent profiled bodies
+    wait for each other rather than stop each other's tracing.
+    """
+    report = {}
+    if not enabled:
+        yield report
+        return
+
+    with _profile_lock:
+        profiler = cProfile.Profile()
+        tracing = not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        profiler.enable()
+        try:
+            yield report
+        finally:
+            profiler.disable()
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if tracing:
+                tracemalloc.stop()
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top_n)
+        report["cprofile"] = _profile_lines(stream.getvalue())
+        report["tracemalloc_peak_bytes"] = peak
+        report["top_allocations"] = [
+            {"location": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics('lineno')[:top_n]
+        ]
+
+
+def _profile_lines(text: str) -> List[str]:
+    return [line.rstrip() for line in text.splitlines() if line.strip()]
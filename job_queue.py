@@ -0,0 +1,237 @@
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+DEFAULT_MAX_WORKERS = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    progress TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+)
+"""
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a running job once it has been cancelled.
+    """
+
+
+class JobStore:
+    """
+    Persists jobs in a local SQLite file so they survive restarts. Safe to
+    share between threads.
+    """
+
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+
+    def insert(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, priority, seq, params, progress, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job["id"], job["status"], job["priority"], job["seq"],
+                 json.dumps(job["params"]), json.dumps(job["progress"]), job["created_at"])
+            )
+
+    def update(self, job_id: str, **fields) -> None:
+        for key in ("params", "progress", "result"):
+            if key in fields:
+                fields[key] = json.dumps(fields[key])
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def transition(self, job_id: str, from_status: str, **fields) -> bool:
+        """
+        Updates a job only if it is still in `from_status`; returns whether it was.
+        """
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND status = ?",
+                (*fields.values(), job_id, from_status)
+            )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_dict(row) if row is not None else None
+
+    def list(self, status: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM jobs" + (" WHERE status = ?" if status else "") + " ORDER BY seq DESC LIMIT ?"
+        params = (status, limit) if status else (limit,)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [_job_dict(row) for row in rows]
+
+    def max_seq(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM jobs").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def _job_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    for key in ("params", "progress", "result"):
+        job[key] = json.loads(job[key]) if job[key] is not None else None
+    return job
+
+
+class JobQueue:
+    """
+    Runs jobs in the background on a bounded pool of worker threads.
+
+    Jobs are picked by priority (higher first) and FIFO within a priority.
+    `runner(params, progress)` does the work and returns a JSON-serializable
+    result; it reports progress by calling `progress(**counters)`, which
+    raises `JobCancelled` once the job has been cancelled. On start, jobs
+    that were queued or interrupted while running are queued again.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[..., Dict[str, Any]],
+        db_path: str = 'data/jobs.sqlite3',
+        max_workers: int = DEFAULT_MAX_WORKERS
+    ):
+        self.runner = runner
+        self.max_workers = max(1, int(max_workers))
+        self.store = JobStore(db_path)
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count(self.store.max_seq() + 1)
+        self._cancelled = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self) -> None:
+        """
+        Re-queues unfinished jobs and starts the workers; safe to call repeatedly.
+        """
+        with self._lock:
+            if self._threads:
+                return
+            for job in self.store.list('running', limit=-1) + self.store.list('queued', limit=-1):
+                self.store.update(job["id"], status='queued', started_at=None)
+                self._enqueue(job)
+            for i in range(self.max_workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def shutdown(self) -> None:
+        """
+        Stops the workers once their current jobs are done.
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put((float('inf'), 0, None))
+        for thread in threads:
+            thread.join()
+
+    def submit(self, params: Dict[str, Any], priority: int = 0) -> str:
+        """
+        Queues a job and returns its id immediately.
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": 'queued',
+            "priority": int(priority),
+            "seq": next(self._seq),
+            "params": params,
+            "progress": {},
+            "created_at": time.time()
+        }
+        self.start()
+        self.store.insert(job)
+        self._enqueue(job)
+        return job["id"]
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        return self.store.get(job_id)
+
+    def list(self, status: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        return self.store.list(status, limit)
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """
+        Cancels a queued job at once, or asks a running job to stop at its
+        next progress report. Finished jobs are left unchanged.
+        """
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED_STATUSES:
+            return job
+        if not self.store.transition(job_id, 'queued', status='cancelled', finished_at=time.time()):
+            self._cancel_event(job_id).set()
+        return self.store.get(job_id)
+
+    def _enqueue(self, job: Dict[str, Any]) -> None:
+        self._queue.put((-job["priority"], job["seq"], job["id"]))
+
+    def _cancel_event(self, job_id: str) -> threading.Event:
+        with self._lock:
+            return self._cancelled.setdefault(job_id, threading.Event())
+
+    def _work(self) -> None:
+        while True:
+            _, _, job_id = self._queue.get()
+            if job_id is None:
+                return
+            # Claiming is atomic, so a job queued twice still runs once
+            if self.store.transition(job_id, 'queued', status='running', started_at=time.time()):
+                self._run(self.store.get(job_id))
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        cancelled = self._cancel_event(job_id)
+        counters = dict(job["progress"])
+
+        def progress(**updates) -> None:
+            if cancelled.is_set():
+                raise JobCancelled(job_id)
+            counters.update(updates)
+            self.store.update(job_id, progress=counters)
+
+        try:
+            progress()
+            result = self.runner(job["params"], progress)
+        except JobCancelled:
+            self.store.update(job_id, status='cancelled', finished_at=time.time())
+        except Exception as e:
+            self.store.update(job_id, status='failed', error=f"{type(e).__name__}: {e}", finished_at=time.time())
+        else:
+            self.store.update(job_id, status='succeeded', result=result, finished_at=time.time())
+        finally:
+            with self._lock:
+                self._cancelled.pop(job_id, None)
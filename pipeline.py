@@ -0,0 +1,428 @@
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable
+
+from .configuration_agent import TableWriter, table_manifest, write_manifest
+from .custom_rules import apply_rules
+from .db_loader import DatabaseLoader, load_in_dependency_order, table_parents
+from .data_generation_agent import generate_column_chunks, generate_shard, plan_generation, shard_ranges
+from .generated_table import table_length
+from .instrumentation import PipelineMetrics, clock, since
+from .privacy_agent import PrivacyMasker
+from .validation_agent import IncrementalValidator, build_expectations, summarize_chunk
+from .validation_report import ReportWriter, format_summary, summarize_result
+from .value_pools import value_pool
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+_worker_pools = {}
+_worker_pools_lock = threading.Lock()
+
+
+def worker_pool(workers: int = None) -> ProcessPoolExecutor:
+    """
+    Returns the shared process pool with `workers` processes, started on
+    first use. Pools outlive runs, so later runs skip worker start-up and
+    find the imports and value pools of earlier runs already loaded.
+    """
+    with _worker_pools_lock:
+        executor = _worker_pools.get(workers)
+        if executor is None:
+            executor = _worker_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return executor
+
+
+def _discard_worker_pool(workers: int, executor: ProcessPoolExecutor) -> None:
+    with _worker_pools_lock:
+        if _worker_pools.get(workers) is executor:
+            del _worker_pools[workers]
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _warm_worker(pool_keys: Iterable[tuple], seeds: Iterable[int]) -> int:
+    """
+    Worker task: loads value pools into the worker's memory.
+    """
+    for semantic, size, locale in pool_keys:
+        for seed in seeds:
+            value_pool(semantic, seed, size, locale)
+    return os.getpid()
+
+
+def warm_worker_pool(workers: int, pool_keys: Iterable[tuple] = (), seeds: Iterable[int] = ()) -> int:
+    """
+    Starts the shared pool of `workers` processes and loads the given value
+    pools (as (semantic type, size, locale) keys) in each of them. Returns
+    how many worker processes answered.
+    """
+    executor = worker_pool(workers)
+    pool_keys, seeds = list(pool_keys), list(seeds)
+    futures = [executor.submit(_warm_worker, pool_keys, seeds) for _ in range(workers or os.cpu_count() or 1)]
+    return len({future.result() for future in futures})
+
+
+def run_streaming_pipeline(
+    parsed_schema: Dict[str, Any],
+    config: dict,
+    output_dir: str = 'data/outputs',
+    seed: int = None,
+    validate: bool = True,
+    progress: Callable[..., None] = None,
+    metrics: PipelineMetrics = None,
+    report_path: str = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Generates, validates and exports every table one chunk at a time.
+
+    Only the current chunk is held in memory, so peak memory depends on
+    `config['chunk_size']` rather than on `config['data_volume']`. Chunks are
+    folded into an `IncrementalValidator`, whose final reports equal batch
+    validation of the complete tables, and then appended to the export file.
+    Returns the files, row and byte counts and validation summary of every
+    table, and saves the file manifest as manifest.json in `output_dir`.
+    The detailed validation reports are written to `report_path` if given.
+
+    `progress`, if given, is called after every chunk with the running
+    totals `generated`, `validated` and `exported` (rows, all tables); an
+    exception raised by it stops the run and discards the unfinished file.
+    Stage timings per table are recorded into `metrics` when given.
+    `config['custom_rules']` are compiled into the schema first, so they
+    shape the generated values and are checked by validation.
+    `config['privacy_settings']` mask each chunk after validation and
+    before export (see `privacy_agent.PrivacyMasker`).
+    A DATABASE export runs `run_database_pipeline` instead.
+    """
+    if config['export_format'] == 'DATABASE':
+        return run_database_pipeline(parsed_schema, config, output_dir, seed, validate, progress, metrics, report_path)
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    parsed_schema = apply_rules(parsed_schema, config.get('custom_rules'))
+    chunk_size = config.get('chunk_size') or DEFAULT_CHUNK_SIZE
+    plan = plan_generation(parsed_schema, config['data_volume'], seed)
+    masker = _prepare_masker(parsed_schema, config, plan, chunk_size)
+    validator = IncrementalValidator(parsed_schema) if validate else None
+    report_writer = ReportWriter(report_path) if validate and report_path else None
+    exported = {}
+    writer = None
+    totals = {"generated": 0, "validated": 0, "exported": 0}
+    started = time.perf_counter()
+
+    print(f"\n🚚 Streaming {config['data_volume']} rows per table in chunks of {chunk_size}")
+
+    def finish(writer) -> None:
+        with metrics.stage('export', writer.table_name):
+            exported[writer.table_name] = table_manifest([writer.close()])
+        metrics.record('export', writer.table_name, bytes=exported[writer.table_name]["bytes"])
+        if validator is not None:
+            with metrics.stage('validate', writer.table_name):
+                validator.finish_table(writer.table_name)
+                report = validator.report(writer.table_name)
+            exported[writer.table_name]["validation"] = summarize_result(writer.table_name, report)
+            if report_writer is not None:
+                report_writer.write(writer.table_name, report)
+
+    try:
+        chunks = iter(generate_column_chunks(parsed_schema, chunk_size=chunk_size, plan=plan))
+        while True:
+            start = clock()
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            table_name, _, columns = chunk
+            rows = table_length(columns)
+            metrics.record('generate', table_name, *since(start), rows=rows)
+
+            if writer is None or writer.table_name != table_name:
+                if writer is not None:
+                    finish(writer)
+                writer = TableWriter(table_name, config['export_format'], output_dir, options=config.get('export_options'))
+
+            totals["generated"] += rows
+            if validator is not None:
+                with metrics.stage('validate', table_name, rows=rows):
+                    validator.add_chunk(table_name, columns)
+                totals["validated"] += rows
+            if masker is not None:
+                with metrics.stage('mask', table_name, rows=rows):
+                    columns = masker.mask(table_name, columns)
+            with metrics.stage('export', table_name, rows=rows):
+                writer.write_chunk(columns)
+            totals["exported"] += rows
+            if progress is not None:
+                progress(**totals)
+        if writer is not None:
+            finish(writer)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    finally:
+        if report_writer is not None:
+            report_writer.close()
+
+    for table_name, info in exported.items():
+        if "validation" in info:
+            print("\n".join(format_summary(info["validation"])))
+        print(f"  ✅ {table_name}: {info['rows']} rows streamed to {info['file_paths'][0]}")
+
+    write_manifest(config['export_format'], output_dir, exported, time.perf_counter() - started)
+    return exported
+
+
+def _prepare_masker(parsed_schema: Dict[str, Any], config: dict, plan: Dict[str, Any], chunk_size: int) -> PrivacyMasker:
+    """
+    Returns the run's privacy masker, calibrated on each table's first
+    chunk, or None when nothing is masked.
+    """
+    masker = PrivacyMasker(parsed_schema, config.get('privacy_settings'), plan["seed"])
+    if not masker.enabled:
+        return None
+    masker.prepare(parsed_schema, plan, chunk_size)
+    print(f"\n🔒 Masking {', '.join(masker.describe())}")
+    return masker
+
+
+def _export_shard(
+    table_name: str,
+    table_info: Dict[str, Any],
+    start: int,
+    size: int,
+    seed: int,
+    references: Dict[str, dict],
+    export_format: str,
+    export_options: dict,
+    output_dir: str,
+    part: int,
+    key_columns: list,
+    validate: bool,
+    masker: PrivacyMasker = None
+) -> tuple:
+    """
+    Worker task: generates one shard, validates it, masks it and writes it
+    as a part file. Returns the file's manifest entry, the shard's stage
+    timings and its validation summary (see `summarize_chunk`) for the
+    parent's validator, or None when not validating.
+    """
+    metrics = PipelineMetrics()
+    with metrics.stage('generate', table_name, rows=size):
+        columns = generate_shard(table_name, table_info, start, size, seed, references)
+    summary = None
+    if validate:
+        with metrics.stage('validate', table_name, rows=size):
+            rules = build_expectations({table_name: table_info})[table_name]
+            summary = summarize_chunk(rules, columns, key_columns)
+    if masker is not None:
+        with metrics.stage('mask', table_name, rows=size):
+            columns = masker.mask(table_name, columns)
+
+    with metrics.stage('export', table_name, rows=size):
+        with TableWriter(table_name, export_format, output_dir, part=part, options=export_options) as writer:
+            writer.write_chunk(columns)
+    metrics.record('export', table_name, bytes=writer.manifest["bytes"])
+    return writer.manifest, metrics.raw(), summary
+
+
+def run_parallel_pipeline(
+    parsed_schema: Dict[str, Any],
+    config: dict,
+    output_dir: str = 'data/outputs',
+    seed: int = None,
+    validate: bool = True,
+    progress: Callable[..., None] = None,
+    metrics: PipelineMetrics = None,
+    report_path: str = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs the pipeline with one task per shard of `config['chunk_size']` rows
+    on the shared pool of `config['workers']` processes (see `worker_pool`).
+
+    Every worker writes its shard straight to a numbered part file, so no
+    process ever holds a whole table. The output is identical for any
+    `config['workers']`, and primary keys stay contiguous across parts.
+    Part files are listed in manifest.json in `output_dir`. `progress` is
+    called as in `run_streaming_pipeline`, once per finished shard; if it
+    raises, shards that have not started yet are cancelled. The workers'
+    stage timings are summed into `metrics` when given (CPU time is the
+    workers' own, so it can exceed wall time). Workers summarize the
+    validation of their shards, and an `IncrementalValidator` here folds the
+    summaries in shard order, so uniqueness and foreign keys are checked
+    across shards and the reports equal those of `run_streaming_pipeline`;
+    the detailed reports are written to `report_path` if given.
+    Custom rules and privacy settings are applied as in
+    `run_streaming_pipeline`; the masker is calibrated here, once, and
+    shipped to every worker. A DATABASE export runs `run_database_pipeline`
+    instead, whose writers are threads sharing a connection pool.
+    """
+    if config['export_format'] == 'DATABASE':
+        return run_database_pipeline(parsed_schema, config, output_dir, seed, validate, progress, metrics, report_path)
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    parsed_schema = apply_rules(parsed_schema, config.get('custom_rules'))
+    shard_size = config.get('chunk_size') or DEFAULT_CHUNK_SIZE
+    plan = plan_generation(parsed_schema, config['data_volume'], seed)
+    masker = _prepare_masker(parsed_schema, config, plan, shard_size)
+    validator = IncrementalValidator(parsed_schema) if validate else None
+    validations = {}
+    started = time.perf_counter()
+
+    print(f"\n🧵 Generating {config['data_volume']} rows per table in shards of {shard_size} "
+          f"on {config.get('workers') or 'all'} workers")
+
+    executor = worker_pool(config.get('workers'))
+    futures = []
+    try:
+        for table_name in plan["order"]:
+            shards = shard_ranges(plan["row_counts"][table_name], shard_size)
+            for part, (start, size) in enumerate(shards):
+                futures.append((table_name, executor.submit(
+                    _export_shard, table_name, parsed_schema[table_name], start, size,
+                    plan["seed"], plan["references"][table_name],
+                    config['export_format'], config.get('export_options'), output_dir, part,
+                    validator.key_columns(table_name) if validator is not None else [], validate, masker
+                )))
+
+        files = {}
+        totals = {"generated": 0, "validated": 0, "exported": 0}
+        report_writer = ReportWriter(report_path) if validate and report_path else None
+
+        def finish(table_name) -> None:
+            with metrics.stage('validate', table_name):
+                validator.finish_table(table_name)
+                report = validator.report(table_name)
+            validations[table_name] = summarize_result(table_name, report)
+            if report_writer is not None:
+                report_writer.write(table_name, report)
+
+        try:
+            for table_name, future in futures:
+                entry, timings, summary = future.result()
+                metrics.merge(timings)
+                if validator is not None:
+                    # Futures are in plan order, so a table's parents are finished before its shards arrive
+                    if files and table_name not in files:
+                        finish(next(reversed(files)))
+                    with metrics.stage('validate', table_name):
+                        validator.add_summary(table_name, summary)
+                files.setdefault(table_name, []).append(entry)
+                totals["generated"] += entry["rows"]
+                totals["validated"] += entry["rows"] if validate else 0
+                totals["exported"] += entry["rows"]
+                if progress is not None:
+                    progress(**totals)
+            if validator is not None and files:
+                finish(next(reversed(files)))
+        finally:
+            if report_writer is not None:
+                report_writer.close()
+    except BaseException as e:
+        # Stop this run's queued shards; the pool itself serves later runs
+        for _, future in futures:
+            future.cancel()
+        wait([future for _, future in futures])
+        if isinstance(e, BrokenProcessPool):
+            _discard_worker_pool(config.get('workers'), executor)
+        raise
+    exported = {table_name: table_manifest(entries) for table_name, entries in files.items()}
+
+    for table_name, info in exported.items():
+        if table_name in validations:
+            info["validation"] = validations[table_name]
+            print("\n".join(format_summary(info["validation"])))
+        print(f"  ✅ {table_name}: {info['rows']} rows written to {len(info['file_paths'])} part files")
+
+    write_manifest(config['export_format'], output_dir, exported, time.perf_counter() - started)
+    return exported
+
+
+def run_database_pipeline(
+    parsed_schema: Dict[str, Any],
+    config: dict,
+    output_dir: str = 'data/outputs',
+    seed: int = None,
+    validate: bool = True,
+    progress: Callable[..., None] = None,
+    metrics: PipelineMetrics = None,
+    report_path: str = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Streams every table straight into the database configured by
+    `config['export_options']` (see `db_loader.parse_database_options`).
+
+    Each table is generated, validated, masked and inserted chunk by chunk
+    on its own writer thread and pooled connection; a table starts once the
+    tables its foreign keys reference are loaded, so parents always land
+    before their children. The generated rows equal those of
+    `run_streaming_pipeline`. Returns each table's rows, rows per second
+    and validation summary, and saves the manifest as manifest.json in
+    `output_dir`. `progress`, `metrics` and `report_path` work as in
+    `run_streaming_pipeline`; when a table fails, the others stop at their
+    next chunk and roll back what they have not committed.
+    """
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    parsed_schema = apply_rules(parsed_schema, config.get('custom_rules'))
+    chunk_size = config.get('chunk_size') or DEFAULT_CHUNK_SIZE
+    plan = plan_generation(parsed_schema, config['data_volume'], seed)
+    masker = _prepare_masker(parsed_schema, config, plan, chunk_size)
+    validator = IncrementalValidator(parsed_schema) if validate else None
+    report_writer = ReportWriter(report_path) if validate and report_path else None
+    # The validator, the report file and the progress totals are shared by the writer threads
+    lock = threading.Lock()
+    totals = {"generated": 0, "validated": 0, "exported": 0}
+    started = time.perf_counter()
+
+    def load(table_name, stop):
+        with loader.writer(table_name) as writer:
+            for start, size in shard_ranges(plan["row_counts"][table_name], chunk_size):
+                if stop.is_set():
+                    raise CancelledError()
+                with metrics.stage('generate', table_name, rows=size):
+                    columns = generate_shard(
+                        table_name, parsed_schema[table_name], start, size,
+                        plan["seed"], plan["references"][table_name]
+                    )
+                if validator is not None:
+                    with lock, metrics.stage('validate', table_name, rows=size):
+                        validator.add_chunk(table_name, columns)
+                if masker is not None:
+                    with metrics.stage('mask', table_name, rows=size):
+                        columns = masker.mask(table_name, columns)
+                with metrics.stage('export', table_name, rows=size):
+                    writer.write_chunk(columns)
+                with lock:
+                    totals["generated"] += size
+                    totals["validated"] += size if validator is not None else 0
+                    totals["exported"] += size
+                    if progress is not None:
+                        progress(**totals)
+            with metrics.stage('export', table_name):
+                info = table_manifest([writer.close()])
+        if validator is not None:
+            with lock, metrics.stage('validate', table_name):
+                validator.finish_table(table_name)
+                report = validator.report(table_name)
+                info["validation"] = summarize_result(table_name, report)
+                if report_writer is not None:
+                    report_writer.write(table_name, report)
+        return info
+
+    with DatabaseLoader(config.get('export_options'), output_dir) as loader:
+        print(f"\n🗄️  Loading {config['data_volume']} rows per table into {loader.target} "
+              f"in chunks of {chunk_size} on {loader.writers or len(plan['order'])} writers")
+        try:
+            loader.prepare(masker.masked_schema(parsed_schema) if masker is not None else parsed_schema, plan["order"])
+            loaded = load_in_dependency_order(plan["order"], table_parents(parsed_schema), load, loader.writers)
+        finally:
+            if report_writer is not None:
+                report_writer.close()
+    exported = {table_name: loaded[table_name] for table_name in plan["order"]}
+
+    for table_name, info in exported.items():
+        if "validation" in info:
+            print("\n".join(format_summary(info["validation"])))
+        entry = info["files"][0]
+        print(f"  ✅ {table_name}: {info['rows']} rows loaded in {entry['seconds']:.2f}s "
+              f"({entry['rows_per_second'] or 0:,} rows/s)")
+
+    write_manifest(config['export_format'], output_dir, exported, time.perf_counter() - started)
+    return exported
@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable
+
+from .pipeline import warm_worker_pool
+from .profiling_agent import apply_profile, load_profile
+from .schema_analysis_agent import analyze_schema_directory
+from .validation_agent import prepare_backend
+from .value_pools import POOL_SEEDS, pool_key, value_pool
+
+DEFAULT_SCHEMA_DIR = os.path.join("data", "schemas")
+
+
+def schema_pool_keys(schemas: Dict[str, Dict[str, Any]], schema_dir: str) -> set:
+    """
+    Collects the (semantic type, size, locale) pools that the parsed
+    schemas, shaped by their sample data profiles, draw from.
+    """
+    keys = set()
+    for file_name, parsed_schema in schemas.items():
+        parsed_schema = apply_profile(parsed_schema, load_profile(os.path.join(schema_dir, file_name)))
+        for table_info in parsed_schema.values():
+            for column, properties in table_info.get("columns", {}).items():
+                key = pool_key(column, properties)
+                if key is not None:
+                    keys.add(key)
+    return keys
+
+
+def preload(
+    schema_dir: str = DEFAULT_SCHEMA_DIR,
+    seeds: Iterable[int] = None,
+    validation_backend: str = "native",
+    workers: int = None
+) -> Dict[str, float]:
+    """
+    Does once, up front, what the first requests would otherwise pay for.
+
+    Parses every schema into the shared schema cache, loads (or builds) the
+    value pools they use for `seeds` (default: every pool variant), readies
+    the validation backend and, with `workers` > 1, starts the shared
+    worker pool and loads the same value pools in each worker. Returns the
+    seconds spent on each step.
+    """
+    seeds = list(range(POOL_SEEDS) if seeds is None else seeds)
+    timings = {}
+
+    started = time.perf_counter()
+    schemas = analyze_schema_directory(schema_dir)
+    timings["schemas"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    keys = schema_pool_keys(schemas, schema_dir)
+    for semantic, size, locale in keys:
+        for seed in seeds:
+            value_pool(semantic, seed, size, locale)
+    timings["value_pools"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    prepare_backend(validation_backend)
+    timings["validation"] = time.perf_counter() - started
+
+    if (workers or 1) > 1:
+        started = time.perf_counter()
+        warm_worker_pool(workers, keys, seeds)
+        timings["workers"] = time.perf_counter() - started
+
+    print(f"🔥 Preloaded {len(schemas)} schemas and {len(keys) * len(seeds)} value pools in "
+          f"{sum(timings.values()):.2f}s ({', '.join(f'{step} {seconds:.2f}s' for step, seconds in timings.items())})")
+    return timings
+
+
+def preload_in_background(*args, **kwargs) -> threading.Thread:
+    """
+    Runs `preload` on a daemon thread, so a server can take requests while
+    it warms up. Failures are reported, not raised: requests then load what
+    they need themselves.
+    """
+    def run():
+        try:
+            preload(*args, **kwargs)
+        except Exception as e:
+            print(f"⚠️ Preload failed: {e}")
+
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,569 @@
+import base64
+import hashlib
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .custom_rules import splitmix64
+from .data_generation_agent import column_kind, foreign_key_columns, generate_shard, resolve_seed
+from .generated_table import DictionaryColumn, GeneratedTable, code_dtype, table_length
+from .value_pools import DATE_TYPES, is_key_name, semantic_type, snake_case
+
+# Bump whenever the same settings would mask values differently
+MASKING_VERSION = 2
+PRIVACY_KEY_ENV = 'PRIVACY_KEY'
+PRIVACY_FLAGS = ('gdpr', 'gdpr_masking', 'enabled')
+PRIVACY_OPTIONS = ('key', 'columns', 'quasi_identifiers', 'k', 'max_suppression')
+MASKING_METHODS = ('hash', 'tokenize', 'generalize', 'redact', 'keep')
+DEFAULT_K = 5
+DEFAULT_MAX_SUPPRESSION = 0.05
+CALIBRATION_ROWS = 10_000
+
+# Semantic type -> masking method applied when GDPR masking is on
+DEFAULT_METHODS = {
+    "name": "hash",
+    "first_name": "hash",
+    "last_name": "hash",
+    "username": "hash",
+    "address": "hash",
+    "street_address": "hash",
+    "email": "tokenize",
+    "phone_number": "tokenize",
+    "postcode": "generalize",
+}
+# Column name tokens of quasi-identifiers that are generalized by default
+QUASI_IDENTIFIER_HINTS = ("age", "birth", "birthday", "birthdate", "dob", "gender", "sex")
+
+FEISTEL_ROUNDS = 4
+FEISTEL_HALF_BITS = 31
+FEISTEL_MASK = np.uint64((1 << FEISTEL_HALF_BITS) - 1)
+HASHABLE_INT_LIMIT = 1 << (2 * FEISTEL_HALF_BITS)
+# Bucket widths of generalized numbers repeat 5, 10, 20 per power of ten
+NUMERIC_STEPS = (5, 10, 20)
+SUPPRESSED = '*'
+NUMBER_DTYPES = ('integer', 'floating', 'mixed-integer-float', 'decimal', 'boolean')
+
+_HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+_HEX_SHIFTS = np.arange(60, -4, -4, dtype=np.uint64)
+
+
+def _alphabet_tables(*alphabets: str) -> tuple:
+    """
+    Maps every ASCII code point to the first code point and size of its
+    alphabet (size 0: the character is kept), for vectorized lookups.
+    Code point 127 stands in for everything above ASCII.
+    """
+    first = np.zeros(128, dtype=np.uint32)
+    size = np.zeros(128, dtype=np.uint8)
+    for alphabet in alphabets:
+        codes = np.frombuffer(alphabet.encode('ascii'), dtype=np.uint8)
+        first[codes] = codes[0]
+        size[codes] = len(codes)
+    return first, size
+
+
+_TOKEN_ALPHABETS = _alphabet_tables('0123456789', 'abcdefghijklmnopqrstuvwxyz', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+_DIGITS = _alphabet_tables('0123456789')
+
+
+def parse_privacy(privacy_settings: dict = None) -> Dict[str, Any]:
+    """
+    Checks privacy settings and returns them with defaults filled in.
+
+    Masking is on when 'GDPR', 'gdpr_masking' or 'enabled' (any case) is
+    true, or when columns or quasi-identifiers are listed. 'columns' maps
+    'table.column' or 'column' to one of MASKING_METHODS and overrides the
+    defaults; 'quasi_identifiers' lists more columns to generalize until
+    every combination of them occurs at least 'k' times. 'key' is the
+    secret behind hashing and tokenization (default: the PRIVACY_KEY
+    environment variable, else the generation seed).
+    """
+    settings = {
+        "enabled": False,
+        "key": None,
+        "columns": {},
+        "quasi_identifiers": [],
+        "k": DEFAULT_K,
+        "max_suppression": DEFAULT_MAX_SUPPRESSION
+    }
+    for name, value in (privacy_settings or {}).items():
+        option = str(name).lower()
+        if option in PRIVACY_FLAGS:
+            settings["enabled"] = settings["enabled"] or bool(value)
+        elif option in PRIVACY_OPTIONS:
+            settings[option] = value
+        else:
+            raise ValueError(
+                f"Unknown privacy setting: '{name}'. Supported settings are: {', '.join(PRIVACY_FLAGS + PRIVACY_OPTIONS)}"
+            )
+
+    if not isinstance(settings["columns"], dict):
+        raise ValueError("Privacy setting 'columns' must map column names to masking methods")
+    for column, method in settings["columns"].items():
+        if method not in MASKING_METHODS:
+            raise ValueError(
+                f"Unsupported masking method for '{column}': '{method}'. Supported methods are: {', '.join(MASKING_METHODS)}"
+            )
+    if isinstance(settings["quasi_identifiers"], str) or not isinstance(settings["quasi_identifiers"], (list, tuple)):
+        raise ValueError("Privacy setting 'quasi_identifiers' must be a list of column names")
+    settings["quasi_identifiers"] = list(settings["quasi_identifiers"])
+    try:
+        settings["k"] = int(settings["k"])
+        settings["max_suppression"] = float(settings["max_suppression"])
+    except (TypeError, ValueError):
+        raise ValueError("Privacy settings 'k' and 'max_suppression' must be numbers")
+    if settings["k"] < 1:
+        raise ValueError(f"Privacy setting 'k' must be at least 1, got {settings['k']}")
+    if not 0 <= settings["max_suppression"] <= 1:
+        raise ValueError(f"Privacy setting 'max_suppression' must be between 0 and 1, got {settings['max_suppression']}")
+
+    settings["enabled"] = settings["enabled"] or bool(settings["columns"]) or bool(settings["quasi_identifiers"])
+    return settings
+
+
+def _secret(settings: Dict[str, Any]) -> str:
+    return settings["key"] or os.environ.get(PRIVACY_KEY_ENV)
+
+
+def privacy_fingerprint(privacy_settings: dict = None) -> str:
+    """
+    Identifies the masking key for result cache keys without revealing it;
+    None when masking is off or keyed by the generation seed.
+    """
+    settings = parse_privacy(privacy_settings)
+    secret = _secret(settings)
+    if not settings["enabled"] or not secret:
+        return None
+    return hashlib.blake2b(str(secret).encode('utf-8'), digest_size=16, person=b'privacy-key').hexdigest()
+
+
+def _lookup(entries, table_name: str, column: str):
+    return entries.get(f"{table_name}.{column}", entries.get(column))
+
+
+def _default_method(column: str, properties: Dict[str, Any]) -> str:
+    if properties.get("primary_key"):
+        return None
+    method = DEFAULT_METHODS.get(semantic_type(column, properties, require_faker=False))
+    # Identifiers such as GenderID only point at a quasi-identifier
+    if method is None and not is_key_name(column) and any(
+        token in QUASI_IDENTIFIER_HINTS for token in snake_case(column).split("_")
+    ):
+        method = "generalize"
+    return method
+
+
+def _key_groups(parsed_schema: Dict[str, Any]) -> List[set]:
+    """
+    Returns the sets of (table, column) linked by foreign keys.
+    """
+    groups = {}
+    for table_name, table_info in parsed_schema.items():
+        for column, reference in foreign_key_columns(table_info).items():
+            members = [(table_name, column), (reference["table"], reference["column"])]
+            merged = set().union(*(groups.get(member, {member}) for member in members))
+            for member in merged:
+                groups[member] = merged
+    return list({id(group): group for group in groups.values()}.values())
+
+
+def privacy_plan(parsed_schema: Dict[str, Any], privacy_settings: dict = None) -> Dict[str, Dict[str, str]]:
+    """
+    Returns {table: {column: method}} for every column the settings mask.
+
+    Without explicit entries, names, usernames and addresses are hashed,
+    emails and phone numbers tokenized, and postcodes, ages, birth dates
+    and genders generalized. Masking one end of a foreign key masks every
+    column it links the same way, so joins still match; key columns can
+    therefore only be hashed or tokenized.
+    """
+    settings = parse_privacy(privacy_settings)
+    if not settings["enabled"]:
+        return {}
+
+    known = set()
+    methods = {}
+    for table_name, table_info in parsed_schema.items():
+        for column, properties in table_info.get("columns", {}).items():
+            known.update((column, f"{table_name}.{column}"))
+            method = _lookup(settings["columns"], table_name, column)
+            if method is None and {column, f"{table_name}.{column}"} & set(settings["quasi_identifiers"]):
+                method = "generalize"
+            methods[(table_name, column)] = method or _default_method(column, properties) or "keep"
+    unknown = [name for name in list(settings["columns"]) + settings["quasi_identifiers"] if name not in known]
+    if unknown:
+        raise ValueError(f"Privacy settings name unknown columns: {', '.join(unknown)}")
+
+    # Joined columns must map equal values to equal values
+    for group in _key_groups(parsed_schema):
+        masked = {methods[member] for member in group if member in methods} - {"keep"}
+        if len(masked) > 1 or masked & {"generalize", "redact"}:
+            names = ", ".join(sorted(f"{table}.{column}" for table, column in group))
+            raise ValueError(f"Foreign key columns {names} must all be hashed or all be tokenized, not {', '.join(sorted(masked))}")
+        for member in group:
+            if masked and member in methods:
+                methods[member] = next(iter(masked))
+
+    plan = {}
+    for (table_name, column), method in methods.items():
+        if method == "keep":
+            continue
+        kind = column_kind(parsed_schema[table_name]["columns"][column].get("type"))
+        if method == "hash" and kind not in ("int", "string"):
+            raise ValueError(f"Cannot hash {table_name}.{column}: only int and string columns can be hashed")
+        if method == "tokenize" and kind != "string":
+            raise ValueError(f"Cannot tokenize {table_name}.{column}: only string columns can be tokenized")
+        plan.setdefault(table_name, {})[column] = method
+    return plan
+
+
+def _hierarchy(column: str, properties: Dict[str, Any]) -> str:
+    """
+    Picks how a quasi-identifier is generalized: 'number' buckets, 'date'
+    truncation or 'text' prefixes.
+    """
+    if column_kind(properties.get("type")) in ("int", "float"):
+        return "number"
+    if semantic_type(column, properties, require_faker=False) in DATE_TYPES:
+        return "date"
+    return "text"
+
+
+def _bucket_width(level: int) -> int:
+    return NUMERIC_STEPS[(level - 1) % len(NUMERIC_STEPS)] * 10 ** ((level - 1) // len(NUMERIC_STEPS))
+
+
+def _top_level(hierarchy: str, values) -> int:
+    """
+    Returns the level at which a hierarchy maps every value to SUPPRESSED.
+    """
+    if hierarchy == "date":
+        return 4
+    if hierarchy == "text":
+        categories = values.categories if isinstance(values, DictionaryColumn) else pd.unique(np.asarray(values, dtype=object))
+        return max((len(str(value)) for value in categories if value is not None), default=0) + 1
+    values = np.asarray(values, dtype=np.float64)
+    span = float(np.nanmax(values) - np.nanmin(values)) if len(values) else 0.0
+    level = 1
+    while _bucket_width(level) <= span:
+        level += 1
+    return level + 1
+
+
+def _label_numbers(values: np.ndarray, level: int, integral: bool) -> np.ndarray:
+    width = _bucket_width(level)
+    if integral:
+        return np.asarray([f"{low}-{low + width - 1}" for low in values.astype(np.int64).tolist()], dtype=object)
+    return np.asarray([f"[{low:g}, {low + width:g})" for low in values.tolist()], dtype=object)
+
+
+def _label_text(values: np.ndarray, hierarchy: str, level: int) -> np.ndarray:
+    values = [str(value) for value in values.tolist()]
+    if hierarchy == "date":
+        # Full date, year-month, year, decade
+        cuts = {1: 7, 2: 4, 3: 3}
+        if level in cuts:
+            values = [value[:cuts[level]] + (SUPPRESSED if level == 3 else "") for value in values]
+    elif level:
+        values = [value[:max(len(value) - level, 0)] + SUPPRESSED for value in values]
+    return np.asarray(values, dtype=object)
+
+
+def _from_uniques(codes: np.ndarray, labels: np.ndarray) -> DictionaryColumn:
+    """
+    Builds a dictionary column from codes into `labels`, merging repeated labels.
+    """
+    lookup, categories = pd.factorize(labels)
+    lookup = np.append(lookup, -1).astype(code_dtype(len(categories)))
+    return DictionaryColumn(lookup[codes], np.asarray(categories, dtype=object))
+
+
+def generalize(values, hierarchy: str, level: int, top: int) -> DictionaryColumn:
+    """
+    Generalizes a column to `level` of its hierarchy as a dictionary
+    column of labels: numbers become buckets such as '30-34', dates are cut
+    to month, year or decade, other text loses its last `level` characters.
+    Level 0 keeps the values, numbers included, as they are. Only distinct
+    values are labelled, so the cost is one pass over codes.
+    """
+    row_count = len(values)
+    if level >= top:
+        return DictionaryColumn(np.zeros(row_count, dtype=np.int8), np.array([SUPPRESSED], dtype=object))
+    if isinstance(values, DictionaryColumn):
+        codes, uniques = values.codes, values.categories
+    elif hierarchy == "number":
+        values = np.asarray(values)
+        integral = values.dtype.kind in 'iu'
+        if not level:
+            codes, uniques = pd.factorize(values)
+            return DictionaryColumn(codes.astype(code_dtype(len(uniques))), np.asarray(uniques))
+        width = _bucket_width(level)
+        codes, uniques = pd.factorize(values // width * width)
+        return _from_uniques(codes, _label_numbers(np.asarray(uniques), level, integral))
+    else:
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    return _from_uniques(codes, _label_text(np.asarray(uniques, dtype=object), hierarchy, level))
+
+
+def _suppress(values: DictionaryColumn, rows: np.ndarray) -> DictionaryColumn:
+    """
+    Replaces the values of the flagged rows by SUPPRESSED, or by missing
+    values in a column of numbers, which a text marker would turn into text.
+    """
+    if pd.api.types.infer_dtype(values.categories, skipna=True) in NUMBER_DTYPES:
+        codes = values.codes.copy()
+        codes[rows] = -1
+        return DictionaryColumn(codes, values.categories)
+    categories = values.categories
+    matches = np.flatnonzero(categories == SUPPRESSED)
+    if not len(matches):
+        categories = np.append(categories, SUPPRESSED)
+        matches = [len(categories) - 1]
+    codes = values.codes.astype(code_dtype(len(categories)))
+    codes[rows] = matches[0]
+    return DictionaryColumn(codes, categories)
+
+
+def small_classes(columns: List[DictionaryColumn], k: int) -> np.ndarray:
+    """
+    Flags the rows whose combination of generalized values occurs fewer
+    than `k` times among the given rows.
+    """
+    if not columns:
+        return np.zeros(0, dtype=bool)
+    key = np.zeros(len(columns[0]), dtype=np.int64)
+    for column in columns:
+        # Re-factorizing after every column keeps the combined key dense
+        key = key * (len(column.categories) + 1) + column.codes.astype(np.int64) + 1
+        key = pd.factorize(key)[0]
+    return np.bincount(key)[key] < k
+
+
+def _column(columns, name: str):
+    return columns.column(name) if isinstance(columns, GeneratedTable) else columns[name]
+
+
+def _hex_tokens(digests: np.ndarray) -> np.ndarray:
+    nibbles = (digests[:, None] >> _HEX_SHIFTS) & np.uint64(15)
+    return _HEX_DIGITS[nibbles].view('S16').ravel().astype(str).astype(object)
+
+
+def _per_unique(values, func):
+    """
+    Applies a transform of distinct string values to a column, keeping
+    (or creating) dictionary encoding unless every value is distinct;
+    missing values stay missing.
+    """
+    if isinstance(values, DictionaryColumn):
+        return DictionaryColumn(values.codes, func(values.categories))
+    values = np.asarray(values, dtype=object)
+    codes, uniques = pd.factorize(values)
+    if len(uniques) == len(values):
+        return func(values)
+    return DictionaryColumn(codes.astype(code_dtype(len(uniques))), func(np.asarray(uniques, dtype=object)))
+
+
+class PrivacyMasker:
+    """
+    Masks generated tables chunk by chunk, as planned by `privacy_plan`.
+
+    Hashing and tokenization are keyed (SipHash for strings, a Feistel
+    permutation for integers), so equal values get equal pseudonyms across
+    tables, chunks and worker processes and foreign keys still join.
+    Hashed integers stay unique integers. Tokens keep every character
+    that is not a letter or digit, an email's whole domain and the letters
+    of phone numbers.
+    Generalization levels are fixed per table by `calibrate`; each chunk
+    then replaces the quasi-identifiers of rows whose combination occurs
+    fewer than `k` times in it by SUPPRESSED, so every exported
+    combination occurs at least `k` times. Which rows are suppressed
+    therefore depends on the chunk size, but not on the number of workers.
+    Instances are picklable and can be handed to worker processes.
+    """
+
+    def __init__(self, parsed_schema: Dict[str, Any], privacy_settings: dict = None, seed: int = None):
+        settings = parse_privacy(privacy_settings)
+        self.plan = privacy_plan(parsed_schema, settings)
+        self.k = settings["k"]
+        self.max_suppression = settings["max_suppression"]
+        self.hierarchies = {
+            table_name: {
+                column: _hierarchy(column, parsed_schema[table_name]["columns"][column])
+                for column, method in methods.items() if method == "generalize"
+            }
+            for table_name, methods in self.plan.items()
+        }
+        self.hierarchies = {table_name: columns for table_name, columns in self.hierarchies.items() if columns}
+        # Phone numbers keep letters such as an 'x' before the extension
+        self.digits_only = {
+            (table_name, column) for table_name, methods in self.plan.items() for column in methods
+            if semantic_type(column, parsed_schema[table_name]["columns"][column], require_faker=False) == "phone_number"
+        }
+        self.levels = {}
+
+        secret = _secret(settings) or f"seed:{resolve_seed(seed)}"
+        digest = hashlib.blake2b(
+            str(secret).encode('utf-8'), digest_size=12 + 8 * FEISTEL_ROUNDS, person=b'privacy-masker'
+        ).digest()
+        self._hash_key = base64.b64encode(digest[:12]).decode('ascii')
+        self._round_keys = np.frombuffer(digest[12:], dtype='<u8').astype(np.uint64)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.plan)
+
+    def describe(self) -> List[str]:
+        """
+        Lists the masked columns as 'table.column (method)'.
+        """
+        return [f"{table_name}.{column} ({method})" for table_name, methods in self.plan.items() for column, method in methods.items()]
+
+    def calibrate(self, table_name: str, columns) -> Dict[str, tuple]:
+        """
+        Fixes the generalization levels of a table from a sample chunk:
+        starting from the raw values, the column with the most distinct
+        labels is coarsened until at most `max_suppression` of the sample
+        falls in classes smaller than `k`. Returns {column: (level, top level)}.
+        """
+        hierarchies = self.hierarchies.get(table_name, {})
+        values = {column: _column(columns, column) for column in hierarchies}
+        tops = {column: _top_level(hierarchy, values[column]) for column, hierarchy in hierarchies.items()}
+        levels = dict.fromkeys(hierarchies, 0)
+        labels = {column: generalize(values[column], hierarchies[column], 0, tops[column]) for column in hierarchies}
+        while labels:
+            suppressed = small_classes(list(labels.values()), self.k)
+            coarsenable = [column for column in levels if levels[column] < tops[column]]
+            if not suppressed.size or suppressed.mean() <= self.max_suppression or not coarsenable:
+                break
+            column = max(coarsenable, key=lambda name: len(labels[name].categories))
+            levels[column] += 1
+            labels[column] = generalize(values[column], hierarchies[column], levels[column], tops[column])
+        self.levels[table_name] = {column: (levels[column], tops[column]) for column in hierarchies}
+        return self.levels[table_name]
+
+    def prepare(self, parsed_schema: Dict[str, Any], plan: Dict[str, Any], sample_rows: int = CALIBRATION_ROWS) -> None:
+        """
+        Calibrates every table with quasi-identifiers on its first
+        `sample_rows` rows, generated from the run's `plan_generation` plan,
+        so all chunks and workers of the run share the same levels. Pass
+        the chunk size: classes are counted per chunk of that many rows.
+        """
+        for table_name in self.hierarchies:
+            sample = generate_shard(
+                table_name, parsed_schema[table_name], 0, min(sample_rows, plan["row_counts"][table_name]),
+                plan["seed"], plan["references"][table_name]
+            )
+            self.calibrate(table_name, sample)
+
+    def masked_schema(self, parsed_schema: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns a copy of the schema with the number columns generalized
+        into text labels (level 1 and up) typed as strings, for writers that
+        declare column types up front. Call after calibrating.
+        """
+        schema = dict(parsed_schema)
+        for table_name, levels in self.levels.items():
+            labelled = [
+                column for column, (level, _) in levels.items()
+                if level and self.hierarchies[table_name][column] == "number"
+            ]
+            if labelled:
+                columns = dict(schema[table_name]["columns"])
+                for column in labelled:
+                    columns[column] = dict(columns[column], type="string")
+                schema[table_name] = dict(schema[table_name], columns=columns)
+        return schema
+
+    def hash_values(self, values):
+        """
+        Replaces strings by 16 hex digit keyed hashes and non-negative
+        integers by a keyed permutation of [0, 2**62).
+        """
+        if not isinstance(values, DictionaryColumn):
+            values = np.asarray(values)
+            if values.dtype.kind in 'iu':
+                return self._permute(values)
+        return _per_unique(values, self._hash_strings)
+
+    def tokenize(self, values, digits_only: bool = False):
+        """
+        Replaces every letter and digit (or, with `digits_only`, every
+        digit) by a keyed pseudo-random one of the same class, keeping
+        length, punctuation and an email's domain.
+        """
+        alphabets = _DIGITS if digits_only else _TOKEN_ALPHABETS
+        return _per_unique(values, lambda strings: self._tokenize_strings(strings, alphabets))
+
+    def _digests(self, values: np.ndarray) -> np.ndarray:
+        return pd.util.hash_array(values, hash_key=self._hash_key, categorize=False)
+
+    def _hash_strings(self, values: np.ndarray) -> np.ndarray:
+        return _hex_tokens(self._digests(values)) if len(values) else values
+
+    def _permute(self, values: np.ndarray) -> np.ndarray:
+        if values.size and (values.min() < 0 or values.max() >= HASHABLE_INT_LIMIT):
+            raise ValueError("Only integers in [0, 2**62) can be hashed")
+        values = values.astype(np.uint64)
+        left, right = values >> np.uint64(FEISTEL_HALF_BITS), values & FEISTEL_MASK
+        for round_key in self._round_keys:
+            left, right = right, left ^ (splitmix64(right ^ round_key, 0) & FEISTEL_MASK)
+        return ((left << np.uint64(FEISTEL_HALF_BITS)) | right).astype(np.int64)
+
+    def _tokenize_strings(self, values: np.ndarray, alphabets=_TOKEN_ALPHABETS) -> np.ndarray:
+        if not len(values):
+            return values
+        first, size = alphabets
+        chars = values.astype(str)
+        codes = chars.view(np.uint32).reshape(len(chars), -1)
+        sizes = size[np.minimum(codes, len(size) - 1)]
+        # Everything from an '@' on is an email domain and is kept
+        at = codes == ord('@')
+        domain = np.where(at.any(axis=1), at.argmax(axis=1), codes.shape[1])
+        sizes[np.arange(codes.shape[1]) >= domain[:, None]] = 0
+        cells = np.flatnonzero(sizes)
+        rows, positions = np.divmod(cells, codes.shape[1])
+        draws = splitmix64(self._digests(values)[rows] ^ positions.astype(np.uint64), 0) >> np.uint64(32)
+        tokens = codes.ravel().copy()
+        # The top 32 bits of each draw, scaled by the alphabet size, pick a character
+        tokens[cells] = first[tokens[cells]] + (draws * sizes.ravel()[cells] >> np.uint64(32))
+        return tokens.view(chars.dtype).astype(object)
+
+    def mask(self, table_name: str, columns) -> GeneratedTable:
+        """
+        Returns one chunk of a table (a GeneratedTable or dict of column
+        arrays) with its planned columns masked; other columns are passed
+        through untouched. Tables not yet calibrated are calibrated on this
+        chunk.
+        """
+        methods = self.plan.get(table_name)
+        source = columns.columns if isinstance(columns, GeneratedTable) else columns
+        if not methods:
+            return columns if isinstance(columns, GeneratedTable) else GeneratedTable(dict(source))
+        row_count = table_length(columns)
+        masked = dict(source)
+        for column, method in methods.items():
+            if method == "hash":
+                masked[column] = self.hash_values(source[column])
+            elif method == "tokenize":
+                masked[column] = self.tokenize(source[column], (table_name, column) in self.digits_only)
+            elif method == "redact":
+                masked[column] = DictionaryColumn(np.full(row_count, -1, dtype=np.int8), np.array([], dtype=object))
+
+        if table_name in self.hierarchies:
+            if table_name not in self.levels:
+                self.calibrate(table_name, columns)
+            generalized = {
+                column: generalize(source[column], hierarchy, *self.levels[table_name][column])
+                for column, hierarchy in self.hierarchies[table_name].items()
+            }
+            suppressed = small_classes(list(generalized.values()), self.k)
+            for column, values in generalized.items():
+                if not suppressed.any():
+                    # Level 0 passes the column through with its original type
+                    masked[column] = values if self.levels[table_name][column][0] else source[column]
+                else:
+                    masked[column] = _suppress(values, suppressed)
+        return GeneratedTable(masked, row_count)
+
@@ -0,0 +1,502 @@
+import argparse
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_generation_agent import column_kind
+from .generated_table import DictionaryColumn, code_dtype
+from .schema_analysis_agent import PROFILE_SUFFIX, analyze_schema_file
+
+# Bump whenever the profile file layout changes
+PROFILE_VERSION = 1
+
+DEFAULT_CHUNK_SIZE = 100_000
+# Rows kept in the uniform row sample that quantiles and correlations come from
+SAMPLE_ROWS = 20_000
+QUANTILE_POINTS = 257
+# Extra quantiles in each tail, so the extremes are not spread over a whole 1/256 step
+TAIL_PROBABILITIES = (1e-4, 1e-3, 5e-3)
+# Columns with at most this many distinct values are sampled from their frequencies
+MAX_CATEGORIES = 256
+# Distinct values counted per column before giving up on exact counts
+TRACKED_VALUES = 10_000
+# Weaker correlations are treated as none, so those columns stay independent
+MIN_CORRELATION = 0.05
+MAX_DECIMALS = 6
+PROFILE_SEED = 0
+
+# Column types ordered so that mixing two of them gives the later one
+KIND_ORDER = ("bool", "int", "float", "string")
+
+# Acklam's rational approximation of the standard normal quantile function
+_PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+          1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+          6.680131188771972e+01, -1.328068155288572e+01)
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+          -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+          3.754408661907416e+00)
+_PPF_LOW = 0.02425
+# Chebyshev fit of erfc (Numerical Recipes' erfcc), relative error below 1.2e-7
+_ERFC_COEFFICIENTS = (-1.26551223, 1.00002368, 0.37409196, 0.09678418, -0.18628806,
+                      0.27886807, -1.13520398, 1.48851587, -0.82215223, 0.17087277)
+_LARGEST_UNIFORM = np.nextafter(1.0, 0.0)
+
+
+def _polynomial(coefficients, x):
+    result = coefficients[0]
+    for coefficient in coefficients[1:]:
+        result = result * x + coefficient
+    return result
+
+
+def normal_ppf(u: np.ndarray) -> np.ndarray:
+    """
+    Standard normal quantile function (inverse CDF) of an array in (0, 1).
+    """
+    u = np.clip(np.asarray(u, dtype=np.float64), 1e-300, _LARGEST_UNIFORM)
+    z = np.empty_like(u)
+    tail = np.minimum(u, 1 - u)
+    central = tail >= _PPF_LOW
+
+    q = u[central] - 0.5
+    r = q * q
+    z[central] = _polynomial(_PPF_A, r) * q / (_polynomial(_PPF_B, r) * r + 1)
+
+    q = np.sqrt(-2 * np.log(tail[~central]))
+    sign = np.where(u[~central] < 0.5, 1.0, -1.0)
+    z[~central] = sign * _polynomial(_PPF_C, q) / (_polynomial(_PPF_D, q) * q + 1)
+    return z
+
+
+def normal_cdf(z: np.ndarray) -> np.ndarray:
+    """
+    Standard normal CDF of an array, clipped to [0, 1) like a uniform draw.
+    """
+    x = np.abs(np.asarray(z, dtype=np.float64)) / math.sqrt(2)
+    t = 1 / (1 + 0.5 * x)
+    erfc = t * np.exp(-x * x + _polynomial(_ERFC_COEFFICIENTS[::-1], t))
+    return np.minimum(np.where(z < 0, 0.5 * erfc, 1 - 0.5 * erfc), _LARGEST_UNIFORM)
+
+
+def profile_path(schema_path: str) -> str:
+    """
+    Returns where the profile of a schema file is stored.
+    """
+    return os.path.splitext(schema_path)[0] + PROFILE_SUFFIX
+
+
+class _ColumnSummary:
+    """
+    Running statistics of one CSV column, updated one chunk at a time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.kind = "bool"
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.counts = pd.Series(dtype=np.int64)
+
+    def add(self, series: pd.Series) -> None:
+        present = series.dropna()
+        self.nulls += len(series) - len(present)
+        if present.empty:
+            return
+        inferred = pd.api.types.infer_dtype(present, skipna=True)
+        kind = {"boolean": "bool", "integer": "int", "floating": "float", "mixed-integer-float": "float"}.get(inferred, "string")
+        if kind in ("int", "float"):
+            x = present.to_numpy(dtype=np.float64)
+            # Integer columns with nulls are read as floats
+            if kind == "float" and (x == np.rint(x)).all():
+                kind = "int"
+        if (kind == "bool") != (self.kind == "bool") and self.count:
+            kind = "string"
+        self.kind = max(self.kind, kind, key=KIND_ORDER.index)
+
+        if kind in ("int", "float"):
+            # Chan et al.'s pairwise update of the mean and sum of squares
+            count, mean = len(x), float(x.mean())
+            delta = mean - self.mean
+            total = self.count + count
+            self.mean += delta * count / total
+            self.m2 += float(((x - mean) ** 2).sum()) + delta * delta * self.count * count / total
+            self.minimum = min(self.minimum, float(x.min()))
+            self.maximum = max(self.maximum, float(x.max()))
+        self.count += len(present)
+
+        if self.counts is not None:
+            self.counts = self.counts.add(present.value_counts(), fill_value=0)
+            if len(self.counts) > TRACKED_VALUES:
+                self.counts = None
+
+    def finish(self, sample: pd.Series) -> Dict[str, Any]:
+        total = self.count + self.nulls
+        if not self.count:
+            self.kind = "string"
+        profile = {
+            "dtype": self.kind,
+            "count": self.count,
+            "nulls": self.nulls,
+            "null_rate": self.nulls / total if total else 0.0,
+            "distinct": len(self.counts) if self.counts is not None else None,
+        }
+        numeric = self.kind in ("int", "float") and self.count
+        if numeric:
+            values = _numeric(sample).dropna().to_numpy()
+            profile.update(
+                min=self.minimum, max=self.maximum, mean=self.mean,
+                std=math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0,
+                decimals=_decimals(values)
+            )
+
+        if self.counts is not None and 0 < len(self.counts) <= MAX_CATEGORIES:
+            counts = self.counts
+            if self.kind == "int":
+                counts.index = counts.index.astype(np.int64)
+            if self.kind == "string":
+                counts = counts.groupby(counts.index.map(str)).sum().sort_values(ascending=False, kind="stable")
+            else:
+                counts = counts.sort_index()
+            profile["categories"] = [_plain(value) for value in counts.index]
+            profile["frequencies"] = [int(count) for count in counts.to_numpy()]
+        elif numeric and len(values):
+            probabilities = quantile_probabilities()
+            quantiles = np.quantile(values, probabilities)
+            quantiles[0], quantiles[-1] = self.minimum, self.maximum
+            profile["probabilities"] = probabilities.tolist()
+            profile["quantiles"] = np.maximum.accumulate(quantiles).tolist()
+        return profile
+
+
+def quantile_probabilities() -> np.ndarray:
+    """
+    The cumulative probabilities at which numeric columns record quantiles.
+    """
+    tails = np.asarray(TAIL_PROBABILITIES)
+    return np.unique(np.concatenate([np.linspace(0, 1, QUANTILE_POINTS), tails, 1 - tails]))
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _numeric(series: pd.Series) -> pd.Series:
+    if pd.api.types.infer_dtype(series, skipna=True) == "boolean":
+        return series.astype(np.float64)
+    return pd.to_numeric(series, errors="coerce").astype(np.float64)
+
+
+def _decimals(values: np.ndarray) -> int:
+    """
+    The fewest decimals that reproduce every sampled value.
+    """
+    for decimals in range(MAX_DECIMALS):
+        if np.allclose(np.round(values, decimals), values, rtol=0, atol=10.0 ** -(decimals + 3)):
+            return decimals
+    return MAX_DECIMALS
+
+
+def _sample_correlations(sample: pd.DataFrame, columns: List[str]) -> Dict[str, Any]:
+    """
+    Pearson and normal-score (Gaussian copula) correlations of the numeric
+    columns in the row sample, over the rows where both columns are present.
+    """
+    numeric = pd.DataFrame({column: _numeric(sample[column]) for column in columns})
+    numeric = numeric.loc[:, numeric.std() > 0]
+    if numeric.shape[1] < 2:
+        return {}
+    ranks = numeric.rank(method="average")
+    scores = pd.DataFrame(
+        {column: normal_ppf((ranks[column] - 0.5) / ranks[column].count()) for column in numeric}, index=numeric.index
+    )
+    return {
+        "columns": list(numeric.columns),
+        "pearson": np.round(numeric.corr().fillna(0).to_numpy(), 6).tolist(),
+        "normal_scores": np.round(scores.corr().fillna(0).to_numpy(), 6).tolist(),
+    }
+
+
+def profile_csv(
+    csv_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sample_rows: int = SAMPLE_ROWS,
+    seed: int = PROFILE_SEED
+) -> Dict[str, Any]:
+    """
+    Scans a CSV file in chunks of `chunk_size` rows and returns its profile.
+
+    Counts, null rates, min/max, mean and standard deviation are exact; so
+    are the frequencies of columns with at most MAX_CATEGORIES distinct
+    values. Quantiles and correlations come from a uniform sample of
+    `sample_rows` rows (each row gets a random key; the smallest keys are
+    kept), so memory stays bounded however large the file is.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    rng = np.random.default_rng(seed)
+    summaries: Dict[str, _ColumnSummary] = {}
+    sample, sample_keys = None, np.empty(0)
+    rows = 0
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, low_memory=False):
+        for column in chunk.columns:
+            summaries.setdefault(column, _ColumnSummary()).add(chunk[column])
+        rows += len(chunk)
+
+        keys = np.concatenate([sample_keys, rng.random(len(chunk))])
+        candidates = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+        keep = np.sort(np.argpartition(keys, sample_rows)[:sample_rows]) if len(keys) > sample_rows else slice(None)
+        sample, sample_keys = candidates.iloc[keep].reset_index(drop=True), keys[keep]
+
+    if sample is None:
+        raise ValueError(f"{csv_path} has no header row")
+    columns = {column: summary.finish(sample[column]) for column, summary in summaries.items()}
+    numeric = [column for column, profile in columns.items() if profile["dtype"] in ("bool", "int", "float")]
+    return {
+        "source": os.path.basename(csv_path),
+        "rows": rows,
+        "sample_rows": len(sample),
+        "columns": columns,
+        "correlations": _sample_correlations(sample, numeric),
+    }
+
+
+def save_profile(schema_path: str, table_profiles: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Writes {table: profile} next to the schema file and returns its path.
+    """
+    path = profile_path(schema_path)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": PROFILE_VERSION, "tables": table_profiles}, f, indent=2, default=_plain)
+    os.replace(temp_path, path)
+    return path
+
+
+def load_profile(schema_path: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Returns the {table: profile} stored next to the schema file, or None.
+    """
+    path = profile_path(schema_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        profile = json.load(f)
+    if profile.get("version") != PROFILE_VERSION:
+        raise ValueError(f"{path} has profile version {profile.get('version')}, expected {PROFILE_VERSION}")
+    return profile["tables"]
+
+
+class ColumnProfile:
+    """
+    Draws one column's values from its profile by inverse-CDF lookup.
+
+    Columns with frequencies are sampled from their categories, numeric
+    columns by interpolating between quantiles; others keep the regular
+    generator and only take their null rate from the profile. A row is null
+    when the fractional part of u * 2**24 falls below the null rate, which
+    leaves the value drawn from u, and so its correlations, unchanged.
+    """
+
+    __slots__ = ("kind", "null_rate", "categories", "cumulative", "probabilities", "quantiles", "decimals")
+
+    def __init__(self, profile: Dict[str, Any], kind: str):
+        self.kind = kind
+        self.null_rate = float(profile.get("null_rate", 0.0))
+        self.categories = self.cumulative = self.probabilities = self.quantiles = None
+        self.decimals = int(profile.get("decimals", MAX_DECIMALS))
+
+        dtype = profile.get("dtype")
+        compatible = kind == "string" or (kind == "bool") == (dtype == "bool") and dtype != "string"
+        if profile.get("categories") and compatible:
+            if kind == "string":
+                self.categories = np.array([str(value) for value in profile["categories"]], dtype=object)
+            elif kind == "bool":
+                self.categories = np.array(profile["categories"], dtype=bool)
+            else:
+                self.categories = np.array(profile["categories"], dtype=np.float64)
+                if kind == "int":
+                    self.categories = np.rint(self.categories).astype(np.int64)
+            frequencies = np.asarray(profile["frequencies"], dtype=np.float64)
+            self.cumulative = np.cumsum(frequencies)[:-1] / frequencies.sum()
+        elif profile.get("quantiles") and kind in ("int", "float"):
+            self.quantiles = np.asarray(profile["quantiles"], dtype=np.float64)
+            self.probabilities = np.asarray(profile["probabilities"], dtype=np.float64)
+
+    @property
+    def shapes_values(self) -> bool:
+        return self.categories is not None or self.quantiles is not None
+
+    def sample(self, u: np.ndarray, fallback):
+        """
+        Turns uniforms in [0, 1) into values; `fallback(u)` draws the values
+        of a column whose profile has no distribution for them.
+        """
+        if self.categories is not None:
+            codes = np.searchsorted(self.cumulative, u, side="right")
+            if self.kind == "string":
+                values = DictionaryColumn(codes.astype(code_dtype(len(self.categories))), self.categories)
+            else:
+                values = self.categories[codes]
+        elif self.quantiles is not None:
+            values = np.interp(u, self.probabilities, self.quantiles)
+            values = np.rint(values).astype(np.int64) if self.kind == "int" else np.round(values, self.decimals)
+        else:
+            values = fallback(u)
+
+        if not self.null_rate:
+            return values
+        nulls = np.modf(u * 2 ** 24)[0] < self.null_rate
+        if isinstance(values, DictionaryColumn):
+            codes = values.codes.copy()
+            codes[nulls] = -1
+            return DictionaryColumn(codes, values.categories)
+        values = np.asarray(values).astype(object)
+        values[nulls] = None
+        return values
+
+
+class Copula:
+    """
+    A Gaussian copula over the profiled columns of one table.
+
+    `correlate` maps independent uniforms to uniforms whose normal scores
+    have the profiled correlations; each column's own distribution then
+    comes from its `ColumnProfile`. Rows are transformed independently, so
+    chunks and single rows give the same values.
+    """
+
+    def __init__(self, columns: List[str], correlations: np.ndarray):
+        matrix = np.asarray(correlations, dtype=np.float64)
+        # Nearest positive definite matrix with a unit diagonal
+        eigenvalues, eigenvectors = np.linalg.eigh((matrix + matrix.T) / 2)
+        matrix = (eigenvectors * np.maximum(eigenvalues, 1e-6)) @ eigenvectors.T
+        scale = np.sqrt(np.diag(matrix))
+        lower = np.linalg.cholesky(matrix / np.outer(scale, scale))
+        self.columns = list(columns)
+        self.terms = [[(j, float(lower[i, j])) for j in range(i + 1) if lower[i, j]] for i in range(len(columns))]
+
+    def __contains__(self, column) -> bool:
+        return column in self.columns
+
+    def correlate(self, uniforms: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        scores = [normal_ppf(uniforms[column]) for column in self.columns]
+        correlated = {}
+        for column, terms in zip(self.columns, self.terms):
+            z = 0.0
+            for j, weight in terms:
+                z = z + weight * scores[j]
+            correlated[column] = normal_cdf(z)
+        return correlated
+
+
+def _match_columns(profile_columns, schema_columns) -> Dict[str, str]:
+    """
+    Pairs schema columns with profiled CSV columns, by name and then case-insensitively.
+    """
+    lowered = {column.lower(): column for column in profile_columns}
+    matches = {}
+    for column in schema_columns:
+        if column in profile_columns:
+            matches[column] = column
+        elif column.lower() in lowered:
+            matches[column] = lowered[column.lower()]
+    return matches
+
+
+def apply_profile(parsed_schema: Dict[str, Any], table_profiles: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Attaches profiles from `profile_csv` (as {table: profile}) to a copy of
+    the parsed schema.
+
+    Every matched column gets a `ColumnProfile` under its 'profile'
+    property, and 'nullable' when the sample has nulls; tables whose
+    profiled numeric columns are correlated get a `Copula` under 'copula'.
+    Keys, foreign keys, unique columns and columns with fixed 'values'
+    keep their generators. The input schema is not modified; without
+    profiles it is returned as is.
+    """
+    if not table_profiles:
+        return parsed_schema
+    unknown = set(table_profiles) - set(parsed_schema)
+    if unknown:
+        raise ValueError(f"Profile has tables that are not in the schema: {', '.join(sorted(unknown))}")
+
+    schema = dict(parsed_schema)
+    for table_name, profile in table_profiles.items():
+        info = parsed_schema[table_name]
+        keys = {info.get("primary_key")} | {fk.get("column") for fk in info.get("foreign_keys", [])}
+        columns = {column: dict(properties) for column, properties in info.get("columns", {}).items()}
+        matches = _match_columns(profile["columns"], columns)
+        profiled = {}
+        for column, source in matches.items():
+            properties = columns[column]
+            if column in keys or properties.get("primary_key") or properties.get("unique") or properties.get("values"):
+                continue
+            column_profile = ColumnProfile(profile["columns"][source], column_kind(properties.get("type")))
+            if properties.get("not_null"):
+                column_profile.null_rate = 0.0
+            properties["profile"] = column_profile
+            properties["nullable"] = column_profile.null_rate > 0
+            if column_profile.shapes_values and column_profile.kind != "string":
+                profiled[source] = column
+
+        table_info = dict(info, columns=columns)
+        copula = _table_copula(profile.get("correlations") or {}, profiled)
+        if copula is not None:
+            table_info["copula"] = copula
+        schema[table_name] = table_info
+    return schema
+
+
+def _table_copula(correlations: Dict[str, Any], profiled: Dict[str, str]) -> Optional[Copula]:
+    """
+    Builds the copula of a table's correlated profiled columns, if any.
+    """
+    if not correlations:
+        return None
+    index = [i for i, source in enumerate(correlations["columns"]) if source in profiled]
+    matrix = np.asarray(correlations["normal_scores"], dtype=np.float64)[np.ix_(index, index)]
+    matrix[np.abs(matrix) < MIN_CORRELATION] = 0.0
+    np.fill_diagonal(matrix, 1.0)
+    # Uncorrelated columns keep their own independent streams
+    correlated = [k for k in range(len(index)) if np.count_nonzero(matrix[k]) > 1]
+    if len(correlated) < 2:
+        return None
+    columns = [profiled[correlations["columns"][index[k]]] for k in correlated]
+    return Copula(columns, matrix[np.ix_(correlated, correlated)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile a sample CSV and store the profile next to its schema.")
+    parser.add_argument("csv_path", help="sample data, one row per record")
+    parser.add_argument("schema_path", help="schema the generated data follows")
+    parser.add_argument("--table", help="table the CSV holds (defaults to the schema's only table)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--sample-rows", type=int, default=SAMPLE_ROWS)
+    args = parser.parse_args()
+
+    schema = analyze_schema_file(args.schema_path)
+    table = args.table or (next(iter(schema)) if len(schema) == 1 else None)
+    if table not in schema:
+        raise SystemExit(f"❌ Pick one of the schema's tables with --table: {', '.join(schema)}")
+
+    table_profiles = (load_profile(args.schema_path) or {})
+    table_profiles[table] = profile_csv(args.csv_path, args.chunk_size, args.sample_rows)
+    path = save_profile(args.schema_path, table_profiles)
+    profiled = _match_columns(table_profiles[table]["columns"], schema[table]["columns"])
+    print(f"✅ Profiled {table_profiles[table]['rows']:,} rows of {args.csv_path}: "
+          f"{len(profiled)}/{len(schema[table]['columns'])} columns of {table} matched → {path}")
+
+
+if __name__ == "__main__":
+    main()
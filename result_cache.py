@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict
+
+from .configuration_agent import file_digest, table_manifest, write_manifest
+from .data_generation_agent import GENERATOR_VERSION
+from .privacy_agent import MASKING_VERSION, privacy_fingerprint
+from .profiling_agent import profile_path
+from .schema_analysis_agent import SCHEMA_PARSER_VERSION
+from .value_pools import pool_version
+
+DEFAULT_CACHE_DIR = os.path.join('data', 'outputs', '.cache')
+DEFAULT_MAX_BYTES = 10 * (1 << 30)
+ENTRY_FILE = 'entry.json'
+
+
+def result_key(schema_path: str, config: dict, seed: int = None) -> str:
+    """
+    Returns the cache key of a generation request: a hash of the schema
+    file's content and of everything that shapes the exported files.
+
+    The row count, format, seed, custom rules, privacy and export options,
+    the masking key's fingerprint, the schema's sample data profile and the
+    generator, masking, parser and value pool versions are all part of the key. Worker
+    count and chunk size only matter when they split tables into part files.
+    """
+    parallel = (config.get('workers') or 1) > 1
+    profile = profile_path(schema_path)
+    request = {
+        "schema_sha256": file_digest(schema_path)[1],
+        "profile_sha256": file_digest(profile)[1] if os.path.exists(profile) else None,
+        "rows": config['data_volume'],
+        "format": config['export_format'],
+        "seed": seed,
+        "custom_rules": config.get('custom_rules'),
+        "privacy_settings": config.get('privacy_settings'),
+        "privacy_key": privacy_fingerprint(config.get('privacy_settings')),
+        "export_options": config.get('export_options'),
+        "part_rows": config.get('chunk_size') if parallel else None,
+        "generator_version": GENERATOR_VERSION,
+        "masking_version": MASKING_VERSION,
+        "parser_version": SCHEMA_PARSER_VERSION,
+        "value_pools": pool_version()
+    }
+    encoded = json.dumps(request, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _link_or_copy(source: str, target: str) -> None:
+    """
+    Hard-links `source` to `target` (replacing it atomically), copying when
+    the two are on different file systems.
+    """
+    if os.path.exists(target) and os.path.samefile(source, target):
+        return
+    temp_path = f"{target}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copy2(source, temp_path)
+    os.replace(temp_path, target)
+
+
+class ResultCache:
+    """
+    Content-addressed store of exported results, bounded to `max_bytes`.
+
+    Each entry is a directory named by its key, holding hard links to the
+    exported files and an entry.json with the pipeline result. A hit links
+    the files back into the requested output directory instead of running
+    the pipeline. The least recently used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        for key in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, key, ENTRY_FILE)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            self._entries[key] = {"bytes": entry["bytes"], "last_used": entry["last_used"]}
+
+    def get(self, key: str, output_dir: str) -> Dict[str, Any]:
+        """
+        On a hit, links the cached files into `output_dir` and returns the
+        cached result with its paths pointing there; returns None on a miss.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries[key]["last_used"] = time.time()
+            self.hits += 1
+            with open(os.path.join(entry_dir, ENTRY_FILE), encoding='utf-8') as f:
+                entry = json.load(f)
+            os.makedirs(output_dir, exist_ok=True)
+            for info in entry["tables"].values():
+                for file in info["files"]:
+                    file["path"] = os.path.join(output_dir, os.path.basename(file["path"]))
+                    _link_or_copy(os.path.join(entry_dir, os.path.basename(file["path"])), file["path"])
+            entry["last_used"] = self._entries[key]["last_used"]
+            self._write_entry(entry_dir, entry)
+
+        exported = {}
+        for table_name, info in entry["tables"].items():
+            exported[table_name] = table_manifest(info["files"])
+            if "validation" in info:
+                exported[table_name]["validation"] = info["validation"]
+        write_manifest(entry["format"], output_dir, exported, 0.0)
+        return exported
+
+    def put(self, key: str, export_format: str, exported: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Stores a pipeline result by hard-linking its files into the cache.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        temp_dir = f"{entry_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+        os.makedirs(temp_dir, exist_ok=True)
+        size = 0
+        for info in exported.values():
+            for file in info["files"]:
+                _link_or_copy(file["path"], os.path.join(temp_dir, os.path.basename(file["path"])))
+                size += file["bytes"]
+        entry = {
+            "format": export_format,
+            "bytes": size,
+            "last_used": time.time(),
+            "tables": {
+                table_name: {key: value for key, value in info.items() if key in ("files", "validation")}
+                for table_name, info in exported.items()
+            }
+        }
+        self._write_entry(temp_dir, entry)
+
+        with self._lock:
+            try:
+                os.rename(temp_dir, entry_dir)
+            except OSError:
+                # An identical request stored the same result first
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                return
+            self._entries[key] = {"bytes": size, "last_used": entry["last_used"]}
+            self.stores += 1
+            self._evict()
+
+    def _write_entry(self, entry_dir: str, entry: Dict[str, Any]) -> None:
+        path = os.path.join(entry_dir, ENTRY_FILE)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(entry, f, default=str)
+        os.replace(f"{path}.tmp", path)
+
+    def _evict(self) -> None:
+        total = sum(entry["bytes"] for entry in self._entries.values())
+        for key in sorted(self._entries, key=lambda k: self._entries[k]["last_used"]):
+            if total <= self.max_bytes or len(self._entries) == 1:
+                break
+            total -= self._entries.pop(key)["bytes"]
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": sum(entry["bytes"] for entry in self._entries.values()),
+                "max_bytes": self.max_bytes
+            }
@@ -1,72 +1,365 @@
 import os
 import json
-import sqlparse
 import re
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-# Global variable for parsing JSON
-current_file = None
+# Bump when parser output changes so on-disk schema cache entries are not reused
+SCHEMA_PARSER_VERSION = 7
+# Sample data profiles are stored next to their schema (see profiling_agent)
+PROFILE_SUFFIX = ".profile.json"
+
+# Croissant (schema.org) data types -> parser column types
+CROISSANT_TYPES = {
+    "integer": "int",
+    "float": "float",
+    "number": "float",
+    "boolean": "bool",
+    "date": "date",
+    "datetime": "datetime",
+}
+
+_SQL_TOKEN = re.compile(r"""
+    \s+ | --[^\n]* | /\*.*?\*/
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])
+  | (?P<word>[A-Za-z_][\w$]*)
+  | (?P<number>[-+]?\d+(?:\.\d+)?)
+  | (?P<symbol>>=|<=|<>|!=|::|\|\||\S)
+""", re.S | re.X)
+
+# Keywords that end a column's type and start its inline constraints
+_COLUMN_CONSTRAINT_WORDS = {
+    "NOT", "NULL", "PRIMARY", "UNIQUE", "REFERENCES", "CHECK", "DEFAULT", "CONSTRAINT",
+    "AUTO_INCREMENT", "AUTOINCREMENT", "IDENTITY", "GENERATED", "COLLATE", "COMMENT", "ON"
+}
+
+# Table-level index clauses, e.g. MySQL's KEY idx_name (column)
+_INDEX_CLAUSE_WORDS = {"KEY", "INDEX", "FULLTEXT", "SPATIAL", "EXCLUDE"}
+# Type names that tell a column called e.g. `key` from an index clause
+_SQL_TYPE_WORDS = {
+    "INT", "INTEGER", "BIGINT", "SMALLINT", "TINYINT", "MEDIUMINT", "SERIAL", "BIGSERIAL", "SMALLSERIAL",
+    "DECIMAL", "NUMERIC", "DEC", "FLOAT", "DOUBLE", "REAL", "MONEY", "BOOL", "BOOLEAN", "BIT",
+    "CHAR", "CHARACTER", "VARCHAR", "NCHAR", "NVARCHAR", "VARCHAR2", "TEXT", "TINYTEXT", "MEDIUMTEXT",
+    "LONGTEXT", "CLOB", "STRING", "BLOB", "BYTEA", "BINARY", "VARBINARY", "DATE", "TIME", "DATETIME",
+    "TIMESTAMP", "TIMESTAMPTZ", "INTERVAL", "YEAR", "UUID", "JSON", "JSONB", "XML", "ENUM", "SET",
+}
+
+def _sql_tokens(sql_text):
+    """
+    Yields (kind, text) tokens in one pass, dropping whitespace and comments.
+    Quoted identifiers are unquoted and reported as names, which are never
+    keywords.
+    """
+    for match in _SQL_TOKEN.finditer(sql_text):
+        kind = match.lastgroup
+        if kind is None:
+            continue
+        text = match.group(kind)
+        if kind == "quoted":
+            yield "name", text[1:-1]
+        else:
+            yield kind, text
+
+def _split_elements(tokens):
+    """
+    Splits the tokens of a table body at top-level commas.
+    """
+    elements, current, depth = [], [], 0
+    for kind, text in tokens:
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        if text == "," and depth == 0 and kind == "symbol":
+            elements.append(current)
+            current = []
+        else:
+            current.append((kind, text))
+    if current:
+        elements.append(current)
+    return elements
+
+def _take_parenthesized(element, index):
+    """
+    Returns (tokens inside the parentheses starting at `index`, index after them).
+    """
+    depth, inner = 0, []
+    for position in range(index, len(element)):
+        text = element[position][1]
+        if text == "(":
+            depth += 1
+            if depth == 1:
+                continue
+        elif text == ")":
+            depth -= 1
+            if depth == 0:
+                return inner, position + 1
+        inner.append(element[position])
+    return inner, len(element)
+
+def _names(tokens):
+    return [text for kind, text in tokens if kind in ("word", "name")]
+
+def _last_name(element, index):
+    """
+    Reads a possibly schema-qualified name and returns (last part, next index).
+    """
+    name = element[index][1]
+    index += 1
+    while index + 1 < len(element) and element[index][1] == ".":
+        name = element[index + 1][1]
+        index += 2
+    return name, index
+
+def _add_foreign_key(table, column, ref_table, ref_column):
+    fk_info = {"column": column, "ref_table": ref_table, "ref_column": ref_column}
+    if fk_info not in table["foreign_keys"]:
+        table["foreign_keys"].append(fk_info)
+    if column in table["columns"]:
+        table["columns"][column]["foreign_key"] = {"table": ref_table, "column": ref_column}
+
+def _join_tokens(tokens):
+    text = " ".join(token for _, token in tokens)
+    return text.replace("( ", "(").replace(" )", ")").replace(" ,", ",")
+
+def _parse_column(element, table):
+    name = element[0][1]
+    index = 1
+    type_tokens = []
+    while index < len(element):
+        kind, text = element[index]
+        if kind == "word" and text.upper() in _COLUMN_CONSTRAINT_WORDS:
+            break
+        if text == "(":
+            inner, index = _take_parenthesized(element, index)
+            type_tokens.append(("symbol", "(" + ",".join(t for _, t in inner if t != ",") + ")"))
+            continue
+        type_tokens.append((kind, text))
+        index += 1
+
+    column = {"type": "".join(
+        text if text.startswith("(") or not position else " " + text
+        for position, (_, text) in enumerate(type_tokens)
+    ) or "string"}
+
+    while index < len(element):
+        word = element[index][1].upper()
+        if word == "NOT" and index + 1 < len(element) and element[index + 1][1].upper() == "NULL":
+            column["not_null"] = True
+            index += 2
+        elif word == "PRIMARY":
+            column["primary_key"] = True
+            column["not_null"] = True
+            table["primary_key"] = name
+            index += 2
+        elif word == "UNIQUE":
+            column["unique"] = True
+            index += 1
+        elif word == "REFERENCES":
+            ref_table, index = _last_name(element, index + 1)
+            ref_columns = []
+            if index < len(element) and element[index][1] == "(":
+                inner, index = _take_parenthesized(element, index)
+                ref_columns = _names(inner)
+            # Without a column list, the referenced primary key (see _resolve_default_references)
+            ref_column = ref_columns[0] if ref_columns else 0
+            column["foreign_key"] = {"table": ref_table, "column": ref_column}
+            _add_foreign_key(table, name, ref_table, ref_column)
+        elif word == "CHECK":
+            inner, index = _take_parenthesized(element, index + 1)
+            column["check"] = _join_tokens(inner)
+        elif word == "CONSTRAINT":
+            index += 2
+        else:
+            index += 1
+
+    table["columns"][name] = column
+
+def _parse_table_constraint(element, table):
+    """
+    Applies a table-level constraint; returns False if the element is a column.
+    """
+    if element[0][0] == "name":
+        return False
+    index = 0
+    if element[0][1].upper() == "CONSTRAINT":
+        index = 2
+    if index >= len(element):
+        return True
+    word = element[index][1].upper()
+    columns = table["columns"]
+
+    if word == "PRIMARY":
+        # PRIMARY KEY [CLUSTERED | NONCLUSTERED] (...)
+        while index < len(element) and element[index][1] != "(":
+            index += 1
+        inner, _ = _take_parenthesized(element, index)
+        keys = _names(inner)
+        table["primary_key"] = keys[0] if len(keys) == 1 else keys
+        for key in keys:
+            if key in columns:
+                columns[key]["not_null"] = True
+                if len(keys) == 1:
+                    columns[key]["primary_key"] = True
+        return True
+
+    if word == "FOREIGN":
+        inner, index = _take_parenthesized(element, index + 2)
+        local = _names(inner)
+        ref_table, index = _last_name(element, index + 1)
+        remote = []
+        if index < len(element) and element[index][1] == "(":
+            inner, index = _take_parenthesized(element, index)
+            remote = _names(inner)
+        # Without a column list, the referenced primary key (see _resolve_default_references)
+        for position, fk_col in enumerate(local):
+            _add_foreign_key(table, fk_col, ref_table, remote[position] if remote else position)
+        return True
+
+    if word == "UNIQUE":
+        while index < len(element) and element[index][1] != "(":
+            index += 1
+        inner, _ = _take_parenthesized(element, index)
+        keys = _names(inner)
+        if len(keys) == 1 and keys[0] in columns:
+            columns[keys[0]]["unique"] = True
+        elif keys:
+            table.setdefault("unique_constraints", []).append(keys)
+        return True
+
+    if word == "CHECK":
+        inner, _ = _take_parenthesized(element, index + 1)
+        table.setdefault("checks", []).append(_join_tokens(inner))
+        return True
+
+    # KEY idx_name (...) or INDEX (...), but not a column such as `key VARCHAR(10)`
+    if word not in _INDEX_CLAUSE_WORDS or element[index][0] != "word" or index + 1 >= len(element):
+        return False
+    kind, text = element[index + 1]
+    return text == "(" or (kind in ("word", "name") and text.upper() not in _SQL_TYPE_WORDS)
 
 def parse_sql_schema(sql_text):
+    """
+    Parses every CREATE TABLE statement of a DDL script in a single pass.
+
+    Handles inline and table-level PRIMARY KEY, FOREIGN KEY, UNIQUE,
+    NOT NULL and CHECK constraints, composite keys (a composite primary key
+    is returned as a list) and parameterized types such as DECIMAL(10,2).
+    Other statements are skipped.
+    """
     schema = {}
-    statements = sqlparse.parse(sql_text)
+    statement = []
+    depth = 0
 
-    for stmt in statements:
-        stmt = str(stmt).strip()
-        if not stmt.lower().startswith("create table"):
+    for kind, text in _sql_tokens(sql_text):
+        if text == ";" and depth == 0:
+            _parse_statement(statement, schema)
+            statement = []
             continue
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        statement.append((kind, text))
+    _parse_statement(statement, schema)
+    _resolve_default_references(schema)
 
-        # Extract table name
-        table_match = re.search(r'create table\s+(\w+)\s*\(', stmt, re.IGNORECASE)
-        if not table_match:
-            continue
+    return schema
 
-        table_name = table_match.group(1)
-        schema[table_name] = {
-            "columns": {},
-            "primary_key": None,
-            "foreign_keys": [],
-            "row_count": 10
-        }
-
-        # Extract column definitions (excluding constraints)
-        column_defs = re.findall(r'(\w+)\s+([\w()]+)[,\n]', stmt)
-        for col_name, col_type in column_defs:
-            schema[table_name]["columns"][col_name] = {"type": col_type}
-
-        # Extract primary key
-        pk_match = re.search(r'primary key\s*\((.*?)\)', stmt, re.IGNORECASE)
-        if pk_match:
-            pk_column = pk_match.group(1).strip()
-            schema[table_name]["primary_key"] = pk_column
-            if pk_column in schema[table_name]["columns"]:
-                schema[table_name]["columns"][pk_column]["primary_key"] = True
-
-        # Extract foreign keys
-        fk_matches = re.findall(
-            r'foreign key\s*\((.*?)\)\s*references\s+(\w+)\s*\((.*?)\)', stmt, re.IGNORECASE
-        )
-        for fk_col, ref_table, ref_col in fk_matches:
-            fk_info = {
-                "column": fk_col.strip(),
-                "ref_table": ref_table.strip(),
-                "ref_column": ref_col.strip()
-            }
-            schema[table_name]["foreign_keys"].append(fk_info)
-            if fk_col.strip() in schema[table_name]["columns"]:
-                schema[table_name]["columns"][fk_col.strip()]["foreign_key"] = {
-                    "table": ref_table.strip(),
-                    "column": ref_col.strip()
-                }
+def _resolve_default_references(schema):
+    """
+    Points foreign keys declared without a column list (REFERENCES t), which
+    hold the position of the column in the key, at the referenced table's
+    primary key columns, or at `id` when the table or its key is unknown.
+    Referenced tables may be created later in the script.
+    """
+    def resolve(ref_table, ref_column):
+        if not isinstance(ref_column, int):
+            return ref_column
+        primary_key = schema.get(ref_table, {}).get("primary_key")
+        keys = primary_key if isinstance(primary_key, list) else [primary_key] if primary_key else []
+        return keys[ref_column] if ref_column < len(keys) else "id"
+
+    for table in schema.values():
+        foreign_keys = []
+        for fk in table["foreign_keys"]:
+            fk = dict(fk, ref_column=resolve(fk["ref_table"], fk["ref_column"]))
+            if fk not in foreign_keys:
+                foreign_keys.append(fk)
+        table["foreign_keys"] = foreign_keys
+        for column in table["columns"].values():
+            reference = column.get("foreign_key")
+            if reference is not None:
+                reference["column"] = resolve(reference["table"], reference["column"])
+
+def _parse_statement(statement, schema):
+    words = [text.upper() for _, text in statement[:8]]
+    if len(words) < 3 or words[0] != "CREATE" or "TABLE" not in words:
+        return
+
+    index = words.index("TABLE") + 1
+    if index < len(statement) and statement[index][1].upper() == "IF":
+        index += 3
+    if index >= len(statement):
+        return
+    table_name, index = _last_name(statement, index)
+    if index >= len(statement) or statement[index][1] != "(":
+        return
+
+    body, _ = _take_parenthesized(statement, index)
+    table = {
+        "columns": {},
+        "primary_key": None,
+        "foreign_keys": [],
+        "row_count": 10
+    }
+    schema[table_name] = table
+
+    for element in _split_elements(body):
+        if element and not _parse_table_constraint(element, table):
+            _parse_column(element, table)
 
+def table_name_for_file(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+def _croissant_type(data_type):
+    types = data_type if isinstance(data_type, list) else [data_type]
+    name = str(types[0] if types else "").split(":")[-1].lower()
+    return CROISSANT_TYPES.get(name, "string")
+
+def parse_croissant_schema(raw, table_name):
+    """
+    Parses the record sets of a Croissant dataset description: one table
+    per record set, named `table_name` when there is only one. Columns are
+    named after the CSV column each field is extracted from.
+    """
+    schema = {}
+    record_sets = raw.get("recordSet", [])
+    for record_set in record_sets:
+        name = table_name
+        if len(record_sets) > 1:
+            name = f"{table_name}_{os.path.splitext(record_set.get('name') or record_set.get('@id'))[0]}"
+        table = {"columns": {}, "primary_key": None, "foreign_keys": [], "row_count": 10}
+        for field in record_set.get("field", []):
+            column = field.get("source", {}).get("extract", {}).get("column") or field["name"]
+            table["columns"][column] = {"type": _croissant_type(field.get("dataType"))}
+        schema[name] = table
     return schema
 
-def parse_json_schema(json_text):
-    global current_file
+def parse_json_schema(json_text, table_name):
+    """
+    Parses a JSON schema into a single table named `table_name`; Croissant
+    metadata (with a `recordSet` list) is handed to `parse_croissant_schema`.
+    """
     raw = json.loads(json_text)
+    if "recordSet" in raw and "fields" not in raw:
+        return parse_croissant_schema(raw, table_name)
     schema = {}
 
-    # Get table name from file
-    table_name = os.path.splitext(os.path.basename(current_file))[0]
     schema[table_name] = {
         "columns": {},
         "primary_key": raw.get("primaryKey", None),
@@ -80,26 +373,158 @@ def parse_json_schema(json_text):
 
         schema[table_name]["columns"][col_name] = {"type": col_type}
 
+        # Optional hint for realistic values, e.g. "email" (see value_pools)
+        if field.get("semantic_type"):
+            schema[table_name]["columns"][col_name]["semantic_type"] = field["semantic_type"]
+
         # Mark as primary key if applicable
         if col_name == raw.get("primaryKey"):
             schema[table_name]["columns"][col_name]["primary_key"] = True
 
     return schema
 
-def analyze_schema_file(file_path):
-    global current_file
-    current_file = file_path
-
-    with open(file_path, 'r') as f:
-        content = f.read()
-
+def _parse_schema_content(file_path, content):
     if file_path.endswith(".sql"):
         return parse_sql_schema(content)
     elif file_path.endswith(".json"):
-        return parse_json_schema(content)
+        return parse_json_schema(content, table_name_for_file(file_path))
     else:
         raise ValueError("Unsupported file type: must be .sql or .json")
 
+def analyze_schema_file(file_path):
+    with open(file_path, 'r') as f:
+        content = f.read()
+
+    return _parse_schema_content(file_path, content)
+
+class SchemaCache:
+    """
+    Thread-safe LRU cache of parsed schemas keyed by path, mtime and content hash.
+
+    An unchanged (path, mtime, size) is served without reading the file; a
+    touched file with the same SHA-256 is served without parsing. With
+    `cache_dir`, parsed schemas are also stored on disk by content hash so
+    they survive restarts.
+    """
+
+    def __init__(self, max_entries=64, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, file_path, digest):
+        name = f"{os.path.basename(file_path)}.v{SCHEMA_PARSER_VERSION}.{digest[:32]}.json"
+        return os.path.join(self.cache_dir, name)
+
+    def _load_from_disk(self, file_path, digest):
+        if not self.cache_dir:
+            return None
+        disk_path = self._disk_path(file_path, digest)
+        if not os.path.exists(disk_path):
+            return None
+        with open(disk_path, 'r') as f:
+            return json.load(f)
+
+    def _save_to_disk(self, file_path, digest, schema):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        disk_path = self._disk_path(file_path, digest)
+        tmp_path = f"{disk_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(schema, f)
+        os.replace(tmp_path, disk_path)
+
+    def get(self, file_path):
+        """
+        Returns the parsed schema of `file_path`, parsing it only on a miss.
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                self.hits += 1
+                self._entries.move_to_end(path)
+                return copy.deepcopy(entry["schema"])
+
+        # Read, hash and parse outside the lock so other files are not blocked
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        if entry and entry["digest"] == digest:
+            schema, source = entry["schema"], "memory"
+        else:
+            schema = self._load_from_disk(path, digest)
+            source = "disk"
+            if schema is None:
+                schema, source = _parse_schema_content(path, raw.decode('utf-8')), "parsed"
+                self._save_to_disk(path, digest, schema)
+
+        with self._lock:
+            if source == "parsed":
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.disk_hits += source == "disk"
+
+            self._entries[path] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "digest": digest,
+                "schema": schema
+            }
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return copy.deepcopy(schema)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries)
+            }
+
+schema_cache = SchemaCache()
+
+def analyze_schema_file_cached(file_path):
+    """
+    Like `analyze_schema_file`, but served from the shared `schema_cache`.
+    """
+    return schema_cache.get(file_path)
+
+def analyze_schema_directory(schema_dir, max_workers=None, use_cache=True):
+    """
+    Parses every .sql and .json schema in `schema_dir` concurrently,
+    skipping the sample data profiles stored beside them.
+
+    Returns {filename: parsed schema}. With `use_cache`, results also land
+    in the shared `schema_cache`, so this doubles as a startup preload.
+    """
+    file_names = sorted(
+        name for name in os.listdir(schema_dir)
+        if (name.endswith(".sql") or name.endswith(".json")) and not name.endswith(PROFILE_SUFFIX)
+    )
+    analyze = analyze_schema_file_cached if use_cache else analyze_schema_file
+    paths = [os.path.join(schema_dir, name) for name in file_names]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(file_names, executor.map(analyze, paths)))
+
 def analyze_schema(schema_filename):
     base_dir = os.path.dirname(os.path.abspath(__file__))
     schema_path = os.path.abspath(os.path.join(base_dir, "..", "..", "data", "schemas", schema_filename))
@@ -119,7 +544,7 @@ if __name__ == "__main__":
 
     print("Available schema files:")
     for fname in os.listdir(schema_dir):
-        if fname.endswith(".json") or fname.endswith(".sql"):
+        if (fname.endswith(".json") or fname.endswith(".sql")) and not fname.endswith(PROFILE_SUFFIX):
             print("-", fname)
 
     schema_file = input("\nEnter schema filename to analyze: ").strip()
@@ -0,0 +1,168 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .generated_table import DictionaryColumn, GeneratedTable, render_dictionary
+
+SQL_MODES = ('insert', 'copy', 'sqlite')
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_TRANSACTION_ROWS = 100_000
+
+_COPY_TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def table_columns(table_data) -> Dict[str, Any]:
+    """
+    Returns a table as {column: values}, accepting rows, column arrays or a
+    GeneratedTable (whose dictionary columns stay encoded).
+    """
+    if isinstance(table_data, GeneratedTable):
+        return table_data.columns
+    if isinstance(table_data, dict):
+        return table_data
+    if not table_data:
+        return {}
+    names = list(table_data[0])
+    return {name: [row.get(name) for row in table_data] for name in names}
+
+
+def sql_literals(values) -> List[str]:
+    """
+    Renders a whole column as SQL literals in a few vectorized passes.
+    """
+    if isinstance(values, DictionaryColumn):
+        return render_dictionary(values, sql_literals, "NULL")
+    array = np.asarray(values)
+    kind = array.dtype.kind
+    if kind in "iu":
+        return array.astype(str).tolist()
+    if kind == "b":
+        return np.where(array, "TRUE", "FALSE").tolist()
+    if kind == "f":
+        return np.where(np.isnan(array), "NULL", array.astype(str)).tolist()
+
+    series = pd.Series(values, dtype=object)
+    if pd.api.types.infer_dtype(series, skipna=True) == "string":
+        literals = "'" + series.str.replace("'", "''", regex=False) + "'"
+        return literals.where(series.notna(), "NULL").tolist()
+    return [_sql_literal(value) for value in series.tolist()]
+
+
+def _sql_literal(value) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "NULL"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, (bool, np.bool_)):
+        return "TRUE" if value else "FALSE"
+    return str(value)
+
+
+def copy_text_values(values) -> List[str]:
+    """
+    Renders a column in PostgreSQL COPY text format (\\N for NULL, t/f for booleans).
+    """
+    if isinstance(values, DictionaryColumn):
+        return render_dictionary(values, copy_text_values, "\\N")
+    array = np.asarray(values)
+    kind = array.dtype.kind
+    if kind in "iu":
+        return array.astype(str).tolist()
+    if kind == "b":
+        return np.where(array, "t", "f").tolist()
+    if kind == "f":
+        return np.where(np.isnan(array), "\\N", array.astype(str)).tolist()
+
+    series = pd.Series(values, dtype=object)
+    if pd.api.types.infer_dtype(series, skipna=True) == "boolean":
+        text = series.map({True: "t", False: "f"})
+    else:
+        text = series.astype(str).str.translate(_COPY_TEXT_ESCAPES)
+    return text.where(series.notna(), "\\N").tolist()
+
+
+def sqlite_type(values) -> str:
+    kind = np.asarray(values).dtype.kind
+    if kind in "iub":
+        return "INTEGER"
+    if kind == "f":
+        return "REAL"
+    return "TEXT"
+
+
+class SqlChunkWriter:
+    """
+    Writes SQL for one table chunk by chunk.
+
+    Modes:
+      - "insert": multi-row INSERTs of `batch_size` rows, wrapped in
+        BEGIN/COMMIT every `transaction_rows` rows
+      - "copy":   one PostgreSQL `COPY ... FROM STDIN` block in text format
+      - "sqlite": a SQLite-ready dump (CREATE TABLE + batched INSERTs in one transaction)
+    """
+
+    def __init__(
+        self,
+        file,
+        table_name: str,
+        mode: str = 'insert',
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        transaction_rows: int = DEFAULT_TRANSACTION_ROWS
+    ):
+        if mode not in SQL_MODES:
+            raise ValueError(f"Unsupported SQL export mode: '{mode}'. Supported modes are: {', '.join(SQL_MODES)}")
+        self.file = file
+        self.table_name = table_name
+        self.mode = mode
+        self.batch_size = max(1, int(batch_size))
+        self.transaction_rows = max(1, int(transaction_rows))
+        self._started = False
+        self._rows_in_transaction = 0
+
+    def _start(self, columns: Dict[str, Any]) -> None:
+        names = ', '.join(columns)
+        if self.mode == 'copy':
+            self.file.write(f"COPY {self.table_name} ({names}) FROM STDIN;\n")
+        elif self.mode == 'sqlite':
+            definitions = ', '.join(f"{name} {sqlite_type(values)}" for name, values in columns.items())
+            self.file.write("PRAGMA foreign_keys=OFF;\nBEGIN TRANSACTION;\n")
+            self.file.write(f"CREATE TABLE IF NOT EXISTS {self.table_name} ({definitions});\n")
+        self._insert_prefix = f"INSERT INTO {self.table_name} ({names}) VALUES\n"
+        self._started = True
+
+    def write(self, table_data) -> int:
+        columns = table_columns(table_data)
+        if not columns:
+            return 0
+        if not self._started:
+            self._start(columns)
+
+        if self.mode == 'copy':
+            rendered = [copy_text_values(values) for values in columns.values()]
+            lines = ["\t".join(row) for row in zip(*rendered)]
+            if lines:
+                self.file.write("\n".join(lines) + "\n")
+            return len(lines)
+
+        rendered = [sql_literals(values) for values in columns.values()]
+        tuples = ["(" + ", ".join(row) + ")" for row in zip(*rendered)]
+        for start in range(0, len(tuples), self.batch_size):
+            batch = tuples[start:start + self.batch_size]
+            if self.mode == 'insert' and self._rows_in_transaction == 0:
+                self.file.write("BEGIN;\n")
+            self.file.write(self._insert_prefix + ",\n".join(batch) + ";\n")
+            self._rows_in_transaction += len(batch)
+            if self.mode == 'insert' and self._rows_in_transaction >= self.transaction_rows:
+                self.file.write("COMMIT;\n")
+                self._rows_in_transaction = 0
+        return len(tuples)
+
+    def close(self) -> None:
+        if self.mode == 'copy' and self._started:
+            self.file.write("\\.\n")
+        elif self.mode == 'sqlite' and self._started:
+            self.file.write("COMMIT;\n")
+        elif self.mode == 'insert' and self._rows_in_transaction:
+            self.file.write("COMMIT;\n")
+            self._rows_in_transaction = 0
@@ -8,12 +8,27 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Import your agent modules
 from agents.configuration_agent import configure_generation
-from agents.schema_analysis_agent import analyze_schema_file
-from agents.data_generation_agent import generate_data
-from agents.validation_agent import validate_all_tables
+from agents.custom_rules import apply_rules
+from agents.profiling_agent import apply_profile, load_profile
+from agents.schema_analysis_agent import analyze_schema_file_cached
+from agents.data_generation_agent import generate_columns
+from agents.preload import preload_in_background
+from agents.privacy_agent import PrivacyMasker
+from agents.validation_agent import summarize_results, validate_all_tables
+from agents.validation_report import format_summary
 
 # Streamlit Page Setup
 st.set_page_config(page_title="Agentic AI Assistant", layout="centered")
+
+
+@st.cache_resource
+def warm_up():
+    # Once per server process, not on every rerun
+    return preload_in_background()
+
+
+warm_up()
+
 st.title("🤖 Agentic AI Assistant")
 st.markdown("Ask me to generate and validate data from any schema! Example: `Generate 100 rows for creditcardfraud-metadata.json as JSON`")
 
@@ -59,16 +74,26 @@ if prompt := st.chat_input("Type your request..."):
                     raise FileNotFoundError(f"❌ Schema file not found: {schema_path}")
 
                 # ✅ Step 3: Analyze schema
-                parsed_schema = analyze_schema_file(schema_path)
+                parsed_schema = apply_profile(analyze_schema_file_cached(schema_path), load_profile(schema_path))
+                parsed_schema = apply_rules(parsed_schema, config["custom_rules"])
 
                 # ✅ Step 4: Generate data
-                generated_data = generate_data(parsed_schema, row_count)
+                generated_data = generate_columns(parsed_schema, row_count)
 
                 # ✅ Step 5: Validate data
-                validation_results = validate_all_tables(generated_data, parsed_schema)
+                validation_summaries = summarize_results(validate_all_tables(generated_data, parsed_schema))
+
+                # ✅ Step 6: Mask personal data
+                masker = PrivacyMasker(parsed_schema, config["privacy_settings"])
+                generated_data = {name: masker.mask(name, columns) for name, columns in generated_data.items()}
 
-                # ✅ Step 6: Final response
+                # ✅ Step 7: Final response
                 success_msg = f"✅ Generated and validated `{row_count}` rows for **{schema_file}** as **{export_format.upper()}**."
+                if masker.enabled:
+                    success_msg += f"\n\n🔒 Masked {', '.join(masker.describe())}"
+                for summary in validation_summaries.values():
+                    if not summary["success"]:
+                        success_msg += "\n\n```\n" + "\n".join(format_summary(summary)) + "\n```"
                 st.session_state.messages.append({"role": "assistant", "content": success_msg})
                 st.markdown(success_msg)
 
@@ -1,2 +1,5 @@
-INSERT INTO products (prod_id, name, price) VALUES (101, 'Laptop "Pro"', 1200);
-INSERT INTO products (prod_id, name, price) VALUES (102, 'Mouse & Keyboard', 150);
+BEGIN;
+INSERT INTO products (prod_id, name, price) VALUES
+(101, 'Laptop "Pro"', 1200),
+(102, 'Mouse & Keyboard', 150);
+COMMIT;
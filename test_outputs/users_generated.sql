@@ -1,2 +1,5 @@
-INSERT INTO users (id, name, email) VALUES (1, 'Alice & Bob', 'alice@example.com');
-INSERT INTO users (id, name, email) VALUES (2, 'Charlie <Admin>', 'charlie@domain.org');
+BEGIN;
+INSERT INTO users (id, name, email) VALUES
+(1, 'Alice & Bob', 'alice@example.com'),
+(2, 'Charlie <Admin>', 'charlie@domain.org');
+COMMIT;
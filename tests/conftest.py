@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+# Add the directory above the agents package to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.schema_analysis_agent import parse_sql_schema
+
+SHOP_DDL = """
+CREATE TABLE customers (id INT PRIMARY KEY, name VARCHAR(50), email VARCHAR(100) UNIQUE, age INT);
+CREATE TABLE products (id INT PRIMARY KEY, title VARCHAR(50), price DECIMAL(10,2));
+CREATE TABLE orders (
+    id INT PRIMARY KEY,
+    customer_id INT NOT NULL,
+    product_id INT,
+    total DECIMAL(10,2),
+    paid BOOLEAN,
+    FOREIGN KEY (customer_id) REFERENCES customers(id),
+    FOREIGN KEY (product_id) REFERENCES products(id)
+);
+"""
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """
+    Runs every test in its own directory, since value pools and exports
+    are written relative to the working directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def shop_schema():
+    return parse_sql_schema(SHOP_DDL)
@@ -0,0 +1,87 @@
+import gzip
+import hashlib
+import json
+import os
+
+import pytest
+
+from agents.configuration_agent import TableWriter, configure_generation, export_data
+from agents.data_generation_agent import columns_to_rows, generate_columns
+
+
+def _export(data, work_dir, export_format, **export_options):
+    config = configure_generation(0, export_format=export_format, export_options=export_options)
+    return export_data(data, config, str(work_dir / "out"))
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_ndjson_writes_one_row_per_line(shop_schema, work_dir):
+    columns = generate_columns(shop_schema, 20, seed=4)
+    manifest = _export(columns, work_dir, "NDJSON")
+    [path] = manifest["tables"]["customers"]["file_paths"]
+    assert path.endswith("customers_generated.ndjson")
+    with open(path, encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == columns_to_rows(columns["customers"])
+
+
+@pytest.mark.parametrize("export_format", ["CSV", "JSON", "NDJSON", "SQL", "XML"])
+def test_gzip_export_matches_plain_export(shop_schema, work_dir, export_format):
+    columns = generate_columns(shop_schema, 20, seed=4)
+    plain = _export(columns, work_dir / "plain", export_format)["tables"]["orders"]
+    packed = _export(columns, work_dir / "gzip", export_format, compression="gzip")["tables"]["orders"]
+    assert packed["file_paths"][0].endswith(f".{export_format.lower()}.gz")
+    with open(plain["file_paths"][0], 'rb') as f, gzip.open(packed["file_paths"][0], 'rb') as g:
+        assert g.read() == f.read()
+
+
+def test_zstd_export_round_trips(shop_schema, work_dir):
+    zstandard = pytest.importorskip("zstandard")
+    columns = generate_columns(shop_schema, 20, seed=4)
+    [path] = _export(columns, work_dir, "NDJSON", compression="zstd")["tables"]["products"]["file_paths"]
+    assert path.endswith(".ndjson.zst")
+    with zstandard.open(path, 'rt', encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == columns_to_rows(columns["products"])
+
+
+def test_unknown_text_compression_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported compression"):
+        configure_generation(10, export_format="CSV", export_options={"compression": "brotli"})
+
+
+def test_long_tables_are_split_into_part_files(shop_schema, work_dir):
+    columns = generate_columns(shop_schema, 25, seed=4)
+    whole = _export(columns, work_dir / "whole", "NDJSON")["tables"]["orders"]
+    config = configure_generation(25, export_format="NDJSON", chunk_size=10, workers=3)
+    manifest = export_data(columns, config, str(work_dir / "parts"))
+    parts = manifest["tables"]["orders"]
+
+    assert [os.path.basename(path) for path in parts["file_paths"]] == [
+        f"orders_generated.part-{part:05d}.ndjson" for part in range(3)
+    ]
+    assert [entry["rows"] for entry in parts["files"]] == [10, 10, 5]
+    assert parts["rows"] == manifest["rows"] // 3 == 25
+    assert b"".join(_read_bytes(path) for path in parts["file_paths"]) == _read_bytes(whole["file_paths"][0])
+    for entry in parts["files"]:
+        assert entry["bytes"] == os.path.getsize(entry["path"])
+        assert entry["sha256"] == hashlib.sha256(_read_bytes(entry["path"])).hexdigest()
+
+
+def test_manifest_is_saved_beside_the_files(shop_schema, work_dir):
+    manifest = _export(generate_columns(shop_schema, 5, seed=4), work_dir, "CSV")
+    with open(manifest.pop("manifest_path"), encoding='utf-8') as f:
+        assert json.load(f) == manifest
+    assert sorted(os.listdir(work_dir / "out")) == [
+        "customers_generated.csv", "manifest.json", "orders_generated.csv", "products_generated.csv"
+    ]
+
+
+def test_failed_write_leaves_no_file(work_dir):
+    with pytest.raises(KeyError):
+        with TableWriter("users", "JSON", str(work_dir)) as writer:
+            writer.write_chunk([{"id": 1}])
+            raise KeyError("id")
+    assert os.listdir(work_dir) == []
@@ -0,0 +1,145 @@
+import re
+
+import numpy as np
+import pytest
+
+from agents import custom_rules
+from agents.custom_rules import REGEX_MAX_BOUND, REGEX_MAX_ITEMS, Expression, Pattern, apply_rules, parse_rules
+from agents.data_generation_agent import columns_to_rows, generate_columns, generate_data, generate_data_reference
+from agents.schema_analysis_agent import parse_sql_schema
+from agents.validation_agent import validate_all_tables
+
+U = np.random.default_rng(0).random(500)
+
+
+@pytest.mark.parametrize("regex", [r"[A-Z]{3}-\d{4}", r"(ab|cd)+x?", r"ORD_[0-9a-f]{2,6}", r"\w*@example\.com"])
+def test_patterns_generate_matching_values(regex):
+    values = Pattern(regex=regex).generate(U)
+    assert all(re.fullmatch(regex, value) for value in values)
+    assert len(set(values)) > 1
+    assert Pattern(regex=regex).matches(values).all()
+
+
+def test_format_templates():
+    values = Pattern(template="SKU-##??\\#").generate(U)
+    assert all(re.fullmatch(r"SKU-\d\d[A-Z][A-Z]#", value) for value in values)
+
+
+@pytest.mark.parametrize("regex", [
+    f"a{{{REGEX_MAX_BOUND + 1}}}",
+    "a{999999999}",
+    "a{1,999999999}",
+    "(a{1000}){1000}",
+])
+def test_oversized_repeats_are_rejected(regex):
+    with pytest.raises(ValueError):
+        Pattern(regex=regex)
+
+
+def test_long_templates_are_rejected():
+    with pytest.raises(ValueError, match="items per value"):
+        Pattern(template="#" * (REGEX_MAX_ITEMS + 1))
+
+
+def test_patterns_render_in_batches(monkeypatch):
+    pattern = Pattern(regex=r"(ab|c\d)+-[A-Z]{2,5}")
+    whole = pattern.generate(U)
+    monkeypatch.setattr(custom_rules, "PATTERN_RENDER_CHARS", 3 * pattern.items)
+    assert pattern.generate(U).tolist() == whole.tolist()
+    assert pattern.generate(U[:0]).tolist() == []
+
+
+def test_unbounded_repeats_are_capped():
+    values = Pattern(regex="a*b+").generate(U)
+    assert max(map(len, values)) <= 1 + 8 + 8
+    assert Pattern(regex=f"a{{{REGEX_MAX_BOUND}}}").generate(U[:2])[0] == "a" * REGEX_MAX_BOUND
+
+
+@pytest.mark.parametrize("source", [
+    "'a' * 100000 * 100000 == 'b'",
+    "price > 10 * 2",
+    "'%0999999d' % quantity == 'x'",
+    "[1] * quantity == [1]",
+])
+def test_unbounded_arithmetic_is_rejected(source):
+    with pytest.raises(ValueError):
+        Expression(source)
+
+
+def test_only_numbers_are_multiplied():
+    columns = {"code": np.array(["a", "b"], dtype=object), "quantity": np.array([1, 3])}
+    with pytest.raises(ValueError, match="only multiply"):
+        Expression("code * quantity == 'x'").evaluate(columns, 2)
+    assert Expression("quantity * 2 > 2").evaluate(columns, 2).tolist() == [False, True]
+    assert Expression("code + '!' == 'a!'").evaluate(columns, 2).tolist() == [True, False]
+
+
+@pytest.mark.parametrize("rules", [
+    "not a dict",
+    {"price": (1,)},
+    {"price": {"range": (1, 2), "values": [1]}},
+    {"status": {"values": ["a"], "weights": [1, 2]}},
+    {"status": {"when": [{"range": (1, 2)}]}},
+])
+def test_malformed_rules_raise(rules):
+    with pytest.raises(ValueError):
+        parse_rules(rules)
+
+
+@pytest.fixture
+def orders_schema():
+    return parse_sql_schema("""
+        CREATE TABLE orders (
+            id INT PRIMARY KEY,
+            status VARCHAR(10),
+            quantity INT,
+            price DECIMAL(10,2),
+            discount DECIMAL(10,2),
+            code VARCHAR(12)
+        );
+    """)
+
+
+ORDER_RULES = {
+    "orders.status": {"values": ["new", "shipped", "returned"], "weights": [1, 2, 1]},
+    "quantity": {"range": (1, 5), "when": [{"if": "status == 'returned'", "range": (0, 0)}]},
+    "price_range": (10, 20),
+    "code": {"regex": r"ORD-\d{6}"},
+    "constraints": ["discount < price"],
+}
+
+
+def test_rules_shape_generated_columns(orders_schema):
+    schema = apply_rules(orders_schema, ORDER_RULES)
+    rows = columns_to_rows(generate_columns(schema, 400, seed=3)["orders"])
+    assert {row["status"] for row in rows} == {"new", "shipped", "returned"}
+    assert all(row["quantity"] == 0 for row in rows if row["status"] == "returned")
+    assert all(1 <= row["quantity"] <= 5 for row in rows if row["status"] != "returned")
+    assert all(10 <= row["price"] <= 20 for row in rows)
+    assert all(row["discount"] < row["price"] for row in rows)
+    assert all(re.fullmatch(r"ORD-\d{6}", row["code"]) for row in rows)
+    assert validate_all_tables({"orders": rows}, schema)["orders"]["success"]
+
+
+def test_ruled_generation_matches_reference(orders_schema):
+    schema = apply_rules(orders_schema, ORDER_RULES)
+    assert generate_data(schema, 50, seed=1) == generate_data_reference(schema, 50, seed=1)
+
+
+def test_rule_violations_are_reported(orders_schema):
+    schema = apply_rules(orders_schema, ORDER_RULES)
+    rows = columns_to_rows(generate_columns(schema, 20, seed=3)["orders"])
+    rows[0].update(status="returned", quantity=4)
+    rows[1]["code"] = "nope"
+    rows[2]["discount"] = rows[2]["price"] + 1
+    failed = [res for res in validate_all_tables({"orders": rows}, schema)["orders"]["results"] if not res["success"]]
+    assert {res["expectation_config"]["kwargs"]["column"] for res in failed} == {"quantity", "code", "discount"}
+    assert all(res["result"]["unexpected_count"] == 1 for res in failed)
+
+
+def test_rules_reject_unknown_and_key_columns(orders_schema):
+    with pytest.raises(ValueError, match="matches no column"):
+        apply_rules(orders_schema, {"missing": (1, 2)})
+    with pytest.raises(ValueError, match="key columns"):
+        apply_rules(orders_schema, {"orders.id": (1, 2)})
+    assert apply_rules(orders_schema, None) is orders_schema
@@ -0,0 +1,175 @@
+import numpy as np
+import pytest
+
+from agents.data_generation_agent import (
+    columns_to_rows, generate_column_chunks, generate_columns, generate_columns_parallel,
+    generate_data, generate_data_reference, generate_shard, order_tables, plan_generation
+)
+from agents.generated_table import GeneratedTable
+from agents.schema_analysis_agent import parse_sql_schema
+
+
+def _rows_by_table(tables):
+    return {table_name: columns_to_rows(columns) for table_name, columns in tables.items()}
+
+
+@pytest.mark.parametrize("seed", [0, 42])
+def test_generate_data_matches_reference(shop_schema, seed):
+    assert generate_data(shop_schema, 60, seed) == generate_data_reference(shop_schema, 60, seed)
+
+
+def test_generate_data_is_deterministic(shop_schema):
+    assert generate_data(shop_schema, 30, seed=5) == generate_data(shop_schema, 30, seed=5)
+    assert generate_data(shop_schema, 30, seed=5) != generate_data(shop_schema, 30, seed=6)
+
+
+def test_foreign_keys_reference_parent_keys(shop_schema):
+    data = generate_data(shop_schema, {"customers": 7, "products": 3, "orders": 50}, seed=1)
+    assert [row["id"] for row in data["customers"]] == list(range(1, 8))
+    assert {row["customer_id"] for row in data["orders"]} <= set(range(1, 8))
+    assert {row["product_id"] for row in data["orders"]} <= set(range(1, 4))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 60, 1000])
+def test_chunks_equal_single_batch(shop_schema, chunk_size):
+    chunks = {}
+    for table_name, _, columns in generate_column_chunks(shop_schema, 60, chunk_size, seed=9):
+        chunks.setdefault(table_name, []).append(columns)
+    chunked = {table_name: GeneratedTable.concat(parts) for table_name, parts in chunks.items()}
+    assert _rows_by_table(chunked) == _rows_by_table(generate_columns(shop_schema, 60, seed=9))
+
+
+def test_parallel_shards_equal_single_batch(shop_schema):
+    parallel = generate_columns_parallel(shop_schema, 60, seed=9, workers=2, shard_size=7)
+    assert _rows_by_table(parallel) == _rows_by_table(generate_columns(shop_schema, 60, seed=9))
+
+
+def test_parallel_empty_tables_equal_single_batch(shop_schema):
+    counts = {"customers": 4, "products": 0, "orders": 0}
+    parallel = generate_columns_parallel(shop_schema, counts, seed=9, workers=2, shard_size=3)
+    assert _rows_by_table(parallel) == _rows_by_table(generate_columns(shop_schema, counts, seed=9))
+    assert list(parallel["orders"]) == list(shop_schema["orders"]["columns"])
+
+
+@pytest.mark.parametrize("start, size", [(0, 1), (13, 20), (59, 1)])
+def test_any_shard_equals_its_slice(shop_schema, start, size):
+    plan = plan_generation(shop_schema, 60, seed=9)
+    whole = generate_columns(shop_schema, 60, seed=9)
+    for table_name in plan["order"]:
+        shard = generate_shard(
+            table_name, shop_schema[table_name], start, size, plan["seed"], plan["references"][table_name]
+        )
+        assert shard.to_rows() == whole[table_name].slice(start, start + size).to_rows()
+
+
+LINES_DDL = """
+CREATE TABLE orders (id INT PRIMARY KEY, total DECIMAL(10,2));
+CREATE TABLE order_items (
+    order_id INT,
+    line INT,
+    sku VARCHAR(12),
+    PRIMARY KEY (order_id, line),
+    FOREIGN KEY (order_id) REFERENCES orders(id)
+);
+CREATE TABLE item_notes (
+    order_id INT,
+    line INT,
+    note VARCHAR(40),
+    FOREIGN KEY (order_id, line) REFERENCES order_items (order_id, line)
+);
+"""
+
+
+@pytest.fixture
+def lines_schema():
+    return parse_sql_schema(LINES_DDL)
+
+
+def test_composite_primary_keys_are_unique(lines_schema):
+    data = generate_data(lines_schema, {"orders": 3, "order_items": 2000, "item_notes": 50}, seed=4)
+    keys = [(row["order_id"], row["line"]) for row in data["order_items"]]
+    assert len(set(keys)) == len(keys)
+    assert {order_id for order_id, _ in keys} == {1, 2, 3}
+    assert {row["order_id"] for row in data["item_notes"]} <= {1, 2, 3}
+
+
+def test_composite_keys_match_reference_and_shards(lines_schema):
+    counts = {"orders": 5, "order_items": 60, "item_notes": 20}
+    assert generate_data(lines_schema, counts, seed=2) == generate_data_reference(lines_schema, counts, seed=2)
+    chunks = [columns for table_name, _, columns in generate_column_chunks(lines_schema, counts, 7, seed=2)
+              if table_name == "order_items"]
+    assert columns_to_rows(GeneratedTable.concat(chunks)) == columns_to_rows(
+        generate_columns(lines_schema, counts, seed=2)["order_items"]
+    )
+
+
+def test_composite_key_space_too_small_raises():
+    schema = parse_sql_schema("""
+        CREATE TABLE a (id INT PRIMARY KEY);
+        CREATE TABLE b (id INT PRIMARY KEY);
+        CREATE TABLE ab (a_id INT REFERENCES a(id), b_id INT REFERENCES b(id), PRIMARY KEY (a_id, b_id));
+    """)
+    assert len(generate_data(schema, {"a": 3, "b": 4, "ab": 12}, seed=1)["ab"]) == 12
+    with pytest.raises(ValueError, match="only has 12 distinct values"):
+        generate_data(schema, {"a": 3, "b": 4, "ab": 13}, seed=1)
+
+
+def test_children_come_after_their_parents():
+    schema = parse_sql_schema("""
+        CREATE TABLE order_items (id INT PRIMARY KEY, order_id INT REFERENCES orders(id), product_id INT REFERENCES products(id));
+        CREATE TABLE orders (id INT PRIMARY KEY, customer_id INT REFERENCES customers(id));
+        CREATE TABLE products (id INT PRIMARY KEY);
+        CREATE TABLE customers (id INT PRIMARY KEY, referrer_id INT REFERENCES customers(id));
+    """)
+    order = order_tables(schema)
+    assert sorted(order) == sorted(schema)
+    assert order.index("customers") < order.index("orders") < order.index("order_items")
+    assert order.index("products") < order.index("order_items")
+
+
+def test_cycles_and_unknown_tables_raise():
+    cyclic = parse_sql_schema("""
+        CREATE TABLE a (id INT PRIMARY KEY, b_id INT REFERENCES b(id));
+        CREATE TABLE b (id INT PRIMARY KEY, a_id INT REFERENCES a(id));
+    """)
+    with pytest.raises(ValueError, match="cycle"):
+        order_tables(cyclic)
+    with pytest.raises(ValueError, match="unknown table 'missing'"):
+        order_tables(parse_sql_schema("CREATE TABLE a (id INT PRIMARY KEY, m_id INT REFERENCES missing(id));"))
+
+
+def test_self_references_point_at_existing_rows():
+    schema = parse_sql_schema("CREATE TABLE staff (id INT PRIMARY KEY, manager_id INT REFERENCES staff(id));")
+    rows = generate_data(schema, 50, seed=3)["staff"]
+    assert {row["manager_id"] for row in rows} <= set(range(1, 51))
+
+
+@pytest.fixture
+def shop_with_fk_options(shop_schema):
+    shop_schema["orders"]["columns"]["customer_id"]["foreign_key"] = {
+        "table": "customers", "column": "id", "distribution": "zipf", "zipf_exponent": 1.5
+    }
+    shop_schema["orders"]["columns"]["product_id"]["foreign_key"] = {
+        "table": "products", "column": "id", "max_per_parent": 4
+    }
+    return shop_schema
+
+
+def test_zipf_and_capped_references(shop_with_fk_options):
+    counts = {"customers": 20, "products": 10, "orders": 40}
+    orders = generate_columns(shop_with_fk_options, counts, seed=1)["orders"]
+    customers = np.bincount(np.asarray(orders.column("customer_id")), minlength=21)[1:]
+    products = np.bincount(np.asarray(orders.column("product_id")), minlength=11)[1:]
+    assert customers[0] == customers.max() and customers[0] > customers[-1]
+    assert products.max() <= 4
+    assert generate_data(shop_with_fk_options, counts, seed=1) == generate_data_reference(shop_with_fk_options, counts, seed=1)
+
+
+def test_capped_references_need_enough_parents(shop_with_fk_options):
+    with pytest.raises(ValueError, match="only allows"):
+        generate_columns(shop_with_fk_options, {"customers": 5, "products": 2, "orders": 9}, seed=1)
+
+
+def test_children_of_empty_parents_raise(shop_schema):
+    with pytest.raises(ValueError, match="has no rows"):
+        generate_columns(shop_schema, {"customers": 0, "products": 3, "orders": 5}, seed=1)
@@ -0,0 +1,159 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from agents.configuration_agent import configure_generation
+from agents.data_generation_agent import columns_to_rows, generate_columns
+from agents.db_loader import (
+    ConnectionPool, load_in_dependency_order, load_tables, parse_database_options, request_database_options
+)
+from agents.pipeline import run_streaming_pipeline
+from agents.schema_analysis_agent import parse_sql_schema
+
+
+def _rows(path, table_name):
+    with sqlite3.connect(path) as connection:
+        cursor = connection.execute(f'SELECT * FROM "{table_name}" ORDER BY rowid')
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+@pytest.mark.parametrize("options", [
+    {"driver": "os"},
+    {"driver": "subprocess"},
+    {"dsn": "host=db"},
+    {"connect_args": {"database": "/etc/passwd"}},
+    {"database": "../escape.db"},
+    {"database": "/tmp/elsewhere.db"},
+    {"database": "nested/../../escape.db"},
+    {"database": "."},
+    {"driver": "psycopg2"},
+    {"driver": "psycopg2", "database": "local.db"},
+])
+def test_request_options_are_restricted(work_dir, options):
+    with pytest.raises(ValueError):
+        request_database_options(options, str(work_dir / "out"))
+
+
+def test_request_sqlite_path_stays_in_output_dir(work_dir):
+    options = request_database_options({"database": "sub/shop.db", "if_exists": "replace"}, "out")
+    assert options == {"database": os.path.join("out", "sub", "shop.db"), "if_exists": "replace"}
+    assert request_database_options(None, "out") == {}
+
+
+def test_request_symlink_out_of_output_dir_is_refused(work_dir):
+    os.makedirs("out")
+    os.symlink(str(work_dir), os.path.join("out", "link"))
+    with pytest.raises(ValueError):
+        request_database_options({"database": "link/shop.db"}, "out")
+
+
+def test_request_postgres_uses_the_server_dsn():
+    options = request_database_options({"driver": "psycopg2", "bulk": "copy"}, "out", {"dsn": "dbname=test"})
+    assert options == {"driver": "psycopg2", "bulk": "copy", "dsn": "dbname=test", "connect_args": None}
+    assert parse_database_options(options)["connect_args"] == {}
+
+
+@pytest.mark.parametrize("options", [
+    {"batch_size": 0},
+    {"writers": "2"},
+    {"if_exists": "truncate"},
+    {"bulk": "copy"},
+    {"driver": "psycopg2", "database": "x.db"},
+])
+def test_bad_options_raise(options):
+    with pytest.raises(ValueError):
+        parse_database_options(options)
+
+
+def test_pool_reuses_and_limits_connections():
+    opened = []
+    pool = ConnectionPool(lambda: opened.append(object()) or opened[-1], size=2)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert len(opened) == 2
+
+    acquired = threading.Event()
+    threading.Thread(target=lambda: (pool.acquire(), acquired.set()), daemon=True).start()
+    assert not acquired.wait(0.1)
+    pool.release(second)
+    assert acquired.wait(1)
+    assert len(opened) == 2
+
+
+def test_dependency_order_loads_parents_first():
+    finished = []
+    lock = threading.Lock()
+
+    def load(table_name, stop):
+        time.sleep({"a": 0.05, "b": 0.0, "c": 0.0}[table_name])
+        with lock:
+            finished.append(table_name)
+        return table_name
+
+    result = load_in_dependency_order(["a", "b", "c"], {"b": {"a"}, "c": {"b"}}, load)
+    assert finished == ["a", "b", "c"]
+    assert result == {"a": "a", "b": "b", "c": "c"}
+
+
+def test_dependency_order_stops_others_after_a_failure():
+    def load(table_name, stop):
+        if table_name == "a":
+            raise RuntimeError("a failed")
+        return table_name
+
+    with pytest.raises(RuntimeError, match="a failed"):
+        load_in_dependency_order(["a", "b"], {"b": {"a"}}, load)
+
+
+def test_load_tables_into_sqlite(shop_schema, work_dir):
+    tables = generate_columns(shop_schema, 40, seed=5)
+    manifest = load_tables(tables, {"database": "shop.db", "batch_size": 7, "commit_rows": 9}, schema=shop_schema)
+    assert {table_name: entry["rows"] for table_name, entry in manifest.items()} == dict.fromkeys(tables, 40)
+    for table_name, columns in tables.items():
+        assert _rows("shop.db", table_name) == [
+            {name: int(value) if isinstance(value, bool) else value for name, value in row.items()}
+            for row in columns_to_rows(columns)
+        ]
+
+
+def test_database_pipeline_matches_streaming_rows(shop_schema, work_dir):
+    config = configure_generation(
+        30, export_format="DATABASE", chunk_size=8, privacy_settings={"GDPR": False},
+        export_options={"database": "out/shop.db", "if_exists": "replace"}
+    )
+    for _ in range(2):
+        exported = run_streaming_pipeline(shop_schema, config, "out", seed=2)
+    assert all(info["validation"]["success"] for info in exported.values())
+    expected = generate_columns(shop_schema, 30, seed=2)
+    assert [row["id"] for row in _rows("out/shop.db", "orders")] == [row["id"] for row in columns_to_rows(expected["orders"])]
+
+
+def test_composite_primary_key_schema_loads_into_sqlite(work_dir):
+    schema = parse_sql_schema("""
+        CREATE TABLE orders (id INT PRIMARY KEY, total DECIMAL(10,2));
+        CREATE TABLE order_items (
+            order_id INT REFERENCES orders(id),
+            line INT,
+            quantity INT,
+            PRIMARY KEY (order_id, line)
+        );
+    """)
+    config = configure_generation(
+        {"orders": 10, "order_items": 500}, export_format="DATABASE", chunk_size=64,
+        export_options={"database": "out/lines.db"}
+    )
+    exported = run_streaming_pipeline(schema, config, "out", seed=7)
+    assert exported["order_items"]["rows"] == 500
+    assert exported["order_items"]["validation"]["success"]
+    with sqlite3.connect("out/lines.db") as connection:
+        [ddl] = connection.execute("SELECT sql FROM sqlite_master WHERE name = 'order_items'").fetchone()
+        count, distinct = connection.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT order_id || '-' || line) FROM order_items"
+        ).fetchone()
+    assert 'PRIMARY KEY ("order_id", "line")' in ddl
+    assert count == distinct == 500
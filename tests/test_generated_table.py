@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.data_generation_agent import generate_columns, generate_data
+from agents.generated_table import (
+    DictionaryColumn, GeneratedTable, code_dtype, render_dictionary, table_length, to_dataframe
+)
+
+
+@pytest.fixture
+def colors():
+    return DictionaryColumn.encode(["red", "green", None, "red"], np.array([0, 1, 2, 3, 1, 0]))
+
+
+def test_dictionary_column_encodes_and_decodes(colors):
+    assert list(colors.categories) == ["red", "green"]
+    assert colors.codes.tolist() == [0, 1, -1, 0, 1, 0]
+    assert colors.codes.dtype == np.int8
+    assert np.asarray(colors).tolist() == ["red", "green", None, "red", "green", "red"]
+    assert colors[1:3].categories is colors.categories
+    assert list(colors.to_pandas()) == ["red", "green", np.nan, "red", "green", "red"]
+
+
+def test_render_dictionary_renders_each_category_once(colors):
+    rendered = []
+
+    def render(values):
+        rendered.extend(values)
+        return [value.upper() for value in values]
+
+    assert render_dictionary(colors, render, "NULL") == ["RED", "GREEN", "NULL", "RED", "GREEN", "RED"]
+    assert rendered == ["red", "green"]
+
+
+@pytest.mark.parametrize("count, dtype", [(100, np.int8), (200, np.int16), (40_000, np.int32)])
+def test_code_dtype(count, dtype):
+    assert code_dtype(count) == dtype
+
+
+def test_table_rows_match_row_generation(shop_schema):
+    columns = generate_columns(shop_schema, 30, seed=6)
+    rows = generate_data(shop_schema, 30, seed=6)
+    for table_name, table in columns.items():
+        assert table.to_rows() == rows[table_name]
+        assert list(table.iter_rows(batch_size=7)) == rows[table_name]
+        assert table_length(table) == table_length(rows[table_name]) == 30
+        pd.testing.assert_frame_equal(
+            to_dataframe(table).astype(object), pd.DataFrame(rows[table_name]).astype(object)
+        )
+
+
+def test_slice_and_concat_keep_dictionary_columns(colors):
+    table = GeneratedTable({"id": np.arange(6), "color": colors})
+    parts = [table.slice(start, start + 4) for start in range(0, 6, 4)]
+    assert [part.num_rows for part in parts] == [4, 2]
+    joined = GeneratedTable.concat(parts)
+    assert isinstance(joined.column("color"), DictionaryColumn)
+    assert joined.to_rows() == table.to_rows()
+    assert table.slice(10, 12).num_rows == 0
+    assert table.nbytes == table["id"].nbytes + 6
+
+
+def test_concat_decodes_mismatched_categories(colors):
+    other = DictionaryColumn.encode(["blue"], np.array([0]))
+    joined = GeneratedTable.concat([GeneratedTable({"color": colors}), GeneratedTable({"color": other})])
+    assert joined["color"].tolist() == ["red", "green", None, "red", "green", "red", "blue"]
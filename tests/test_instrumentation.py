@@ -0,0 +1,83 @@
+import threading
+
+from agents.instrumentation import MetricsRegistry, PipelineMetrics, profiled
+
+
+def test_stages_total_their_tables():
+    metrics = PipelineMetrics()
+    metrics.record("generate", "customers", wall=1.0, cpu=0.5, rows=100)
+    metrics.record("generate", "orders", wall=3.0, cpu=1.5, rows=300)
+    metrics.record("export", "orders", wall=0.5, rows=300, bytes=4096)
+    timings = metrics.to_dict()
+
+    generate = timings["stages"]["generate"]
+    assert generate["wall_seconds"] == 4.0
+    assert generate["cpu_seconds"] == 2.0
+    assert generate["rows"] == 400
+    assert generate["rows_per_second"] == 100.0
+    assert generate["tables"]["orders"]["rows_per_second"] == 100.0
+    assert timings["stages"]["export"]["bytes"] == 4096
+    assert "peak_rss_bytes" not in generate
+    assert "peak_rss_bytes" in timings
+
+
+def test_stage_records_even_when_the_body_fails():
+    metrics = PipelineMetrics()
+    try:
+        with metrics.stage("validate", "orders", rows=5):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert metrics.raw()["validate"]["orders"]["rows"] == 5
+
+
+def test_merge_adds_worker_counters():
+    worker = PipelineMetrics()
+    worker.record("generate", "orders", wall=2.0, rows=10)
+    metrics = PipelineMetrics()
+    metrics.record("generate", "orders", wall=1.0, rows=5)
+    metrics.merge(worker.raw())
+    assert metrics.raw()["generate"]["orders"]["rows"] == 15
+    assert metrics.raw()["generate"]["orders"]["wall_seconds"] == 3.0
+
+
+def test_concurrent_records_are_not_lost():
+    metrics = PipelineMetrics()
+
+    def record():
+        for _ in range(1000):
+            metrics.record("export", "t", rows=1)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.raw()["export"]["t"]["rows"] == 4000
+
+
+def test_registry_renders_prometheus_counters():
+    registry = MetricsRegistry(prefix="test")
+    metrics = PipelineMetrics()
+    metrics.record("generate", "t", wall=1.5, rows=10)
+    registry.observe(metrics)
+    registry.observe(PipelineMetrics(), "error")
+    text = registry.render({"cache_entries": 3})
+    assert 'test_requests_total{outcome="error"} 1' in text
+    assert 'test_requests_total{outcome="success"} 1' in text
+    assert 'test_stage_rows_total{stage="generate"} 10' in text
+    assert 'test_stage_wall_seconds_total{stage="generate"} 1.5' in text
+    assert "test_cache_entries 3" in text
+
+
+def test_profiled_reports_functions_and_allocations():
+    with profiled() as report:
+        data = [str(i) * 10 for i in range(10_000)]
+    assert data
+    assert report["cprofile"]
+    assert report["tracemalloc_peak_bytes"] > 0
+    assert report["top_allocations"]
+
+    with profiled(False) as report:
+        pass
+    assert report == {}
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from agents.job_queue import FINISHED_STATUSES, JobQueue, JobStore
+
+
+def _wait(job_queue, job_id, statuses=FINISHED_STATUSES, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = job_queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} is still {job['status']}")
+
+
+@pytest.fixture
+def blocking_queue(work_dir):
+    """
+    A one-worker queue whose jobs record their names in `ran` and, when
+    their params say so, wait for `release` while reporting progress.
+    """
+    ran = []
+    release = threading.Event()
+
+    def runner(params, progress):
+        while params.get("block") and not release.wait(0.01):
+            progress(waiting=True)
+        ran.append(params["name"])
+        if params.get("fail"):
+            raise RuntimeError("boom")
+        return {"name": params["name"]}
+
+    job_queue = JobQueue(runner, str(work_dir / "jobs.sqlite3"), max_workers=1)
+    job_queue.ran, job_queue.release = ran, release
+    yield job_queue
+    release.set()
+    job_queue.shutdown()
+    job_queue.store.close()
+
+
+def test_jobs_run_by_priority_then_fifo(blocking_queue):
+    first = blocking_queue.submit({"name": "first", "block": True})
+    _wait(blocking_queue, first, ("running",))
+    ids = [blocking_queue.submit({"name": name}, priority=priority)
+           for name, priority in [("low", 0), ("high", 5), ("low-2", 0), ("mid", 1)]]
+    blocking_queue.release.set()
+    for job_id in ids:
+        assert _wait(blocking_queue, job_id)["status"] == "succeeded"
+    assert blocking_queue.ran == ["first", "high", "mid", "low", "low-2"]
+    assert blocking_queue.get(ids[1])["result"] == {"name": "high"}
+
+
+def test_cancel_queued_and_running_jobs(blocking_queue):
+    running = blocking_queue.submit({"name": "running", "block": True})
+    _wait(blocking_queue, running, ("running",))
+    queued = blocking_queue.submit({"name": "queued"})
+
+    assert blocking_queue.cancel(queued)["status"] == "cancelled"
+    blocking_queue.cancel(running)
+    assert _wait(blocking_queue, running)["status"] == "cancelled"
+    assert blocking_queue.get(running)["progress"] == {"waiting": True}
+
+    # The cancelled queued job is skipped and finished jobs stay as they are
+    done = blocking_queue.submit({"name": "done"})
+    assert _wait(blocking_queue, done)["status"] == "succeeded"
+    assert blocking_queue.cancel(done)["status"] == "succeeded"
+    assert blocking_queue.ran == ["done"]
+
+
+def test_failed_job_records_the_error(blocking_queue):
+    job_id = blocking_queue.submit({"name": "broken", "fail": True})
+    job = _wait(blocking_queue, job_id)
+    assert (job["status"], job["error"]) == ("failed", "RuntimeError: boom")
+
+
+def test_unfinished_jobs_are_requeued_on_start(work_dir):
+    db_path = str(work_dir / "jobs.sqlite3")
+    store = JobStore(db_path)
+    for seq, status in enumerate(["running", "queued", "succeeded"], 1):
+        store.insert({"id": status, "status": status, "priority": 0, "seq": seq,
+                      "params": {"name": status}, "progress": {}, "created_at": time.time()})
+    store.close()
+
+    ran = []
+    job_queue = JobQueue(lambda params, progress: ran.append(params["name"]), db_path, max_workers=1)
+    job_queue.start()
+    try:
+        for job_id in ["running", "queued"]:
+            assert _wait(job_queue, job_id)["status"] == "succeeded"
+        assert sorted(ran) == ["queued", "running"]
+        # New jobs are numbered after the stored ones
+        assert job_queue.get(job_queue.submit({"name": "next"}))["seq"] == 4
+    finally:
+        job_queue.shutdown()
+        job_queue.store.close()
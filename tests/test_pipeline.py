@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from agents import data_generation_agent, pipeline
+from agents.configuration_agent import configure_generation, export_data
+from agents.data_generation_agent import generate_columns
+from agents.pipeline import run_parallel_pipeline, run_streaming_pipeline
+from agents.validation_agent import summarize_results, validate_all_tables
+
+
+def _file_contents(manifest):
+    contents = {}
+    for table_name, info in manifest.items():
+        [path] = info["file_paths"]
+        with open(path, 'rb') as f:
+            contents[table_name] = f.read()
+    return contents
+
+
+# SQL is left out: its INSERT statements end at chunk boundaries
+@pytest.mark.parametrize("export_format", ["CSV", "JSON", "NDJSON", "XML"])
+def test_streamed_export_equals_single_batch(shop_schema, work_dir, export_format):
+    streamed = run_streaming_pipeline(
+        shop_schema, configure_generation(50, export_format=export_format, chunk_size=7),
+        str(work_dir / "streamed"), seed=3
+    )
+    batch = export_data(
+        generate_columns(shop_schema, 50, seed=3), configure_generation(50, export_format=export_format),
+        str(work_dir / "batch")
+    )["tables"]
+
+    assert {table_name: info["rows"] for table_name, info in streamed.items()} == {
+        table_name: info["rows"] for table_name, info in batch.items()
+    }
+    assert _file_contents(streamed) == _file_contents(batch)
+
+
+def test_streamed_validation_equals_batch_validation(shop_schema, work_dir):
+    streamed = run_streaming_pipeline(
+        shop_schema, configure_generation(50, chunk_size=7), str(work_dir / "streamed"), seed=3
+    )
+    batch = summarize_results(validate_all_tables(generate_columns(shop_schema, 50, seed=3), shop_schema))
+    assert {table_name: info["validation"] for table_name, info in streamed.items()} == batch
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parallel_pipeline_equals_streaming_pipeline(shop_schema, work_dir, workers):
+    streamed = run_streaming_pipeline(
+        shop_schema, configure_generation(25, export_format="NDJSON", chunk_size=10),
+        str(work_dir / "streamed"), seed=3
+    )
+    parallel = run_parallel_pipeline(
+        shop_schema, configure_generation(25, export_format="NDJSON", chunk_size=10, workers=workers),
+        str(work_dir / "parallel"), seed=3
+    )
+    for table_name, info in parallel.items():
+        assert len(info["file_paths"]) == 3
+        assert info["validation"] == streamed[table_name]["validation"]
+        parts = b""
+        for path in info["file_paths"]:
+            with open(path, 'rb') as f:
+                parts += f.read()
+        assert parts == _file_contents({table_name: streamed[table_name]})[table_name]
+    assert not [name for name in os.listdir(work_dir / "parallel") if ".tmp-" in name]
+
+
+def test_streaming_pipeline_plans_once(shop_schema, work_dir, monkeypatch):
+    calls, plan = [], data_generation_agent.plan_generation
+
+    def plan_generation(*args):
+        calls.append(args)
+        return plan(*args)
+
+    monkeypatch.setattr(pipeline, "plan_generation", plan_generation)
+    monkeypatch.setattr(data_generation_agent, "plan_generation", plan_generation)
+    config = configure_generation(20, privacy_settings={"GDPR": True}, chunk_size=7)
+    streamed = run_streaming_pipeline(shop_schema, config, str(work_dir), seed=None)
+    assert len(calls) == 1
+    assert streamed["orders"]["validation"]["success"]
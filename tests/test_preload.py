@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from agents import value_pools
+from agents.preload import preload
+from agents.schema_analysis_agent import schema_cache
+
+# The directory above the agents package, so subprocesses can import it
+PACKAGE_PARENT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+AGENT_MODULES = [
+    "agents.configuration_agent", "agents.custom_rules", "agents.profiling_agent",
+    "agents.schema_analysis_agent", "agents.data_generation_agent", "agents.preload",
+    "agents.privacy_agent", "agents.validation_agent", "agents.validation_report",
+]
+# pandas may import pyarrow itself, but never pyarrow.parquet
+LAZY_MODULES = ["great_expectations", "faker", "pyarrow.parquet", "zstandard"]
+
+EVENTS_DDL = "CREATE TABLE events (id INT PRIMARY KEY, happened DATE, logged TIMESTAMP, note VARCHAR(20));"
+
+
+def test_agents_import_without_optional_dependencies():
+    code = (f"import sys, {', '.join(AGENT_MODULES)}; "
+            f"print(','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PACKAGE_PARENT, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+@pytest.fixture
+def schema_dir(work_dir, monkeypatch):
+    monkeypatch.setattr(value_pools, "_pools", {})
+    schema_cache.clear()
+    path = work_dir / "schemas"
+    path.mkdir()
+    (path / "events.sql").write_text(EVENTS_DDL)
+    yield str(path)
+    schema_cache.clear()
+
+
+def test_preload_fills_the_schema_cache_and_value_pools(schema_dir, work_dir):
+    timings = preload(schema_dir, seeds=[0, 1])
+    assert list(timings) == ["schemas", "value_pools", "validation"]
+    assert schema_cache.stats()["entries"] == 1
+
+    # Both seeds of the date and datetime pools; the note column has no pool
+    assert sorted((semantic, seed) for semantic, seed, _, _ in value_pools._pools) == [
+        ("date", 0), ("date", 1), ("datetime", 0), ("datetime", 1)
+    ]
+    assert len(os.listdir(work_dir / "data" / "pools")) == 4
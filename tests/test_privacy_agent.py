@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from agents.data_generation_agent import columns_to_rows, generate_columns
+from agents.privacy_agent import PrivacyMasker, generalize, privacy_plan
+from agents.schema_analysis_agent import parse_sql_schema
+
+
+def test_default_plan(shop_schema):
+    assert privacy_plan(shop_schema, {"GDPR": True}) == {
+        "customers": {"name": "hash", "email": "tokenize", "age": "generalize"}
+    }
+    assert privacy_plan(shop_schema, {"GDPR": False}) == {}
+
+
+def test_identifier_columns_are_not_generalized():
+    schema = parse_sql_schema("CREATE TABLE people (id INT PRIMARY KEY, GenderID INT, Sex VARCHAR(1), age_code VARCHAR(4));")
+    assert privacy_plan(schema, {"GDPR": True}) == {"people": {"Sex": "generalize"}}
+
+
+def test_hashed_keys_still_join(shop_schema):
+    tables = generate_columns(shop_schema, {"customers": 20, "products": 5, "orders": 200}, seed=4)
+    masker = PrivacyMasker(shop_schema, {"columns": {"customers.id": "hash"}}, seed=4)
+    assert masker.plan["customers"]["id"] == masker.plan["orders"]["customer_id"] == "hash"
+
+    customers = columns_to_rows(masker.mask("customers", tables["customers"]))
+    orders = columns_to_rows(masker.mask("orders", tables["orders"]))
+    pseudonyms = {raw["id"]: masked["id"] for raw, masked in zip(columns_to_rows(tables["customers"]), customers)}
+    assert len(set(pseudonyms.values())) == len(pseudonyms)
+    assert pseudonyms != {key: key for key in pseudonyms}
+    assert [row["customer_id"] for row in orders] == [
+        pseudonyms[row["customer_id"]] for row in columns_to_rows(tables["orders"])
+    ]
+
+
+def test_masking_is_deterministic_per_key(shop_schema):
+    tables = generate_columns(shop_schema, 30, seed=2)
+    first = PrivacyMasker(shop_schema, {"GDPR": True, "key": "secret"}, seed=2)
+    second = PrivacyMasker(shop_schema, {"GDPR": True, "key": "secret"}, seed=8)
+    other = PrivacyMasker(shop_schema, {"GDPR": True, "key": "other"}, seed=2)
+    masked = columns_to_rows(first.mask("customers", tables["customers"]))
+    assert masked == columns_to_rows(second.mask("customers", tables["customers"]))
+    assert masked != columns_to_rows(other.mask("customers", tables["customers"]))
+
+
+def test_level_zero_keeps_numbers():
+    values = np.array([31, 47, 31, 62])
+    column = generalize(values, "number", 0, 3)
+    assert column.categories[column.codes].tolist() == [31, 47, 31, 62]
+    labels = generalize(values, "number", 1, 3)
+    assert labels.categories[labels.codes].tolist() == ["30-34", "45-49", "30-34", "60-64"]
+
+
+@pytest.mark.parametrize("k", [1, 50])
+def test_masked_schema_types_labelled_numbers_as_text(shop_schema, k):
+    masker = PrivacyMasker(shop_schema, {"quasi_identifiers": ["age"], "k": k}, seed=1)
+    tables = generate_columns(shop_schema, 200, seed=1)
+    level, _ = masker.calibrate("customers", tables["customers"])["age"]
+    schema = masker.masked_schema(shop_schema)
+    expected = "string" if level else shop_schema["customers"]["columns"]["age"]["type"]
+    assert schema["customers"]["columns"]["age"]["type"] == expected
+    assert (level == 0) == (k == 1)
+    assert shop_schema["customers"]["columns"]["age"]["type"] == "INT"
@@ -0,0 +1,122 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.data_generation_agent import generate_columns, generate_data, generate_data_reference
+from agents.profiling_agent import (
+    Copula, apply_profile, load_profile, normal_cdf, normal_ppf, profile_csv, profile_path, save_profile
+)
+from agents.schema_analysis_agent import parse_sql_schema
+
+PEOPLE_DDL = """
+CREATE TABLE people (
+    id INT PRIMARY KEY,
+    height DECIMAL(5,1),
+    weight DECIMAL(5,1),
+    city VARCHAR(20),
+    score INT NOT NULL
+);
+"""
+
+
+@pytest.fixture
+def people_csv(work_dir):
+    """
+    5000 people whose weight tracks their height, from three cities, with
+    some scores missing.
+    """
+    rng = np.random.default_rng(7)
+    height = rng.normal(170, 10, 5000)
+    frame = pd.DataFrame({
+        "id": np.arange(1, 5001),
+        "Height": np.round(height, 1),
+        "weight": np.round(0.9 * height - 85 + rng.normal(0, 4, 5000), 1),
+        "city": rng.choice(["Oslo", "Rome", "Lima"], 5000, p=[0.6, 0.3, 0.1]),
+        "score": np.where(rng.random(5000) < 0.2, np.nan, rng.integers(0, 5, 5000))
+    })
+    path = work_dir / "people.csv"
+    frame.to_csv(path, index=False)
+    return str(path), frame
+
+
+def test_normal_ppf_and_cdf_match_the_standard_library():
+    u = np.array([1e-9, 1e-4, 0.01, 0.3, 0.5, 0.8, 0.99, 1 - 1e-6])
+    expected = np.array([NormalDist().inv_cdf(p) for p in u])
+    np.testing.assert_allclose(normal_ppf(u), expected, rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(normal_cdf(expected), u, rtol=1e-6, atol=1e-7)
+
+
+def test_profile_is_exact_whatever_the_chunk_size(people_csv):
+    path, frame = people_csv
+    profile = profile_csv(path, chunk_size=700, sample_rows=1000)
+    whole = profile_csv(path, chunk_size=5000, sample_rows=1000)
+    for column, summary in whole["columns"].items():
+        # Means and deviations are merged chunk by chunk, so only equal to rounding
+        assert summary == pytest.approx(profile["columns"][column])
+    assert (profile["rows"], profile["sample_rows"]) == (5000, 1000)
+
+    height = profile["columns"]["Height"]
+    assert height["dtype"] == "float" and height["decimals"] == 1
+    assert height["mean"] == pytest.approx(frame["Height"].mean())
+    assert height["std"] == pytest.approx(frame["Height"].std())
+    assert (height["min"], height["max"]) == (frame["Height"].min(), frame["Height"].max())
+
+    city = profile["columns"]["city"]
+    assert city["categories"] == ["Oslo", "Rome", "Lima"]
+    assert city["frequencies"] == frame["city"].value_counts().tolist()
+
+    score = profile["columns"]["score"]
+    assert score["dtype"] == "int" and score["categories"] == [0, 1, 2, 3, 4]
+    assert score["null_rate"] == frame["score"].isna().mean()
+    assert profile["correlations"]["columns"] == ["id", "Height", "weight", "score"]
+
+
+def test_profiles_are_saved_beside_the_schema(people_csv, work_dir):
+    schema_path = str(work_dir / "people.sql")
+    profile = profile_csv(people_csv[0], sample_rows=500)
+    assert save_profile(schema_path, {"people": profile}) == profile_path(schema_path)
+    assert load_profile(schema_path) == {"people": profile}
+    assert load_profile(str(work_dir / "other.sql")) is None
+
+
+@pytest.fixture
+def profiled_schema(people_csv):
+    return apply_profile(parse_sql_schema(PEOPLE_DDL), {"people": profile_csv(people_csv[0], sample_rows=3000)})
+
+
+def test_generated_columns_follow_the_profile(profiled_schema, people_csv):
+    frame = people_csv[1]
+    rows = pd.DataFrame(generate_data(profiled_schema, 5000, seed=1)["people"])
+
+    assert rows["id"].tolist() == list(range(1, 5001))
+    assert rows["height"].astype(float).mean() == pytest.approx(frame["Height"].mean(), abs=1)
+    shares = rows["city"].value_counts(normalize=True)
+    assert shares["Oslo"] == pytest.approx(0.6, abs=0.03) and shares["Lima"] == pytest.approx(0.1, abs=0.02)
+    # The schema's NOT NULL wins over the sample's missing scores
+    assert rows["score"].notna().all() and set(rows["score"]) <= {0, 1, 2, 3, 4}
+    assert rows["height"].astype(float).corr(rows["weight"].astype(float)) == pytest.approx(
+        frame["Height"].corr(frame["weight"]), abs=0.05
+    )
+
+
+def test_profiled_generation_is_chunk_independent(profiled_schema):
+    assert "copula" in profiled_schema["people"]
+    reference = generate_data_reference(profiled_schema, 300, seed=5)
+    assert generate_data(profiled_schema, 300, seed=5) == reference
+    assert generate_columns(profiled_schema, 300, seed=5)["people"].slice(100, 200).to_rows() == reference["people"][100:200]
+
+
+def test_copula_correlates_normal_scores():
+    copula = Copula(["a", "b"], [[1.0, 0.8], [0.8, 1.0]])
+    rng = np.random.default_rng(0)
+    uniforms = copula.correlate({"a": rng.random(20000), "b": rng.random(20000)})
+    scores = np.corrcoef(normal_ppf(uniforms["a"]), normal_ppf(uniforms["b"]))[0, 1]
+    assert scores == pytest.approx(0.8, abs=0.02)
+    assert ((uniforms["a"] >= 0) & (uniforms["a"] < 1)).all()
+
+
+def test_profile_for_an_unknown_table_is_rejected(people_csv):
+    with pytest.raises(ValueError, match="not in the schema"):
+        apply_profile(parse_sql_schema(PEOPLE_DDL), {"staff": profile_csv(people_csv[0])})
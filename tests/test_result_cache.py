@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from agents.configuration_agent import configure_generation, export_data
+from agents.data_generation_agent import generate_columns
+from agents.result_cache import ResultCache, result_key
+
+SCHEMA_DDL = "CREATE TABLE users (id INT PRIMARY KEY, name VARCHAR(20));"
+
+
+def _export(shop_schema, output_dir, rows=10):
+    columns = generate_columns(shop_schema, rows, seed=1)
+    exported = export_data(columns, configure_generation(rows), str(output_dir))["tables"]
+    exported["orders"]["validation"] = {"success": True}
+    return exported
+
+
+def test_hit_links_cached_files_into_the_output_dir(shop_schema, work_dir):
+    exported = _export(shop_schema, work_dir / "first")
+    cache = ResultCache(str(work_dir / "cache"))
+    cache.put("key", "CSV", exported)
+
+    assert cache.get("other", str(work_dir / "second")) is None
+    hit = cache.get("key", str(work_dir / "second"))
+    assert set(hit) == set(exported)
+    assert hit["orders"]["validation"] == {"success": True}
+    for table_name, info in hit.items():
+        [path] = info["file_paths"]
+        assert path == str(work_dir / "second" / f"{table_name}_generated.csv")
+        assert os.path.samefile(path, exported[table_name]["file_paths"][0])
+        assert info["rows"] == exported[table_name]["rows"]
+    assert os.path.exists(work_dir / "second" / "manifest.json")
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 1
+
+
+def test_entries_survive_restarts(shop_schema, work_dir):
+    exported = _export(shop_schema, work_dir / "first")
+    ResultCache(str(work_dir / "cache")).put("key", "CSV", exported)
+    cache = ResultCache(str(work_dir / "cache"))
+    assert cache.stats()["entries"] == 1
+    assert cache.get("key", str(work_dir / "second"))["customers"]["rows"] == 10
+
+
+def test_least_recently_used_entries_are_evicted(shop_schema, work_dir):
+    exported = _export(shop_schema, work_dir / "first")
+    size = sum(info["bytes"] for info in exported.values())
+    cache = ResultCache(str(work_dir / "cache"), max_bytes=2 * size)
+    cache.put("a", "CSV", exported)
+    cache.put("b", "CSV", exported)
+    cache.get("a", str(work_dir / "out"))
+    cache.put("c", "CSV", exported)
+
+    assert sorted(os.listdir(work_dir / "cache")) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 2 * size
+
+
+def test_oversized_entry_is_kept_alone(shop_schema, work_dir):
+    exported = _export(shop_schema, work_dir / "first")
+    cache = ResultCache(str(work_dir / "cache"), max_bytes=1)
+    cache.put("a", "CSV", exported)
+    cache.put("b", "CSV", exported)
+    assert os.listdir(work_dir / "cache") == ["b"]
+
+
+@pytest.fixture
+def schema_path(work_dir):
+    path = work_dir / "users.sql"
+    path.write_text(SCHEMA_DDL)
+    return str(path)
+
+
+def test_result_key_covers_what_shapes_the_output(schema_path):
+    key = result_key(schema_path, configure_generation(10), seed=1)
+    assert result_key(schema_path, configure_generation(10), seed=1) == key
+    assert result_key(schema_path, configure_generation(10), seed=2) != key
+    assert result_key(schema_path, configure_generation(11), seed=1) != key
+    assert result_key(schema_path, configure_generation(10, export_format="JSON"), seed=1) != key
+
+    # Chunk size only matters when parallel workers write part files
+    assert result_key(schema_path, configure_generation(10, chunk_size=3), seed=1) == key
+    assert result_key(schema_path, configure_generation(10, chunk_size=3, workers=2), seed=1) != key
+
+    with open(schema_path, 'a') as f:
+        f.write("\n")
+    assert result_key(schema_path, configure_generation(10), seed=1) != key
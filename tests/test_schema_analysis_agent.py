@@ -0,0 +1,206 @@
+import json
+import os
+
+import pytest
+
+from agents.data_generation_agent import generate_data
+from agents.schema_analysis_agent import SchemaCache, analyze_schema_directory, analyze_schema_file, parse_sql_schema
+
+
+def test_parses_columns_keys_and_foreign_keys(shop_schema):
+    assert list(shop_schema) == ["customers", "products", "orders"]
+    orders = shop_schema["orders"]
+    assert list(orders["columns"]) == ["id", "customer_id", "product_id", "total", "paid"]
+    assert orders["primary_key"] == "id"
+    assert orders["columns"]["id"]["primary_key"]
+    assert orders["columns"]["customer_id"]["not_null"]
+    assert orders["columns"]["total"]["type"] == "DECIMAL(10,2)"
+    assert orders["columns"]["product_id"]["foreign_key"] == {"table": "products", "column": "id"}
+    assert orders["foreign_keys"] == [
+        {"column": "customer_id", "ref_table": "customers", "ref_column": "id"},
+        {"column": "product_id", "ref_table": "products", "ref_column": "id"}
+    ]
+    assert shop_schema["customers"]["columns"]["email"]["unique"]
+
+
+def test_quoting_comments_and_qualified_names():
+    schema = parse_sql_schema("""
+        -- accounts
+        CREATE TABLE IF NOT EXISTS `shop`.`accounts` (
+            `id` INT NOT NULL AUTO_INCREMENT, /* surrogate key */
+            "display name" VARCHAR(64),
+            PRIMARY KEY (`id`)
+        ) ENGINE=InnoDB;
+    """)
+    assert list(schema) == ["accounts"]
+    assert list(schema["accounts"]["columns"]) == ["id", "display name"]
+    assert schema["accounts"]["primary_key"] == "id"
+
+
+@pytest.mark.parametrize("definition", ["key VARCHAR(20)", '"key" VARCHAR(20)', "`index` INT", "index INT"])
+def test_columns_named_key_or_index(definition):
+    schema = parse_sql_schema(f"CREATE TABLE t (id INT PRIMARY KEY, {definition});")
+    name = definition.split()[0].strip('"`')
+    assert list(schema["t"]["columns"]) == ["id", name]
+
+
+@pytest.mark.parametrize("clause", [
+    "KEY idx_email (email)",
+    "INDEX (email)",
+    "KEY idx_email USING BTREE (email)",
+    "FULLTEXT KEY ft_email (email)",
+])
+def test_index_clauses_are_not_columns(clause):
+    schema = parse_sql_schema(f"CREATE TABLE t (id INT PRIMARY KEY, email VARCHAR(100), {clause});")
+    assert list(schema["t"]["columns"]) == ["id", "email"]
+
+
+def test_unique_key_clause_marks_column_unique():
+    schema = parse_sql_schema("CREATE TABLE t (id INT, code VARCHAR(8), UNIQUE KEY uq_code (code));")
+    assert schema["t"]["columns"]["code"]["unique"]
+
+
+def test_named_constraints_and_composite_primary_key():
+    schema = parse_sql_schema("""
+        CREATE TABLE users (id INT PRIMARY KEY);
+        CREATE TABLE order_lines (
+            order_id INT,
+            line_no INT,
+            user_id INT REFERENCES users(id),
+            CONSTRAINT pk_lines PRIMARY KEY (order_id, line_no),
+            CONSTRAINT fk_user FOREIGN KEY (user_id) REFERENCES users (id)
+        );
+    """)
+    lines = schema["order_lines"]
+    assert lines["primary_key"] == ["order_id", "line_no"]
+    assert all(lines["columns"][column]["not_null"] for column in ("order_id", "line_no"))
+    assert not any(properties.get("primary_key") for properties in lines["columns"].values())
+    assert lines["foreign_keys"] == [{"column": "user_id", "ref_table": "users", "ref_column": "id"}]
+
+
+@pytest.mark.parametrize("clause", [
+    "PRIMARY KEY CLUSTERED (order_id, line_no)",
+    "CONSTRAINT pk_lines PRIMARY KEY NONCLUSTERED (order_id, line_no)",
+])
+def test_clustered_primary_key(clause):
+    schema = parse_sql_schema(f"CREATE TABLE lines (order_id INT, line_no INT, note TEXT, {clause});")
+    assert schema["lines"]["primary_key"] == ["order_id", "line_no"]
+    assert list(schema["lines"]["columns"]) == ["order_id", "line_no", "note"]
+
+
+@pytest.mark.parametrize("reference", [
+    "FOREIGN KEY (customer_id) REFERENCES customers ON DELETE CASCADE",
+    "FOREIGN KEY (customer_id) REFERENCES customers",
+    "CONSTRAINT fk_customer FOREIGN KEY (customer_id) REFERENCES shop.customers ON UPDATE NO ACTION",
+])
+def test_foreign_key_without_column_list_references_primary_key(reference):
+    schema = parse_sql_schema(f"""
+        CREATE TABLE orders (id INT PRIMARY KEY, customer_id INT, {reference});
+        CREATE TABLE customers (customer_no INT PRIMARY KEY, name VARCHAR(50));
+    """)
+    orders = schema["orders"]
+    assert orders["foreign_keys"] == [{"column": "customer_id", "ref_table": "customers", "ref_column": "customer_no"}]
+    assert orders["columns"]["customer_id"]["foreign_key"] == {"table": "customers", "column": "customer_no"}
+
+
+def test_inline_and_composite_references_without_column_list():
+    schema = parse_sql_schema("""
+        CREATE TABLE orders (order_id INT, line INT, PRIMARY KEY (order_id, line));
+        CREATE TABLE users (id INT PRIMARY KEY);
+        CREATE TABLE shipments (
+            user_id INT REFERENCES users ON DELETE SET NULL,
+            order_id INT,
+            line INT,
+            FOREIGN KEY (order_id, line) REFERENCES orders
+        );
+    """)
+    assert schema["shipments"]["foreign_keys"] == [
+        {"column": "user_id", "ref_table": "users", "ref_column": "id"},
+        {"column": "order_id", "ref_table": "orders", "ref_column": "order_id"},
+        {"column": "line", "ref_table": "orders", "ref_column": "line"}
+    ]
+
+
+def test_on_delete_reference_generates():
+    schema = parse_sql_schema("""
+        CREATE TABLE customers (id INT PRIMARY KEY);
+        CREATE TABLE orders (id INT PRIMARY KEY, customer_id INT,
+            FOREIGN KEY (customer_id) REFERENCES customers ON DELETE CASCADE);
+    """)
+    data = generate_data(schema, {"customers": 5, "orders": 20}, seed=1)
+    assert {row["customer_id"] for row in data["orders"]} <= set(range(1, 6))
+
+
+SMALL_DDL = "CREATE TABLE users (id INT PRIMARY KEY, name VARCHAR(20));"
+
+
+def test_schema_cache_serves_unchanged_files(work_dir):
+    path = work_dir / "users.sql"
+    path.write_text(SMALL_DDL)
+    cache = SchemaCache()
+    first = cache.get(str(path))
+    assert cache.get(str(path)) == first == parse_sql_schema(SMALL_DDL)
+    assert cache.stats() == {"hits": 1, "disk_hits": 0, "misses": 1, "entries": 1}
+
+
+def test_schema_cache_returns_copies(work_dir):
+    path = work_dir / "users.sql"
+    path.write_text(SMALL_DDL)
+    cache = SchemaCache()
+    cache.get(str(path))["users"]["columns"].clear()
+    assert list(cache.get(str(path))["users"]["columns"]) == ["id", "name"]
+
+
+def test_schema_cache_reparses_changed_content(work_dir):
+    path = work_dir / "users.sql"
+    path.write_text(SMALL_DDL)
+    cache = SchemaCache()
+    cache.get(str(path))
+    path.write_text(SMALL_DDL.replace("name", "email"))
+    os.utime(path, ns=(1, 1))
+    assert list(cache.get(str(path))["users"]["columns"]) == ["id", "email"]
+    assert cache.stats()["misses"] == 2
+
+    # A touched file with the same content is hashed but not parsed again
+    os.utime(path, ns=(2, 2))
+    cache.get(str(path))
+    assert cache.stats() == {"hits": 1, "disk_hits": 0, "misses": 2, "entries": 1}
+
+
+def test_schema_cache_survives_restarts_on_disk(work_dir):
+    path = work_dir / "users.sql"
+    path.write_text(SMALL_DDL)
+    SchemaCache(cache_dir=str(work_dir / "cache")).get(str(path))
+    cache = SchemaCache(cache_dir=str(work_dir / "cache"))
+    assert cache.get(str(path)) == parse_sql_schema(SMALL_DDL)
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_schema_cache_evicts_least_recently_used(work_dir):
+    cache = SchemaCache(max_entries=2)
+    for name in ["a", "b", "c"]:
+        (work_dir / f"{name}.sql").write_text(SMALL_DDL)
+        cache.get(str(work_dir / f"{name}.sql"))
+    assert cache.stats()["entries"] == 2
+    cache.get(str(work_dir / "a.sql"))
+    assert cache.stats()["misses"] == 4
+
+
+def test_directory_is_parsed_concurrently_with_per_file_table_names(work_dir):
+    schema_dir = work_dir / "schemas"
+    schema_dir.mkdir()
+    for i in range(20):
+        (schema_dir / f"table_{i:02d}.json").write_text(json.dumps({
+            "primaryKey": "id", "fields": [{"name": "id", "type": "integer"}, {"name": f"col_{i}"}]
+        }))
+    (schema_dir / "users.sql").write_text(SMALL_DDL)
+    (schema_dir / "users.profile.json").write_text("{}")
+    (schema_dir / "notes.txt").write_text("not a schema")
+
+    schemas = analyze_schema_directory(str(schema_dir), max_workers=8, use_cache=False)
+    assert sorted(schemas) == [f"table_{i:02d}.json" for i in range(20)] + ["users.sql"]
+    for i in range(20):
+        table = schemas[f"table_{i:02d}.json"][f"table_{i:02d}"]
+        assert list(table["columns"]) == ["id", f"col_{i}"] and table["primary_key"] == "id"
+    for file_name, schema in schemas.items():
+        assert schema == analyze_schema_file(str(schema_dir / file_name))
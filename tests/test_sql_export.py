@@ -0,0 +1,84 @@
+import io
+import sqlite3
+
+import numpy as np
+import pytest
+
+from agents.generated_table import DictionaryColumn, GeneratedTable
+from agents.sql_export import SqlChunkWriter, copy_text_values, sql_literals
+
+ROWS = [
+    {"id": 1, "name": "O'Brien", "score": 1.5, "active": True},
+    {"id": 2, "name": None, "score": float("nan"), "active": False},
+    {"id": 3, "name": "tab\there", "score": -2.0, "active": True}
+]
+
+
+def _write(mode, chunks, **kwargs):
+    out = io.StringIO()
+    writer = SqlChunkWriter(out, "people", mode=mode, **kwargs)
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("values, expected", [
+    (np.array([1, -2]), ["1", "-2"]),
+    (np.array([True, False]), ["TRUE", "FALSE"]),
+    (np.array([1.5, np.nan]), ["1.5", "NULL"]),
+    (["it's", None], ["'it''s'", "NULL"]),
+    ([1, "a", None, True], ["1", "'a'", "NULL", "TRUE"]),
+    (DictionaryColumn(np.array([1, 0, 1], dtype=np.int8), np.array(["x", "y'"], dtype=object)),
+     ["'y'''", "'x'", "'y'''"])
+])
+def test_sql_literals(values, expected):
+    assert sql_literals(values) == expected
+
+
+def test_copy_text_values_escape_and_null():
+    assert copy_text_values(["a\tb", "x\\y", None]) == ["a\\tb", "x\\\\y", "\\N"]
+    assert copy_text_values(np.array([True, False])) == ["t", "f"]
+    assert copy_text_values(np.array([2.5, np.nan])) == ["2.5", "\\N"]
+
+
+def test_insert_mode_batches_rows_and_transactions():
+    sql = _write("insert", [ROWS, ROWS], batch_size=2, transaction_rows=4)
+    assert sql.count("INSERT INTO people (id, name, score, active) VALUES") == 4
+    assert sql.count("BEGIN;") == 2
+    assert sql.count("COMMIT;") == 2
+    assert "'O''Brien'" in sql
+
+
+def test_copy_mode_writes_one_block():
+    sql = _write("copy", [ROWS[:2], ROWS[2:]])
+    assert sql == (
+        "COPY people (id, name, score, active) FROM STDIN;\n"
+        "1\tO'Brien\t1.5\tt\n"
+        "2\t\\N\t\\N\tf\n"
+        "3\ttab\\there\t-2.0\tt\n"
+        "\\.\n"
+    )
+
+
+@pytest.mark.parametrize("mode", ["insert", "sqlite"])
+def test_sql_dump_loads_into_sqlite(mode):
+    table = GeneratedTable({
+        "id": np.array([1, 2, 3]),
+        "name": np.array(["O'Brien", None, "tab\there"], dtype=object),
+        "score": np.array([1.5, np.nan, -2.0]),
+        "active": np.array([True, False, True])
+    })
+    sql = _write(mode, [table.slice(0, 2), table.slice(2, 3)], batch_size=2)
+    connection = sqlite3.connect(":memory:")
+    if mode == "insert":
+        connection.execute("CREATE TABLE people (id INTEGER, name TEXT, score REAL, active INTEGER)")
+    connection.executescript(sql)
+    assert connection.execute("SELECT * FROM people ORDER BY id").fetchall() == [
+        (1, "O'Brien", 1.5, 1), (2, None, None, 0), (3, "tab\there", -2.0, 1)
+    ]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported SQL export mode"):
+        SqlChunkWriter(io.StringIO(), "people", mode="csv")
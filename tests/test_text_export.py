@@ -0,0 +1,76 @@
+import html
+import io
+import json
+
+import numpy as np
+import pytest
+
+from agents.data_generation_agent import columns_to_rows, generate_columns
+from agents.generated_table import DictionaryColumn
+from agents.text_export import JsonChunkWriter, XmlChunkWriter, json_values, xml_values
+
+MIXED_VALUES = ["plain", "quote \" and \\ backslash", "<tag> & 'apostrophe'", "ünïcödé", "", None]
+
+
+@pytest.mark.parametrize("values", [
+    np.arange(-5, 100, dtype=np.int64),
+    np.array([0.1, 2.5, 1e20, -3.0] * 20),
+    np.array([True, False, True]),
+    np.array(MIXED_VALUES * 20, dtype=object),
+    np.array([1, "one", 2.5, True, None], dtype=object),
+])
+def test_json_values_match_json_dumps(values):
+    assert json_values(values) == [json.dumps(value) for value in values.tolist()]
+
+
+def test_json_values_render_nan_as_null():
+    assert json_values(np.array([1.5, np.nan])) == ["1.5", "null"]
+
+
+@pytest.mark.parametrize("values", [
+    np.arange(100),
+    np.array([0.25, 10.0] * 40),
+    np.array(MIXED_VALUES * 20, dtype=object),
+])
+def test_xml_values_match_html_escape(values):
+    assert xml_values(values) == [html.escape(str(value)) for value in values.tolist()]
+
+
+def test_dictionary_columns_render_like_their_values():
+    column = DictionaryColumn(np.array([2, 0, -1, 1, 2]), np.array(["a&b", "c", "d"], dtype=object))
+    assert json_values(column) == ['"d"', '"a&b"', "null", '"c"', '"d"']
+    assert xml_values(column) == ["d", "a&amp;b", "None", "c", "d"]
+
+
+def _written(writer_class, chunks, *args, **kwargs):
+    out = io.StringIO()
+    writer = writer_class(out, *args, **kwargs)
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100])
+def test_json_writer_matches_json_dump(shop_schema, chunk_size):
+    table = generate_columns(shop_schema, 30, seed=2)["customers"]
+    rows = columns_to_rows(table)
+    chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+    assert _written(JsonChunkWriter, chunks) == json.dumps(rows, indent=4)
+    assert _written(JsonChunkWriter, chunks, lines=True) == "".join(json.dumps(row) + "\n" for row in rows)
+
+
+def test_json_writer_empty_table():
+    assert _written(JsonChunkWriter, []) == json.dumps([], indent=4)
+    assert _written(JsonChunkWriter, [], lines=True) == ""
+
+
+def test_xml_writer_matches_per_field_writes(shop_schema):
+    rows = columns_to_rows(generate_columns(shop_schema, 12, seed=2)["orders"])
+    expected = "<data><table name='orders'>\n"
+    for row in rows:
+        expected += "  <row>\n"
+        expected += "".join(f"    <{key}>{html.escape(str(value))}</{key}>\n" for key, value in row.items())
+        expected += "  </row>\n"
+    expected += "</table></data>\n"
+    assert _written(XmlChunkWriter, [rows[:5], rows[5:]], "orders") == expected
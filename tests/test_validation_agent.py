@@ -0,0 +1,106 @@
+import pytest
+
+from agents.data_generation_agent import generate_data
+from agents.schema_analysis_agent import parse_sql_schema
+from agents.validation_agent import IncrementalValidator, validate_all_tables
+
+
+def _failures(report):
+    return {
+        (res["expectation_config"]["expectation_type"], res["expectation_config"]["kwargs"]["column"]):
+            res["result"].get("unexpected_count")
+        for res in report["results"] if not res["success"]
+    }
+
+
+@pytest.fixture
+def broken_data(shop_schema):
+    """
+    Shop data with a null name, a duplicate order id and an order whose
+    customer does not exist.
+    """
+    data = generate_data(shop_schema, 40, seed=3)
+    data["customers"][2]["name"] = None
+    data["orders"][5]["id"] = data["orders"][6]["id"]
+    data["orders"][3]["customer_id"] = 999
+    return data
+
+
+def test_batch_validation_reports_failures(shop_schema, broken_data):
+    results = validate_all_tables(broken_data, shop_schema)
+    assert _failures(results["customers"]) == {("expect_column_values_to_not_be_null", "name"): 1}
+    assert _failures(results["products"]) == {}
+    assert _failures(results["orders"]) == {
+        ("expect_column_values_to_be_unique", "id"): 2,
+        ("expect_column_values_to_be_in_set", "customer_id"): 1
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 40])
+def test_incremental_validation_equals_batch(shop_schema, broken_data, chunk_size):
+    validator = IncrementalValidator(shop_schema)
+    for table_name, rows in broken_data.items():
+        for start in range(0, len(rows), chunk_size):
+            validator.add_chunk(table_name, rows[start:start + chunk_size])
+        validator.finish_table(table_name)
+    assert validator.reports() == validate_all_tables(broken_data, shop_schema)
+
+
+def test_incremental_validation_finds_duplicates_across_chunks(shop_schema):
+    data = generate_data(shop_schema, 20, seed=1)
+    data["products"][15]["id"] = data["products"][0]["id"]
+    validator = IncrementalValidator(shop_schema)
+    for start in range(0, 20, 10):
+        validator.add_chunk("products", data["products"][start:start + 10])
+    validator.finish_table("products")
+    assert _failures(validator.report("products")) == {("expect_column_values_to_be_unique", "id"): 2}
+
+
+LINES_DDL = """
+CREATE TABLE orders (id INT PRIMARY KEY, code VARCHAR(8) UNIQUE);
+CREATE TABLE order_items (
+    order_id INT REFERENCES orders(id),
+    line INT,
+    sku VARCHAR(12),
+    PRIMARY KEY (order_id, line)
+);
+"""
+
+
+@pytest.fixture
+def duplicate_lines():
+    """
+    Orders with a repeated unique code and items with a repeated
+    (order_id, line) key, whose columns are each repeated elsewhere too.
+    """
+    return {
+        "orders": [{"id": 1, "code": "A"}, {"id": 2, "code": "B"}, {"id": 3, "code": "A"}],
+        "order_items": [
+            {"order_id": 1, "line": 1, "sku": "x"},
+            {"order_id": 1, "line": 2, "sku": "y"},
+            {"order_id": 2, "line": 1, "sku": "z"},
+            {"order_id": 1, "line": 2, "sku": "w"},
+            {"order_id": 3, "line": 1, "sku": "v"}
+        ]
+    }
+
+
+def test_composite_keys_and_unique_columns_are_checked(duplicate_lines):
+    schema = parse_sql_schema(LINES_DDL)
+    results = validate_all_tables(duplicate_lines, schema)
+    assert _failures(results["orders"]) == {("expect_column_values_to_be_unique", "code"): 2}
+    assert _failures(results["order_items"]) == {("expect_compound_columns_to_be_unique", "order_id"): 2}
+    [compound] = [res for res in results["order_items"]["results"] if not res["success"]]
+    assert compound["expectation_config"]["kwargs"]["column_list"] == ["order_id", "line"]
+    assert compound["result"]["partial_unexpected_list"] == [[1, 2]]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5])
+def test_incremental_composite_keys_equal_batch(duplicate_lines, chunk_size):
+    schema = parse_sql_schema(LINES_DDL)
+    validator = IncrementalValidator(schema)
+    for table_name, rows in duplicate_lines.items():
+        for start in range(0, len(rows), chunk_size):
+            validator.add_chunk(table_name, rows[start:start + chunk_size])
+        validator.finish_table(table_name)
+    assert validator.reports() == validate_all_tables(duplicate_lines, schema)
@@ -0,0 +1,76 @@
+import gzip
+import json
+
+import pytest
+
+from agents.validation_agent import validate_all_tables
+from agents.validation_report import (
+    MAX_SUMMARY_FAILURES, ReportWriter, compact_result, format_summary, summarize_result
+)
+
+
+@pytest.fixture
+def orders_report(shop_schema):
+    """
+    A report on 200 orders whose customer ids are all missing from customers.
+    """
+    data = {
+        "customers": [{"id": 1, "name": "a", "email": "a@x", "age": 30}],
+        "orders": [
+            {"id": i, "customer_id": 1000 + i, "product_id": 1, "total": 1.0, "paid": True}
+            for i in range(200)
+        ]
+    }
+    return validate_all_tables(data, {name: shop_schema[name] for name in data})["orders"]
+
+
+def test_compact_result_is_bounded(orders_report):
+    compact = compact_result(orders_report, sample_size=3)
+    [failure] = [res for res in compact["results"]
+                 if not res["success"] and res["expectation_config"]["kwargs"]["column"] == "customer_id"]
+    assert failure["result"]["unexpected_count"] == 200
+    assert failure["result"]["partial_unexpected_list"] == [1000, 1001, 1002]
+    assert "unexpected_list" not in failure["result"]
+    assert failure["expectation_config"]["kwargs"] == {"column": "customer_id"}
+    assert compact["statistics"] == orders_report["statistics"]
+    assert len(json.dumps(compact)) < len(json.dumps(orders_report, default=str))
+
+
+def test_summary_caps_failures():
+    result = {
+        "success": False,
+        "results": [
+            {"success": False, "expectation_config": {
+                "expectation_type": "expect_column_values_to_be_between",
+                "kwargs": {"column": f"c{i}", "min_value": 0, "max_value": 1}
+            }, "result": {"unexpected_count": 1, "unexpected_percent": 50.0, "partial_unexpected_list": [2]}}
+            for i in range(MAX_SUMMARY_FAILURES + 3)
+        ],
+        "statistics": {"evaluated_expectations": MAX_SUMMARY_FAILURES + 3, "successful_expectations": 0}
+    }
+    summary = summarize_result("t", result)
+    assert len(summary["failures"]) == MAX_SUMMARY_FAILURES
+    assert summary["failures_omitted"] == 3
+    assert summary["failures"][0] == {
+        "expectation": "expect_column_values_to_be_between", "column": "c0",
+        "rule": {"min_value": 0, "max_value": 1},
+        "unexpected_count": 1, "unexpected_percent": 50.0, "sample": [2]
+    }
+    lines = format_summary(summary)
+    assert len(lines) == MAX_SUMMARY_FAILURES + 2
+    assert lines[1].endswith("failed on column 'c0' (min_value=0, max_value=1): 1 unexpected (50.00%), e.g. [2]")
+    assert lines[-1] == "  … and 3 more failed expectations"
+
+
+@pytest.mark.parametrize("file_name", ["reports.jsonl", "reports.jsonl.gz"])
+def test_report_writer_writes_one_line_per_report(orders_report, work_dir, file_name):
+    path = str(work_dir / file_name)
+    with ReportWriter(path) as writer:
+        writer.write("orders", orders_report)
+        writer.write("orders", orders_report, part=1)
+    opener = gzip.open if file_name.endswith(".gz") else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f]
+    assert [(entry["table"], entry.get("part")) for entry in entries] == [("orders", None), ("orders", 1)]
+    assert entries[0]["report"] == json.loads(json.dumps(compact_result(orders_report)))
+    assert sorted(p.name for p in work_dir.iterdir()) == [file_name]
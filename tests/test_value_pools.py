@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pytest
+
+from agents import value_pools
+from agents.data_generation_agent import generate_data
+from agents.schema_analysis_agent import parse_sql_schema
+from agents.value_pools import POOL_SEEDS, disambiguate, semantic_type, value_pool
+
+
+@pytest.fixture(autouse=True)
+def empty_pools(monkeypatch):
+    """
+    Starts every test with an empty in-memory pool cache.
+    """
+    monkeypatch.setattr(value_pools, "_pools", {})
+
+
+@pytest.mark.parametrize("column, properties, expected", [
+    ("email", {"type": "VARCHAR(100)"}, "email"),
+    ("CustomerEmail", {"type": "string"}, "email"),
+    ("first_name", {"type": "text"}, "first_name"),
+    ("name", {"type": "VARCHAR(50)"}, "name"),
+    ("zip_code", {"type": "VARCHAR(10)"}, "postcode"),
+    ("country_code", {"type": "VARCHAR(2)"}, None),
+    ("email", {"type": "INT"}, None),
+    ("email", {"type": "VARCHAR(100)", "values": ["a@x"]}, None),
+    ("created", {"type": "TIMESTAMP"}, "datetime"),
+    ("birthday", {"type": "DATE"}, "date"),
+    ("code", {"type": "VARCHAR(8)", "semantic_type": "city"}, "city"),
+])
+def test_semantic_type(column, properties, expected):
+    assert semantic_type(column, properties, require_faker=False) == expected
+
+
+def test_unknown_semantic_type_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported semantic type"):
+        semantic_type("x", {"semantic_type": "color"})
+
+
+def test_pools_are_cached_in_memory_and_on_disk(work_dir):
+    pool_dir = str(work_dir / "pools")
+    pool = value_pool("datetime", 3, size=500, pool_dir=pool_dir)
+    assert len(pool) == len(set(pool)) <= 500
+    assert not pool.flags.writeable
+    assert value_pool("datetime", 3 + POOL_SEEDS, size=500, pool_dir=pool_dir) is pool
+    [file_name] = os.listdir(pool_dir)
+
+    value_pools._pools.clear()
+    reloaded = value_pool("datetime", 3, size=500, pool_dir=pool_dir)
+    assert reloaded is not pool and reloaded.tolist() == pool.tolist()
+    assert os.listdir(pool_dir) == [file_name]
+    assert value_pool("datetime", 4, size=500, pool_dir=pool_dir).tolist() != pool.tolist()
+
+
+def test_date_pool_covers_every_day(work_dir):
+    pool = value_pool("date", 0, pool_dir=str(work_dir))
+    assert (pool[0], pool[-1]) == value_pools.DATE_RANGE
+    assert len(pool) == int((np.datetime64(pool[-1]) - np.datetime64(pool[0])).astype(int)) + 1
+
+
+def test_disambiguate_only_changes_later_rounds():
+    pool = np.array(["a@x.org", "Paris", "b@y.org", "Rome"], dtype=object)
+    index = np.array([0, 1, 2, 3, 2, 1])
+    assert disambiguate(pool, index, np.array([0, 0, 1, 2, 0, 11])).tolist() == [
+        "a@x.org", "Paris", "b+1@y.org", "Rome 3", "b@y.org", "Paris 12"
+    ]
+    assert disambiguate(pool, index[:0], index[:0]).tolist() == []
+
+
+def test_date_columns_draw_from_pools():
+    schema = parse_sql_schema("CREATE TABLE events (id INT PRIMARY KEY, happened DATE);")
+    rows = generate_data(schema, 50, seed=2)["events"]
+    pool = set(value_pool("date", 2).tolist())
+    assert {row["happened"] for row in rows} <= pool
+
+
+def test_faker_pools_are_distinct_values(work_dir):
+    pytest.importorskip("faker")
+    pool = value_pool("email", 1, size=300, pool_dir=str(work_dir))
+    assert len(pool) == len(set(pool)) and all("@" in value for value in pool)
@@ -0,0 +1,224 @@
+import html
+import json
+from json.encoder import encode_basestring_ascii
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from .generated_table import DictionaryColumn, render_dictionary
+from .sql_export import table_columns
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional, faster encoder for untyped values
+    orjson = None
+
+DEFAULT_JSON_INDENT = 4
+FACTORIZE_SAMPLE = 2048
+
+
+def _as_column(values) -> np.ndarray:
+    array = np.asarray(values)
+    if array.ndim != 1:
+        # Rows holding lists or dicts: keep every value as one object
+        array = np.empty(len(values), dtype=object)
+        array[:] = list(values)
+    return array
+
+
+def _repeats(sample: np.ndarray) -> bool:
+    return len(pd.unique(sample)) <= len(sample) // 2
+
+
+def _render_column(array: np.ndarray, render: Callable[[object], str], render_many=None) -> List[str]:
+    """
+    Renders a column value by value, rendering each distinct value only once
+    when the column repeats values (categories, small ints, rounded prices).
+    `render_many`, if given, renders a whole list of values at once.
+    """
+    if render_many is None:
+        def render_many(values):
+            return list(map(render, values))
+    # Mixed object columns are rendered per value: 1 and True hash equal, and
+    # factorizing would turn None into NaN
+    uniform = array.dtype.kind != "O" or pd.api.types.infer_dtype(array, skipna=False) == "string"
+    if uniform and len(array) >= 64 and _repeats(array[:FACTORIZE_SAMPLE]):
+        codes, uniques = pd.factorize(array, use_na_sentinel=False)
+        if len(uniques) <= len(array) // 2:
+            rendered = np.array(render_many(uniques.tolist()), dtype=object)
+            return rendered[codes].tolist()
+    return render_many(array.tolist())
+
+
+def _escape_many(strings: List[str]) -> List[str]:
+    """
+    html.escape for a list of strings, escaping them as one joined string.
+    """
+    joined = "\0".join(strings)
+    if joined.count("\0") != len(strings) - 1:
+        return [html.escape(value) for value in strings]
+    return html.escape(joined).split("\0") if strings else []
+
+
+def _interleave(pieces: List[str], rendered: List[List[str]]) -> str:
+    """
+    Joins rendered columns into one string, row by row, with `pieces[i]`
+    written before column i and `pieces[-1]` after the last one.
+
+    Equivalent to "".join(template % row for row in zip(*rendered)), but the
+    rows are assembled by slice assignment instead of one format call each.
+    """
+    rows = len(rendered[0])
+    step = 2 * len(rendered) + 1
+    out = [None] * (rows * step)
+    for i, piece in enumerate(pieces):
+        out[2 * i::step] = [piece] * rows
+    for i, values in enumerate(rendered):
+        out[2 * i + 1::step] = values
+    return "".join(out)
+
+
+def _json_value(value) -> str:
+    if value is None or (isinstance(value, float) and value != value):
+        return "null"
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(value, default=str)
+
+
+def _is_string_column(array: np.ndarray) -> bool:
+    return array.dtype.kind == "U" or (
+        array.dtype.kind == "O" and pd.api.types.infer_dtype(array, skipna=False) == "string"
+    )
+
+
+def json_values(values) -> List[str]:
+    """
+    Renders a column as JSON literals, matching `json.dumps` for str, int,
+    float and bool values (NaN becomes null).
+    """
+    if isinstance(values, DictionaryColumn):
+        return render_dictionary(values, json_values, "null")
+    array = _as_column(values)
+    kind = array.dtype.kind
+    if kind == "b":
+        return np.where(array, "true", "false").tolist()
+    if kind in "iu":
+        return _render_column(array, str)
+    if kind == "f":
+        rendered = _render_column(array, float.__repr__)
+        for i in np.flatnonzero(np.isnan(array)):
+            rendered[i] = "null"
+        return rendered
+    if _is_string_column(array):
+        return _render_column(array, encode_basestring_ascii)
+    return _render_column(array, _json_value)
+
+
+def xml_values(values) -> List[str]:
+    """
+    Renders a column as escaped XML text, matching `html.escape(str(value))`.
+    """
+    if isinstance(values, DictionaryColumn):
+        return render_dictionary(values, xml_values, "None")
+    array = _as_column(values)
+    kind = array.dtype.kind
+    if kind == "b":
+        return np.where(array, "True", "False").tolist()
+    if kind in "iu":
+        return _render_column(array, str)
+    if kind == "f":
+        return _render_column(array, float.__repr__)
+    if _is_string_column(array):
+        return _render_column(array, html.escape, _escape_many)
+    return _render_column(array, lambda value: html.escape(str(value)))
+
+
+class JsonChunkWriter:
+    """
+    Streams one table as a JSON array or as NDJSON (one object per line).
+
+    Each chunk is rendered column by column, each distinct value once, and
+    the rows are assembled and written with a single call. `indent` matches
+    `json.dump(indent=...)` for arrays; None writes one compact row per line.
+    """
+
+    def __init__(self, file, lines: bool = False, indent: int = DEFAULT_JSON_INDENT):
+        self.file = file
+        self.lines = lines
+        self.indent = None if lines else (indent or None)
+        self.rows_written = 0
+        self._pieces = None
+        if not lines:
+            self.file.write("[")
+
+    def _row_pieces(self, names) -> List[str]:
+        keys = [encode_basestring_ascii(name) for name in names]
+        if self.lines:
+            return ["{" + keys[0] + ": "] + [f", {key}: " for key in keys[1:]] + ["}\n"]
+        if self.indent is None:
+            return [",\n{" + keys[0] + ": "] + [f", {key}: " for key in keys[1:]] + ["}"]
+        outer = " " * self.indent
+        inner = outer * 2
+        return ([f",\n{outer}{{\n{inner}{keys[0]}: "] + [f",\n{inner}{key}: " for key in keys[1:]]
+                + [f"\n{outer}}}"])
+
+    def write(self, table_data) -> int:
+        columns = table_columns(table_data)
+        if not columns:
+            return 0
+        if self._pieces is None:
+            self._pieces = self._row_pieces(columns)
+
+        rendered = [json_values(values) for values in columns.values()]
+        count = len(rendered[0])
+        if not count:
+            return 0
+
+        text = _interleave(self._pieces, rendered)
+        if not self.lines and not self.rows_written:
+            text = "\n" + text[2:]
+        self.file.write(text)
+        self.rows_written += count
+        return count
+
+    def close(self) -> None:
+        if not self.lines:
+            self.file.write("\n]" if self.rows_written else "]")
+
+
+class XmlChunkWriter:
+    """
+    Streams one table as `<data><table name=...><row>...</row></table></data>`.
+    """
+
+    def __init__(self, file, table_name: str):
+        self.file = file
+        self._pieces = None
+        self.file.write(f"<data><table name='{table_name}'>\n")
+
+    def write(self, table_data) -> int:
+        columns = table_columns(table_data)
+        if not columns:
+            return 0
+        if self._pieces is None:
+            names = list(columns)
+            self._pieces = (["  <row>\n    <" + names[0] + ">"]
+                            + [f"</{prev}>\n    <{name}>" for prev, name in zip(names, names[1:])]
+                            + [f"</{names[-1]}>\n  </row>\n"])
+
+        rendered = [xml_values(values) for values in columns.values()]
+        if not rendered[0]:
+            return 0
+        self.file.write(_interleave(self._pieces, rendered))
+        return len(rendered[0])
+
+    def close(self) -> None:
+        self.file.write("</table></data>\n")
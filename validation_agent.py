@@ -1,128 +1,784 @@
+import numpy as np
 import pandas as pd
 import os
-import json
 import html
+import threading
 import time
-from datetime import datetime
-import great_expectations as ge
-from great_expectations.data_context import get_context
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+
+from .data_generation_agent import column_kind, foreign_key_columns, primary_key_columns
+from .generated_table import to_dataframe
+from .instrumentation import PipelineMetrics
+from .validation_report import (
+    UNEXPECTED_SAMPLE_SIZE, ReportWriter, compact_result, format_summary, summarize_result
+)
+
+PARTIAL_UNEXPECTED_COUNT = UNEXPECTED_SAMPLE_SIZE
+BITMAP_MIN_SIZE = 1 << 20
+BITMAP_GROWTH = 16
+
+_ge_batches = None
+_ge_lock = threading.Lock()
+# The shared data source hands out one batch at a time
+_ge_validate_lock = threading.Lock()
 
 
 def convert_type(sql_type: str) -> str:
     """
     Converts SQL-style types to Python types for GE.
     """
-    sql_type = sql_type.lower()
-    if sql_type.startswith("int"):
+    return {"int": "int", "float": "float", "bool": "bool"}.get(column_kind(sql_type), "str")
+
+
+def observed_type(series: pd.Series) -> str:
+    """
+    Infers the Python type name of a column's non-null values in one pass.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Only the categories that occur, each once
+        codes = series.cat.codes.to_numpy()
+        series = pd.Series(series.cat.categories.to_numpy()[np.unique(codes[codes >= 0])], dtype=object)
+    inferred = pd.api.types.infer_dtype(series, skipna=True)
+    if inferred == "integer":
         return "int"
-    elif sql_type.startswith("varchar") or sql_type == "string":
-        return "str"
-    elif sql_type.startswith("float") or sql_type.startswith("double"):
+    if inferred in ("floating", "mixed-integer-float", "decimal"):
         return "float"
-    return "str"
+    if inferred == "boolean":
+        return "bool"
+    if inferred in ("string", "empty"):
+        return "str"
+    return inferred
 
 
-def validate_data(
+def _ge_batch_definition():
+    """
+    Returns the Great Expectations (1.x) batch definition that validates
+    whole DataFrames, created once per process in an ephemeral context.
+
+    Great Expectations is an optional backend that takes seconds to import,
+    so it is only imported here, on first use (or by `preload`).
+    """
+    global _ge_batches
+    with _ge_lock:
+        if _ge_batches is None:
+            try:
+                import great_expectations as gx
+                from great_expectations.data_context.types.base import ProgressBarsConfig
+            except ImportError:
+                raise ImportError("The 'ge' validation backend requires great_expectations>=1.0 to be installed")
+            context = gx.get_context(mode="ephemeral")
+            if not hasattr(context, "data_sources"):
+                raise ImportError(
+                    f"The 'ge' validation backend requires great_expectations>=1.0, found {gx.__version__}"
+                )
+            context.variables.progress_bars = ProgressBarsConfig(globally=False)
+            asset = context.data_sources.add_pandas("generated").add_dataframe_asset("tables")
+            _ge_batches = asset.add_batch_definition_whole_dataframe("table")
+    return _ge_batches
+
+
+def _ge_expectation(expectation_type: str, column: str, **kwargs):
+    """
+    Builds a Great Expectations expectation from its snake_case name.
+    """
+    import great_expectations as gx
+
+    name = "".join(part.capitalize() for part in expectation_type.split("_"))
+    return getattr(gx.expectations, name)(column=column, **kwargs)
+
+
+def _reference_keys(
+    reference_data: Dict[str, Any],
+    reference_index: Dict[Tuple[str, str], Any],
+    ref_table: str,
+    ref_column: str
+):
+    """
+    Returns the unique key values of a referenced column, or None if unknown.
+    """
+    key = (ref_table, ref_column)
+    if reference_index is not None and key in reference_index:
+        return reference_index[key]
+    if reference_data and ref_table in reference_data:
+        ref_df = to_dataframe(reference_data[ref_table])
+        if ref_column in ref_df.columns:
+            keys = pd.unique(ref_df[ref_column])
+            if reference_index is not None:
+                reference_index[key] = keys
+            return keys
+    return None
+
+
+def _plain_values(series: pd.Series) -> list:
+    """
+    Converts a (small) Series to a JSON-friendly list with None for missing values.
+    """
+    return [
+        value if isinstance(value, list) else None if pd.isna(value) else value
+        for value in series.astype(object).tolist()
+    ]
+
+
+def _key_tuples(df: pd.DataFrame, keys: List[str]) -> np.ndarray:
+    """
+    Returns the (a, b, ...) tuples of the rows whose `keys` columns are all
+    present, as an object array. Rows with a missing key part never
+    collide, as in SQL.
+    """
+    present = df[keys].notna().all(axis=1).to_numpy()
+    return pd.Series(list(zip(*(df[key].to_numpy()[present].tolist() for key in keys))), dtype=object).to_numpy()
+
+
+def _compound_result(df: pd.DataFrame, column: str, keys: List[str]) -> dict:
+    """
+    Checks that the combinations of `keys` are unique. The result is
+    reported on the first key column, with the key tuples as samples.
+    """
+    series = df[column]
+    present = df[keys].notna().all(axis=1)
+    unexpected = present & df.duplicated(subset=keys, keep=False)
+    repeats = df.loc[present & df.duplicated(subset=keys, keep="first"), keys]
+    return _expectation_result(
+        "expect_compound_columns_to_be_unique", column, series,
+        unexpected=unexpected, partial=pd.Series(repeats.astype(object).values.tolist(), dtype=object),
+        kwargs={"column_list": list(keys)}
+    )
+
+
+def _expectation_result(
+    expectation_type: str,
+    column: str,
+    series: pd.Series,
+    unexpected: pd.Series = None,
+    partial: pd.Series = None,
+    observed_value: Any = None,
+    success: bool = None,
+    kwargs: dict = None
+) -> dict:
+    """
+    Builds one expectation result in the same shape as Great Expectations' JSON output.
+    """
+    result = {"element_count": int(len(series))}
+    if unexpected is not None:
+        unexpected_count = int(unexpected.sum())
+        partial = series[unexpected] if partial is None else partial
+        result.update({
+            "unexpected_count": unexpected_count,
+            "unexpected_percent": 100.0 * unexpected_count / len(series) if len(series) else 0.0,
+            "partial_unexpected_list": _plain_values(partial.head(PARTIAL_UNEXPECTED_COUNT))
+        })
+        success = unexpected_count == 0
+    else:
+        result["observed_value"] = observed_value
+
+    return {
+        "success": bool(success),
+        "expectation_config": {"expectation_type": expectation_type, "kwargs": {"column": column, **(kwargs or {})}},
+        "result": result
+    }
+
+
+def _validate_native(
     df: pd.DataFrame,
-    table_name: str,
     expectations: dict,
-    reference_data: Dict[str, List[Dict[str, Any]]] = None
+    reference_data: Dict[str, Any] = None,
+    reference_index: Dict[Tuple[str, str], Any] = None
 ) -> dict:
     """
-    Validates a single table (DataFrame) using Great Expectations rules.
+    Runs every expectation as a vectorized pandas operation.
     """
-    context = get_context()
-    suite_name = f"{table_name}_suite_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-    context.add_expectation_suite(expectation_suite_name=suite_name)
-    validator = context.sources.pandas_default.read_dataframe(df)
+    results = []
+    for column, rules in expectations.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
 
-    start = time.time()
-    print(f"\n🔍 Validating table: {table_name}")
+        if rules.get("not_null"):
+            results.append(_expectation_result(
+                "expect_column_values_to_not_be_null", column, series, unexpected=series.isna()
+            ))
+        if rules.get("unique"):
+            present = series.notna()
+            results.append(_expectation_result(
+                "expect_column_values_to_be_unique", column, series,
+                unexpected=present & series.duplicated(keep=False),
+                partial=series[present & series.duplicated(keep="first")]
+            ))
+        for keys in rules.get("compound_unique", ()):
+            if all(key in df.columns for key in keys):
+                results.append(_compound_result(df, column, keys))
+        if "type" in rules:
+            observed = observed_type(series)
+            results.append(_expectation_result(
+                "expect_column_values_to_be_of_type", column, series,
+                observed_value=observed, success=observed == rules["type"]
+            ))
+        if "in_set" in rules:
+            results.append(_expectation_result(
+                "expect_column_values_to_be_in_set", column, series,
+                unexpected=series.notna() & ~series.isin(rules["in_set"])
+            ))
+
+        # Foreign key checks
+        if "foreign_key" in rules:
+            ref_table, ref_column = rules["foreign_key"]
+            keys = _reference_keys(reference_data, reference_index, ref_table, ref_column)
+            if keys is not None:
+                results.append(_expectation_result(
+                    "expect_column_values_to_be_in_set", column, series,
+                    unexpected=series.notna() & ~series.isin(keys)
+                ))
+
+        # Custom rule checks
+        if "custom_rules" in rules:
+            expectations_of_rule = rules["custom_rules"].expectations()
+            for (expectation_type, kwargs), unexpected in zip(expectations_of_rule, rules["custom_rules"].violations(df)):
+                results.append(_expectation_result(expectation_type, column, series, unexpected=unexpected, kwargs=kwargs))
+
+    return _report(results)
+
+
+def _report(results: List[dict]) -> dict:
+    """
+    Wraps expectation results with Great Expectations-style statistics.
+    """
+    successful = sum(1 for res in results if res["success"])
+    return {
+        "success": successful == len(results),
+        "results": results,
+        "statistics": {
+            "evaluated_expectations": len(results),
+            "successful_expectations": successful,
+            "unsuccessful_expectations": len(results) - successful,
+            "success_percent": 100.0 * successful / len(results) if results else 100.0
+        }
+    }
+
+
+def _validate_ge(
+    df: pd.DataFrame,
+    expectations: dict,
+    reference_data: Dict[str, Any] = None,
+    reference_index: Dict[Tuple[str, str], Any] = None
+) -> dict:
+    """
+    Runs the expectations through Great Expectations 1.x. Reports name
+    each expectation's `expectation_type`, like the native backend's.
+    """
+    import great_expectations as gx
 
+    batches = _ge_batch_definition()
+    # Great Expectations checks the types of dictionary-encoded columns as 'category'
+    categorical = [column for column, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    if categorical:
+        df = df.astype({column: object for column in categorical})
+    suite = gx.ExpectationSuite(name="generated")
     for column, rules in expectations.items():
         if rules.get("not_null"):
-            validator.expect_column_values_to_not_be_null(column)
+            suite.add_expectation(_ge_expectation("expect_column_values_to_not_be_null", column))
         if rules.get("unique"):
-            validator.expect_column_values_to_be_unique(column)
+            suite.add_expectation(_ge_expectation("expect_column_values_to_be_unique", column))
+        for keys in rules.get("compound_unique", ()):
+            suite.add_expectation(gx.expectations.ExpectCompoundColumnsToBeUnique(column_list=list(keys)))
         if "type" in rules:
-            validator.expect_column_values_to_be_of_type(column, rules["type"])
+            suite.add_expectation(_ge_expectation("expect_column_values_to_be_of_type", column, type_=rules["type"]))
         if "in_set" in rules:
-            validator.expect_column_values_to_be_in_set(column, rules["in_set"])
+            suite.add_expectation(_ge_expectation("expect_column_values_to_be_in_set", column, value_set=rules["in_set"]))
 
         # Foreign key checks
-        if "foreign_key" in rules and reference_data:
+        if "foreign_key" in rules:
             ref_table, ref_column = rules["foreign_key"]
-            if ref_table in reference_data:
-                ref_df = pd.DataFrame(reference_data[ref_table])
-                if ref_column in ref_df.columns:
-                    valid_values = ref_df[ref_column].tolist()
-                    validator.expect_column_values_to_be_in_set(column, valid_values)
-
-    result = validator.validate()
-
-    # Debug Output (Full JSON)
-    print(f"\n📋 Full Validation Output for '{table_name}':")
-    print(json.dumps(result.to_json_dict(), indent=2))
-
-    # Optional: Print only failed expectations
-    print(f"\n❌ Failed Expectations Summary for '{table_name}':")
-    for res in result.results:
-        if not res.success:
-            exp_type = res.expectation_config["expectation_type"]
-            column = res.expectation_config["kwargs"].get("column")
-            unexpected = res.result.get("unexpected_list", [])
-            print(f"  ❌ {exp_type} failed on column '{column}'")
-            print(f"     Unexpected: {unexpected[:5]}{'...' if len(unexpected) > 5 else ''}")
+            keys = _reference_keys(reference_data, reference_index, ref_table, ref_column)
+            if keys is not None:
+                suite.add_expectation(_ge_expectation("expect_column_values_to_be_in_set", column, value_set=list(keys)))
+
+        # Conditional cases and expressions have no Great Expectations counterpart
+        if "custom_rules" in rules:
+            for expectation_type, kwargs in rules["custom_rules"].expectations():
+                if "condition" not in kwargs and "expression" not in kwargs:
+                    suite.add_expectation(_ge_expectation(expectation_type, column, **kwargs))
+
+    with _ge_validate_lock:
+        report = batches.get_batch(batch_parameters={"dataframe": df}).validate(suite).to_json_dict()
+    for result in report["results"]:
+        config = result["expectation_config"]
+        config["expectation_type"] = config.pop("type", config.get("expectation_type"))
+        # Compound checks are reported on their first column, as natively
+        kwargs = config.setdefault("kwargs", {})
+        if "column" not in kwargs and kwargs.get("column_list"):
+            kwargs["column"] = kwargs["column_list"][0]
+    return report
+
+
+VALIDATION_BACKENDS = {
+    "native": _validate_native,
+    "ge": _validate_ge
+}
+
+
+def prepare_backend(backend: str = "native") -> None:
+    """
+    Loads what a validation backend needs before its first table: the
+    shared Great Expectations context for "ge", raising ImportError when a
+    supported Great Expectations is not installed. The native backend
+    needs nothing.
+    """
+    if backend not in VALIDATION_BACKENDS:
+        raise ValueError(f"Unsupported validation backend: '{backend}'. Supported backends are: {', '.join(VALIDATION_BACKENDS)}")
+    if backend == "ge":
+        _ge_batch_definition()
+
+
+def validate_data(
+    df: pd.DataFrame,
+    table_name: str,
+    expectations: dict,
+    reference_data: Dict[str, Any] = None,
+    backend: str = "native",
+    reference_index: Dict[Tuple[str, str], Any] = None
+) -> dict:
+    """
+    Validates a single table (DataFrame) against its expectation rules.
+
+    `backend` is "native" (vectorized pandas checks) or "ge" (Great
+    Expectations). Both return a report in Great Expectations' JSON shape.
+    Foreign key values come from `reference_index` ((table, column) -> unique
+    keys) or, failing that, from the tables in `reference_data`. The report
+    is compacted (see `compact_result`), so its size does not depend on the
+    number of rows.
+    """
+    if backend not in VALIDATION_BACKENDS:
+        raise ValueError(f"Unsupported validation backend: '{backend}'. Supported backends are: {', '.join(VALIDATION_BACKENDS)}")
 
+    start = time.time()
+    print(f"\n🔍 Validating table: {table_name}")
+
+    result = compact_result(VALIDATION_BACKENDS[backend](df, expectations, reference_data, reference_index))
+
+    print_validation_result(table_name, result)
     print(f"✅ Validation for '{table_name}' completed in {time.time() - start:.2f}s")
     return result
 
 
-def validate_all_tables(
-    data: Dict[str, List[Dict[str, Any]]],
-    schema: Dict[str, Any]
-) -> Dict[str, Any]:
+def print_validation_result(table_name: str, result: dict) -> None:
     """
-    Validates all tables in a dataset based on a schema.
+    Prints a short summary of a validation report: the pass count and the
+    first failed expectations with a few unexpected values each. Detailed
+    reports go to a `ReportWriter` file instead of stdout.
     """
-    reference_data = {}
-    dataframes = {}
-    expectations_by_table = {}
+    print("\n".join(format_summary(summarize_result(table_name, result))))
 
-    # Step 1: Convert all tables to DataFrames
-    for table_name, rows in data.items():
-        df = pd.DataFrame(rows)
-        dataframes[table_name] = df
-        reference_data[table_name] = rows
 
-    # Step 2: Build expectations from schema
+def build_expectations(schema: Dict[str, Any]) -> Dict[str, Dict[str, dict]]:
+    """
+    Derives the expectation rules of every table from the parsed schema,
+    including the checks of custom rules compiled into it (`apply_rules`).
+
+    Primary key and `unique` columns must be unique. A composite primary
+    key and every multi-column `unique_constraints` entry become a
+    `compound_unique` check on their first column.
+    """
+    expectations_by_table = {}
     for table_name, details in schema.items():
         table_rules = {}
-        for column, dtype in details.get("columns", {}).items():
+        references = foreign_key_columns(details)
+        columns = details.get("columns", {})
+        primary_key = primary_key_columns(details)
+        compound_keys = [primary_key] if len(primary_key) > 1 else []
+        compound_keys += [list(keys) for keys in details.get("unique_constraints", []) if len(keys) > 1]
+        for column, properties in columns.items():
             rule = {
-                "not_null": True,
-                "type": convert_type(dtype)
+                "not_null": not properties.get("nullable"),
+                "type": convert_type(properties.get("type", "string"))
             }
 
-            # Add unique constraint for primary key
-            if details.get("primary_key") == column:
+            # Add unique constraint for primary key and unique columns
+            if primary_key == [column] or properties.get("primary_key") or properties.get("unique"):
                 rule["unique"] = True
+            compound = [keys for keys in compound_keys if keys[0] == column and all(key in columns for key in keys)]
+            if compound:
+                rule["compound_unique"] = compound
+
+            custom = properties.get("rule")
+            if properties.get("values") and not (custom is not None and custom.supersedes_values):
+                rule["in_set"] = list(properties["values"])
 
             # Add foreign key relationships
-            for fk in details.get("foreign_keys", []):
-                if fk["column"] == column:
-                    rule["foreign_key"] = (fk["ref_table"], fk["ref_column"])
+            if column in references:
+                rule["foreign_key"] = (references[column]["table"], references[column]["column"])
+
+            if custom is not None and custom.expectations():
+                rule["custom_rules"] = custom
 
             table_rules[column] = rule
 
         expectations_by_table[table_name] = table_rules
+    return expectations_by_table
+
+
+def validate_all_tables(
+    data: Dict[str, Any],
+    schema: Dict[str, Any],
+    backend: str = "native",
+    metrics: PipelineMetrics = None,
+    report_path: str = None
+) -> Dict[str, Any]:
+    """
+    Validates all tables in a dataset based on a schema.
+
+    Tables may be lists of row dicts or dicts of column arrays. Per-table
+    validation timings are recorded into `metrics` when given. If
+    `report_path` is set, the detailed reports are also written there in
+    the background (see `ReportWriter`).
+    """
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    # Step 1: Convert all tables to DataFrames
+    dataframes = {table_name: to_dataframe(table_data) for table_name, table_data in data.items()}
+
+    # Step 2: Build expectations from schema
+    expectations_by_table = build_expectations(schema)
 
-    # Step 3: Validate each table
+    # Step 3: Index the key values referenced by foreign keys once
+    reference_index = {}
+    for rules in expectations_by_table.values():
+        for rule in rules.values():
+            if "foreign_key" in rule:
+                _reference_keys(dataframes, reference_index, *rule["foreign_key"])
+
+    # Step 4: Validate each table
     results = {}
-    for table_name, df in dataframes.items():
-        expectations = expectations_by_table.get(table_name, {})
-        result = validate_data(df, table_name, expectations, reference_data)
-        results[table_name] = result
+    report_writer = ReportWriter(report_path) if report_path else None
+    try:
+        for table_name, df in dataframes.items():
+            expectations = expectations_by_table.get(table_name, {})
+            with metrics.stage('validate', table_name, rows=len(df)):
+                results[table_name] = validate_data(
+                    df, table_name, expectations, backend=backend, reference_index=reference_index
+                )
+            if report_writer is not None:
+                report_writer.write(table_name, results[table_name])
+    finally:
+        if report_writer is not None:
+            report_writer.close()
 
     return results
+
+
+def summarize_results(results: Dict[str, dict]) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the small per-table summaries of `validate_all_tables` results.
+    """
+    return {table_name: summarize_result(table_name, result) for table_name, result in results.items()}
+
+
+class KeySet:
+    """
+    Set of column values seen so far. Dense non-negative integer keys are
+    kept in a bitmap; anything else falls back to a Python set.
+    """
+
+    def __init__(self, use_bitmap: bool = True):
+        self._bitmap = np.zeros(0, dtype=bool) if use_bitmap else None
+        self._set = set()
+        self._added = 0
+        self.frozen = False
+
+    def _fits_bitmap(self, values: np.ndarray) -> bool:
+        if self._bitmap is None or values.dtype.kind not in "iu":
+            return False
+        if not len(values):
+            return True
+        limit = max(BITMAP_MIN_SIZE, BITMAP_GROWTH * (self._added + len(values)))
+        return values.min() >= 0 and values.max() < limit
+
+    def contains(self, values: np.ndarray) -> np.ndarray:
+        """
+        Returns a boolean mask of which values are already in the set.
+        """
+        found = np.zeros(len(values), dtype=bool)
+        if self._bitmap is not None and values.dtype.kind in "iu":
+            inside = (values >= 0) & (values < len(self._bitmap))
+            found[inside] = self._bitmap[values[inside]]
+        if self._set:
+            found |= np.fromiter((v in self._set for v in values.tolist()), dtype=bool, count=len(values))
+        return found
+
+    def add(self, values: np.ndarray) -> None:
+        if self.frozen:
+            raise ValueError("Cannot add values to a frozen key set")
+        if self._fits_bitmap(values):
+            if len(values) and values.max() >= len(self._bitmap):
+                grown = np.zeros(max(int(values.max()) + 1, 2 * len(self._bitmap)), dtype=bool)
+                grown[:len(self._bitmap)] = self._bitmap
+                self._bitmap = grown
+            self._bitmap[values] = True
+        else:
+            if self._bitmap is not None:
+                self._set.update(np.flatnonzero(self._bitmap).tolist())
+                self._bitmap = None
+            self._set.update(values.tolist())
+        self._added += len(values)
+
+
+class _ColumnState:
+    """
+    Running counters for the expectations of one column.
+    """
+
+    def __init__(self, rules: dict):
+        self.rules = rules
+        self.element_count = 0
+        self.in_data = False
+        self.observed_types = {}
+        self.unexpected = {}
+        self.partial = {}
+        self.pending = []
+        self.seen = KeySet() if rules.get("unique") else None
+        self.duplicated = KeySet() if rules.get("unique") else None
+        # (seen, duplicated) key tuples of each compound unique check
+        self.compound = [(KeySet(use_bitmap=False), KeySet(use_bitmap=False)) for _ in rules.get("compound_unique", ())]
+
+    def record(self, check: str, count: int, values: list) -> None:
+        self.unexpected[check] = self.unexpected.get(check, 0) + int(count)
+        partial = self.partial.setdefault(check, [])
+        partial.extend(values[:PARTIAL_UNEXPECTED_COUNT - len(partial)])
+
+
+def summarize_chunk(rules: Dict[str, dict], table_data, key_columns: List[str] = ()) -> dict:
+    """
+    Computes what `IncrementalValidator.add_summary` needs from one chunk of
+    a table with the given `build_expectations` rules: the counters of the
+    checks that look at one row at a time, and the values of the unique,
+    foreign key and referenced `key_columns` that are checked across
+    chunks. Summaries are small and picklable, so worker processes can
+    validate their shards and the parent still checks keys across shards.
+    """
+    df = to_dataframe(table_data)
+    summary = {
+        "rows": len(df),
+        "keys": {column: df[column].dropna().to_numpy() for column in key_columns if column in df.columns},
+        "columns": {}
+    }
+    for column, rules in rules.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        present = series.notna()
+        counters = {"element_count": len(series), "observed_types": {}, "unexpected": {}, "values": None}
+
+        if rules.get("not_null"):
+            nulls = int((~present).sum())
+            counters["unexpected"]["not_null"] = (nulls, [None] * min(nulls, PARTIAL_UNEXPECTED_COUNT))
+        if "type" in rules and present.any():
+            counters["observed_types"][observed_type(series[present])] = int(present.sum())
+        if "in_set" in rules:
+            unexpected = present & ~series.isin(rules["in_set"])
+            counters["unexpected"]["in_set"] = (
+                int(unexpected.sum()), _plain_values(series[unexpected].head(PARTIAL_UNEXPECTED_COUNT))
+            )
+        if rules.get("unique") or "foreign_key" in rules:
+            counters["values"] = series[present].to_numpy()
+        counters["compound_values"] = [_key_tuples(df, keys) for keys in rules.get("compound_unique", ())]
+        if "custom_rules" in rules:
+            for check, unexpected in enumerate(rules["custom_rules"].violations(df)):
+                counters["unexpected"][f"custom_{check}"] = (
+                    int(unexpected.sum()), _plain_values(series[unexpected].head(PARTIAL_UNEXPECTED_COUNT))
+                )
+        summary["columns"][column] = counters
+    return summary
+
+
+class IncrementalValidator:
+    """
+    Validates tables chunk by chunk with compact running state and produces
+    the same reports as `validate_all_tables` on the complete tables.
+
+    Parent tables must be finished (`finish_table`) before chunks of tables
+    whose foreign keys reference them are added; generation order already
+    guarantees this. Every table should be finished before its report is read.
+    """
+
+    def __init__(self, schema: Dict[str, Any], reference_index: Dict[Tuple[str, str], Any] = None):
+        self.expectations = build_expectations(schema)
+        self._columns = {
+            table_name: {column: _ColumnState(rules) for column, rules in table_rules.items()}
+            for table_name, table_rules in self.expectations.items()
+        }
+        self._row_counts = {}
+        self._references = {}
+        for table_rules in self.expectations.values():
+            for rules in table_rules.values():
+                if "foreign_key" in rules:
+                    self._references.setdefault(tuple(rules["foreign_key"]), KeySet())
+        for key, keys in (reference_index or {}).items():
+            key_set = KeySet()
+            key_set.add(np.asarray(keys))
+            key_set.frozen = True
+            self._references[tuple(key)] = key_set
+
+    def key_columns(self, table_name: str) -> List[str]:
+        """
+        Returns the columns of a table that other tables' foreign keys read.
+        """
+        return [ref_column for ref_table, ref_column in self._references if ref_table == table_name]
+
+    def add_chunk(self, table_name: str, table_data) -> None:
+        """
+        Folds one chunk (rows or column arrays) into the table's running state.
+        """
+        rules = self.expectations.get(table_name, {})
+        self.add_summary(table_name, summarize_chunk(rules, table_data, self.key_columns(table_name)))
+
+    def add_summary(self, table_name: str, summary: dict) -> None:
+        """
+        Folds a chunk's `summarize_chunk` result into the table's running
+        state; summaries must arrive in row order, like chunks.
+        """
+        self._row_counts[table_name] = self._row_counts.get(table_name, 0) + summary["rows"]
+
+        # Collect referenced keys first so self-references see this chunk's keys
+        for (ref_table, ref_column), key_set in self._references.items():
+            if ref_table == table_name and ref_column in summary["keys"] and not key_set.frozen:
+                key_set.add(summary["keys"][ref_column])
+
+        for column, state in self._columns.get(table_name, {}).items():
+            counters = summary["columns"].get(column)
+            if counters is None:
+                continue
+            state.in_data = True
+            state.element_count += counters["element_count"]
+            for observed, count in counters["observed_types"].items():
+                state.observed_types[observed] = state.observed_types.get(observed, 0) + count
+            for check, (count, values) in counters["unexpected"].items():
+                state.record(check, count, values)
+            if state.seen is not None:
+                self._track_unique(state, "unique", counters["values"], state.seen, state.duplicated)
+            for check, ((seen, duplicated), values) in enumerate(zip(state.compound, counters["compound_values"])):
+                self._track_unique(state, f"compound_{check}", values, seen, duplicated)
+            if "foreign_key" in state.rules:
+                self._check_foreign_key(table_name, state, counters["values"])
+
+    def _check_foreign_key(self, table_name: str, state: _ColumnState, values: np.ndarray) -> None:
+        """
+        Checks foreign key values against the frozen parent keys. Values of a
+        self-reference that are not resolved yet wait until `finish_table`.
+        """
+        ref_table = state.rules["foreign_key"][0]
+        key_set = self._references[tuple(state.rules["foreign_key"])]
+        if ref_table == table_name:
+            state.pending.append(values[~key_set.contains(values)])
+            return
+        if not key_set.frozen and ref_table in self._row_counts:
+            raise ValueError(f"Finish table '{ref_table}' before validating chunks of '{table_name}' that reference it")
+        if key_set.frozen:
+            missing = ~key_set.contains(values)
+            state.record("foreign_key", missing.sum(), values[missing][:PARTIAL_UNEXPECTED_COUNT].tolist())
+
+    def _track_unique(
+        self,
+        state: _ColumnState,
+        check: str,
+        values: np.ndarray,
+        seen: KeySet,
+        duplicated: KeySet
+    ) -> None:
+        """
+        Counts duplicates like the batch check: every occurrence of a
+        repeated value (or key tuple) is unexpected, and repeats are
+        sampled in row order.
+        """
+        repeats = seen.contains(values) | pd.Series(values).duplicated(keep="first").to_numpy()
+        repeated_values = pd.unique(values[repeats])
+        newly_duplicated = repeated_values[~duplicated.contains(repeated_values)]
+        samples = [
+            list(value) if isinstance(value, tuple) else value
+            for value in values[repeats][:PARTIAL_UNEXPECTED_COUNT].tolist()
+        ]
+        state.record(check, repeats.sum() + len(newly_duplicated), samples)
+        duplicated.add(newly_duplicated)
+        seen.add(values)
+
+    def finish_table(self, table_name: str) -> None:
+        """
+        Freezes the key sets other tables' foreign keys read from this table.
+        """
+        for (ref_table, _), key_set in self._references.items():
+            if ref_table == table_name:
+                key_set.frozen = True
+
+        for state in self._columns.get(table_name, {}).values():
+            if state.pending:
+                values = np.concatenate(state.pending)
+                state.pending = []
+                key_set = self._references[tuple(state.rules["foreign_key"])]
+                missing = ~key_set.contains(values)
+                state.record("foreign_key", missing.sum(), values[missing][:PARTIAL_UNEXPECTED_COUNT].tolist())
+
+    def report(self, table_name: str) -> dict:
+        """
+        Returns the table's report in the same shape and order as `validate_data`.
+        """
+        results = []
+        for column, state in self._columns.get(table_name, {}).items():
+            if state.in_data:
+                results.extend(self._column_results(column, state))
+        return _report(results)
+
+    def _column_results(self, column: str, state: _ColumnState) -> List[dict]:
+        rules = state.rules
+
+        def counted(expectation_type, check, kwargs=None):
+            count = state.unexpected.get(check, 0)
+            return {
+                "success": count == 0,
+                "expectation_config": {"expectation_type": expectation_type, "kwargs": {"column": column, **(kwargs or {})}},
+                "result": {
+                    "element_count": state.element_count,
+                    "unexpected_count": count,
+                    "unexpected_percent": 100.0 * count / state.element_count if state.element_count else 0.0,
+                    "partial_unexpected_list": state.partial.get(check, [])
+                }
+            }
+
+        results = []
+        if rules.get("not_null"):
+            results.append(counted("expect_column_values_to_not_be_null", "not_null"))
+        if rules.get("unique"):
+            results.append(counted("expect_column_values_to_be_unique", "unique"))
+        for check, keys in enumerate(rules.get("compound_unique", ())):
+            results.append(counted("expect_compound_columns_to_be_unique", f"compound_{check}", {"column_list": list(keys)}))
+        if "type" in rules:
+            observed = _combine_observed_types(state.observed_types)
+            results.append({
+                "success": observed == rules["type"],
+                "expectation_config": {"expectation_type": "expect_column_values_to_be_of_type", "kwargs": {"column": column}},
+                "result": {"element_count": state.element_count, "observed_value": observed}
+            })
+        if "in_set" in rules:
+            results.append(counted("expect_column_values_to_be_in_set", "in_set"))
+        if "foreign_key" in rules and self._references[tuple(rules["foreign_key"])].frozen:
+            results.append(counted("expect_column_values_to_be_in_set", "foreign_key"))
+        if "custom_rules" in rules:
+            for check, (expectation_type, kwargs) in enumerate(rules["custom_rules"].expectations()):
+                results.append(counted(expectation_type, f"custom_{check}", kwargs))
+        return results
+
+    def reports(self) -> Dict[str, dict]:
+        """
+        Returns the report of every table that received chunks.
+        """
+        return {table_name: self.report(table_name) for table_name in self._row_counts}
+
+
+def _combine_observed_types(observed_types: Dict[str, int]) -> str:
+    """
+    Combines per-chunk observed types the way inference over the whole column would.
+    """
+    types = {name for name in observed_types if name != "empty"}
+    if not types:
+        return "str"
+    if len(types) == 1:
+        return types.pop()
+    if types == {"int", "float"}:
+        return "float"
+    return "mixed"
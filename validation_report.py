@@ -0,0 +1,176 @@
+import gzip
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, List
+
+UNEXPECTED_SAMPLE_SIZE = 20
+SUMMARY_SAMPLE_SIZE = 5
+MAX_SUMMARY_FAILURES = 20
+
+# Per-expectation result fields that are bounded whatever the table size
+_BOUNDED_RESULT_FIELDS = (
+    "element_count", "missing_count", "missing_percent", "unexpected_count",
+    "unexpected_percent", "unexpected_percent_total", "unexpected_percent_nonmissing",
+    "observed_value"
+)
+# Expectation kwargs that are bounded and say which rule was checked
+_BOUNDED_KWARGS = ("min_value", "max_value", "regex", "expression", "condition", "column_list")
+
+
+def compact_result(result: dict, sample_size: int = UNEXPECTED_SAMPLE_SIZE) -> dict:
+    """
+    Returns a validation report whose size does not grow with the table.
+
+    Counts, percentages and observed values are kept; unexpected values are
+    cut to `sample_size` samples, and the full `unexpected_list`, the index
+    lists and the expectation's unbounded kwargs (e.g. a foreign key's
+    whole value set) are dropped. Works on native and Great
+    Expectations reports alike.
+    """
+    results = []
+    for res in result.get("results", []):
+        config = res.get("expectation_config", {})
+        details = res.get("result") or {}
+        compact = {key: details[key] for key in _BOUNDED_RESULT_FIELDS if key in details}
+        if "partial_unexpected_list" in details:
+            compact["partial_unexpected_list"] = list(details["partial_unexpected_list"][:sample_size])
+        if "partial_unexpected_counts" in details:
+            compact["partial_unexpected_counts"] = list(details["partial_unexpected_counts"][:sample_size])
+        kwargs = config.get("kwargs", {})
+        results.append({
+            "success": bool(res.get("success")),
+            "expectation_config": {
+                "expectation_type": config.get("expectation_type", config.get("type")),
+                "kwargs": {
+                    "column": kwargs.get("column"), **{key: kwargs[key] for key in _BOUNDED_KWARGS if key in kwargs}
+                }
+            },
+            "result": compact
+        })
+    return {"success": bool(result.get("success")), "results": results, "statistics": result.get("statistics", {})}
+
+
+def summarize_result(table_name: str, result: dict) -> Dict[str, Any]:
+    """
+    Returns the small summary handed to callers: pass/fail, the statistics
+    and at most MAX_SUMMARY_FAILURES failed expectations with a few samples.
+    """
+    failed = [res for res in result.get("results", []) if not res["success"]]
+    failures = []
+    for res in failed[:MAX_SUMMARY_FAILURES]:
+        details = res.get("result", {})
+        kwargs = res["expectation_config"]["kwargs"]
+        failure = {
+            "expectation": res["expectation_config"]["expectation_type"],
+            "column": kwargs.get("column")
+        }
+        rule = {key: kwargs[key] for key in _BOUNDED_KWARGS if key in kwargs}
+        if rule:
+            failure["rule"] = rule
+        if "unexpected_count" in details:
+            failure["unexpected_count"] = details["unexpected_count"]
+            failure["unexpected_percent"] = round(details.get("unexpected_percent") or 0.0, 4)
+            failure["sample"] = details.get("partial_unexpected_list", [])[:SUMMARY_SAMPLE_SIZE]
+        if "observed_value" in details:
+            failure["observed_value"] = details["observed_value"]
+        failures.append(failure)
+
+    return {
+        "table": table_name,
+        "success": bool(result.get("success")),
+        "statistics": result.get("statistics", {}),
+        "failures": failures,
+        "failures_omitted": len(failed) - len(failures)
+    }
+
+
+def format_summary(summary: Dict[str, Any]) -> List[str]:
+    """
+    Renders a summary as a handful of log lines.
+    """
+    statistics = summary["statistics"]
+    lines = [
+        f"📋 Validation for '{summary['table']}': {statistics.get('successful_expectations', 0)}/"
+        f"{statistics.get('evaluated_expectations', 0)} expectations passed"
+    ]
+    for failure in summary["failures"]:
+        line = f"  ❌ {failure['expectation']} failed on column '{failure['column']}'"
+        if "rule" in failure:
+            line += " (" + ", ".join(f"{key}={value!r}" for key, value in failure["rule"].items()) + ")"
+        if "unexpected_count" in failure:
+            line += f": {failure['unexpected_count']} unexpected ({failure['unexpected_percent']:.2f}%), e.g. {failure['sample']}"
+        elif "observed_value" in failure:
+            line += f": observed {failure['observed_value']}"
+        lines.append(line)
+    if summary["failures_omitted"]:
+        lines.append(f"  … and {summary['failures_omitted']} more failed expectations")
+    return lines
+
+
+class ReportWriter:
+    """
+    Writes detailed validation reports to a file on a background thread,
+    one compact JSON object per line (gzip-compressed if the path ends in
+    .gz), so callers never wait on serialization or disk.
+
+    `write` only queues the report; `close` waits until everything is on
+    disk and then moves the file into place.
+    """
+
+    def __init__(self, path: str, max_pending: int = 64):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._temp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        if path.endswith('.gz'):
+            self._file = gzip.open(self._temp_path, 'wt', encoding='utf-8')
+        else:
+            self._file = open(self._temp_path, 'w', encoding='utf-8')
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._drain, name="validation-report-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, table_name: str, result: dict, part: int = None) -> None:
+        """
+        Queues one table's (compacted) report for writing. The report must
+        not be modified afterwards.
+        """
+        if self._error is not None:
+            raise self._error
+        entry = {"table": table_name}
+        if part is not None:
+            entry["part"] = part
+        entry["report"] = compact_result(result)
+        self._queue.put(entry)
+
+    def _drain(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            if self._error is not None:
+                continue
+            try:
+                self._file.write(json.dumps(entry, separators=(',', ':'), default=str) + "\n")
+            except Exception as e:
+                self._error = e
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            os.remove(self._temp_path)
+            raise self._error
+        os.replace(self._temp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
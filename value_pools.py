@@ -0,0 +1,278 @@
+import gzip
+import importlib.metadata
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+
+# Bump whenever the same pool key would produce different values
+POOL_VERSION = 1
+DEFAULT_POOL_DIR = os.path.join('data', 'pools')
+DEFAULT_POOL_SIZE = 20_000
+DEFAULT_LOCALE = 'en_US'
+POOL_SEEDS = 16
+DATE_RANGE = ('1970-01-01', '2030-12-31')
+
+# Semantic type -> Faker provider method
+FAKER_PROVIDERS = {
+    "name": "name",
+    "first_name": "first_name",
+    "last_name": "last_name",
+    "email": "email",
+    "username": "user_name",
+    "phone_number": "phone_number",
+    "address": "address",
+    "street_address": "street_address",
+    "city": "city",
+    "country": "country",
+    "postcode": "postcode",
+    "company": "company",
+    "job": "job",
+    "url": "url",
+}
+DATE_TYPES = ('date', 'datetime')
+SEMANTIC_TYPES = tuple(FAKER_PROVIDERS) + DATE_TYPES
+
+# Column name tokens that identify a semantic type, most specific first
+_NAME_HINTS = (
+    (("email", "e_mail", "mail"), "email"),
+    (("phone", "telephone", "mobile", "phone_number"), "phone_number"),
+    (("first_name", "firstname", "given_name"), "first_name"),
+    (("last_name", "lastname", "surname", "family_name"), "last_name"),
+    (("username", "user_name", "login"), "username"),
+    (("street", "street_address"), "street_address"),
+    (("address",), "address"),
+    (("city", "town"), "city"),
+    (("country",), "country"),
+    (("zip", "zipcode", "zip_code", "postcode", "postal_code"), "postcode"),
+    (("company", "employer", "organization", "organisation"), "company"),
+    (("job", "job_title", "occupation", "position"), "job"),
+    (("url", "website", "homepage"), "url"),
+)
+# Last name tokens of identifier columns, e.g. PositionID or country_code;
+# these need an explicit semantic_type to draw from a pool
+KEY_NAME_TOKENS = ("id", "code", "no", "key")
+_PERSON_NAMES = (
+    "name", "full_name", "fullname", "customer_name", "employee_name", "contact_name",
+    "person_name", "manager_name", "author_name", "owner_name", "client_name",
+)
+
+_pools = {}
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def faker_version() -> str:
+    """
+    Returns the installed Faker version, or None without Faker.
+
+    Faker is optional and slow to import, so it is only looked up here and
+    imported when a pool has to be built.
+    """
+    try:
+        return importlib.metadata.version("Faker")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def pool_version() -> str:
+    """
+    Identifies everything that shapes pool contents, for result cache keys.
+    """
+    return f"{POOL_VERSION}:faker-{faker_version() or 'none'}"
+
+
+def snake_case(name: str) -> str:
+    return re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', name).replace('-', '_').replace(' ', '_').lower()
+
+
+def is_key_name(column: str) -> bool:
+    """
+    Tells whether a column name ends in an identifier token such as 'ID'.
+    """
+    return snake_case(column).split("_")[-1] in KEY_NAME_TOKENS
+
+
+def semantic_type(column: str, properties: Dict[str, Any], require_faker: bool = True) -> str:
+    """
+    Returns the semantic type whose pool fills a column, or None.
+
+    An explicit `semantic_type` property wins; otherwise string columns
+    without a value list are matched by schema type (dates) and by column
+    name. Names ending in an identifier token (see `KEY_NAME_TOKENS`) only
+    match a hint they equal, such as 'zip_code'. Faker-backed types are only
+    returned when Faker is installed, unless `require_faker` is False.
+    """
+    faker_ready = faker_version() is not None or not require_faker
+    explicit = properties.get("semantic_type")
+    if explicit:
+        if explicit not in SEMANTIC_TYPES:
+            raise ValueError(f"Unsupported semantic type: '{explicit}'. Supported types are: {', '.join(SEMANTIC_TYPES)}")
+        return explicit if explicit in DATE_TYPES or faker_ready else None
+    if properties.get("values") or properties.get("primary_key"):
+        return None
+
+    dtype = str(properties.get("type") or "string").lower().split(":")[-1]
+    if dtype.startswith(("datetime", "timestamp")):
+        return "datetime"
+    if dtype.startswith("date"):
+        return "date"
+    if not dtype.startswith(("str", "varchar", "char", "text", "nvarchar", "nchar")):
+        return None
+    if not faker_ready:
+        return None
+
+    name = snake_case(column)
+    if name in _PERSON_NAMES:
+        return "name"
+    tokens = name.split("_")
+    key_name = is_key_name(column)
+    for hints, semantic in _NAME_HINTS:
+        if name in hints:
+            return semantic
+        if not key_name and any(hint in tokens or name.endswith("_" + hint) for hint in hints):
+            return semantic
+    return None
+
+
+def pool_seed(seed: int) -> int:
+    """
+    Maps a generation seed to one of POOL_SEEDS pool variants, so runs
+    with different seeds draw from different pools while the disk cache
+    stays bounded.
+    """
+    return int(seed) % POOL_SEEDS
+
+
+def _date_pool(semantic: str, seed: int, size: int) -> np.ndarray:
+    first, last = (np.datetime64(day, 'D') for day in DATE_RANGE)
+    if semantic == 'date':
+        # Every day in the range, so sampling is uniform over dates
+        return np.arange(first, last + 1).astype(str).astype(object)
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(0, int((last - first) / np.timedelta64(1, 's')), size=size)
+    stamps = first.astype('datetime64[s]') + seconds.astype('timedelta64[s]')
+    return np.char.replace(np.datetime_as_string(stamps, unit='s'), 'T', ' ').astype(object)
+
+
+def _faker_pool(semantic: str, seed: int, size: int, locale: str) -> np.ndarray:
+    from faker import Faker
+
+    fake = Faker(locale)
+    fake.seed_instance(seed)
+    provider = getattr(fake, FAKER_PROVIDERS[semantic])
+    return np.asarray([provider() for _ in range(size)], dtype=object)
+
+
+def build_pool(semantic: str, seed: int, size: int = DEFAULT_POOL_SIZE, locale: str = DEFAULT_LOCALE) -> np.ndarray:
+    """
+    Builds a pool of up to `size` distinct values of one semantic type.
+    """
+    if semantic in DATE_TYPES:
+        values = _date_pool(semantic, seed, size)
+    elif semantic in FAKER_PROVIDERS:
+        if faker_version() is None:
+            raise ImportError(f"The '{semantic}' value pool requires Faker to be installed")
+        values = _faker_pool(semantic, seed, size, locale)
+    else:
+        raise ValueError(f"Unsupported semantic type: '{semantic}'. Supported types are: {', '.join(SEMANTIC_TYPES)}")
+    # Distinct values, in first-seen order, so unique columns can draw without repeats
+    return np.asarray(pd.unique(values), dtype=object)
+
+
+def _pool_path(pool_dir: str, semantic: str, seed: int, size: int, locale: str) -> str:
+    provider = f"faker{faker_version()}" if semantic in FAKER_PROVIDERS else "numpy"
+    return os.path.join(pool_dir, f"{semantic}-{locale}-{size}-{seed}-v{POOL_VERSION}-{provider}.json.gz")
+
+
+def value_pool(
+    semantic: str,
+    seed: int,
+    size: int = DEFAULT_POOL_SIZE,
+    locale: str = DEFAULT_LOCALE,
+    pool_dir: str = DEFAULT_POOL_DIR
+) -> np.ndarray:
+    """
+    Returns the read-only pool for a semantic type and generation seed.
+
+    Pools are built once per (type, pool seed, size, locale), kept in
+    memory and cached on disk as gzipped JSON, so later runs and worker
+    processes load them instead of calling Faker again.
+    """
+    seed = pool_seed(seed)
+    key = (semantic, seed, size, locale)
+    with _lock:
+        pool = _pools.get(key)
+    if pool is not None:
+        return pool
+
+    path = _pool_path(pool_dir, semantic, seed, size, locale)
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            pool = np.asarray(json.load(f), dtype=object)
+    except (OSError, ValueError):
+        pool = build_pool(semantic, seed, size, locale)
+        os.makedirs(pool_dir, exist_ok=True)
+        temp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump(pool.tolist(), f)
+        os.replace(temp_path, path)
+
+    pool.flags.writeable = False
+    with _lock:
+        return _pools.setdefault(key, pool)
+
+
+def pool_key(column: str, properties: Dict[str, Any]) -> tuple:
+    """
+    Returns the (semantic type, size, locale) of the pool that fills a
+    column, or None if it has no semantic type. `pool_size` and `locale`
+    column properties override the defaults.
+    """
+    semantic = semantic_type(column, properties)
+    if semantic is None:
+        return None
+    return semantic, int(properties.get("pool_size", DEFAULT_POOL_SIZE)), properties.get("locale", DEFAULT_LOCALE)
+
+
+def column_pool(column: str, properties: Dict[str, Any], seed: int) -> np.ndarray:
+    """
+    Returns the pool that fills a column, or None if it has no semantic type.
+    """
+    key = pool_key(column, properties)
+    if key is None:
+        return None
+    semantic, size, locale = key
+    return value_pool(semantic, seed, size, locale)
+
+
+def disambiguate(pool: np.ndarray, index: np.ndarray, rounds: np.ndarray) -> np.ndarray:
+    """
+    Returns `pool[index]`, made distinct where a unique column has used the
+    whole pool: round r > 0 appends " r+1", or "+r" to an email's local part.
+
+    Each pool value is split at its "@" once; rows are then assembled with
+    a few array concatenations instead of per-row string formatting.
+    """
+    values = pool[index].astype(object)
+    rows = np.flatnonzero(rounds)
+    if not len(rows):
+        return values
+    parts = [str(value).partition("@") for value in pool]
+    emails = np.array([bool(at) for _, at, _ in parts])
+    heads = np.array([local + ("+" if at else " ") for local, at, _ in parts], dtype=object)
+    tails = np.array([at + domain for _, at, domain in parts], dtype=object)
+
+    codes = index[rows]
+    numbers = rounds[rows].astype(np.int64) + ~emails[codes]
+    # A chunk spans few rounds, so each suffix is rendered once
+    low = numbers.min()
+    labels = np.arange(low, numbers.max() + 1).astype(str).astype(object)
+    values[rows] = heads[codes] + labels[numbers - low] + tails[codes]
+    return values